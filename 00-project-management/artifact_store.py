@@ -0,0 +1,369 @@
+#!/usr/bin/env python
+"""
+Content-Addressed Artifact Store
+Operation Lineage Audit
+
+Every dataset a phase produces (grants_aggregated.csv, org_clusters.csv,
+query CSVs, logs, ...) is copied into the store under its SHA-256 with a
+metadata record: producer, upstream hashes, size, row count and column
+schema. Working copies keep their fixed names in the phase folders; the
+store keeps every distinct version exactly once, so any number of runs
+can be kept without duplicating files that did not change.
+
+Layout (ARTIFACT_DIR, default <repo>/artifacts, or LINEAGE_ARTIFACT_DIR):
+  objects/ab/<sha256>        file content (read-only by convention)
+  objects/ab/<sha256>.json   metadata
+  refs/<name>.jsonl          version history per dataset name; last line = latest
+  runs/<producer>.jsonl      input fingerprint -> output hashes, per pipeline stage
+  cache/<sha256>.rows2.pkl   parsed CSV rows, for read_rows()
+
+Consumers resolve a dataset by name (`resolve`, `read_rows`). When the
+working copy has been rewritten outside a publishing producer it is
+published first (producer 'external'), so "latest" never lags the file
+on disk.
+
+Usage:
+  python artifact_store.py list
+  python artifact_store.py history grants_aggregated.csv
+  python artifact_store.py put 01-data-assembly/org_clusters.csv --producer manual
+  python artifact_store.py gc --keep 5
+"""
+
+import sys, os, csv, json, time, pickle, shutil, hashlib, argparse
+from datetime import datetime
+
+import metrics
+
+# ── Configuration ────────────────────────────────────────────────────
+SCRIPT_DIR   = os.path.dirname(os.path.abspath(__file__))
+ROOT         = os.path.normpath(os.path.join(SCRIPT_DIR, '..'))
+ARTIFACT_DIR = os.environ.get('LINEAGE_ARTIFACT_DIR', os.path.join(ROOT, 'artifacts'))
+HASH_CHUNK   = 1 << 20
+ROWS_CACHE   = '.rows2.pkl'   # suffix of parsed-row caches; renamed when parsing changes
+SCHEMA_ROWS  = 1000      # rows sampled to infer CSV column types
+TABULAR      = ('.csv',)
+
+def log(msg):
+    ts = datetime.now().strftime("%H:%M:%S")
+    print(f"[{ts}] {msg}", flush=True)
+
+
+# ── Content hashes ───────────────────────────────────────────────────
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+class FileHashes:
+    """SHA-256 per file, reused while size and mtime are unchanged."""
+
+    def __init__(self, known=None):
+        self.known = dict(known or {})
+
+    def get(self, path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        rec = self.known.get(path)
+        if rec and rec['size'] == st.st_size and rec['mtime_ns'] == st.st_mtime_ns:
+            return rec['sha256']
+        sha = sha256_file(path)
+        self.known[path] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': sha}
+        return sha
+
+
+# ── CSV helpers ──────────────────────────────────────────────────────
+def _with_csv(path, fn):
+    """fn(csv.reader) over the file as utf-8-sig (BOM-safe), cp1252 if that fails."""
+    try:
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            return fn(csv.reader(f))
+    except UnicodeDecodeError:
+        with open(path, 'r', encoding='cp1252', newline='') as f:
+            return fn(csv.reader(f))
+
+def _value_type(v):
+    if v == '' or v == 'NA':
+        return None
+    try:
+        int(v)
+        return 'int'
+    except ValueError:
+        pass
+    try:
+        float(v)
+        return 'float'
+    except ValueError:
+        pass
+    try:
+        datetime.fromisoformat(v)
+        return 'date'
+    except ValueError:
+        return 'string'
+
+_WIDEN = {('int', 'float'): 'float', ('float', 'int'): 'float'}
+
+def _profile(reader):
+    header = next(reader, None)
+    if header is None:
+        return 0, []
+    types = [None] * len(header)
+    n = 0
+    for row in reader:
+        if not row:                         # blank line, skipped as by csv.DictReader
+            continue
+        if n < SCHEMA_ROWS:
+            for i, v in enumerate(row[:len(header)]):
+                t = _value_type(v)
+                if t is None or types[i] == t:
+                    continue
+                types[i] = t if types[i] is None else _WIDEN.get((types[i], t), 'string')
+        n += 1
+    return n, [[c, t or 'empty'] for c, t in zip(header, types)]
+
+def csv_profile(path):
+    """(row count, [[column, type], ...]) for a CSV file."""
+    return _with_csv(path, _profile)
+
+
+# ── Store ────────────────────────────────────────────────────────────
+class ArtifactStore:
+    def __init__(self, root=ARTIFACT_DIR):
+        self.root = root
+        self.hashes = FileHashes()
+
+    # paths
+    def object_path(self, sha):
+        return os.path.join(self.root, 'objects', sha[:2], sha)
+
+    def _meta_path(self, sha):
+        return self.object_path(sha) + '.json'
+
+    def _ref_path(self, name):
+        return os.path.join(self.root, 'refs', name.replace('/', '__') + '.jsonl')
+
+    def _run_path(self, producer):
+        return os.path.join(self.root, 'runs', producer + '.jsonl')
+
+    @staticmethod
+    def _append(path, rec):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(rec, sort_keys=True) + '\n')
+
+    @staticmethod
+    def _read_jsonl(path):
+        if not os.path.exists(path):
+            return []
+        with open(path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    # objects
+    def has(self, sha):
+        return os.path.exists(self.object_path(sha))
+
+    def meta(self, sha):
+        with open(self._meta_path(sha), encoding='utf-8') as f:
+            return json.load(f)
+
+    def put(self, path, name=None, producer=None, upstream=None):
+        """Store a file by content and make it the latest version of `name`."""
+        name = name or os.path.basename(path)
+        sha = self.hashes.get(path)
+        if sha is None:
+            raise FileNotFoundError(path)
+        obj = self.object_path(sha)
+        if not os.path.exists(obj):
+            os.makedirs(os.path.dirname(obj), exist_ok=True)
+            tmp = f"{obj}.{os.getpid()}.tmp"
+            shutil.copyfile(path, tmp)
+            os.replace(tmp, obj)
+        if not os.path.exists(self._meta_path(sha)):
+            rows, columns = csv_profile(obj) if name.endswith(TABULAR) else (None, None)
+            meta = {'sha256': sha, 'name': name, 'size': os.path.getsize(obj),
+                    'rows': rows, 'columns': columns, 'producer': producer,
+                    'upstream': upstream or {},
+                    'created_at': datetime.now().isoformat(timespec='seconds')}
+            tmp = f"{self._meta_path(sha)}.{os.getpid()}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, indent=2)
+            os.replace(tmp, self._meta_path(sha))
+        st = os.stat(path)
+        head = self.latest(name)
+        if head is None or head['sha256'] != sha or head.get('path') != os.path.abspath(path) \
+                or head.get('mtime_ns') != st.st_mtime_ns:
+            self._append(self._ref_path(name), {
+                'sha256': sha, 'producer': producer, 'upstream': upstream or {},
+                'path': os.path.abspath(path), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns,
+                'published_at': datetime.now().isoformat(timespec='seconds')})
+        return self.meta(sha)
+
+    def restore(self, sha, dest):
+        """Copy a stored object back to a working path."""
+        os.makedirs(os.path.dirname(os.path.abspath(dest)), exist_ok=True)
+        tmp = f"{dest}.{os.getpid()}.tmp"
+        shutil.copyfile(self.object_path(sha), tmp)
+        os.replace(tmp, dest)
+
+    # names
+    def history(self, name):
+        return self._read_jsonl(self._ref_path(name))
+
+    def latest(self, name):
+        hist = self.history(name)
+        return hist[-1] if hist else None
+
+    def names(self):
+        d = os.path.join(self.root, 'refs')
+        if not os.path.isdir(d):
+            return []
+        return sorted(f[:-6].replace('__', '/') for f in os.listdir(d) if f.endswith('.jsonl'))
+
+    def resolve(self, name, working_path=None):
+        """Path of the latest stored version of `name`.
+
+        If working_path exists and differs from what the store last saw
+        there (size or mtime), it is published first."""
+        head = self.latest(name)
+        if working_path and os.path.exists(working_path):
+            st = os.stat(working_path)
+            seen = (head is not None and head.get('path') == os.path.abspath(working_path)
+                    and head.get('size') == st.st_size and head.get('mtime_ns') == st.st_mtime_ns)
+            if not seen and (head is None or self.hashes.get(working_path) != head['sha256']):
+                self.put(working_path, name, producer='external')
+                head = self.latest(name)
+        if head is None:
+            raise FileNotFoundError(f"no artifact named {name!r}"
+                                    + (f" and no file at {working_path}" if working_path else ""))
+        return self.object_path(head['sha256'])
+
+    def read_rows(self, name, working_path=None):
+        """Latest version of a CSV as a list of dicts, parsed once per content hash."""
+        path = self.resolve(name, working_path)
+        sha = os.path.basename(path)
+        cache = os.path.join(self.root, 'cache', sha + ROWS_CACHE)
+        hit = os.path.exists(cache)
+        with metrics.span('csv.read', file=name, cache='hit' if hit else 'miss') as sp:
+            if hit:
+                with open(cache, 'rb') as f:
+                    header, rows = pickle.load(f)
+            else:
+                def parse(reader):
+                    header = next(reader, [])
+                    pad = (None,) * len(header)     # short rows read as None, blank lines skipped, like csv.DictReader
+                    return header, [tuple(x) + pad[len(x):] for x in reader if x]
+                header, rows = _with_csv(path, parse)
+                os.makedirs(os.path.dirname(cache), exist_ok=True)
+                tmp = f"{cache}.{os.getpid()}.tmp"
+                with open(tmp, 'wb') as f:
+                    pickle.dump((header, rows), f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, cache)
+            out = [dict(zip(header, r)) for r in rows]
+            sp.rows = len(out)
+            sp.bytes = os.path.getsize(path)
+        return out
+
+    # pipeline runs
+    def record_run(self, producer, key, inputs, outputs):
+        self._append(self._run_path(producer), {
+            'key': key, 'inputs': inputs, 'outputs': outputs,
+            'recorded_at': datetime.now().isoformat(timespec='seconds')})
+
+    def find_run(self, producer, key):
+        """Most recent run of `producer` with this input key whose outputs are all stored."""
+        for rec in reversed(self._read_jsonl(self._run_path(producer))):
+            if rec['key'] == key and all(self.has(s) for s in rec['outputs'].values()):
+                return rec
+        return None
+
+    # housekeeping
+    def gc(self, keep=5):
+        """Keep the last `keep` distinct versions per name, delete every other
+        object and forget runs that used one. Returns (objects removed, bytes freed)."""
+        live = set()
+        for name in self.names():
+            distinct = list(dict.fromkeys(h['sha256'] for h in reversed(self.history(name))))
+            kept = set(distinct[:keep] if keep else distinct)
+            live.update(kept)
+            hist = self.history(name)
+            if any(h['sha256'] not in kept for h in hist):
+                with open(self._ref_path(name), 'w', encoding='utf-8') as fh:
+                    fh.writelines(json.dumps(h, sort_keys=True) + '\n'
+                                  for h in hist if h['sha256'] in kept)
+        runs_dir = os.path.join(self.root, 'runs')
+        for f in (os.listdir(runs_dir) if os.path.isdir(runs_dir) else []):
+            path = os.path.join(runs_dir, f)
+            recs = self._read_jsonl(path)
+            kept = [r for r in recs if set(r['outputs'].values()) <= live]
+            if len(kept) != len(recs):
+                with open(path, 'w', encoding='utf-8') as fh:
+                    fh.writelines(json.dumps(r, sort_keys=True) + '\n' for r in kept)
+        removed, freed = 0, 0
+        obj_dir = os.path.join(self.root, 'objects')
+        for sub in (os.listdir(obj_dir) if os.path.isdir(obj_dir) else []):
+            for f in os.listdir(os.path.join(obj_dir, sub)):
+                sha = f.split('.')[0]
+                if sha in live:
+                    continue
+                path = os.path.join(obj_dir, sub, f)
+                freed += os.path.getsize(path)
+                os.remove(path)
+                if not f.endswith('.json'):
+                    removed += 1
+                    cache = os.path.join(self.root, 'cache', sha + ROWS_CACHE)
+                    if os.path.exists(cache):
+                        os.remove(cache)
+        return removed, freed
+
+
+def publish(path, producer, upstream=None, store=None):
+    """Producer-side hook: store a freshly written output. Never fails the caller."""
+    try:
+        (store or ArtifactStore()).put(path, producer=producer, upstream=upstream)
+    except OSError as e:
+        log(f"  WARN: could not publish {os.path.basename(path)} to the artifact store: {e}")
+
+
+def main():
+    sys.stdout.reconfigure(encoding='utf-8')
+
+    ap = argparse.ArgumentParser(description="Inspect the content-addressed artifact store.")
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    sub.add_parser('list', help="latest version of every dataset")
+    p = sub.add_parser('history', help="every stored version of one dataset")
+    p.add_argument('name')
+    p = sub.add_parser('put', help="store a file as the latest version of its name")
+    p.add_argument('path')
+    p.add_argument('--name')
+    p.add_argument('--producer', default='manual')
+    p = sub.add_parser('gc', help="drop all but the last N versions per dataset")
+    p.add_argument('--keep', type=int, default=5)
+    args = ap.parse_args()
+
+    store = ArtifactStore()
+    if args.cmd == 'list':
+        for name in store.names():
+            head = store.latest(name)
+            m = store.meta(head['sha256'])
+            rows = f"{m['rows']:,} rows" if m['rows'] is not None else f"{m['size']:,} bytes"
+            log(f"{name:<45} {head['sha256'][:12]}  {rows:<16} {head['producer'] or '?':<22} "
+                f"{head['published_at']}  ({len(store.history(name))} versions)")
+    elif args.cmd == 'history':
+        for h in store.history(args.name):
+            m = store.meta(h['sha256'])
+            up = ', '.join(f"{k}@{v[:8]}" for k, v in sorted(h['upstream'].items()) if v)
+            log(f"{h['published_at']}  {h['sha256'][:12]}  rows={m['rows']}  "
+                f"producer={h['producer']}" + (f"  upstream: {up}" if up else ""))
+    elif args.cmd == 'put':
+        m = store.put(args.path, args.name, producer=args.producer)
+        log(f"Stored {m['name']} as {m['sha256'][:12]} ({m['rows']} rows)")
+    elif args.cmd == 'gc':
+        t0 = time.time()
+        n, freed = store.gc(args.keep)
+        log(f"Removed {n} objects, freed {freed / 1e6:.1f} MB in {time.time()-t0:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+#!/usr/bin/env python
+"""
+Integer BN Identity Layer
+Operation Lineage Audit
+
+A CRA Business Number is a 9-digit root, a 2-letter program identifier
+and a 4-digit account (100021237RR0001). Every source spells it a little
+differently -- GOA and federal files carry spaces, dashes or just the
+root -- and every stage used to carry it around as a 15-char string.
+Here each BN becomes one int64:
+
+  bits 24..53  root       (0 .. 999,999,999)
+  bits 14..23  program    ((A..Z)*27 + (A..Z), 0 = root only)
+  bits  0..13  account    (0 .. 9999)
+
+so a bare root is the code with its low 24 bits clear, `root(codes)` is
+a mask, and codes sort by root first. NULL (-1) marks values with no BN.
+
+  encode / decode     vectorized str <-> int64 (numpy / pandas)
+  clean               vectorized clean_bn: canonical string, root if that is all there is
+  BnSet               sorted code array: contains / resolve / index, exact or by root
+  BnDictionary        BnSet persisted as bn_dictionary.csv with the datasets each BN came from
+
+The dictionary is rebuilt by the bn_dictionary pipeline stage from the
+Phase 0 outputs (DATA_DIR, default 01-data-assembly, or LINEAGE_DATA_DIR).
+Consumers load it with BnDictionary.load() and use canonical() to complete
+bare 9-digit roots to the full BN the other datasets know them by:
+director_resolution.py for raw director extracts, agent_1_federal_grants.py
+for the federal file.
+
+Usage:
+  python bn_ids.py build
+  python bn_ids.py info
+  python bn_ids.py lookup 100021237RR0001 "100021237 RR 0002" 100021237
+"""
+
+import os, time, argparse
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from artifact_store import publish
+import metrics
+
+# ── Configuration ────────────────────────────────────────────────────
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT       = os.path.normpath(os.path.join(SCRIPT_DIR, '..'))
+DATA_DIR   = os.environ.get('LINEAGE_DATA_DIR', os.path.join(ROOT, '01-data-assembly'))
+DICT_CSV   = 'bn_dictionary.csv'
+
+ROOT_SHIFT    = 24
+PROGRAM_SHIFT = 14
+ACCOUNT_MASK  = (1 << PROGRAM_SHIFT) - 1
+PROGRAM_MASK  = ((1 << (ROOT_SHIFT - PROGRAM_SHIFT)) - 1) << PROGRAM_SHIFT
+ROOT_MASK     = ~((1 << ROOT_SHIFT) - 1)
+NULL          = -1
+NULL_TOKENS   = ('NONE', 'NULL', 'NAN')
+
+# [0-9], not \d: \d also matches non-ASCII digits, which _pack cannot read
+FULL_RE  = r'[0-9]{9}[A-Z]{2}[0-9]{4}'
+ROOT_RE  = r'[0-9]{9}'
+BN_TOKEN = r'[0-9]{9}(?:[A-Z]{2}[0-9]{4})?'
+
+# Phase 0 outputs the dictionary is built from: file -> BN columns.
+# A column may hold a list of BNs (multi_board_directors.linked_bns).
+SOURCES = {
+    'org_risk_flags.csv':        ['bn'],
+    'org_clusters.csv':          ['bn'],
+    'org_network_edges.csv':     ['org1_bn', 'org2_bn'],
+    'multi_board_directors.csv': ['linked_bns'],
+    'goa_cra_matched.csv':       ['bn'],
+    'federal_grants.csv':        ['BN'],
+}
+
+def log(msg):
+    ts = datetime.now().strftime("%H:%M:%S")
+    print(f"[{ts}] {msg}", flush=True)
+
+
+# ── Encode / decode ──────────────────────────────────────────────────
+def _normalize(values):
+    s = pd.Series(values, dtype=object).fillna('').astype(str).str.upper()
+    return s.str.replace(r'[\s\-]', '', regex=True)
+
+_WIDTH  = 16                                   # 15 chars + one byte to catch longer values
+
+def _bytes(values):
+    """(n, 16) uint8 matrix of the values' ASCII bytes, or None if any is not ASCII text."""
+    try:
+        arr = np.array(values, dtype=f'S{_WIDTH}')
+    except (UnicodeEncodeError, ValueError):
+        return None
+    return arr.view(np.uint8).reshape(-1, _WIDTH)
+
+def _canonical(raw):
+    """Rows that already read NNNNNNNNN or NNNNNNNNNAANNNN (column at a time, uint8)."""
+    def all_in(cols, lo, span):
+        ok = np.ones(len(raw), dtype=bool)
+        for j in cols:
+            ok &= (raw[:, j] - np.uint8(lo)) < span
+        return ok
+    root_only = np.ones(len(raw), dtype=bool)
+    for j in range(9, _WIDTH):
+        root_only &= raw[:, j] == 0
+    full = all_in(range(9, 11), 65, 26) & all_in(range(11, 15), 48, 10) & (raw[:, 15] == 0)
+    return all_in(range(9), 48, 10) & (root_only | full)
+
+def _pack(raw):
+    """int64 codes from canonical rows of a _bytes matrix."""
+    def number(cols):
+        out = np.zeros(len(raw), dtype=np.int64)
+        for j in cols:
+            out = out * 10 + (raw[:, j] - 48)
+        return out
+    full = raw[:, 9] > 0
+    program = (raw[:, 9].astype(np.int64) - 64) * 27 + (raw[:, 10].astype(np.int64) - 64)
+    tail = np.where(full, program << PROGRAM_SHIFT | number(range(11, 15)), 0)
+    return number(range(9)) << ROOT_SHIFT | tail
+
+def encode(values):
+    """BN-like values -> int64 codes (NULL where no 9-digit root is found).
+
+    Spaces and dashes are ignored; the first full BN is taken, else the
+    first 9-digit root, as clean_bn does. Values already in
+    canonical form are parsed straight from their bytes; only the rest go
+    through the regex extract.
+    """
+    values = np.asarray(values, dtype=object).ravel()
+    codes = np.full(len(values), NULL, dtype=np.int64)
+    if not len(values):
+        return codes
+    raw = _bytes(values)
+    if raw is not None:
+        canon = _canonical(raw)
+        codes[canon] = _pack(raw[canon])
+    else:
+        canon = np.zeros(len(values), dtype=bool)
+    rest = np.flatnonzero(~canon)
+    if len(rest):
+        s = _normalize(values[rest])
+        found = s.str.extract(f'({FULL_RE})', expand=False).fillna(s.str.extract(f'({ROOT_RE})', expand=False))
+        hit = found.notna().to_numpy()
+        if hit.any():
+            codes[rest[hit]] = _pack(_bytes(found[hit].to_numpy(dtype=object)))
+    return codes
+
+def encode_one(bn):
+    return int(encode([bn])[0])
+
+def decode(codes):
+    """int64 codes -> BN strings (root only where the code has no program, '' for NULL)."""
+    codes = np.asarray(codes, dtype=np.int64).ravel()
+    valid = codes >= 0
+    c = np.where(valid, codes, 0)
+    program = (c & PROGRAM_MASK) >> PROGRAM_SHIFT
+    full = valid & (program > 0)
+    raw = np.zeros((len(c), 15), dtype=np.uint8)
+    for cols, n in ((range(8, -1, -1), c >> ROOT_SHIFT), (range(14, 10, -1), c & ACCOUNT_MASK)):
+        for j in cols:
+            raw[:, j] = n % 10 + 48
+            n = n // 10
+    raw[:, 9] = program // 27 + 64
+    raw[:, 10] = program % 27 + 64
+    raw[~full, 9:] = 0
+    raw[~valid] = 0
+    return raw.view('S15').ravel().astype(str)
+
+def decode_one(code):
+    return decode([code])[0]
+
+def root(codes):
+    """Root-only code for each code (NULL stays NULL)."""
+    codes = np.asarray(codes, dtype=np.int64)
+    return np.where(codes >= 0, codes & ROOT_MASK, NULL)
+
+def is_root_only(codes):
+    codes = np.asarray(codes, dtype=np.int64)
+    return (codes >= 0) & ((codes & ~ROOT_MASK) == 0)
+
+def clean(values):
+    """Vectorized clean_bn: canonical BN, 9-digit root, or the normalized input if neither."""
+    s = _normalize(values)
+    codes = encode(s)
+    out = decode(codes)
+    rest = s.where(~s.isin(NULL_TOKENS), '').to_numpy(dtype=object)
+    return np.where(codes >= 0, out, rest)
+
+
+# ── Sets ─────────────────────────────────────────────────────────────
+class BnSet:
+    """Sorted unique BN codes with vectorized membership.
+
+    Lookups take strings or codes. by_root=True matches on the 9-digit
+    root alone, so a bare root, or the same charity under another program
+    account, finds its member.
+    """
+
+    def __init__(self, codes=()):
+        codes = np.asarray(codes, dtype=np.int64)
+        self.codes = np.unique(codes[codes >= 0])
+        self.roots = np.unique(root(self.codes))
+
+    @classmethod
+    def from_values(cls, values):
+        return cls(encode(list(values)))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __iter__(self):
+        return iter(decode(self.codes).tolist())
+
+    def __contains__(self, bn):
+        return bool(self.contains([bn])[0])
+
+    @staticmethod
+    def _codes(values):
+        if isinstance(values, np.ndarray) and values.dtype.kind in 'iu':
+            return values.astype(np.int64)
+        return encode(list(values) if not isinstance(values, pd.Series) else values)
+
+    @staticmethod
+    def _isin(sorted_codes, codes):
+        if not len(sorted_codes):
+            return np.zeros(len(codes), dtype=bool)
+        pos = np.minimum(np.searchsorted(sorted_codes, codes), len(sorted_codes) - 1)
+        return (sorted_codes[pos] == codes) & (codes >= 0)
+
+    def contains(self, values, by_root=False):
+        codes = self._codes(values)
+        if by_root:
+            return self._isin(self.roots, root(codes))
+        return self._isin(self.codes, codes)
+
+    def index(self, values):
+        """Dense position of each value in the set (-1 if absent), for array indexing."""
+        codes = self._codes(values)
+        pos = np.searchsorted(self.codes, codes)
+        return np.where(self._isin(self.codes, codes), pos, -1)
+
+    def resolve(self, values, by_root=True):
+        """Member code per value: the exact BN if present, else (by_root)
+        the lowest-coded member sharing its root; NULL if none."""
+        codes = self._codes(values)
+        out = np.where(self._isin(self.codes, codes), codes, NULL)
+        if by_root and len(self.codes):
+            miss = (out == NULL) & (codes >= 0)
+            roots = root(codes[miss])
+            pos = np.minimum(np.searchsorted(self.codes, roots), len(self.codes) - 1)
+            hit = root(self.codes[pos]) == roots
+            out[np.flatnonzero(miss)[hit]] = self.codes[pos[hit]]
+        return out
+
+
+class BnDictionary(BnSet):
+    """The shared BN registry: every BN seen in the Phase 0 outputs, with
+    the datasets it appeared in. Codes are the encode() codes, so a
+    dictionary built on one machine decodes the same everywhere."""
+
+    def __init__(self, codes=(), sources=None):
+        codes = np.asarray(codes, dtype=np.int64)
+        super().__init__(codes)
+        names = pd.Series(sources if sources is not None else [''] * len(codes), dtype=object)
+        names = names.fillna('').astype(str).str.split(';').explode()
+        names = names[(names != '') & (codes[names.index] >= 0)]
+        # One bit per dataset name, OR-ed per code, then decoded once per distinct mask
+        labels, bit = pd.factorize(names, sort=True)
+        masks = np.zeros(len(self.codes), dtype=np.int64)
+        np.bitwise_or.at(masks, np.searchsorted(self.codes, codes[names.index]), 1 << labels.astype(np.int64))
+        uniq, inverse = np.unique(masks, return_inverse=True)
+        text = np.array([';'.join(n for i, n in enumerate(bit) if m >> i & 1) for m in uniq], dtype=object)
+        self.sources = text[inverse]
+
+    @classmethod
+    def build(cls, data_dir=DATA_DIR, sources=SOURCES):
+        codes, names = [], []
+        for filename, columns in sources.items():
+            path = os.path.join(data_dir, filename)
+            if not os.path.exists(path):
+                continue
+            head = pd.read_csv(path, nrows=0, encoding='utf-8-sig').columns
+            cols = [c for c in columns if c in head]
+            if not cols:
+                continue
+            df = pd.read_csv(path, usecols=cols, dtype=str, encoding='utf-8-sig')
+            for col in cols:
+                found = _normalize(df[col]).str.findall(BN_TOKEN).explode().dropna()
+                c = np.unique(encode(found))
+                c = c[c >= 0]
+                codes.append(c)
+                names.extend([filename[:-4]] * len(c))
+        if not codes:
+            return cls()
+        return cls(np.concatenate(codes), names)
+
+    @classmethod
+    def load(cls, path=None, missing_ok=False):
+        """The saved dictionary; with missing_ok, an empty one if there is no file."""
+        path = path or os.path.join(DATA_DIR, DICT_CSV)
+        if missing_ok and not os.path.exists(path):
+            return cls()
+        df = pd.read_csv(path, dtype={'code': np.int64, 'sources': str}, keep_default_na=False)
+        return cls(df['code'].to_numpy(), df['sources'].to_numpy())
+
+    def canonical(self, values):
+        """clean() per value, with each bare 9-digit root completed to the
+        dictionary's full BN under that root (the lowest-coded), if it has one.
+
+        Returns (strings, number of roots completed).
+        """
+        out = np.asarray(clean(values), dtype=object)
+        codes = encode(out)
+        bare = np.flatnonzero(is_root_only(codes))
+        if not len(bare):
+            return out, 0
+        if not hasattr(self, '_full'):
+            self._full = BnSet(self.codes[~is_root_only(self.codes)])
+        hit = self._full.resolve(codes[bare])
+        ok = hit >= 0
+        out[bare[ok]] = decode(hit[ok])
+        return out, int(ok.sum())
+
+    def save(self, path=None):
+        path = path or os.path.join(DATA_DIR, DICT_CSV)
+        pd.DataFrame({
+            'code': self.codes,
+            'bn': decode(self.codes),
+            'root': decode(root(self.codes)),
+            'sources': self.sources,
+        }).to_csv(path, index=False, encoding='utf-8')
+        return path
+
+
+# ── CLI ──────────────────────────────────────────────────────────────
+def main():
+    ap = argparse.ArgumentParser(description="Integer BN codes and the shared BN dictionary.")
+    ap.add_argument('--data-dir', default=DATA_DIR)
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    sub.add_parser('build', help=f"rebuild {DICT_CSV} from the Phase 0 outputs")
+    sub.add_parser('info', help="dictionary counts by source")
+    lk = sub.add_parser('lookup', help="encode BNs and resolve them against the dictionary")
+    lk.add_argument('bns', nargs='+')
+    args = ap.parse_args()
+    path = os.path.join(args.data_dir, DICT_CSV)
+
+    if args.cmd == 'build':
+        t0 = time.time()
+        with metrics.span('bn_dictionary.build') as sp:
+            d = BnDictionary.build(args.data_dir)
+            sp.rows = len(d)
+        d.save(path)
+        log(f"{len(d):,} BNs, {len(d.roots):,} roots ({time.time() - t0:.2f}s) -> {path}")
+        publish(path, 'bn_dictionary')
+        return
+
+    d = BnDictionary.load(path)
+    if args.cmd == 'info':
+        log(f"{path}: {len(d):,} BNs, {len(d.roots):,} roots, "
+            f"{int(is_root_only(d.codes).sum()):,} root-only")
+        counts = pd.Series(d.sources).str.split(';').explode().value_counts()
+        for name, n in counts.items():
+            log(f"  {name:28s} {n:>9,}")
+    else:
+        codes = encode(args.bns)
+        for bn, c, r in zip(args.bns, codes, d.resolve(codes)):
+            member = f"{decode_one(r)} ({d.sources[d.index([r])[0]]})" if r >= 0 else '-'
+            log(f"  {bn!r:24} code={c:<20} root={decode_one(root([c])[0]) or '-':10} -> {member}")
+
+if __name__ == '__main__':
+    main()
+    metrics.export('bn_ids', log)
@@ -0,0 +1,316 @@
+#!/usr/bin/env python
+"""
+Run Metrics
+Operation Lineage Audit
+
+Timing instrumentation for the hot paths of a rebuild: CSV parsing,
+param building, each batch write, each Cypher query and each warehouse
+fetch. Code records into one process-wide registry:
+
+    with metrics.span('params', step='organizations') as sp:
+        ...
+        sp.rows = len(org_params)
+
+    @metrics.timed('flags.compute')
+    def compute_flags(...): ...      # rows = len(result) when it has one
+
+Each series (span name + labels) keeps a latency histogram (count, sum,
+max, fixed buckets) plus row, byte and error totals. export(run) at the
+end of a script:
+
+  - writes <METRICS_DIR>/<run>.prom in Prometheus text format
+    (lineage_span_seconds histogram, lineage_span_rows_total, ...), for a
+    node_exporter textfile collector or a plain diff;
+  - appends the run's summary to <METRICS_DIR>/runs.jsonl;
+  - logs the summary table, slowest series first, with p50/p95 estimated
+    from the buckets.
+
+METRICS_DIR defaults to <repo>/metrics (LINEAGE_METRICS_DIR overrides).
+
+Usage:
+  python metrics.py show agent_1_graph_builder        # last run's table
+  python metrics.py compare agent_1_graph_builder     # last two runs side by side
+"""
+
+import sys, os, json, time, math, socket, functools, threading, argparse
+from datetime import datetime
+from contextlib import contextmanager
+
+# ── Configuration ────────────────────────────────────────────────────
+SCRIPT_DIR  = os.path.dirname(os.path.abspath(__file__))
+ROOT        = os.path.normpath(os.path.join(SCRIPT_DIR, '..'))
+METRICS_DIR = os.environ.get('LINEAGE_METRICS_DIR', os.path.join(ROOT, 'metrics'))
+RUNS_NAME   = 'runs.jsonl'
+PREFIX      = 'lineage_span'
+BUCKETS     = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+               1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, math.inf)
+
+def log(msg):
+    ts = datetime.now().strftime("%H:%M:%S")
+    print(f"[{ts}] {msg}", flush=True)
+
+
+# ── Histogram ────────────────────────────────────────────────────────
+class Histogram:
+    """Fixed-bucket latency histogram (seconds), cumulative like Prometheus."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)     # per bucket, not cumulative
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, v):
+        for i, le in enumerate(self.buckets):
+            if v <= le:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += v
+        self.max = max(self.max, v)
+
+    def cumulative(self):
+        total, out = 0, []
+        for le, c in zip(self.buckets, self.counts):
+            total += c
+            out.append((le, total))
+        return out
+
+    def quantile(self, q):
+        """Linear interpolation inside the bucket holding the q-th observation."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        lo, seen = 0.0, 0
+        for le, c in zip(self.buckets, self.counts):
+            if c and seen + c >= rank:
+                hi = min(le, self.max)
+                return lo + (hi - lo) * ((rank - seen) / c) if hi > lo else hi
+            seen += c
+            lo = le
+        return self.max
+
+
+# ── Registry ─────────────────────────────────────────────────────────
+class Span:
+    """Handle yielded by Registry.span(); set .rows / .bytes before it closes."""
+    __slots__ = ('rows', 'bytes')
+
+    def __init__(self):
+        self.rows = 0
+        self.bytes = 0
+
+
+def _key(name, labels):
+    return (name, tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None)))
+
+class Registry:
+    def __init__(self):
+        self.series = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds, rows=0, nbytes=0, error=False, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            s = self.series.get(key)
+            if s is None:
+                s = self.series[key] = {'hist': Histogram(), 'rows': 0, 'bytes': 0, 'errors': 0}
+            s['hist'].observe(seconds)
+            s['rows'] += rows or 0
+            s['bytes'] += nbytes or 0
+            s['errors'] += int(error)
+
+    @contextmanager
+    def span(self, name, **labels):
+        sp = Span()
+        t0 = time.perf_counter()
+        try:
+            yield sp
+        except BaseException:
+            self.observe(name, time.perf_counter() - t0, sp.rows, sp.bytes, error=True, **labels)
+            raise
+        self.observe(name, time.perf_counter() - t0, sp.rows, sp.bytes, **labels)
+
+    def timed(self, name=None, **labels):
+        """Decorator: one span per call; rows = len(result) when the result is sized."""
+        def wrap(fn):
+            span_name = name or fn.__qualname__
+            @functools.wraps(fn)
+            def inner(*args, **kwargs):
+                with self.span(span_name, **labels) as sp:
+                    result = fn(*args, **kwargs)
+                    if hasattr(result, '__len__'):
+                        sp.rows = len(result)
+                    return result
+            return inner
+        return wrap
+
+    def reset(self):
+        with self._lock:
+            self.series.clear()
+            self.started = time.time()
+
+    # ── Export ───────────────────────────────────────────────────────
+    def summary(self):
+        """One dict per series, slowest total first."""
+        with self._lock:
+            items = list(self.series.items())
+        out = []
+        for (name, labels), s in items:
+            h = s['hist']
+            out.append({
+                'span': name, 'labels': dict(labels), 'count': h.count,
+                'seconds': round(h.sum, 6), 'max': round(h.max, 6),
+                'p50': _round(h.quantile(0.5)), 'p95': _round(h.quantile(0.95)),
+                'rows': s['rows'], 'bytes': s['bytes'], 'errors': s['errors'],
+            })
+        return sorted(out, key=lambda r: -r['seconds'])
+
+    def prometheus(self, run=None):
+        """Registry contents in Prometheus text exposition format."""
+        with self._lock:
+            items = sorted(self.series.items())
+        base = {'run': run} if run else {}
+        lines = [f"# HELP {PREFIX}_seconds Latency of instrumented spans.",
+                 f"# TYPE {PREFIX}_seconds histogram"]
+        for (name, labels), s in items:
+            lab = dict(base, span=name, **dict(labels))
+            h = s['hist']
+            for le, c in h.cumulative():
+                lines.append(f"{PREFIX}_seconds_bucket{_labels(lab, le=_le(le))} {c}")
+            lines.append(f"{PREFIX}_seconds_sum{_labels(lab)} {h.sum:.6f}")
+            lines.append(f"{PREFIX}_seconds_count{_labels(lab)} {h.count}")
+        for metric, field, help_ in (('rows', 'rows', 'Rows read or written by instrumented spans.'),
+                                     ('bytes', 'bytes', 'Bytes read by instrumented spans.'),
+                                     ('errors', 'errors', 'Instrumented spans that raised.')):
+            lines += [f"# HELP {PREFIX}_{metric}_total {help_}",
+                      f"# TYPE {PREFIX}_{metric}_total counter"]
+            for (name, labels), s in items:
+                lab = dict(base, span=name, **dict(labels))
+                lines.append(f"{PREFIX}_{metric}_total{_labels(lab)} {s[field]}")
+        if run:
+            lines += [f"# HELP {PREFIX}_run_seconds Wall time of the run.",
+                      f"# TYPE {PREFIX}_run_seconds gauge",
+                      f"{PREFIX}_run_seconds{_labels(base)} {time.time() - self.started:.3f}"]
+        return '\n'.join(lines) + '\n'
+
+    def export(self, run, log=log, metrics_dir=None, top=25):
+        """Write <run>.prom, append to runs.jsonl and log the summary table."""
+        metrics_dir = metrics_dir or METRICS_DIR
+        os.makedirs(metrics_dir, exist_ok=True)
+        path = os.path.join(metrics_dir, f"{run}.prom")
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus(run))
+        os.replace(tmp, path)
+
+        summary = self.summary()
+        record = {'run': run, 'host': socket.gethostname(),
+                  'started_at': datetime.fromtimestamp(self.started).isoformat(timespec='seconds'),
+                  'wall_seconds': round(time.time() - self.started, 3), 'series': summary}
+        with open(os.path.join(metrics_dir, RUNS_NAME), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+
+        log("")
+        log(f"-- RUN METRICS ({run}) --")
+        report(summary, log, top)
+        log(f"  Wrote {path}")
+        return path
+
+
+def _round(v):
+    return None if v is None else round(v, 6)
+
+def _le(v):
+    return '+Inf' if v == math.inf else repr(float(v))
+
+def _escape(v):
+    return str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(d, **extra):
+    d = dict(d, **extra)
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in d.items()) + '}' if d else ''
+
+def _series_name(r):
+    labels = ' '.join(f"{k}={v}" for k, v in sorted(r['labels'].items()))
+    return f"{r['span']} {labels}".strip()
+
+def _size(n):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if n < 1024 or unit == 'GB':
+            return f"{n:.0f}{unit}" if unit == 'B' else f"{n:.1f}{unit}"
+        n /= 1024
+
+def report(summary, log=log, top=25):
+    if not summary:
+        log("  (no instrumented spans)")
+        return
+    log(f"  {'total s':>9} {'count':>8} {'p50 s':>8} {'p95 s':>8} {'max s':>8} "
+        f"{'rows':>11} {'bytes':>8}  series")
+    for r in summary[:top]:
+        log(f"  {r['seconds']:9.2f} {r['count']:8,} {r['p50'] or 0:8.3f} {r['p95'] or 0:8.3f} "
+            f"{r['max']:8.3f} {r['rows']:11,} {_size(r['bytes']) if r['bytes'] else '-':>8}  "
+            f"{_series_name(r)}{'  (' + str(r['errors']) + ' errors)' if r['errors'] else ''}")
+    if len(summary) > top:
+        rest = summary[top:]
+        log(f"  {sum(r['seconds'] for r in rest):9.2f} {sum(r['count'] for r in rest):8,}"
+            f"   ... {len(rest)} more series")
+
+
+# ── Process-wide registry ────────────────────────────────────────────
+REGISTRY = Registry()
+span     = REGISTRY.span
+timed    = REGISTRY.timed
+observe  = REGISTRY.observe
+export   = REGISTRY.export
+
+
+# ── CLI ──────────────────────────────────────────────────────────────
+def load_runs(run, metrics_dir=None):
+    path = os.path.join(metrics_dir or METRICS_DIR, RUNS_NAME)
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [r for r in map(json.loads, filter(None, map(str.strip, f))) if r['run'] == run]
+
+def compare(prev, cur, log=log):
+    before = {_series_name(r): r for r in prev['series']}
+    log(f"  {'before s':>9} {'after s':>9} {'change':>8}  series")
+    for r in cur['series']:
+        name = _series_name(r)
+        b = before.pop(name, None)
+        if b is None:
+            log(f"  {'-':>9} {r['seconds']:9.2f} {'new':>8}  {name}")
+        else:
+            change = f"{(r['seconds'] / b['seconds'] - 1) * 100:+.0f}%" if b['seconds'] else '-'
+            log(f"  {b['seconds']:9.2f} {r['seconds']:9.2f} {change:>8}  {name}")
+    for name, b in before.items():
+        log(f"  {b['seconds']:9.2f} {'-':>9} {'gone':>8}  {name}")
+    log(f"  wall: {prev['wall_seconds']:.1f}s -> {cur['wall_seconds']:.1f}s")
+
+def main():
+    sys.stdout.reconfigure(encoding='utf-8')
+
+    ap = argparse.ArgumentParser(description="Show recorded run metrics.")
+    ap.add_argument('command', choices=['show', 'compare'])
+    ap.add_argument('run', help="Run name, e.g. agent_1_graph_builder")
+    ap.add_argument('--top', type=int, default=40)
+    args = ap.parse_args()
+
+    runs = load_runs(args.run)
+    if not runs:
+        sys.exit(f"No recorded runs named {args.run!r} in {os.path.join(METRICS_DIR, RUNS_NAME)}")
+    cur = runs[-1]
+    if args.command == 'show':
+        log(f"{args.run} started {cur['started_at']} on {cur['host']}, {cur['wall_seconds']:.1f}s wall")
+        report(cur['series'], top=args.top)
+    elif len(runs) < 2:
+        sys.exit(f"Only one recorded run of {args.run!r}")
+    else:
+        log(f"{args.run}: {runs[-2]['started_at']} vs {cur['started_at']}")
+        compare(runs[-2], cur)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,588 @@
+#!/usr/bin/env python
+"""
+Pipeline Orchestrator
+Operation Lineage Audit
+
+Runs the Phase 0-4 scripts as one dependency graph. Each stage declares
+the files it reads and writes; a stage depends on whichever stage
+produces one of its inputs (plus any explicit `after` ordering for
+stages that only meet through Neo4j). Independent stages run side by
+side, at most --max-workers at a time (README: max 4 concurrent), so a
+full refresh takes as long as the critical path rather than the sum of
+every script.
+
+A stage is skipped when its script, arguments and input file contents
+(SHA-256) match its last successful run and its outputs are still on
+disk unmodified. Every output is published to the artifact store
+(artifact_store.py) with its producer and input hashes; a stale stage
+whose inputs match any earlier stored run has its outputs restored from
+the store instead of being rerun, unless it is marked side_effects: a
+stage that writes to Neo4j or another store outside its declared
+outputs (the Phase 1 loaders, lineage_closure, t3010_store,
+temporal_graph) is never restored, since copying files back would skip
+its writes. The graph itself is represented by the snapshot LATEST
+pointer written by graph_snapshot.py: that stage always runs (it is a
+no-op when the graph version marker has not moved), and everything that
+reads the graph lists LATEST as an input.
+
+Paths:
+  LINEAGE_DATA_DIR   where the Phase 0 CSVs live (default 01-data-assembly/);
+                     passed through to every stage
+  SOURCES            repo files stages read but no stage builds (sankey_data.json)
+  pipeline_state.json  fingerprints of the last successful run per stage
+  pipeline_logs/       stdout/stderr of each stage, one file per stage
+
+Usage:
+  python pipeline.py                       # everything that is stale
+  python pipeline.py --dry-run             # show what would run and why
+  python pipeline.py --stages governance_queries,statistical_tests
+  python pipeline.py --force graph_builder # rerun regardless of hashes
+  python pipeline.py --list
+"""
+
+import sys, os, glob, json, time, hashlib, argparse, subprocess
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from artifact_store import ArtifactStore, FileHashes
+
+sys.stdout.reconfigure(encoding='utf-8')
+sys.stderr.reconfigure(encoding='utf-8')
+
+# ── Configuration ────────────────────────────────────────────────────
+SCRIPT_DIR  = os.path.dirname(os.path.abspath(__file__))
+ROOT        = os.path.normpath(os.path.join(SCRIPT_DIR, '..'))
+DATA_DIR    = os.environ.get('LINEAGE_DATA_DIR', os.path.join(ROOT, '01-data-assembly'))
+STATE_PATH  = os.path.join(SCRIPT_DIR, 'pipeline_state.json')
+LOG_DIR     = os.path.join(SCRIPT_DIR, 'pipeline_logs')
+MAX_WORKERS = 4
+RISK_FLAGS  = os.environ.get('LINEAGE_RISK_FLAGS', 'warehouse')   # see agent_1_graph_builder.py
+DONE        = ('ran', 'skipped', 'restored')
+
+def data(name):
+    return os.path.join(DATA_DIR, name)
+
+def repo(*parts):
+    return os.path.join(ROOT, *parts)
+
+SNAPSHOT_LATEST = repo('02-graph-build', 'snapshot', 'LATEST')
+
+# Stage inputs that live in the repo but no stage builds: maintained by
+# hand and committed, so a from-scratch run expects them on disk
+SOURCES = {
+    repo('05-html-artifacts', 'sankey_data.json'):
+        "ministry lineage + per-era funding extract (05-html-artifacts/ministry_lineage_query.py), curated",
+}
+
+# Declared in run order within each phase; dependencies come from the
+# inputs/outputs, not from this order.
+STAGES = {
+    # ── Phase 0: Data Assembly (Databricks) ──
+    'grant_linker': {
+        'phase': 0,
+        'script': '01-data-assembly/agent_0a_grant_linker.py',
+        'inputs': [],
+        'outputs': [data('entity_mapping.csv'), data('transform_events.csv'),
+                    data('grants_aggregated.csv'), data('goa_cra_matched.csv')],
+    },
+    'director_network': {
+        'phase': 0,
+        'script': '01-data-assembly/agent_0b_director_network.py',
+        'inputs': [],
+        'outputs': [data('multi_board_directors.csv'), data('org_clusters.csv'),
+                    data('org_risk_flags.csv'), data('org_network_edges.csv')],
+    },
+    'federal_grants': {
+        'phase': 0,
+        'script': '01-data-assembly/agent_0d_federal_grants_v2.py',
+        'inputs': [],
+        'outputs': [data('federal_grants.csv')],
+    },
+    'bn_dictionary': {
+        'phase': 0,
+        'script': '00-project-management/bn_ids.py',
+        'args': ['build'],
+        'inputs': [data(f) for f in ('org_risk_flags.csv', 'org_clusters.csv', 'org_network_edges.csv',
+                                     'multi_board_directors.csv', 'goa_cra_matched.csv',
+                                     'federal_grants.csv')],
+        'outputs': [data('bn_dictionary.csv')],
+    },
+    'risk_flags': {
+        'phase': 0,
+        'script': '01-data-assembly/risk_flags.py',
+        'inputs': [data('org_risk_flags.csv'), data('org_clusters.csv'), data('org_network_edges.csv'),
+                   repo('data', 'CRA-2024-T3010-Raw', 'Schedule 3_ Compensation.csv')],
+        'outputs': [data('risk_flag_matrix.csv')],
+    },
+    'compensation': {
+        'phase': 0,
+        'script': '01-data-assembly/compensation.py',
+        'inputs': [data('org_risk_flags.csv'),
+                   repo('data', 'CRA-2024-T3010-Raw', 'Schedule 3_ Compensation.csv'),
+                   repo('data', 'CRA-2024-T3010-Raw', '# Category_Sub-Category.csv')],
+        'outputs': [data('compensation_index.csv'), data('compensation_percentiles.csv')],
+    },
+    'foreign_activity': {
+        'phase': 0,
+        'script': '01-data-assembly/foreign_activity.py',
+        'inputs': [repo('data', 'CRA-2024-T3010-Raw', f) for f in (
+            'Schedule 2_ Activities Outside Canada.csv',
+            'Schedule 2_ Activities Outside Canada - Country.csv',
+            'Schedule 2_ Activities Outside Canada - Destination.csv',
+            'Schedule 2_ Activities Outside Canada - Recipient.csv',
+            'Schedule 5_ Non-Cash gifts.csv', '# Country.csv')],
+        'outputs': [data('foreign_flows.csv'), data('foreign_activity_bn.csv'),
+                    data('foreign_activity_country.csv')],
+    },
+    't3010_store': {
+        'phase': 0,
+        'side_effects': True,
+        'script': '01-data-assembly/t3010_store.py',
+        'args': ['ingest', repo('data', 'CRA-2024-T3010-Raw'), repo('data', 'CRA-2024-QualifiedDonee')],
+        'inputs': sorted(glob.glob(repo('data', 'CRA-2024-T3010-Raw', '*.csv')))
+                  + [repo('data', 'CRA-2024-QualifiedDonee', 'qual2024.csv')],
+        'outputs': [],                  # appends to LINEAGE_T3010_STORE; skips unchanged releases itself
+    },
+    'donee_linkage': {
+        'phase': 0,
+        'script': '01-data-assembly/donee_linkage.py',
+        'inputs': [data('org_risk_flags.csv'), data('multi_board_directors.csv')]
+                  + [repo('data', 'CRA-2024-T3010-Raw', f) for f in (
+                      'Grants to Non-Qualified Donees.csv', 'Schedule 1_ Foundations.csv')],
+        'outputs': [data('donee_grants.csv')],
+    },
+    'director_resolution': {
+        'phase': 0,
+        'script': '01-data-assembly/director_resolution.py',
+        'inputs': [data('multi_board_directors.csv'), data('org_clusters.csv'), data('bn_dictionary.csv')],
+        'outputs': [data('director_resolution.csv'), data('director_entities.csv')],
+    },
+    'donations': {
+        'phase': 0,
+        'script': '01-data-assembly/donations.py',
+        'inputs': sorted(glob.glob(repo('data', 'Elections-Alberta-Contributions', '*.csv')))
+                  + [data('multi_board_directors.csv'), data('org_risk_flags.csv')],
+        'outputs': [data('donations.csv'), data('director_donations.csv')],
+    },
+    # ── Phase 1: Graph Build (Neo4j writes) ──
+    'graph_builder': {
+        'phase': 1,
+        'side_effects': True,
+        'script': '02-graph-build/agent_1_graph_builder.py',
+        'inputs': [data('grants_aggregated.csv'), data('goa_cra_matched.csv'),
+                   data('org_risk_flags.csv'), data('multi_board_directors.csv'),
+                   data('org_clusters.csv'), data('org_network_edges.csv')]
+                  + ([data('risk_flag_matrix.csv')] if RISK_FLAGS == 'recomputed' else []),
+        'outputs': [repo('02-graph-build', 'ingestion_log.md')],
+    },
+    'federal_ingest': {
+        'phase': 1,
+        'side_effects': True,
+        'script': '02-graph-build/agent_1_federal_grants.py',
+        'inputs': [data('federal_grants.csv'), data('bn_dictionary.csv')],
+        'outputs': [repo('02-graph-build', 'federal_ingestion_log.md')],
+        'after': ['graph_builder'],     # links to the Organization nodes it creates
+    },
+    'compensation_ingest': {
+        'phase': 1,
+        'side_effects': True,
+        'script': '02-graph-build/agent_1_compensation.py',
+        'inputs': [data('compensation_index.csv')],
+        'outputs': [],
+        'after': ['graph_builder'],     # sets properties on existing Organization nodes
+    },
+    'foreign_ingest': {
+        'phase': 1,
+        'side_effects': True,
+        'script': '02-graph-build/agent_1_foreign_activity.py',
+        'inputs': [data('foreign_flows.csv'), data('foreign_activity_bn.csv'),
+                   data('foreign_activity_country.csv')],
+        'outputs': [],
+        'after': ['graph_builder'],     # edges from existing Organization nodes
+    },
+    'donee_ingest': {
+        'phase': 1,
+        'side_effects': True,
+        'script': '02-graph-build/agent_1_donee_grants.py',
+        'inputs': [data('donee_grants.csv')],
+        'outputs': [],
+        'after': ['graph_builder'],     # links Organization and Director nodes it creates
+    },
+    'director_resolution_ingest': {
+        'phase': 1,
+        'side_effects': True,
+        'script': '02-graph-build/agent_1_director_resolution.py',
+        'inputs': [data('director_resolution.csv'), data('director_entities.csv')],
+        'outputs': [],
+        'after': ['graph_builder'],     # resolves existing Director nodes and SITS_ON edges
+    },
+    'donations_ingest': {
+        'phase': 1,
+        'side_effects': True,
+        'script': '02-graph-build/agent_1_donations.py',
+        'inputs': [data('director_donations.csv')],
+        'outputs': [],
+        'after': ['graph_builder'],     # edges from existing Director nodes
+    },
+    'graph_snapshot': {
+        'phase': 1,
+        'script': '02-graph-build/graph_snapshot.py',
+        'args': ['export'],
+        'inputs': [],
+        'outputs': [SNAPSHOT_LATEST],
+        'after': ['graph_builder', 'federal_ingest', 'compensation_ingest', 'foreign_ingest',
+                  'donee_ingest', 'director_resolution_ingest', 'donations_ingest'],
+        'always': True,                 # skips itself when the graph version is unchanged
+    },
+    # ── Phase 2: Governance Queries ──
+    'governance_queries': {
+        'phase': 2,
+        'script': '03-governance-queries/agent_2_governance_queries.py',
+        'inputs': [SNAPSHOT_LATEST],
+        'outputs': [repo('03-governance-queries', f) for f in (
+            'q1_ndp_ministry_funding_trace.csv', 'q2_cluster_funding_concentration.csv',
+            'q3_cluster_ndp_audit.csv', 'bonus_shared_director_grantees.csv',
+            'query_log.md')],
+    },
+    'lineage_closure': {
+        'phase': 2,
+        'side_effects': True,
+        'script': '02-graph-build/lineage_closure.py',
+        'inputs': [SNAPSHOT_LATEST],
+        'outputs': [repo('02-graph-build', 'lineage_closure.json')],
+    },
+    'temporal_graph': {
+        'phase': 2,
+        'side_effects': True,
+        'script': '02-graph-build/temporal_graph.py',
+        'args': ['build'],
+        'inputs': [SNAPSHOT_LATEST],
+        'outputs': [],                  # temporal.npz inside the snapshot version it indexes
+    },
+    # ── Phase 3: Synthesis & HTML ──
+    'sankey': {
+        'phase': 3,
+        'script': '05-html-artifacts/generate_sankey.py',
+        'inputs': [repo('05-html-artifacts', 'sankey_data.json')],     # source, see SOURCES
+        'outputs': [repo('05-html-artifacts', '01-ministry-lineage-political.html')],
+    },
+    # ── Phase 4: Validation ──
+    'statistical_tests': {
+        'phase': 4,
+        'script': '06-validation/statistical_tests.py',
+        'inputs': [SNAPSHOT_LATEST],
+        'outputs': [repo('06-validation', 'statistical_test_results.md')],
+    },
+    'sensitivity_sweep': {
+        'phase': 4,
+        'script': '06-validation/sensitivity_sweep.py',
+        'inputs': [SNAPSHOT_LATEST],
+        'outputs': [repo('06-validation', 'sensitivity_sweep_results.csv'),
+                    repo('06-validation', 'sensitivity_sweep_results.md')],
+    },
+}
+
+def log(msg):
+    ts = datetime.now().strftime("%H:%M:%S")
+    print(f"[{ts}] {msg}", flush=True)
+
+
+# ── Dependency graph ─────────────────────────────────────────────────
+def dependencies(stages):
+    """stage -> set of upstream stages (producers of its inputs + `after`)."""
+    producer, by_name = {}, {}
+    for name, st in stages.items():
+        for path in st['outputs']:
+            base = os.path.basename(path)
+            if base in by_name:
+                raise ValueError(f"{base} is produced by both {by_name[base]} and {name}")
+            if path in SOURCES:
+                raise ValueError(f"{base} is declared a source but produced by {name}")
+            producer[path] = by_name[base] = name
+    deps = {}
+    for name, st in stages.items():
+        d = {producer[p] for p in st['inputs'] if p in producer}
+        d.update(st.get('after', []))
+        d.discard(name)
+        unknown = d - set(stages)
+        if unknown:
+            raise ValueError(f"{name}: unknown upstream stage(s) {sorted(unknown)}")
+        deps[name] = d
+    return deps
+
+def topo_order(deps):
+    order, state = [], {}
+    def visit(n, chain):
+        if state.get(n) == 'done':
+            return
+        if state.get(n) == 'visiting':
+            raise ValueError("dependency cycle: " + " -> ".join(chain + [n]))
+        state[n] = 'visiting'
+        for d in sorted(deps[n]):
+            visit(d, chain + [n])
+        state[n] = 'done'
+        order.append(n)
+    for n in deps:
+        visit(n, [])
+    return order
+
+def with_upstream(names, deps):
+    out, stack = set(), list(names)
+    while stack:
+        n = stack.pop()
+        if n not in out:
+            out.add(n)
+            stack.extend(deps[n])
+    return out
+
+
+# ── Content hashes ───────────────────────────────────────────────────
+def _rel(path):
+    return os.path.relpath(path, ROOT)
+
+def fingerprint(stage, hashes):
+    return {
+        'script': hashes.get(repo(stage['script'])),
+        'args': stage.get('args', []),
+        'inputs': {_rel(p): hashes.get(p) for p in stage['inputs']},
+    }
+
+def run_key(fp):
+    return hashlib.sha256(json.dumps(fp, sort_keys=True).encode()).hexdigest()
+
+def stale_reason(name, stage, record, hashes, forced):
+    """Why the stage must run, or None if it can be skipped."""
+    if name in forced:
+        return 'forced'
+    if stage.get('always'):
+        return 'always runs'
+    if not record:
+        return 'no previous run'
+    fp = fingerprint(stage, hashes)
+    old = record['fingerprint']
+    if fp['script'] != old['script']:
+        return 'script changed'
+    if fp['args'] != old['args']:
+        return 'arguments changed'
+    for p, h in fp['inputs'].items():
+        if old['inputs'].get(p) != h:
+            return f"input changed: {p}"
+    for p, h in record['outputs'].items():
+        cur = hashes.get(repo(p))
+        if cur is None:
+            return f"output missing: {p}"
+        if cur != h:
+            return f"output modified: {p}"
+    return None
+
+
+# ── State ────────────────────────────────────────────────────────────
+def load_state(path=STATE_PATH):
+    if not os.path.exists(path):
+        return {'stages': {}, 'files': {}}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def save_state(state, path=STATE_PATH):
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+# ── Execution ────────────────────────────────────────────────────────
+def run_stage(name, stage):
+    """Run one script in a subprocess; stdout/stderr go to pipeline_logs/."""
+    script = repo(stage['script'])
+    env = dict(os.environ, LINEAGE_DATA_DIR=DATA_DIR, PYTHONIOENCODING='utf-8')
+    log_path = os.path.join(LOG_DIR, f"{name}.log")
+    t0 = time.time()
+    with open(log_path, 'w', encoding='utf-8') as out:
+        proc = subprocess.run([sys.executable, script] + stage.get('args', []),
+                              cwd=os.path.dirname(script), env=env,
+                              stdout=out, stderr=subprocess.STDOUT)
+    return proc.returncode, time.time() - t0, log_path
+
+def critical_path(names, deps, seconds):
+    """Longest chain by stage duration among `names` -> (seconds, [stages])."""
+    best = {}
+    for n in topo_order(deps):
+        if n not in names:
+            continue
+        prev = max(((best[d][0], best[d][1]) for d in deps[n] if d in best),
+                   default=(0.0, []))
+        best[n] = (prev[0] + seconds.get(n, 0.0), prev[1] + [n])
+    return max(best.values(), default=(0.0, []))
+
+def memoized_run(name, stage, hashes, store, forced):
+    """An earlier stored run of this stage with identical inputs, if any.
+    Never for a side_effects stage: restoring its files would skip its writes."""
+    if name in forced or stage.get('always') or stage.get('side_effects'):
+        return None
+    return store.find_run(name, run_key(fingerprint(stage, hashes)))
+
+def record_success(name, stage, hashes, store, state, secs):
+    """Publish a stage's outputs to the artifact store and remember the run."""
+    fp = fingerprint(stage, hashes)
+    upstream = {os.path.basename(p): hashes.get(p) for p in stage['inputs']}
+    outputs = {}
+    for p in stage['outputs']:
+        outputs[os.path.basename(p)] = store.put(p, producer=name, upstream=upstream)['sha256']
+    store.record_run(name, run_key(fp), upstream, outputs)
+    state['stages'][name] = {
+        'fingerprint': fp,
+        'outputs': {_rel(p): hashes.get(p) for p in stage['outputs']},
+        'finished_at': datetime.now().isoformat(timespec='seconds'),
+        'seconds': round(secs, 1),
+    }
+    state['files'] = hashes.known
+    save_state(state)
+
+def run_pipeline(stages, selected, forced, max_workers, dry_run=False, store=None):
+    deps = dependencies(stages)
+    order = [n for n in topo_order(deps) if n in selected]
+    state = load_state()
+    hashes = FileHashes(state.get('files'))
+    store = store or ArtifactStore()
+    store.hashes = hashes
+    status, seconds = {}, {}
+
+    if dry_run:
+        for n in order:
+            up = [d for d in deps[n] if status.get(d) == 'run']
+            reason = stale_reason(n, stages[n], state['stages'].get(n), hashes, forced)
+            if reason is None and up:
+                reason = f"upstream may change: {', '.join(sorted(up))}"
+            elif reason and memoized_run(n, stages[n], hashes, store, forced):
+                reason += "; outputs of an identical earlier run are stored"
+            status[n] = 'run' if reason else 'skip'
+            log(f"  {'RUN ' if reason else 'skip'} {n:<20} {reason or 'unchanged'}")
+            for p in stages[n]['inputs']:
+                if p in SOURCES and not os.path.exists(p):
+                    log(f"       missing source {_rel(p)}: {SOURCES[p]}")
+        return status
+
+    os.makedirs(LOG_DIR, exist_ok=True)
+    os.makedirs(DATA_DIR, exist_ok=True)
+    pending, running = list(order), {}
+    t_start = time.time()
+
+    def release():
+        """Resolve every pending stage whose upstream stages are settled."""
+        progress = True
+        while progress:
+            progress = False
+            for n in list(pending):
+                up = [d for d in deps[n] if d in selected]
+                if any(status.get(d) in ('failed', 'blocked') for d in up):
+                    status[n] = 'blocked'
+                elif not all(status.get(d) in DONE for d in up):
+                    continue
+                else:
+                    missing = [_rel(p) for p in stages[n]['inputs'] if not os.path.exists(p)]
+                    reason = None if missing else stale_reason(
+                        n, stages[n], state['stages'].get(n), hashes, forced)
+                    memo = reason and memoized_run(n, stages[n], hashes, store, forced)
+                    if missing:
+                        status[n] = 'failed'
+                        log(f"  FAIL {n}: missing input {', '.join(missing)}")
+                        for p in stages[n]['inputs']:
+                            if p in SOURCES and not os.path.exists(p):
+                                log(f"    {_rel(p)} is not built by any stage: {SOURCES[p]}")
+                    elif reason is None:
+                        status[n] = 'skipped'
+                        log(f"  skip {n} (unchanged)")
+                    elif memo:
+                        for p in stages[n]['outputs']:
+                            store.restore(memo['outputs'][os.path.basename(p)], p)
+                        record_success(n, stages[n], hashes, store, state, 0.0)
+                        status[n] = 'restored'
+                        log(f"  restore {n} ({reason}; same inputs as run of {memo['recorded_at']})")
+                    elif len(running) >= max_workers:
+                        continue
+                    else:
+                        log(f"  start {n} ({reason})")
+                        running[pool.submit(run_stage, n, stages[n])] = n
+                pending.remove(n)
+                progress = True
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        release()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                n = running.pop(fut)
+                rc, secs, log_path = fut.result()
+                seconds[n] = secs
+                missing = [_rel(p) for p in stages[n]['outputs'] if not os.path.exists(p)]
+                if rc != 0 or missing:
+                    status[n] = 'failed'
+                    why = f"exit code {rc}" if rc != 0 else f"did not write {', '.join(missing)}"
+                    log(f"  FAIL {n} after {secs:.1f}s: {why} (see {_rel(log_path)})")
+                    continue
+                status[n] = 'ran'
+                record_success(n, stages[n], hashes, store, state, secs)
+                log(f"  done {n} in {secs:.1f}s")
+            release()
+
+    state['files'] = hashes.known
+    save_state(state)
+
+    wall = time.time() - t_start
+    cp_secs, cp = critical_path(set(seconds), deps, seconds)
+    log("")
+    log(f"Ran {sum(s == 'ran' for s in status.values())}, "
+        f"skipped {sum(s == 'skipped' for s in status.values())}, "
+        f"restored {sum(s == 'restored' for s in status.values())}, "
+        f"failed {sum(s == 'failed' for s in status.values())}, "
+        f"blocked {sum(s == 'blocked' for s in status.values())}")
+    log(f"Wall {wall:.1f}s | serial sum {sum(seconds.values()):.1f}s | "
+        f"critical path {cp_secs:.1f}s ({' -> '.join(cp) or 'none'})")
+    for n in order:
+        if status.get(n) == 'blocked':
+            log(f"  blocked: {n} (upstream failed)")
+    return status
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run the lineage-audit pipeline as a DAG.")
+    ap.add_argument('--stages', help="comma-separated targets (their upstream stages are included)")
+    ap.add_argument('--force', help="comma-separated stages to rerun regardless of hashes, or 'all'")
+    ap.add_argument('--max-workers', type=int, default=MAX_WORKERS)
+    ap.add_argument('--dry-run', action='store_true', help="show what would run and why")
+    ap.add_argument('--list', action='store_true', help="list stages and their dependencies")
+    args = ap.parse_args()
+
+    deps = dependencies(STAGES)
+    if args.list:
+        for n in topo_order(deps):
+            st = STAGES[n]
+            log(f"Phase {st['phase']}  {n:<20} {st['script']}"
+                + (" [side effects]" if st.get('side_effects') else "")
+                + (f"  <- {', '.join(sorted(deps[n]))}" if deps[n] else ""))
+        for path, what in SOURCES.items():
+            log(f"Source   {_rel(path):<40} {what}"
+                + ("" if os.path.exists(path) else "  (missing)"))
+        return
+
+    def names(value):
+        out = [s for s in value.split(',') if s]
+        unknown = [s for s in out if s not in STAGES]
+        if unknown:
+            ap.error(f"unknown stages: {', '.join(unknown)}")
+        return out
+
+    selected = with_upstream(names(args.stages), deps) if args.stages else set(STAGES)
+    if args.force == 'all':
+        forced = set(selected)
+    else:
+        forced = set(names(args.force)) if args.force else set()
+
+    log(f"Pipeline: {len(selected)} stages, max {args.max_workers} concurrent, "
+        f"data dir {DATA_DIR}")
+    status = run_pipeline(STAGES, selected, forced, max(1, args.max_workers), args.dry_run)
+    if any(s in ('failed', 'blocked') for s in status.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
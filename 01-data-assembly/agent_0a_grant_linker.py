@@ -34,7 +34,10 @@ sys.stdout.reconfigure(encoding='utf-8')
 sys.stderr.reconfigure(encoding='utf-8')
 
 import pandas as pd
-from databricks import sql as dbsql
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "00-project-management"))
+from artifact_store import publish
+import metrics
+import warehouse
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -45,7 +48,8 @@ DATABRICKS_WAREHOUSE = "<YOUR_DATABRICKS_SQL_WAREHOUSE>"
 CATALOG = "dbw_unitycatalog_test"
 SCHEMA = "default"
 
-OUTPUT_DIR = r"C:\Users\alina\OneDrive\Desktop\lineage-audit\01-data-assembly"
+# Phase 0 CSVs land next to this script unless LINEAGE_DATA_DIR points elsewhere
+OUTPUT_DIR = os.environ.get("LINEAGE_DATA_DIR", os.path.dirname(os.path.abspath(__file__)))
 
 # Volume paths (space in "Ministry Data" requires read_files() not csv.``)
 VOLUME_BASE = "/Volumes/dbw_unitycatalog_test/uploads/uploaded_files/Ministry Data"
@@ -72,8 +76,8 @@ def log(msg):
 
 
 def get_connection():
-    """Create a Databricks SQL connection."""
-    return dbsql.connect(
+    """Databricks SQL connection (or the local DuckDB warehouse, see warehouse.py)."""
+    return warehouse.connect(
         server_hostname=DATABRICKS_HOST,
         http_path=DATABRICKS_WAREHOUSE,
         access_token=DATABRICKS_TOKEN,
@@ -174,10 +178,12 @@ def main():
     # Save as entity_mapping.csv (the canonical name for downstream agents)
     entity_mapping_path = os.path.join(OUTPUT_DIR, "entity_mapping.csv")
     df_org_entities.to_csv(entity_mapping_path, index=False, encoding='utf-8')
+    publish(entity_mapping_path, producer="agent_0a_grant_linker")
     log(f"Saved entity_mapping.csv ({len(df_org_entities)} rows) [source: org_entities.csv]")
 
     transform_events_path = os.path.join(OUTPUT_DIR, "transform_events.csv")
     df_transform_events.to_csv(transform_events_path, index=False, encoding='utf-8')
+    publish(transform_events_path, producer="agent_0a_grant_linker")
     log(f"Saved transform_events.csv ({len(df_transform_events)} rows)")
 
     # ------------------------------------------------------------------
@@ -360,6 +366,7 @@ def main():
 
     grants_agg_path = os.path.join(OUTPUT_DIR, "grants_aggregated.csv")
     df_agg.to_csv(grants_agg_path, index=False, encoding='utf-8')
+    publish(grants_agg_path, producer="agent_0a_grant_linker")
     log(f"Saved grants_aggregated.csv ({len(df_agg):,} rows)")
     log(f"  Columns: {list(df_agg.columns)}")
 
@@ -386,6 +393,7 @@ def main():
 
     cra_matched_path = os.path.join(OUTPUT_DIR, "goa_cra_matched.csv")
     df_cra_matched.to_csv(cra_matched_path, index=False, encoding='utf-8')
+    publish(cra_matched_path, producer="agent_0a_grant_linker")
     log(f"Saved goa_cra_matched.csv ({len(df_cra_matched):,} rows)")
 
     # ------------------------------------------------------------------
@@ -500,3 +508,4 @@ def main():
 
 if __name__ == "__main__":
     main()
+    metrics.export("agent_0a_grant_linker", log)
@@ -28,7 +28,10 @@ sys.stdout.reconfigure(encoding='utf-8')
 sys.stderr.reconfigure(encoding='utf-8')
 
 import pandas as pd
-from databricks import sql as dbsql
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "00-project-management"))
+from artifact_store import publish
+import metrics
+import warehouse
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -39,7 +42,8 @@ DATABRICKS_WAREHOUSE = "<YOUR_DATABRICKS_SQL_WAREHOUSE>"
 CATALOG = "dbw_unitycatalog_test"
 SCHEMA = "default"
 
-OUTPUT_DIR = r"C:\Users\alina\OneDrive\Desktop\lineage-audit\01-data-assembly"
+# Phase 0 CSVs land next to this script unless LINEAGE_DATA_DIR points elsewhere
+OUTPUT_DIR = os.environ.get("LINEAGE_DATA_DIR", os.path.dirname(os.path.abspath(__file__)))
 
 # Tables to pull
 TABLES = {
@@ -85,8 +89,8 @@ def log(msg: str) -> None:
 
 
 def get_connection():
-    """Return a fresh Databricks SQL connection."""
-    return dbsql.connect(
+    """Return a fresh Databricks SQL connection (or the local DuckDB warehouse, see warehouse.py)."""
+    return warehouse.connect(
         server_hostname=DATABRICKS_HOST,
         http_path=DATABRICKS_WAREHOUSE,
         access_token=DATABRICKS_TOKEN,
@@ -181,6 +185,7 @@ def main():
             dataframes[tname] = df
             csv_path = os.path.join(OUTPUT_DIR, tinfo["output_csv"])
             df.to_csv(csv_path, index=False, encoding="utf-8")
+            publish(csv_path, producer="agent_0b_director_network")
             log(f"  Saved to: {csv_path}")
             log(f"  Columns: {list(df.columns)}")
             log(f"  Shape: {df.shape}")
@@ -528,3 +533,4 @@ def main():
 
 if __name__ == "__main__":
     main()
+    metrics.export("agent_0b_director_network", log)
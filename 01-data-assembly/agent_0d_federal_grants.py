@@ -27,6 +27,10 @@ sys.stdout.reconfigure(encoding='utf-8')
 sys.stderr.reconfigure(encoding='utf-8')
 
 import pandas as pd
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "00-project-management"))
+from artifact_store import publish
+import metrics
+import warehouse
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -39,7 +43,8 @@ SCHEMA = "default"
 
 VOLUME_PATH = "/Volumes/dbw_unitycatalog_test/uploads/uploaded_files/GoC Grants/"
 
-OUTPUT_DIR = r"C:\Users\alina\OneDrive\Desktop\lineage-audit\01-data-assembly"
+# Phase 0 CSVs land next to this script unless LINEAGE_DATA_DIR points elsewhere
+OUTPUT_DIR = os.environ.get("LINEAGE_DATA_DIR", os.path.dirname(os.path.abspath(__file__)))
 OUTPUT_CSV = os.path.join(OUTPUT_DIR, "federal_grants.csv")
 OUTPUT_LOG = os.path.join(OUTPUT_DIR, "federal_grants_log.md")
 
@@ -109,9 +114,8 @@ def write_log(summary_stats=None):
 # Databricks connection helpers
 # ---------------------------------------------------------------------------
 def get_databricks_connection():
-    """Create a Databricks SQL connection using databricks-sql-connector."""
-    from databricks import sql as dbsql
-    return dbsql.connect(
+    """Databricks SQL connection, or the local DuckDB warehouse (see warehouse.py)."""
+    return warehouse.connect(
         server_hostname=DATABRICKS_HOST,
         http_path=DATABRICKS_WAREHOUSE,
         access_token=DATABRICKS_TOKEN,
@@ -684,6 +688,7 @@ def write_outputs(df):
     out_cols = OUTPUT_COLUMNS
     df_out = df[out_cols] if not df.empty else pd.DataFrame(columns=out_cols)
     df_out.to_csv(OUTPUT_CSV, index=False, encoding="utf-8")
+    publish(OUTPUT_CSV, producer="agent_0d_federal_grants")
     log(f"  Written: {OUTPUT_CSV}")
     log(f"  Rows: {len(df_out)}")
     log(f"  Columns: {list(df_out.columns)}")
@@ -828,3 +833,4 @@ def main():
 
 if __name__ == "__main__":
     main()
+    metrics.export("agent_0d_federal_grants", log)
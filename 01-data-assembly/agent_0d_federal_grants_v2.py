@@ -32,6 +32,11 @@ sys.stdout.reconfigure(encoding='utf-8')
 sys.stderr.reconfigure(encoding='utf-8')
 
 import pandas as pd
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "00-project-management"))
+from artifact_store import publish
+import metrics
+import bn_ids
+import warehouse
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -45,7 +50,8 @@ SCHEMA = "default"
 VOLUME_PATH = "/Volumes/dbw_unitycatalog_test/uploads/uploaded_files/GoC Grants/"
 CSV_FILE = VOLUME_PATH + "grants.csv"
 
-OUTPUT_DIR = r"C:\Users\alina\OneDrive\Desktop\lineage-audit\01-data-assembly"
+# Phase 0 CSVs land next to this script unless LINEAGE_DATA_DIR points elsewhere
+OUTPUT_DIR = os.environ.get("LINEAGE_DATA_DIR", os.path.dirname(os.path.abspath(__file__)))
 OUTPUT_CSV = os.path.join(OUTPUT_DIR, "federal_grants.csv")
 OUTPUT_LOG = os.path.join(OUTPUT_DIR, "federal_grants_log.md")
 
@@ -137,8 +143,7 @@ def write_log_file(df):
 # Databricks connection
 # ---------------------------------------------------------------------------
 def get_databricks_connection():
-    from databricks import sql as dbsql
-    return dbsql.connect(
+    return warehouse.connect(
         server_hostname=DATABRICKS_HOST,
         http_path=DATABRICKS_WAREHOUSE,
         access_token=DATABRICKS_TOKEN,
@@ -168,30 +173,8 @@ def run_query(conn, sql, description="query"):
 
 
 # ---------------------------------------------------------------------------
-# BN cleaning
+# Amount cleaning (BNs go through bn_ids.clean, vectorized)
 # ---------------------------------------------------------------------------
-def clean_bn(val):
-    """Normalize a Business Number value."""
-    if pd.isna(val) or str(val).strip().lower() in ('', 'none', 'null', 'nan'):
-        return ""
-    s = str(val).strip().upper()
-    s = re.sub(r'[\s\-]', '', s)
-    # Full BN: 9 digits + 2 letters + 4 digits
-    if re.match(r'^\d{9}[A-Z]{2}\d{4}$', s):
-        return s
-    # 9-digit root
-    if re.match(r'^\d{9}$', s):
-        return s
-    # Try to extract
-    match = re.search(r'(\d{9}[A-Z]{2}\d{4})', s)
-    if match:
-        return match.group(1)
-    match = re.search(r'(\d{9})', s)
-    if match:
-        return match.group(1)
-    return s
-
-
 def clean_amount(val):
     """Parse an amount value to float."""
     if pd.isna(val) or str(val).strip().lower() in ('', 'none', 'null', 'nan'):
@@ -362,7 +345,7 @@ def main():
             # Clean BN
             log("")
             log("Cleaning BN values...")
-            final_df["BN"] = final_df["BN"].apply(clean_bn)
+            final_df["BN"] = bn_ids.clean(final_df["BN"])
             bn_populated = (final_df["BN"] != "").sum()
             bn_empty = (final_df["BN"] == "").sum()
             log(f"  BN populated: {bn_populated:,} / {len(final_df):,}")
@@ -441,6 +424,7 @@ def main():
         final_df = final_df[OUTPUT_COLUMNS]
 
         final_df.to_csv(OUTPUT_CSV, index=False, encoding="utf-8")
+        publish(OUTPUT_CSV, producer="agent_0d_federal_grants_v2")
         log(f"Written: {OUTPUT_CSV}")
         log(f"Rows: {len(final_df):,}")
         log(f"File size: {os.path.getsize(OUTPUT_CSV):,} bytes")
@@ -492,3 +476,4 @@ def main():
 
 if __name__ == "__main__":
     main()
+    metrics.export("agent_0d_federal_grants_v2", log)
@@ -0,0 +1,243 @@
+"""
+compensation.py
+===============
+Compensation index from T3010 Schedule 3 (data/CRA-2024-T3010-Raw).
+
+Per charity (latest filing), from whole-column arrays:
+
+  band_*             ten highest-paid full-time positions per pay band
+                     (lines 305-345), as an int matrix
+  n_top10            positions reported across the bands
+  top10_est          $ estimate for those positions (band count x band
+                     midpoint; $400K for the open 350K+ band)
+  top10_share        top10_est / total compensation (line 390), capped at 1
+  senior_share       share of the top-10 positions paid $120K or more
+  avg_ft_pay         (line 390 - line 380) / line 300 full-time positions
+  part_time_share    line 380 / line 390
+  comp_pct_of_exp    line 390 / total expenditures (financials)
+
+Percentile ranks of avg_ft_pay and comp_pct_of_exp are taken within the
+charity's category, falling back to its charity type (joined through
+"# Category_Sub-Category.csv") and then to all charities when the group
+has fewer than MIN_GROUP members. A rank at or above OUTLIER_PCTILE sets
+comp_outlier -- the transparent counterpart of the salary_mill flag.
+
+Outputs:
+  compensation_index.csv        one row per BN of the financials
+  compensation_percentiles.csv  p10..p99 of each metric per category,
+                                charity type and overall
+
+agent_1_compensation.py writes the index onto Organization nodes.
+
+Usage:
+  python compensation.py
+  python compensation.py --all-filers      # every Schedule 3 filer, not just the financials' BNs
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# Handle Windows Unicode issues
+sys.stdout.reconfigure(encoding='utf-8')
+sys.stderr.reconfigure(encoding='utf-8')
+
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "00-project-management"))
+from artifact_store import publish
+import metrics
+import t3010
+from risk_flags import read_table, _num, _ratio
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+DATA_DIR = os.environ.get("LINEAGE_DATA_DIR", os.path.dirname(os.path.abspath(__file__)))
+INDEX_CSV = "compensation_index.csv"
+PERCENTILES_CSV = "compensation_percentiles.csv"
+
+# (t3010 column, output column, lower bound, representative $) for the top-10 bands
+BANDS = [
+    ("n_top10_1_to_39999", "band_lt40k", 1, 20_000),
+    ("n_top10_40000_to_79999", "band_40k", 40_000, 60_000),
+    ("n_top10_80000_to_119999", "band_80k", 80_000, 100_000),
+    ("n_top10_120000_to_159999", "band_120k", 120_000, 140_000),
+    ("n_top10_160000_to_199999", "band_160k", 160_000, 180_000),
+    ("n_top10_200000_to_249999", "band_200k", 200_000, 225_000),
+    ("n_top10_250000_to_299999", "band_250k", 250_000, 275_000),
+    ("n_top10_300000_to_349999", "band_300k", 300_000, 325_000),
+    ("n_top10_350000_plus", "band_350k", 350_000, 400_000),
+]
+BAND_COLUMNS = [col for _, col, _, _ in BANDS]
+SENIOR_MIN = 120_000
+
+RANKED = ["avg_ft_pay", "comp_pct_of_exp"]
+QUANTILES = [0.10, 0.25, 0.50, 0.75, 0.90, 0.95, 0.99]
+MIN_GROUP = 20
+OUTLIER_PCTILE = 0.95
+
+
+def log(msg):
+    print(msg, flush=True)
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+def band_matrix(comp):
+    """(n_orgs, n_bands) int32 headcounts; blank bands are 0."""
+    cols = [comp[c] if c in comp else pd.Series(np.nan, index=comp.index) for c, _, _, _ in BANDS]
+    return np.nan_to_num(np.column_stack([c.to_numpy(dtype=float) for c in cols])).astype(np.int32)
+
+
+def categories(fin, t3010_dir=None):
+    """category and charity_type per row of fin (NaN when unknown)."""
+    lookup = t3010.read_categories(t3010_dir)
+    if "category_code" in fin:
+        code = fin["category_code"].astype(str).str.strip().str.zfill(4)
+        category = code.map(lookup.set_index("category_code")["category"])
+    else:
+        category = fin.get("Category_English_Desc", pd.Series(np.nan, index=fin.index)).astype(str).str.strip()
+        category = category.where(~category.isin(["", "nan"]))
+    by_name = lookup.drop_duplicates("category").set_index("category")["charity_type"]
+    return pd.DataFrame({"category": category.to_numpy(), "charity_type": category.map(by_name).to_numpy()})
+
+
+def rank_group(index, min_group=MIN_GROUP):
+    """Peer group per org: category, else charity type, else 'All'.
+
+    Group sizes count Schedule 3 filers only.
+    """
+    group = pd.Series("All", index=index.index, dtype=object)
+    filed = index["filed_schedule3"] == 1
+    for level in ("charity_type", "category"):
+        sizes = index[level].map(index.loc[filed, level].value_counts()).fillna(0)
+        group = group.mask(index[level].notna() & (sizes >= min_group), index[level])
+    return group
+
+
+def compensation_index(comp, fin=None, t3010_dir=None, min_group=MIN_GROUP, outlier_pctile=OUTLIER_PCTILE):
+    """One row per BN of comp (latest Schedule 3 filing) with the metrics above.
+
+    fin: financials (org_risk_flags.csv layout) for expenditures and
+    category; when given, the index covers exactly fin's BNs.
+    """
+    if fin is not None:
+        bn = fin["bn"].astype(str).str.strip()
+        base = pd.DataFrame({"bn": bn.to_numpy(), "expenditures": _num(fin, "Total_Expenditures").to_numpy()})
+        base = pd.concat([base, categories(fin, t3010_dir)], axis=1)
+        comp = base.merge(comp, on="bn", how="left")
+    else:
+        comp = comp.assign(expenditures=np.nan, category=np.nan, charity_type=np.nan)
+
+    bands = band_matrix(comp)
+    lows = np.array([lo for _, _, lo, _ in BANDS])
+    mids = np.array([mid for _, _, _, mid in BANDS], dtype=float)
+    n_top10 = bands.sum(axis=1)
+    top10_est = bands @ mids
+
+    total = _num(comp, "total_compensation")
+    part_time = _num(comp, "part_time_compensation")
+    full_time = _num(comp, "n_full_time")
+
+    out = pd.DataFrame({"bn": comp["bn"].to_numpy()})
+    out["fiscal_period_end"] = comp["fiscal_period_end"].dt.date.to_numpy()
+    out["filed_schedule3"] = comp["fiscal_period_end"].notna().astype(np.int8).to_numpy()
+    out["category"] = comp["category"].to_numpy()
+    out["charity_type"] = comp["charity_type"].to_numpy()
+    for j, col in enumerate(BAND_COLUMNS):
+        out[col] = bands[:, j]
+    out["n_top10"] = n_top10
+    out["n_full_time"] = full_time.to_numpy()
+    out["n_part_time"] = _num(comp, "n_part_time").to_numpy()
+    out["total_compensation"] = total.to_numpy()
+    out["top10_est"] = np.where(n_top10 > 0, top10_est, np.nan)
+    out["top10_share"] = np.minimum(_ratio(out["top10_est"], total).to_numpy(), 1.0)
+    out["senior_share"] = np.where(n_top10 > 0, bands[:, lows >= SENIOR_MIN].sum(axis=1) / np.maximum(n_top10, 1),
+                                   np.nan)
+    out["avg_ft_pay"] = _ratio(total - part_time.fillna(0), full_time).to_numpy()
+    out["part_time_share"] = _ratio(part_time, total).to_numpy()
+    out["comp_pct_of_exp"] = _ratio(total, _num(comp, "expenditures")).to_numpy()
+
+    out["peer_group"] = rank_group(out, min_group)
+    for metric in RANKED:
+        out[f"{metric}_pctile"] = out.groupby("peer_group")[metric].rank(pct=True)
+    top = out[[f"{m}_pctile" for m in RANKED]].max(axis=1)
+    out["comp_outlier"] = (top >= outlier_pctile).astype(np.int8)
+    return out
+
+
+def percentile_table(index):
+    """Quantiles of each ranked metric per category, charity type and overall."""
+    metric_cols = ["avg_ft_pay", "comp_pct_of_exp", "top10_share", "senior_share"]
+    frames = []
+    for level in ("category", "charity_type", None):
+        if level is None:
+            keyed = index.assign(group="All")
+        else:
+            keyed = index[index[level].notna()]
+            if keyed.empty:
+                continue
+            keyed = keyed.assign(group=keyed[level])
+        q = keyed.groupby("group")[metric_cols].quantile(QUANTILES).unstack()
+        n = keyed.groupby("group")[metric_cols].count()
+        for metric in metric_cols:
+            block = q[metric].rename(columns=lambda p: f"p{round(p * 100)}")
+            block.insert(0, "n", n[metric])
+            block.insert(0, "metric", metric)
+            block.insert(0, "level", level or "all")
+            frames.append(block.reset_index()[["level", "group", "metric", "n"] + list(block.columns[3:])])
+    return pd.concat(frames, ignore_index=True)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+def main():
+    ap = argparse.ArgumentParser(description="Build the Schedule 3 compensation index.")
+    ap.add_argument("--financials", default=os.path.join(DATA_DIR, "org_risk_flags.csv"))
+    ap.add_argument("--t3010-dir", default=t3010.T3010_DIR)
+    ap.add_argument("--all-filers", action="store_true",
+                    help="index every Schedule 3 filer (no expenditures / categories)")
+    ap.add_argument("--min-group", type=int, default=MIN_GROUP)
+    ap.add_argument("--outlier-pctile", type=float, default=OUTLIER_PCTILE)
+    ap.add_argument("--out-dir", default=DATA_DIR)
+    args = ap.parse_args()
+
+    t_start = time.time()
+    with metrics.span("comp.load") as sp:
+        comp = t3010.read_compensation(args.t3010_dir)
+        fin = None if args.all_filers else read_table(args.financials)
+        sp.rows = len(comp)
+    log(f"Schedule 3: {len(comp):,} filers (latest filing per BN)")
+    if fin is not None:
+        log(f"Financials: {args.financials} ({len(fin):,} orgs)")
+
+    with metrics.span("comp.index") as sp:
+        index = compensation_index(comp, fin, args.t3010_dir, args.min_group, args.outlier_pctile)
+        table = percentile_table(index)
+        sp.rows = len(index)
+    filed = index["filed_schedule3"] == 1
+    log(f"Indexed {len(index):,} orgs ({int(filed.sum()):,} filed Schedule 3) in {time.time() - t_start:.2f}s")
+    log(f"  Peer groups: {index.loc[filed, 'peer_group'].nunique()} "
+        f"(min {args.min_group} orgs; fallback category -> charity type -> All)")
+    log(f"  Outliers (>= p{args.outlier_pctile * 100:.0f} in peer group): {int(index['comp_outlier'].sum()):,}")
+    overall = table[(table["level"] == "all")].set_index("metric")
+    for metric in ("avg_ft_pay", "comp_pct_of_exp", "top10_share"):
+        if metric in overall.index:
+            r = overall.loc[metric]
+            log(f"  {metric:16s} n={int(r['n']):>6,}  p50={r['p50']:>12,.2f}  p90={r['p90']:>12,.2f}  "
+                f"p99={r['p99']:>12,.2f}")
+
+    for name, df in ((INDEX_CSV, index), (PERCENTILES_CSV, table)):
+        path = os.path.join(args.out_dir, name)
+        df.to_csv(path, index=False, encoding="utf-8")
+        log(f"Saved {path}")
+        publish(path, "compensation")
+
+
+if __name__ == "__main__":
+    main()
+    metrics.export("compensation", log)
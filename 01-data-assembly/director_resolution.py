@@ -0,0 +1,469 @@
+"""
+director_resolution.py
+======================
+Entity resolution for directors: which director records are the same person.
+
+Director nodes are keyed by clean_name_no_initial, so two people with the
+same name share a node and one person spelled two ways gets two. Here
+every (name, BN) record is resolved to a person with a stable director_id,
+in three vectorized passes over sparse name x board matrices:
+
+  split   A name common enough to be shared by several people
+          (expected holders >= COMMON_NAME, from first- and last-name
+          frequencies) is split into one person per group of its boards
+          linked by a co-director with a rare name (or the same org
+          cluster). Rare names stay one person.
+  merge   Persons are blocked by surname (identical after normalization).
+          Within a block, a pair is a candidate only when the two sit on a
+          board in common (sparse persons x boards x persons product, CHUNK
+          persons at a time). A candidate merges when the given names are
+          compatible (donee_linkage.given_name_match: equal, an initial, a
+          nickname, or one edit apart when both have 5+ letters) and the
+          middle initials do not conflict. A whole-name similarity score is
+          not enough: DONNA and DONALD GAGNON score 0.9.
+  cluster Merges are closed transitively, strongest first (equal given
+          names, then nicknames, initials, one-edit spellings). Two groups
+          are only joined if every pair across them is compatible, so
+          J SMITH cannot chain JOHN and JAMES SMITH into one person.
+
+DIFFERENT_PEOPLE lists name pairs that must never merge; main() checks
+the rule against them before resolving anything.
+
+director_ids are carried over from the previous director_resolution.csv:
+a person keeps the id held by most of its records. If a person split,
+the largest part keeps the id. New persons get a hash of their name
+(with initial) and lowest BN.
+
+Records come from multi_board_directors.csv (clean_name_no_initial x
+linked_bns) or, with --records, from a raw CRA directors extract (BN plus
+Last Name / First Name / Initials, or a single name column). A bare
+9-digit BN root is completed to its full BN from bn_dictionary.csv.
+
+Outputs:
+  director_resolution.csv  bn, name, director_name, initial, director_id  (one row per record)
+  director_entities.csv    one row per resolved person: director_id, name, names,
+                           n_boards, linked_bns, n_names, split
+
+agent_1_director_resolution.py writes the ids back to the graph in batches.
+
+Usage:
+  python director_resolution.py
+  python director_resolution.py --records "Directors.csv"
+  python director_resolution.py --common-name 2
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import unicodedata
+from collections import Counter
+
+# Handle Windows Unicode issues
+sys.stdout.reconfigure(encoding='utf-8')
+sys.stderr.reconfigure(encoding='utf-8')
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "00-project-management"))
+from artifact_store import publish
+import metrics
+import bn_ids
+import t3010
+from donee_linkage import normalize, given_name_match
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+DATA_DIR = os.environ.get("LINEAGE_DATA_DIR", os.path.dirname(os.path.abspath(__file__)))
+RECORDS_CSV = "director_resolution.csv"
+ENTITIES_CSV = "director_entities.csv"
+
+COMMON_NAME = 1.0     # expected people per name at which same-name records are split
+CHUNK = 50_000        # persons per evidence product in the merge pass
+
+# Name pairs that are different people; the merge rule must reject every one
+DIFFERENT_PEOPLE = [
+    ("DONALD GAGNON", "DONNA GAGNON"), ("MICHAEL GAGNON", "MICHELLE GAGNON"),
+    ("BRIAN MACDONALD", "RYAN MACDONALD"), ("LINDA LEBLANC", "LISA LEBLANC"),
+    ("GARY JOHNSON", "MARY JOHNSON"), ("MARK JOHNSON", "MARY JOHNSON"), ("MARY JOHNSON", "MARIA JOHNSON"),
+    ("GARY JOHNSON", "MARK JOHNSON"), ("PAUL SMITH", "PAULA SMITH"), ("CHRISTIAN ROY", "CHRISTINA ROY"),
+    ("THOMAS ROY", "THOMAS ROYER"),
+]
+
+# Raw extract columns, first match wins
+BN_COLUMNS = ["bn", "BN"]
+LAST_COLUMNS = ["Last Name", "last_name"]
+FIRST_COLUMNS = ["First Name", "first_name"]
+INITIAL_COLUMNS = ["Initials", "initials"]
+NAME_COLUMNS = ["name", "director_name", "clean_name_no_initial"]
+
+def log(msg):
+    print(msg, flush=True)
+
+
+# ---------------------------------------------------------------------------
+# Records
+# ---------------------------------------------------------------------------
+def _pick(df, names):
+    return next((c for c in names if c in df.columns), None)
+
+
+def middle_initial(raw):
+    """First single-letter token between the first and last name ('JOHN A SMITH' -> 'A')."""
+    name = unicodedata.normalize("NFKD", str(raw)).encode("ascii", "ignore").decode().upper()
+    if "," in name:
+        last, _, first = name.partition(",")
+        name = f"{first} {last}"
+    tokens = re.sub(r"[^A-Z ]+", " ", name).split()
+    return next((t for t in tokens[1:-1] if len(t) == 1), "")
+
+
+def parse_names(raw):
+    """director_name (as clean_name_no_initial) and middle initial per raw name,
+    computed once per distinct spelling."""
+    uniq = pd.Series(pd.unique(raw.fillna("")))
+    director = uniq.map(lambda r: normalize(r, "person"))
+    initial = uniq.map(middle_initial)
+    pos = pd.Index(uniq).get_indexer(raw.fillna(""))
+    return director.to_numpy()[pos], initial.to_numpy()[pos]
+
+
+def read_records(path=None, data_dir=DATA_DIR):
+    """One row per distinct (bn, name) director record with its parsed name parts."""
+    if path is None:
+        dirs = pd.read_csv(os.path.join(data_dir, "multi_board_directors.csv"), dtype=str, keep_default_na=False)
+        linked = dirs["linked_bns"].str.findall(bn_ids.BN_TOKEN)
+        df = pd.DataFrame({"name": dirs["clean_name_no_initial"].str.strip(), "bn": linked}).explode("bn")
+        df = df[df["bn"].notna()]
+    else:
+        raw = t3010.read_file(path)
+        bn_col = _pick(raw, BN_COLUMNS)
+        last, first, init = _pick(raw, LAST_COLUMNS), _pick(raw, FIRST_COLUMNS), _pick(raw, INITIAL_COLUMNS)
+        if last and first:
+            name = raw[last].fillna("") + ", " + raw[first].fillna("")
+            if init:
+                name = name + " " + raw[init].fillna("")
+        else:
+            name = raw[_pick(raw, NAME_COLUMNS)]
+        df = pd.DataFrame({"name": name.str.strip(), "bn": raw[bn_col]})
+    # Bare roots (raw extracts) completed to the full BN the other datasets use
+    dictionary = bn_ids.BnDictionary.load(os.path.join(data_dir, bn_ids.DICT_CSV), missing_ok=True)
+    df["bn"], n_completed = dictionary.canonical(df["bn"])
+    if n_completed:
+        log(f"  {n_completed:,} bare BN roots completed from {bn_ids.DICT_CSV}")
+    df = df[(df["bn"] != "") & (df["name"] != "")].drop_duplicates(["bn", "name"]).reset_index(drop=True)
+    df["director_name"], df["initial"] = parse_names(df["name"])
+    df = df[df["director_name"] != ""].reset_index(drop=True)
+    parts = df["director_name"].str.split()
+    df["first"] = parts.str[0]
+    df["last"] = parts.str[-1]
+    df["key"] = df["director_name"] + np.where(df["initial"] != "", " /" + df["initial"], "")
+    return df
+
+
+def read_clusters(data_dir=DATA_DIR):
+    path = os.path.join(data_dir, "org_clusters.csv")
+    if not os.path.exists(path):
+        return {}
+    c = pd.read_csv(path, dtype=str, usecols=["bn", "cluster_id"])
+    return dict(zip(c["bn"].str.strip(), c["cluster_id"]))
+
+
+# ---------------------------------------------------------------------------
+# Sparse helpers
+# ---------------------------------------------------------------------------
+def incidence(rows, cols, shape):
+    m = sparse.csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=shape)
+    m.data[:] = 1
+    return m
+
+
+def group_pairs(groups, members):
+    """All (i, j), i < j, of members sharing a group label, one triu per group size."""
+    order = np.argsort(groups, kind="stable")
+    g, m = groups[order], members[order]
+    starts = np.flatnonzero(np.r_[True, g[1:] != g[:-1]])
+    sizes = np.diff(np.r_[starts, len(g)])
+    out_i, out_j = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+    for k in np.unique(sizes[sizes > 1]):
+        block = m[starts[sizes == k][:, None] + np.arange(k)]
+        i, j = np.triu_indices(k, 1)
+        out_i.append(block[:, i].ravel())
+        out_j.append(block[:, j].ravel())
+    return np.concatenate(out_i), np.concatenate(out_j)
+
+
+def _lookup(m, i, j):
+    if not len(i):
+        return np.zeros(0)
+    return np.asarray(m[i, j]).ravel()
+
+
+# ---------------------------------------------------------------------------
+# Passes
+# ---------------------------------------------------------------------------
+def split_homonyms(rec, clusters, common_name=COMMON_NAME):
+    """Person label per record: common names split by linked boards, rare names whole.
+
+    Returns (person, expected holders per record's name).
+    """
+    key_id, keys = pd.factorize(rec["key"])
+    bn_id, bns = pd.factorize(rec["bn"])
+    n_keys = len(keys)
+
+    # Expected number of people holding each name
+    first_of = rec.groupby(key_id)["first"].first().to_numpy()
+    last_of = rec.groupby(key_id)["last"].first().to_numpy()
+    f_first = pd.Series(first_of).map(pd.Series(first_of).value_counts()).to_numpy()
+    f_last = pd.Series(last_of).map(pd.Series(last_of).value_counts()).to_numpy()
+    expected = f_first * f_last / max(n_keys, 1)
+    common = expected >= common_name
+
+    # Boards x boards: rare names in common (common names co-occur by chance)
+    r = ~common[key_id]
+    M = incidence(key_id[r], bn_id[r], (n_keys, len(bns)))
+    C = (M.T @ M).tocsr()
+
+    idx = np.arange(len(rec))
+    i, j = group_pairs(key_id, idx)
+    rare = ~common[key_id[i]]
+    a, b = bn_id[i], bn_id[j]
+    shared = (a == b) | (_lookup(C, a, b) >= 1)     # a rare name sits on both boards
+    cluster = pd.Series(bns).map(clusters).to_numpy()
+    same_cluster = pd.notna(cluster[a]) & (cluster[a] == cluster[b])
+    keep = rare | shared | same_cluster
+    g = sparse.coo_matrix((np.ones(keep.sum()), (i[keep], j[keep])), shape=(len(rec), len(rec)))
+    _, person = connected_components(g, directed=False)
+    return person, expected[key_id]
+
+
+def evidence_pairs(P, surname, chunk=CHUNK):
+    """(p, q), p < q, of persons with the same surname sitting on a board in common.
+
+    Persons are taken in surname order, CHUNK at a time (whole surname
+    groups), so the persons x persons product stays chunk-sized.
+    """
+    order = np.argsort(surname, kind="stable")
+    edges = np.flatnonzero(np.r_[True, surname[order][1:] != surname[order][:-1]])
+    out_p, out_q = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+    start = 0
+    while start < len(order):
+        stop = edges[np.searchsorted(edges, start + chunk, side="right") - 1]
+        stop = len(order) if stop <= start or start + chunk >= len(order) else stop
+        idx = order[start:stop]
+        Pc = P[idx]
+        E = (Pc @ Pc.T).tocoo()
+        keep = (E.row < E.col) & (surname[idx[E.row]] == surname[idx[E.col]])
+        out_p.append(idx[E.row[keep]])
+        out_q.append(idx[E.col[keep]])
+        start = stop
+    p, q = np.concatenate(out_p), np.concatenate(out_q)
+    return np.minimum(p, q), np.maximum(p, q)
+
+
+def name_rank(a, b):
+    """given_name_match of two director names (FIRST ... LAST, optional
+    middle initial), or None unless the surnames are identical and the
+    middle initials (or middle names' initials) do not conflict."""
+    (name_a, mid_a), (name_b, mid_b) = a, b
+    ta, tb = name_a.split(), name_b.split()
+    if len(ta) < 2 or len(tb) < 2:
+        return None
+    # surname: the last token with a letter, plus any suffix after it ("SMITH 2")
+    sa = max([i for i, t in enumerate(ta) if i and not t.isdigit()] or [len(ta) - 1])
+    sb = max([i for i, t in enumerate(tb) if i and not t.isdigit()] or [len(tb) - 1])
+    if ta[sa:] != tb[sb:]:
+        return None
+    mid_a = mid_a or "".join(t[0] for t in ta[1:sa])[:1]
+    mid_b = mid_b or "".join(t[0] for t in tb[1:sb])[:1]
+    if mid_a and mid_b and mid_a != mid_b:
+        return None
+    return given_name_match(ta[0], tb[0])
+
+
+def check_name_rule():
+    """The DIFFERENT_PEOPLE pairs the merge rule would still merge."""
+    return [(a, b) for a, b in DIFFERENT_PEOPLE if name_rank((a, ""), (b, "")) is not None]
+
+
+def merge_variants(rec, person):
+    """Merge edges (p, q) between persons with compatible names on a board in common.
+
+    Returns (p, q, rank of each edge, number of candidate pairs checked),
+    rank as given_name_match (0 = same given name).
+    """
+    n_person = person.max() + 1 if len(person) else 0
+    bn_id, bns = pd.factorize(rec["bn"])
+    P = incidence(person, bn_id, (n_person, len(bns)))
+
+    per = rec.groupby(person).agg(key=("key", "first"), name=("director_name", "first"),
+                                  initial=("initial", "first"), last=("last", "first"))
+    p, q = evidence_pairs(P, pd.factorize(per["last"])[0])
+    n_candidates = len(p)
+
+    keys = per["key"].to_numpy()
+    p, q = p[keys[p] != keys[q]], q[keys[p] != keys[q]]
+
+    # One rule check per distinct pair of spellings
+    named = list(zip(per["name"], per["initial"]))
+    ranks = {}
+    rank = np.array([ranks.setdefault((named[a], named[b]), name_rank(named[a], named[b]))
+                     for a, b in zip(p, q)], dtype=object)
+    merge = np.array([r is not None for r in rank], dtype=bool)
+    return p[merge], q[merge], rank[merge].astype(np.int64), n_candidates
+
+
+def cluster(n_person, p, q, rank, named):
+    """Transitive closure of the merge edges, strongest rank first. Two groups
+    are joined only if every name across them is compatible (name_rank), so
+    an initial or a one-edit spelling never chains two different given names
+    into one person.
+
+    Returns (entity per person, number of merges refused).
+    """
+    parent = np.arange(n_person)
+    members = {}
+    refused = 0
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for e in np.argsort(rank, kind="stable"):
+        a, b = find(p[e]), find(q[e])
+        if a == b:
+            continue
+        ma, mb = members.get(a, [a]), members.get(b, [b])
+        if any(name_rank(named[x], named[y]) is None for x in ma for y in mb):
+            refused += 1
+            continue
+        parent[b] = a
+        members[a] = ma + mb
+        members.pop(b, None)
+    roots = np.array([find(x) for x in range(n_person)], dtype=np.int64)
+    return pd.factorize(roots)[0], refused
+
+
+# ---------------------------------------------------------------------------
+# Stable ids
+# ---------------------------------------------------------------------------
+def new_id(key, bn):
+    return "D" + hashlib.sha1(f"{key}|{bn}".encode("utf-8")).hexdigest()[:12]
+
+
+def assign_ids(rec, entity, previous=None):
+    """director_id per entity: the previous id most of its records held (each
+    old id to the entity holding most of its records), else a hash of the
+    entity's name key and lowest BN."""
+    ids = np.full(entity.max() + 1 if len(entity) else 0, None, dtype=object)
+    if previous is not None and len(previous):
+        old = rec[["bn", "name"]].merge(previous[["bn", "name", "director_id"]], on=["bn", "name"], how="left")
+        votes = pd.DataFrame({"entity": entity, "old": old["director_id"].to_numpy()}).dropna()
+        votes = votes.value_counts().reset_index(name="n")
+        votes = votes.sort_values(["n", "entity"], ascending=[False, True], kind="stable")
+        votes = votes.drop_duplicates("old").drop_duplicates("entity")
+        ids[votes["entity"].to_numpy()] = votes["old"].to_numpy()
+    missing = np.flatnonzero(pd.isna(ids))
+    if len(missing):
+        first = rec.assign(entity=entity).sort_values("bn").drop_duplicates("entity")
+        first = first.set_index("entity").loc[missing]
+        fresh = pd.Series([new_id(k, b) for k, b in zip(first["key"], first["bn"])])
+        taken = set(ids[pd.notna(ids)])
+        for i in np.flatnonzero(fresh.duplicated().to_numpy() | fresh.isin(taken).to_numpy()):
+            n = 1
+            while fresh[i] in taken or (fresh == fresh[i]).sum() > 1:
+                fresh[i] = new_id(f"{first['key'].iloc[i]}#{n}", first["bn"].iloc[i])
+                n += 1
+        ids[missing] = fresh.to_numpy()
+    return ids
+
+
+def entities(rec, split_names):
+    """One row per resolved person (a single pass over the records sorted by id)."""
+    srt = rec.sort_values(["director_id", "bn"], kind="stable")
+    rows = []
+    ids, names, bns = srt["director_id"].tolist(), srt["director_name"].tolist(), srt["bn"].tolist()
+    start = 0
+    for stop in np.r_[np.flatnonzero(srt["director_id"].to_numpy()[1:] != srt["director_id"].to_numpy()[:-1]) + 1,
+                      len(ids)]:
+        spelled = Counter(names[start:stop])
+        boards = sorted(set(bns[start:stop]))
+        rows.append((ids[start], spelled.most_common(1)[0][0], ";".join(sorted(spelled)),
+                     len(boards), json.dumps(boards), len(spelled)))
+        start = stop
+    out = pd.DataFrame(rows, columns=["director_id", "name", "names", "n_boards", "linked_bns", "n_names"])
+    out["split"] = out["name"].isin(split_names)
+    return out.sort_values(["n_boards", "director_id"], ascending=[False, True]).reset_index(drop=True)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+def main():
+    ap = argparse.ArgumentParser(description="Resolve director records to persons with stable ids.")
+    ap.add_argument("--records", help="raw directors extract (default: multi_board_directors.csv)")
+    ap.add_argument("--common-name", type=float, default=COMMON_NAME)
+    ap.add_argument("--out-dir", default=DATA_DIR)
+    args = ap.parse_args()
+
+    wrong = check_name_rule()
+    if wrong:
+        raise SystemExit(f"Merge rule accepts different people: {wrong}")
+
+    t_start = time.time()
+    with metrics.span("directors.load") as sp:
+        rec = read_records(args.records)
+        clusters = read_clusters()
+        sp.rows = len(rec)
+    n_names = rec["key"].nunique()
+    log(f"Director records: {len(rec):,} ({n_names:,} names, {rec['bn'].nunique():,} boards)")
+
+    with metrics.span("directors.split") as sp:
+        person, expected = split_homonyms(rec, clusters, args.common_name)
+        sp.rows = int(person.max()) + 1
+    log(f"Split: {n_names:,} names -> {sp.rows:,} persons "
+        f"({(expected >= args.common_name).sum():,} records under common names)")
+
+    with metrics.span("directors.merge") as sp:
+        p, q, rank, n_candidates = merge_variants(rec, person)
+        per = rec.groupby(person).agg(name=("director_name", "first"), initial=("initial", "first"))
+        labels, refused = cluster(person.max() + 1, p, q, rank, list(zip(per["name"], per["initial"])))
+        entity = labels[person]
+        sp.rows = len(p)
+    log(f"Merge: {n_candidates:,} same-surname pairs on a shared board, {len(p):,} with compatible "
+        f"given names -> {entity.max() + 1:,} persons")
+    if refused:
+        log(f"  {refused:,} merges refused: they would chain incompatible given names")
+
+    out_path = os.path.join(args.out_dir, RECORDS_CSV)
+    previous = pd.read_csv(out_path, dtype=str) if os.path.exists(out_path) else None
+    with metrics.span("directors.ids") as sp:
+        rec["director_id"] = assign_ids(rec, entity, previous)[entity]
+        split_names = set(rec.groupby("director_name")["director_id"].nunique().loc[lambda s: s > 1].index)
+        ent = entities(rec, split_names)
+        sp.rows = len(ent)
+    if previous is not None:
+        kept = len(set(previous["director_id"]) & set(ent["director_id"]))
+        log(f"Ids: {kept:,} carried over from the previous run, {len(ent) - kept:,} new")
+    log(f"Resolved {len(ent):,} persons: {int(ent['split'].sum()):,} from split names, "
+        f"{int((ent['n_names'] > 1).sum()):,} merged across spellings ({time.time() - t_start:.1f}s)")
+
+    out = rec[["bn", "name", "director_name", "initial", "director_id"]].sort_values(["director_id", "bn"])
+    for name, df in ((RECORDS_CSV, out), (ENTITIES_CSV, ent)):
+        path = os.path.join(args.out_dir, name)
+        df.to_csv(path, index=False, encoding="utf-8")
+        log(f"Saved {path}")
+        publish(path, "director_resolution")
+
+
+if __name__ == "__main__":
+    main()
+    metrics.export("director_resolution", log)
@@ -0,0 +1,351 @@
+"""
+donations.py
+============
+Loads Elections Alberta contributor exports and links contributors to the
+graph's Director nodes, for the DONATED_TO layer dropped in D010 for want
+of data. Every CSV in the donations folder (LINEAGE_DONATIONS_DIR,
+default data/Elections-Alberta-Contributions/) is read; columns are found
+by name, so exports from the contributor search and the annual financial
+returns both load. Files are decoded as UTF-8 (with or without the BOM
+Excel writes), else latin-1. With no exports the stage writes empty
+outputs and the graph ingest removes any DONATED_TO edges left from
+earlier runs.
+
+Per contribution:
+  contributor  normalized as clean_name_no_initial ("SMITH, JOHN A." ->
+               "JOHN SMITH"), once per distinct spelling
+  postal_area  forward sortation area of the postal code ("T5K 2J1" -> T5K)
+  city         upper-case ASCII
+  party        NDP / UCP / PC / WRP / LIB / AP / GRN from the party or
+               recipient text, else OTHER (the recipient column keeps the
+               text, so a candidate's name never becomes a party code)
+  year         contribution year (a year column, else the date's year)
+
+Linkage is exact on the normalized name (D004): a hash lookup against the
+Director names in multi_board_directors.csv. With --min-score below 1, a
+name with no exact match is scored (difflib ratio) against the Directors
+in its block, Soundex of surname plus first initial, so work grows with
+the number of names. A match is local when the contributor's city is the
+city of one of the director's charities (org_risk_flags.csv):
+
+  HIGH    exact and local
+  MEDIUM  exact, or fuzzy and local   (pending human verification, D006)
+  LOW     fuzzy only
+
+Outputs:
+  donations.csv           one row per contribution with its match
+  director_donations.csv  matched contributions summed per director, party
+                          and year: amount, n_contributions, best confidence,
+                          postal areas, recipients
+
+Usage:
+  python donations.py
+  python donations.py --donations-dir exports/ --min-score 0.92
+"""
+
+import os
+import re
+import sys
+import json
+import glob
+import time
+import argparse
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+# Handle Windows Unicode issues
+sys.stdout.reconfigure(encoding='utf-8')
+sys.stderr.reconfigure(encoding='utf-8')
+
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "00-project-management"))
+from artifact_store import publish
+import metrics
+import t3010
+from donee_linkage import normalize, soundex
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+DATA_DIR = os.environ.get("LINEAGE_DATA_DIR", os.path.dirname(os.path.abspath(__file__)))
+DONATIONS_DIR = os.environ.get("LINEAGE_DONATIONS_DIR",
+                               os.path.join(t3010.ROOT, "data", "Elections-Alberta-Contributions"))
+DONATIONS_CSV = "donations.csv"
+DIRECTOR_CSV = "director_donations.csv"
+
+MIN_SCORE = 1.0       # exact names only (D004); lower to admit fuzzy matches
+
+# Export columns, first match wins
+NAME_COLUMNS = ["Contributor Name", "Contributor", "Name", "contributor"]
+LAST_COLUMNS = ["Contributor Last Name", "Last Name", "last_name"]
+FIRST_COLUMNS = ["Contributor First Name", "First Name", "first_name"]
+CITY_COLUMNS = ["Contributor City", "City", "city"]
+POSTAL_COLUMNS = ["Contributor Postal Code", "Postal Code", "postal_code"]
+AMOUNT_COLUMNS = ["Contribution Amount", "Amount", "amount"]
+PARTY_COLUMNS = ["Political Party", "Party", "party"]
+RECIPIENT_COLUMNS = ["Recipient", "Registered Party/Candidate", "Candidate", "Constituency Association", "recipient"]
+YEAR_COLUMNS = ["Contribution Year", "Year", "year"]
+DATE_COLUMNS = ["Contribution Date", "Date Received", "Date", "date"]
+
+PARTIES = [
+    ("NDP", re.compile(r"NEW DEMOCRAT|\bNDP\b")),
+    ("UCP", re.compile(r"UNITED CONSERVATIVE|\bUCP\b")),
+    ("PC",  re.compile(r"PROGRESSIVE CONSERVATIVE|\bPC\b")),
+    ("WRP", re.compile(r"WILDROSE|WILD ROSE")),
+    ("LIB", re.compile(r"LIBERAL")),
+    ("AP",  re.compile(r"ALBERTA PARTY")),
+    ("GRN", re.compile(r"GREEN")),
+]
+CONFIDENCE = {"HIGH": 3, "MEDIUM": 2, "LOW": 1}
+
+_POSTAL = re.compile(r"^([A-Z]\d[A-Z])")
+_NON_ALPHA = re.compile(r"[^A-Z ]+")
+
+OUTPUT_COLUMNS = ["source_file", "contributor", "contributor_norm", "city", "postal_area", "party", "recipient",
+                  "year", "amount", "match_id", "match_method", "match_score", "local", "confidence"]
+DIRECTOR_COLUMNS = ["director", "party", "year", "amount", "n_contributions", "confidence", "postal_areas",
+                    "recipients"]
+
+
+def log(msg):
+    print(msg, flush=True)
+
+
+# ---------------------------------------------------------------------------
+# Contributions
+# ---------------------------------------------------------------------------
+def _pick(df, names):
+    return next((c for c in names if c in df.columns), None)
+
+
+def _upper(values):
+    """Upper-case ASCII, punctuation to spaces, per distinct value."""
+    uniq = pd.Series(pd.unique(values.fillna("")))
+    clean = uniq.map(lambda v: " ".join(_NON_ALPHA.sub(" ", unicodedata.normalize("NFKD", str(v))
+                                                      .encode("ascii", "ignore").decode().upper()).split()))
+    return clean.to_numpy()[pd.Index(uniq).get_indexer(values.fillna(""))]
+
+
+def party_code(text):
+    """Known party code for the text, 'OTHER' if it names none, '' if blank."""
+    text = " ".join(_NON_ALPHA.sub(" ", str(text).upper()).split())
+    return next((code for code, pattern in PARTIES if pattern.search(text)), "OTHER" if text else "")
+
+
+def postal_area(values):
+    """'T5K 2J1' -> 'T5K' (forward sortation area); '' when not a postal code."""
+    return values.fillna("").str.upper().str.replace(r"\s+", "", regex=True).str.extract(
+        _POSTAL, expand=False).fillna("")
+
+
+def read_export(path):
+    """One contributor export as the common columns, or None if it has no names or amounts."""
+    try:
+        raw = t3010.read_file(path, encoding="utf-8-sig")
+    except UnicodeDecodeError:
+        raw = t3010.read_file(path, encoding="latin-1")
+    name_col = _pick(raw, NAME_COLUMNS)
+    last, first = _pick(raw, LAST_COLUMNS), _pick(raw, FIRST_COLUMNS)
+    amount_col = _pick(raw, AMOUNT_COLUMNS)
+    if not (name_col or (last and first)) or not amount_col:
+        return None
+    if name_col:
+        name = raw[name_col].fillna("")
+    else:
+        name = raw[last].fillna("") + ", " + raw[first].fillna("")
+
+    party_col, recipient_col = _pick(raw, PARTY_COLUMNS), _pick(raw, RECIPIENT_COLUMNS)
+    party_text = raw[party_col].fillna("") if party_col else pd.Series("", index=raw.index)
+    recipient = raw[recipient_col].fillna("") if recipient_col else party_text
+    if not party_col:
+        party_text = recipient
+    year_col, date_col = _pick(raw, YEAR_COLUMNS), _pick(raw, DATE_COLUMNS)
+    if year_col:
+        year = pd.to_numeric(raw[year_col], errors="coerce")
+    elif date_col:
+        year = pd.to_datetime(raw[date_col], errors="coerce").dt.year
+    else:
+        year = pd.Series(np.nan, index=raw.index)
+    amount = raw[amount_col]
+    if not pd.api.types.is_numeric_dtype(amount):
+        amount = t3010.money(amount)
+
+    city_col, postal_col = _pick(raw, CITY_COLUMNS), _pick(raw, POSTAL_COLUMNS)
+    empty = pd.Series("", index=raw.index)
+    return pd.DataFrame({
+        "source_file": os.path.basename(path),
+        "contributor": name.str.strip(),
+        "city": _upper(raw[city_col]) if city_col else empty,
+        "postal_area": postal_area(raw[postal_col]) if postal_col else empty,
+        "party": party_text.map(party_code) if len(raw) else empty,
+        "recipient": recipient.str.strip(),
+        "year": year.astype("Int64"),
+        "amount": amount,
+    })
+
+
+def read_contributions(donations_dir):
+    frames = []
+    for path in sorted(glob.glob(os.path.join(donations_dir, "*.csv"))):
+        df = read_export(path)
+        if df is None:
+            log(f"  skipped {os.path.basename(path)}: no contributor name / amount columns")
+            continue
+        log(f"  {os.path.basename(path)}: {len(df):,} contributions")
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame(columns=OUTPUT_COLUMNS[:3] + OUTPUT_COLUMNS[3:9])
+    df = pd.concat(frames, ignore_index=True)
+    df = df[(df["contributor"] != "") & df["amount"].notna()].reset_index(drop=True)
+    uniq = pd.Series(pd.unique(df["contributor"]))
+    norm = uniq.map(lambda r: normalize(r, "person"))
+    df["contributor_norm"] = norm.to_numpy()[pd.Index(uniq).get_indexer(df["contributor"])]
+    return df
+
+
+# ---------------------------------------------------------------------------
+# Directors
+# ---------------------------------------------------------------------------
+def read_directors(data_dir):
+    """{director name: set of cities of the charities they sit on}."""
+    path = os.path.join(data_dir, "multi_board_directors.csv")
+    if not os.path.exists(path):
+        return {}
+    dirs = pd.read_csv(path, dtype=str, keep_default_na=False)
+    cities = {}
+    fin_path = os.path.join(data_dir, "org_risk_flags.csv")
+    if os.path.exists(fin_path):
+        fin = pd.read_csv(fin_path, dtype=str, keep_default_na=False, usecols=["bn", "City"])
+        cities = dict(zip(fin["bn"].str.strip(), _upper(fin["City"])))
+    directors = {}
+    for name, linked in zip(dirs["clean_name_no_initial"].str.strip(), dirs["linked_bns"]):
+        if not name:
+            continue
+        try:
+            bns = json.loads(linked or "[]")
+        except ValueError:
+            bns = []
+        directors[name] = {cities[b] for b in map(str.strip, map(str, bns)) if cities.get(b)}
+    return directors
+
+
+def block_key(norm):
+    tokens = norm.split()
+    return f"{soundex(tokens[-1])}:{tokens[0][0]}" if tokens else ""
+
+
+class DirectorIndex:
+    """Exact name lookup plus Soundex(surname) + first-initial blocks for fuzzy scoring."""
+
+    def __init__(self, directors):
+        self.names = set(directors)
+        self.blocks = defaultdict(list)
+        for name in directors:
+            self.blocks[block_key(name)].append(name)
+
+    def best(self, norm, min_score=MIN_SCORE):
+        """(director, method, score, n_compared) for one contributor name."""
+        if norm in self.names:
+            return norm, "exact", 1.0, 0
+        if min_score >= 1 or not norm:
+            return None, "none", 0.0, 0
+        cands = self.blocks.get(block_key(norm), ())
+        best, score = None, 0.0
+        sm = SequenceMatcher(None, autojunk=False)
+        sm.set_seq2(norm)                           # difflib caches the second sequence
+        for name in cands:
+            sm.set_seq1(name)
+            floor = max(score, min_score)
+            if sm.real_quick_ratio() < floor or sm.quick_ratio() < floor:
+                continue
+            s = sm.ratio()
+            if s > score:
+                best, score = name, s
+        if best is None or score < min_score:
+            return None, "none", 0.0, len(cands)
+        return best, "fuzzy", round(score, 3), len(cands)
+
+
+# ---------------------------------------------------------------------------
+# Linkage
+# ---------------------------------------------------------------------------
+def link(contrib, directors, min_score=MIN_SCORE):
+    """Match columns on every contribution, scored once per distinct name."""
+    index = DirectorIndex(directors)
+    names = pd.unique(contrib["contributor_norm"])
+    found = {n: index.best(n, min_score) for n in names}
+    n_compared = sum(r[3] for r in found.values())
+    pos = pd.Index(names).get_indexer(contrib["contributor_norm"])
+    table = list(found.values())
+    out = contrib.copy()
+    out["match_id"] = [table[i][0] for i in pos]
+    out["match_method"] = [table[i][1] for i in pos]
+    out["match_score"] = [table[i][2] for i in pos]
+    out["local"] = [int(pd.notna(m) and bool(c) and c in directors[m])
+                    for m, c in zip(out["match_id"], out["city"])]
+    exact, local = out["match_method"] == "exact", out["local"] == 1
+    out["confidence"] = np.select([exact & local, exact | (local & (out["match_method"] == "fuzzy")),
+                                   out["match_method"] == "fuzzy"], ["HIGH", "MEDIUM", "LOW"], "")
+    return out[OUTPUT_COLUMNS], n_compared
+
+
+def by_director(linked):
+    """Matched contributions summed per (director, party, year)."""
+    m = linked[linked["match_id"].notna() & linked["year"].notna()].copy()
+    if m.empty:
+        return pd.DataFrame(columns=DIRECTOR_COLUMNS)
+    m["rank"] = m["confidence"].map(CONFIDENCE)
+    out = m.groupby(["match_id", "party", "year"], sort=True).agg(
+        amount=("amount", "sum"), n_contributions=("amount", "size"), rank=("rank", "max"),
+        postal_areas=("postal_area", lambda s: ";".join(sorted(set(s) - {""}))),
+        recipients=("recipient", lambda s: ";".join(sorted(set(s) - {""})))).reset_index()
+    out["confidence"] = out["rank"].map({v: k for k, v in CONFIDENCE.items()})
+    return out.rename(columns={"match_id": "director"})[DIRECTOR_COLUMNS]
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+def main():
+    ap = argparse.ArgumentParser(description="Link Elections Alberta contributors to Director nodes.")
+    ap.add_argument("--donations-dir", default=DONATIONS_DIR)
+    ap.add_argument("--data-dir", default=DATA_DIR)
+    ap.add_argument("--min-score", type=float, default=MIN_SCORE)
+    ap.add_argument("--out-dir", default=DATA_DIR)
+    args = ap.parse_args()
+
+    t_start = time.time()
+    with metrics.span("donations.load") as sp:
+        log(f"Contributor exports in {args.donations_dir}:")
+        contrib = read_contributions(args.donations_dir)
+        directors = read_directors(args.data_dir)
+        sp.rows = len(contrib)
+    if contrib.empty:
+        log("  none found; writing empty outputs")
+    log(f"Contributions: {len(contrib):,} ({contrib['contributor_norm'].nunique():,} names); "
+        f"directors: {len(directors):,}")
+
+    with metrics.span("donations.link") as sp:
+        linked, n_compared = link(contrib, directors, args.min_score)
+        totals = by_director(linked)
+        sp.rows = len(linked)
+    counts = linked["confidence"].value_counts()
+    log(f"Linked {int(linked['match_id'].notna().sum()):,} contributions to "
+        f"{linked['match_id'].nunique():,} directors ({n_compared:,} fuzzy comparisons): "
+        + ", ".join(f"{c} {int(counts.get(c, 0)):,}" for c in CONFIDENCE))
+    for party, amount in totals.groupby("party")["amount"].sum().sort_values(ascending=False).head(8).items():
+        log(f"  {party:<10} ${amount:,.0f}")
+
+    for name, df in ((DONATIONS_CSV, linked), (DIRECTOR_CSV, totals)):
+        path = os.path.join(args.out_dir, name)
+        df.to_csv(path, index=False, encoding="utf-8")
+        log(f"Saved {path}")
+        publish(path, "donations")
+    log(f"Done in {time.time() - t_start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
+    metrics.export("donations", log)
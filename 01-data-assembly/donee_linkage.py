@@ -0,0 +1,402 @@
+"""
+donee_linkage.py
+================
+Links the recipients in "Grants to Non-Qualified Donees.csv" (T3010, ~12K
+grants by recipient name, purpose and amount) to the graph's Organization
+and Director nodes.
+
+Recipient names arrive as typed by the filer ("PUGH, MS. MEGHAN",
+"Festival international de la littérature (FIL)"). Each is normalized
+(accents, honorifics and punctuation stripped, "LAST, FIRST" turned
+round, legal suffixes dropped) and classed person or organization. A
+two-word name is a person only with some evidence of it: a comma, an
+honorific, or a first word that is a director's given name ("Open
+Studio", "APPUI GASPESIE" are organizations).
+
+Linkage is blocked, never all-pairs:
+
+  phonetic keys  Soundex of the first and last name token, per kind
+  token keys     each name token, kept only while its block holds at most
+                 MAX_BLOCK targets (common words make useless blocks)
+
+A recipient is scored (difflib ratio on the normalized names) only
+against the targets sharing one of its keys, so work grows with the
+number of names rather than their product. A person is only compared
+with directors of the same surname whose given name is compatible
+(given_name_match: equal, an initial, a nickname, or one edit apart when
+both have 5+ letters), so JOSH MARTIN never scores against JOHN MARTIN.
+Targets:
+
+  organization   org_risk_flags.csv Legal_name / Account_name  -> bn
+  person         multi_board_directors.csv clean_name_no_initial
+                 -> Director normalized_name (with its linked BNs)
+
+A recipient below MIN_SCORE stays unmatched and becomes a GrantRecipient
+node keyed by its normalized name. own_director marks grants to a
+director who sits on the granting charity's own board.
+
+Schedule 1 (Foundations) carries no recipient names, only the
+foundation questions. Every filer has a row there, but only foundations
+answer the questions; a grantor that answered any is marked
+is_foundation.
+
+Output: donee_grants.csv, one row per grant.
+
+Usage:
+  python donee_linkage.py
+  python donee_linkage.py --min-score 0.85
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+# Handle Windows Unicode issues
+sys.stdout.reconfigure(encoding='utf-8')
+sys.stderr.reconfigure(encoding='utf-8')
+
+import pandas as pd
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "00-project-management"))
+from artifact_store import publish
+import metrics
+import t3010
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+DATA_DIR = os.environ.get("LINEAGE_DATA_DIR", os.path.dirname(os.path.abspath(__file__)))
+OUTPUT_CSV = "donee_grants.csv"
+
+MIN_SCORE = 0.90
+MAX_BLOCK = 200
+
+HONORIFICS = {"MR", "MRS", "MS", "MISS", "MME", "MLLE", "M", "DR", "PROF", "REV", "SR", "JR"}
+LEGAL_SUFFIXES = {"INC", "INCORPORATED", "LTD", "LIMITED", "CORP", "CORPORATION", "LTEE", "CO", "THE"}
+ORG_WORDS = {
+    "ASSOCIATION", "SOCIETY", "FOUNDATION", "FONDATION", "CENTRE", "CENTER", "INSTITUTE", "UNIVERSITY",
+    "UNIVERSITE", "COLLEGE", "SCHOOL", "ECOLE", "CHURCH", "EGLISE", "MINISTRY", "COUNCIL", "CLUB",
+    "COOPERATIVE", "COOP", "GROUP", "NETWORK", "TRUST", "FUND", "FESTIVAL", "THEATRE", "MUSEUM",
+    "HOSPITAL", "COMMUNITY", "INTERNATIONAL", "PROJECT", "PROGRAM", "COMMITTEE", "CONSERVANCY",
+    "MEDIA", "PRESSES", "PRESS", "TECHNOLOGIES", "GOVERNMENT", "CITY", "DEPARTMENT", "REGION",
+    "FEDERATION", "ALLIANCE", "PARTNERSHIP", "COMPANY", "SERVICES", "ORGANIZATION", "ORGANISATION",
+    "STUDIO", "STUDIOS", "PRODUCTION", "PRODUCTIONS", "COMEDY", "BALLET", "ARTS", "COLLECTIVE", "ENSEMBLE",
+    "ORCHESTRA", "CHOIR", "GALLERY", "TOURISM", "APPUI", "ESPACE", "DIOCESE", "ARCHDIOCESE", "CANADA",
+} | LEGAL_SUFFIXES
+# Nickname groups: two given names are compatible if some group holds both
+NICKNAMES = [
+    {"ROBERT", "ROB", "ROBBIE", "BOB", "BOBBY", "BERT"}, {"WILLIAM", "WILL", "BILL", "BILLY", "WILLIE", "LIAM"},
+    {"RICHARD", "RICK", "RICKY", "RICH", "DICK"}, {"JAMES", "JIM", "JIMMY", "JAMIE"}, {"JOHN", "JACK", "JOHNNY"},
+    {"MICHAEL", "MIKE", "MICK"}, {"DAVID", "DAVE"}, {"THOMAS", "TOM", "TOMMY"}, {"JOSEPH", "JOE", "JOEY"},
+    {"CHRISTOPHER", "CHRIS"}, {"DANIEL", "DAN", "DANNY"}, {"MATTHEW", "MATT"}, {"ANTHONY", "TONY"},
+    {"DONALD", "DON", "DONNIE"}, {"RONALD", "RON", "RONNIE"}, {"KENNETH", "KEN", "KENNY"},
+    {"STEVEN", "STEPHEN", "STEVE"}, {"EDWARD", "ED", "EDDIE", "TED", "NED"}, {"GERALD", "GERRY", "JERRY"},
+    {"GREGORY", "GREG"}, {"JEFFREY", "JEFF"}, {"TIMOTHY", "TIM"}, {"PATRICK", "PAT"}, {"PETER", "PETE"},
+    {"DOUGLAS", "DOUG"}, {"LAWRENCE", "LARRY"}, {"LEONARD", "LEN"}, {"SAMUEL", "SAM"}, {"BENJAMIN", "BEN"},
+    {"NICHOLAS", "NICK"}, {"ALEXANDER", "ALEX", "SANDY"}, {"ANDREW", "ANDY", "DREW"}, {"FREDERICK", "FRED"},
+    {"CATHERINE", "KATHERINE", "KATHRYN", "KATE", "KATHY", "CATHY", "KATIE"}, {"MARGARET", "MAGGIE", "PEGGY", "MEG"},
+    {"ELIZABETH", "LIZ", "BETH", "BETTY", "ELIZA", "LIZA", "BETSY"}, {"PATRICIA", "PAT", "PATTY", "TRISH"},
+    {"SUSAN", "SUE", "SUZY"}, {"DEBORAH", "DEBRA", "DEB", "DEBBIE"}, {"JENNIFER", "JEN", "JENNY"},
+    {"REBECCA", "BECKY"}, {"BARBARA", "BARB"}, {"VICTORIA", "VICKY"}, {"JACQUELINE", "JACKIE"},
+    {"CYNTHIA", "CINDY"}, {"JUDITH", "JUDY"}, {"KIMBERLY", "KIMBERLEY", "KIM"}, {"PAMELA", "PAM"},
+    {"ALEXANDRA", "SANDRA", "SANDY", "ALEX"}, {"CHRISTINE", "CHRISTINA", "CHRIS", "TINA"},
+    {"THERESA", "TERESA", "TERRI", "TERRY"},
+]
+_NICKNAME_GROUPS = defaultdict(set)
+for _i, _group in enumerate(NICKNAMES):
+    for _name in _group:
+        _NICKNAME_GROUPS[_name].add(_i)
+_NON_ALNUM = re.compile(r"[^A-Z0-9 ]+")
+_PARENS = re.compile(r"\([^)]*\)")
+_COOP = re.compile(r"\bCO-OP\b")
+
+
+def log(msg):
+    print(msg, flush=True)
+
+
+# ---------------------------------------------------------------------------
+# Names
+# ---------------------------------------------------------------------------
+def _ascii_upper(name):
+    name = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode()
+    return name.upper()
+
+
+def classify(raw, given_names=None):
+    """'person' or 'organization' from the raw recipient name. With
+    given_names, a two-word name without a comma or honorific is a person
+    only if its first word is one of them or a known nickname."""
+    name = _ascii_upper(raw)
+    tokens = _NON_ALNUM.sub(" ", name).split()
+    if set(tokens) & ORG_WORDS or any(ch.isdigit() for ch in name):
+        return "organization"
+    words = [t for t in tokens if t not in HONORIFICS]
+    if not 1 < len(words) <= 4:
+        return "organization"
+    if (len(words) == 2 and given_names is not None and "," not in name
+            and len(words) == len(tokens) and words[0] not in given_names and words[0] not in _NICKNAME_GROUPS):
+        return "organization"
+    return "person"
+
+
+def normalize(raw, kind):
+    """Upper-case ASCII, no punctuation / honorifics; persons as FIRST LAST
+    (middle initials dropped, as clean_name_no_initial); organizations
+    without parentheticals or legal suffixes."""
+    name = _ascii_upper(raw)
+    if kind == "person":
+        if "," in name:
+            last, _, first = name.partition(",")
+            name = f"{first} {last}"
+        tokens = [t for t in _NON_ALNUM.sub(" ", name).split() if t not in HONORIFICS]
+        tokens = [t for i, t in enumerate(tokens) if len(t) > 1 or i in (0, len(tokens) - 1)]
+        return " ".join(tokens)
+    name = _COOP.sub("COOP", _PARENS.sub(" ", name).replace("&", " AND "))
+    tokens = [t for t in _NON_ALNUM.sub(" ", name).split() if t not in LEGAL_SUFFIXES]
+    return " ".join(tokens)
+
+
+def _one_edit(a, b):
+    """True if a and b differ by exactly one insertion, deletion or substitution."""
+    if abs(len(a) - len(b)) > 1 or a == b:
+        return False
+    i = 0
+    while i < min(len(a), len(b)) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:]
+    return a[i + 1:] == b[i:] if len(a) > len(b) else a[i:] == b[i + 1:]
+
+
+def given_name_match(a, b):
+    """How two given names can be one person's: 0 equal, 1 nickname,
+    2 initial, 3 one edit apart (both 5+ letters), or None."""
+    if a == b:
+        return 0
+    if _NICKNAME_GROUPS.get(a, set()) & _NICKNAME_GROUPS.get(b, set()):
+        return 1
+    if (len(a) == 1 or len(b) == 1) and a[:1] == b[:1]:
+        return 2
+    if len(a) >= 5 and len(b) >= 5 and _one_edit(a, b):
+        return 3
+    return None
+
+
+def same_person_name(a, b):
+    """Normalized FIRST ... LAST names: identical surname, compatible given name."""
+    ta, tb = a.split(), b.split()
+    return bool(ta and tb) and ta[-1] == tb[-1] and given_name_match(ta[0], tb[0]) is not None
+
+
+def soundex(word):
+    """American Soundex ('ROBERT' -> 'R163')."""
+    word = "".join(ch for ch in word if ch.isalpha())
+    if not word:
+        return ""
+    codes = {**dict.fromkeys("BFPV", "1"), **dict.fromkeys("CGJKQSXZ", "2"), **dict.fromkeys("DT", "3"),
+             "L": "4", **dict.fromkeys("MN", "5"), "R": "6"}
+    out, prev = word[0], codes.get(word[0], "")
+    for ch in word[1:]:
+        code = codes.get(ch, "")
+        if code and code != prev:
+            out += code
+        if ch not in "HW":
+            prev = code
+    return (out + "000")[:4]
+
+
+def blocking_keys(norm, kind):
+    tokens = norm.split()
+    if not tokens:
+        return []
+    keys = [f"{kind}:sx:{soundex(tokens[0])}:{soundex(tokens[-1])}"]
+    keys += [f"{kind}:tok:{t}" for t in tokens if len(t) > 2]
+    return keys
+
+
+# ---------------------------------------------------------------------------
+# Blocking index
+# ---------------------------------------------------------------------------
+class BlockingIndex:
+    """key -> target ids, with oversized token blocks dropped."""
+
+    def __init__(self, max_block=MAX_BLOCK):
+        self.max_block = max_block
+        self.blocks = defaultdict(set)
+        self.names = {}
+
+    def add(self, target_id, norm, kind):
+        self.names[target_id] = norm
+        for key in blocking_keys(norm, kind):
+            self.blocks[key].add(target_id)
+
+    def freeze(self):
+        """Drop token blocks too common to discriminate; returns how many."""
+        big = [k for k, ids in self.blocks.items() if ":tok:" in k and len(ids) > self.max_block]
+        for k in big:
+            del self.blocks[k]
+        return len(big)
+
+    def candidates(self, norm, kind):
+        found = set()
+        for key in blocking_keys(norm, kind):
+            found |= self.blocks.get(key, set())
+        return found
+
+    def best(self, norm, kind):
+        """(target_id, score, n_candidates) of the closest candidate, or (None, 0, n).
+        Persons only score against same_person_name candidates."""
+        cands = self.candidates(norm, kind)
+        best_id, best_score = None, 0.0
+        for cid in cands:
+            if kind == "person" and not same_person_name(norm, self.names[cid]):
+                continue
+            score = SequenceMatcher(None, norm, self.names[cid], autojunk=False).ratio()
+            if score > best_score:
+                best_id, best_score = cid, score
+        return best_id, best_score, len(cands)
+
+
+def build_index(orgs, directors):
+    index = BlockingIndex()
+    for bn, names in orgs.items():
+        for name in names:
+            index.add(("organization", bn, name), name, "organization")
+    for name in directors:
+        index.add(("director", name, name), name, "person")
+    dropped = index.freeze()
+    return index, dropped
+
+
+# ---------------------------------------------------------------------------
+# Inputs
+# ---------------------------------------------------------------------------
+def read_targets(data_dir):
+    """{bn: {normalized org names}}, {director name: [linked BNs]}."""
+    orgs = defaultdict(set)
+    fin = pd.read_csv(os.path.join(data_dir, "org_risk_flags.csv"), dtype=str, keep_default_na=False)
+    for col in ("Legal_name", "Account_name"):
+        if col in fin:
+            for bn, name in zip(fin["bn"].str.strip(), fin[col]):
+                norm = normalize(name, "organization")
+                if norm:
+                    orgs[bn].add(norm)
+    directors = {}
+    path = os.path.join(data_dir, "multi_board_directors.csv")
+    if os.path.exists(path):
+        dirs = pd.read_csv(path, dtype=str, keep_default_na=False)
+        for name, linked in zip(dirs["clean_name_no_initial"].str.strip(), dirs["linked_bns"]):
+            if name:
+                try:
+                    directors[name] = [str(b).strip() for b in json.loads(linked or "[]")]
+                except ValueError:
+                    directors[name] = []
+    return orgs, directors
+
+
+def read_foundations(t3010_dir=None):
+    """BNs that answered a Schedule 1 question (lines 100-130)."""
+    f = t3010.read_schedule("foundations", t3010_dir)
+    lines = [c for c in f.columns if c.isdigit()]
+    return f.loc[f[lines].notna().any(axis=1), "bn"]
+
+
+def read_grants(t3010_dir=None):
+    g = t3010.read_schedule("non_qualified_donees", t3010_dir).rename(columns={
+        "Grant Recipient Name": "recipient", "Grant Purpose": "purpose",
+        "Amount of Cash Disbursed": "cash", "Amount of non-cash Disbursed": "non_cash",
+        "Grant Country": "country"})
+    g = g[g["recipient"].notna()].reset_index(drop=True)
+    # "UG-UGANDA" -> UG
+    g["country_code"] = g["country"].str.extract(r"^([A-Z]{2})-", expand=False)
+    return g
+
+
+# ---------------------------------------------------------------------------
+# Linkage
+# ---------------------------------------------------------------------------
+def link(grants, index, directors, foundations=(), min_score=MIN_SCORE):
+    """One output row per grant with its match (or None) and own_director."""
+    given_names = {name.split()[0] for name in directors if len(name.split()[0]) > 1} or None
+    kinds = [classify(r, given_names) for r in grants["recipient"]]
+    norms = [normalize(r, k) for r, k in zip(grants["recipient"], kinds)]
+
+    cache, n_compared = {}, 0
+    match_type, match_id, match_score = [], [], []
+    for norm, kind in zip(norms, kinds):
+        if (norm, kind) not in cache:
+            best, score, n = index.best(norm, kind)
+            n_compared += n
+            cache[norm, kind] = (best, score) if best is not None and score >= min_score else (None, score)
+        best, score = cache[norm, kind]
+        match_type.append(best[0] if best else "none")
+        match_id.append(best[1] if best else None)
+        match_score.append(round(score, 3))
+
+    out = pd.DataFrame({
+        "bn": grants["bn"], "fiscal_period_end": grants["fiscal_period_end"].dt.date, "seq": grants["seq"],
+        "recipient": grants["recipient"], "recipient_norm": norms, "recipient_kind": kinds,
+        "purpose": grants["purpose"], "cash": grants["cash"], "non_cash": grants["non_cash"],
+        "country_code": grants["country_code"],
+        "match_type": match_type, "match_id": match_id, "match_score": match_score,
+    })
+    out["own_director"] = [int(t == "director" and bn in directors.get(mid, ()))
+                           for t, mid, bn in zip(out["match_type"], out["match_id"], out["bn"])]
+    out["is_foundation"] = out["bn"].isin(set(foundations)).astype(int)
+    return out, n_compared
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+def main():
+    ap = argparse.ArgumentParser(description="Link non-qualified-donee grant recipients to the graph.")
+    ap.add_argument("--data-dir", default=DATA_DIR)
+    ap.add_argument("--t3010-dir", default=t3010.T3010_DIR)
+    ap.add_argument("--min-score", type=float, default=MIN_SCORE)
+    ap.add_argument("--out", default=os.path.join(DATA_DIR, OUTPUT_CSV))
+    args = ap.parse_args()
+
+    t_start = time.time()
+    with metrics.span("donee.load") as sp:
+        grants = read_grants(args.t3010_dir)
+        orgs, directors = read_targets(args.data_dir)
+        foundations = read_foundations(args.t3010_dir)
+        sp.rows = len(grants)
+    log(f"Grants: {len(grants):,} from {grants['bn'].nunique():,} charities; "
+        f"targets: {len(orgs):,} organizations, {len(directors):,} directors")
+
+    with metrics.span("donee.index") as sp:
+        index, dropped = build_index(orgs, directors)
+        sp.rows = len(index.names)
+    log(f"Blocking index: {len(index.blocks):,} blocks over {len(index.names):,} names "
+        f"({dropped:,} token blocks over {MAX_BLOCK} dropped)")
+
+    with metrics.span("donee.link") as sp:
+        t0 = time.time()
+        out, n_compared = link(grants, index, directors, foundations, args.min_score)
+        sp.rows = len(out)
+    naive = len(set(zip(out["recipient_norm"], out["recipient_kind"]))) * len(index.names)
+    log(f"Linked in {time.time() - t0:.2f}s: {n_compared:,} comparisons "
+        f"(all-pairs would be {naive:,})")
+    counts = out["match_type"].value_counts()
+    for kind in ("organization", "director", "none"):
+        log(f"  {kind:13s} {int(counts.get(kind, 0)):>7,} grants")
+    own = out[out["own_director"] == 1]
+    log(f"  Grants to the grantor's own director: {len(own):,} "
+        f"(${own['cash'].sum():,.0f}, {int(own['is_foundation'].sum()):,} from foundations)")
+
+    out.to_csv(args.out, index=False, encoding="utf-8")
+    log(f"Saved {args.out} ({time.time() - t_start:.1f}s)")
+    publish(args.out, "donee_linkage")
+
+
+if __name__ == "__main__":
+    main()
+    metrics.export("donee_linkage", log)
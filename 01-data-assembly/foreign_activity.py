@@ -0,0 +1,252 @@
+"""
+foreign_activity.py
+===================
+Foreign-activity and non-cash-gift index from T3010 Schedules 2 and 5.
+
+Schedule 2 gives, per charity, the dollars spent outside Canada (line
+200), the program countries, exported goods by destination country and
+recipients of resources abroad with their country. Each is reduced to
+(bn, country_code, amount) flows:
+
+  program     line 200 less the charity's recipient transfers, split
+              evenly over its program countries (the schedule does not
+              break it down by country)
+  export      "Value (CAN)" of goods exported, by destination country
+  recipient   "Amount" transferred to a recipient, by its country
+
+and summed into a BN x country sparse matrix (scipy CSR). Row sums and
+row nnz give the per-BN rollup, column sums and column nnz the
+per-country one. Country codes are decoded through "# Country.csv"
+(unknown codes keep the code as their name).
+
+Line 200 is the total spent outside Canada, so it already includes the
+resources transferred to recipients abroad. Only the remainder (floored
+at zero) is spread over program countries, so weight = program + export
++ recipient counts each transferred dollar once, in its recipient's
+country.
+
+Schedule 5 has no country; its total (line 580) and the gift kinds
+ticked (lines 500-560) join the per-BN rollup.
+
+Outputs:
+  foreign_flows.csv       bn, country_code, country, program, export_value,
+                          recipient_amount, weight  (non-zero matrix cells)
+  foreign_activity_bn.csv one row per BN with Schedule 2 or 5 data
+  foreign_activity_country.csv  one row per country
+
+agent_1_foreign_activity.py loads the flows as weighted ACTIVE_IN edges
+to Country nodes.
+
+Usage:
+  python foreign_activity.py
+  python foreign_activity.py --bns org_risk_flags.csv   # restrict to the BNs in a CSV
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# Handle Windows Unicode issues
+sys.stdout.reconfigure(encoding='utf-8')
+sys.stderr.reconfigure(encoding='utf-8')
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "00-project-management"))
+from artifact_store import publish
+import metrics
+import t3010
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+DATA_DIR = os.environ.get("LINEAGE_DATA_DIR", os.path.dirname(os.path.abspath(__file__)))
+FLOWS_CSV = "foreign_flows.csv"
+BN_CSV = "foreign_activity_bn.csv"
+COUNTRY_CSV = "foreign_activity_country.csv"
+
+SOURCES = ["program", "export_value", "recipient_amount"]
+GIFT_KINDS = [name for line, name in t3010.NON_CASH_LINES.items() if line < "565"]
+
+
+def log(msg):
+    print(msg, flush=True)
+
+
+# ---------------------------------------------------------------------------
+# Flows
+# ---------------------------------------------------------------------------
+def _code(values):
+    return values.str.strip().str.upper().fillna("")
+
+
+def read_flows(t3010_dir=None, bns=None):
+    """Long (bn, country_code, source, amount) table from the Schedule 2 files."""
+    summary = t3010.latest_filing(t3010.read_schedule("activities_outside_canada", t3010_dir)
+                                  .rename(columns=t3010.OUTSIDE_CANADA_LINES))
+    countries = t3010.read_schedule("outside_canada_countries", t3010_dir)
+    exports = t3010.read_schedule("outside_canada_exports", t3010_dir)
+    recipients = t3010.read_schedule("outside_canada_recipients", t3010_dir)
+
+    # Only the latest return per BN, as for the summary
+    latest = summary.set_index("bn")["fiscal_period_end"]
+    frames = []
+    for df in (countries, exports, recipients):
+        keep = df["fiscal_period_end"] == df["bn"].map(latest)
+        frames.append(df[keep & df["bn"].isin(latest.index)])
+    countries, exports, recipients = frames
+
+    countries = countries.assign(country_code=_code(countries["Charity's Program Country Code"]))
+    countries = countries[countries["country_code"] != ""].drop_duplicates(["bn", "country_code"])
+    n_countries = countries.groupby("bn").size()
+    # Line 200 includes the recipient transfers, which are attributed by country below
+    transferred = recipients.groupby("bn")["Amount"].sum()
+    spend = summary.set_index("bn")["outside_canada_expenditures"]
+    spend = (spend - transferred.reindex(spend.index).fillna(0.0)).clip(lower=0.0)
+    program = pd.DataFrame({
+        "bn": countries["bn"], "country_code": countries["country_code"], "source": "program",
+        "amount": (countries["bn"].map(spend) / countries["bn"].map(n_countries)).fillna(0.0),
+    })
+    export = pd.DataFrame({"bn": exports["bn"], "country_code": _code(exports["Country code"]),
+                           "source": "export_value", "amount": exports["Value (CAN)"].fillna(0.0)})
+    recipient = pd.DataFrame({"bn": recipients["bn"], "country_code": _code(recipients["Country"]),
+                              "source": "recipient_amount", "amount": recipients["Amount"].fillna(0.0)})
+
+    flows = pd.concat([program, export, recipient], ignore_index=True)
+    flows = flows[flows["country_code"] != ""]
+    if bns is not None:
+        flows = flows[flows["bn"].isin(bns)]
+        summary = summary[summary["bn"].isin(bns)]
+    return flows.reset_index(drop=True), summary
+
+
+def flow_matrices(flows):
+    """BN x country CSR matrices over shared labels: one per source, plus
+    'weight' (all sources) and 'present' (1 wherever a flow record exists).
+
+    Returns (matrices, bn labels, country labels).
+    """
+    bn_codes, bns = pd.factorize(flows["bn"], sort=True)
+    cc_codes, ccs = pd.factorize(flows["country_code"], sort=True)
+    shape = (len(bns), len(ccs))
+    source = flows["source"].to_numpy()
+    amount = flows["amount"].to_numpy(dtype=float)
+
+    def build(values):
+        m = sparse.coo_matrix((values, (bn_codes, cc_codes)), shape=shape).tocsr()
+        m.sum_duplicates()
+        return m
+
+    mats = {s: build(np.where(source == s, amount, 0.0)) for s in SOURCES}
+    mats["weight"] = build(amount)
+    mats["present"] = build(np.ones(len(flows)))
+    mats["present"].data[:] = 1
+    return mats, np.asarray(bns), np.asarray(ccs)
+
+
+def _country_name(codes, countries):
+    return codes.map(countries).fillna(codes)
+
+
+def flow_table(mats, bns, ccs, countries):
+    """Non-zero cells of the BN x country matrices, one column per source."""
+    cells = mats["present"].tocoo()
+    out = pd.DataFrame({"bn": bns[cells.row], "country_code": ccs[cells.col]})
+    out["country"] = _country_name(out["country_code"], countries)
+    for col in SOURCES + ["weight"]:
+        out[col] = np.asarray(mats[col][cells.row, cells.col]).ravel()
+    return out.sort_values(["bn", "weight"], ascending=[True, False], kind="stable").reset_index(drop=True)
+
+
+# ---------------------------------------------------------------------------
+# Rollups
+# ---------------------------------------------------------------------------
+def bn_rollup(mats, bns, ccs, summary, non_cash, countries):
+    """Row sums / nnz per BN, joined with the Schedule 2 totals and Schedule 5."""
+    weight = mats["weight"]
+    out = pd.DataFrame({
+        "bn": bns,
+        "n_countries": np.diff(mats["present"].indptr),
+        "foreign_weight": np.asarray(weight.sum(axis=1)).ravel(),
+        "top_country_code": ccs[np.asarray(weight.argmax(axis=1)).ravel()],
+    })
+    out["top_country"] = _country_name(out["top_country_code"], countries)
+    for source in ("export_value", "recipient_amount"):
+        out[source] = np.asarray(mats[source].sum(axis=1)).ravel()
+
+    s2 = summary[["bn", "outside_canada_expenditures", "resources_transferred"]]
+    gifts = non_cash.rename(columns=t3010.NON_CASH_LINES)
+    ticked = gifts[GIFT_KINDS].eq("Y").to_numpy()
+    kinds = np.array(GIFT_KINDS, dtype=object)
+    gifts = pd.DataFrame({
+        "bn": gifts["bn"].to_numpy(),
+        "non_cash_total": gifts["non_cash_total"].to_numpy(),
+        "non_cash_kinds": [";".join(kinds[row]) for row in ticked],
+    })
+    out = out.merge(s2, on="bn", how="outer").merge(gifts, on="bn", how="outer")
+    out["n_countries"] = out["n_countries"].fillna(0).astype(int)
+    return out.sort_values("bn").reset_index(drop=True)
+
+
+def country_rollup(mats, ccs, countries):
+    """Column sums / nnz per country."""
+    out = pd.DataFrame({
+        "country_code": ccs,
+        "n_charities": np.diff(mats["present"].tocsc().indptr),
+    })
+    out.insert(1, "country", _country_name(out["country_code"], countries))
+    for col in ["weight"] + SOURCES:
+        out[col] = np.asarray(mats[col].sum(axis=0)).ravel()
+    return out.sort_values("weight", ascending=False).reset_index(drop=True)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+def main():
+    ap = argparse.ArgumentParser(description="Build the Schedule 2 / 5 foreign-activity index.")
+    ap.add_argument("--t3010-dir", default=t3010.T3010_DIR)
+    ap.add_argument("--bns", help="CSV with a bn column; keep only those charities")
+    ap.add_argument("--out-dir", default=DATA_DIR)
+    args = ap.parse_args()
+
+    t_start = time.time()
+    with metrics.span("foreign.load") as sp:
+        bns = None
+        if args.bns:
+            bns = set(pd.read_csv(args.bns, usecols=["bn"], dtype=str)["bn"].str.strip())
+        countries = t3010.read_countries(args.t3010_dir)
+        flows, summary = read_flows(args.t3010_dir, bns)
+        non_cash = t3010.latest_filing(t3010.read_schedule("non_cash_gifts", args.t3010_dir))
+        if bns is not None:
+            non_cash = non_cash[non_cash["bn"].isin(bns)]
+        sp.rows = len(flows)
+    log(f"Schedule 2: {len(summary):,} filers, {len(flows):,} flow records; "
+        f"Schedule 5: {len(non_cash):,} filers")
+
+    with metrics.span("foreign.index") as sp:
+        mats, bn_labels, cc_labels = flow_matrices(flows)
+        table = flow_table(mats, bn_labels, cc_labels, countries)
+        by_bn = bn_rollup(mats, bn_labels, cc_labels, summary, non_cash, countries)
+        by_country = country_rollup(mats, cc_labels, countries)
+        sp.rows = len(table)
+    unknown = sorted(set(by_country["country_code"]) - set(countries.index))
+    log(f"BN x country matrix: {len(bn_labels):,} x {len(cc_labels):,}, {len(table):,} non-zero "
+        f"({time.time() - t_start:.2f}s)")
+    if unknown:
+        log(f"  Codes not in # Country.csv (kept as-is): {unknown}")
+    for r in by_country.head(10).itertuples():
+        log(f"  {r.country[:30]:30s} {r.n_charities:>6,} charities  ${r.weight:>16,.0f}")
+
+    for name, df in ((FLOWS_CSV, table), (BN_CSV, by_bn), (COUNTRY_CSV, by_country)):
+        path = os.path.join(args.out_dir, name)
+        df.to_csv(path, index=False, encoding="utf-8")
+        log(f"Saved {path}")
+        publish(path, "foreign_activity")
+
+
+if __name__ == "__main__":
+    main()
+    metrics.export("foreign_activity", log)
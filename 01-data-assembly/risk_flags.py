@@ -0,0 +1,287 @@
+"""
+risk_flags.py
+=============
+Local recomputation of the seven CRA risk flags behind FLAGGED_AS.
+
+ab_org_risk_flags arrives from Databricks with the flags already set.
+This module derives them again, as whole-column numpy/pandas
+expressions, from:
+
+  financials   T3010 financial fields, one row per BN (default
+               org_risk_flags.csv; any CSV/Parquet extract with the same
+               columns works, e.g. an ab_master_profile or national
+               Section D export)
+  Schedule 3   line 390 total compensation from the T3010 extract
+               (t3010.py); used in place of the `compensation` field
+               wherever a charity filed it
+  clusters     org_clusters.csv        -> in_director_cluster
+  edges        org_network_edges.csv   -> shadow_network
+
+Flag definitions (THRESHOLDS, overridable with --set / --thresholds):
+
+  low_passthrough      program spending / revenue      < low_passthrough_max
+  salary_mill          compensation / expenditures     > salary_mill_min
+  high_gov_dependency  government revenue / revenue    > high_gov_dependency_min
+  deficit              expenditures - revenue          > deficit_min
+  insolvency_5pct_cut  net assets + (1 - cut) * revenue - expenditures < 0
+  shadow_network       >= shadow_min_partners other orgs each sharing
+                       >= shadow_min_shared directors with it
+  in_director_cluster  in a cluster of >= cluster_min_size orgs
+
+A ratio with a missing or non-positive denominator never sets a flag.
+Missing amounts fall back to the matching *_pct column (program_pct,
+compensation_pct_of_exp, gov_dependency_pct are percent of expenditures
+/ revenue) and net assets to assets - liabilities.
+
+The upstream definition of shadow_network is not published; the
+partner-count rule above is this module's, and the agreement report
+(recomputed vs. precomputed, per flag) is there to calibrate it.
+
+Output: risk_flag_matrix.csv -- bn + the seven flag_* columns (0/1),
+the same layout as the flag columns of org_risk_flags.csv, so
+agent_1_graph_builder.py can build FLAGGED_AS from it directly
+(LINEAGE_RISK_FLAGS=recomputed).
+
+Usage:
+  python risk_flags.py
+  python risk_flags.py --set salary_mill_min=0.6 --set shadow_min_partners=5
+  python risk_flags.py --financials national_t3010_financials.parquet --no-compare
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+# Handle Windows Unicode issues
+sys.stdout.reconfigure(encoding='utf-8')
+sys.stderr.reconfigure(encoding='utf-8')
+
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "00-project-management"))
+from artifact_store import publish
+import metrics
+import t3010
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+DATA_DIR = os.environ.get("LINEAGE_DATA_DIR", os.path.dirname(os.path.abspath(__file__)))
+OUTPUT_CSV = "risk_flag_matrix.csv"
+
+FLAG_TYPES = ["low_passthrough", "salary_mill", "high_gov_dependency", "deficit",
+              "insolvency_5pct_cut", "shadow_network", "in_director_cluster"]
+FLAG_COLUMNS = [f"flag_{f}" for f in FLAG_TYPES]
+
+THRESHOLDS = {
+    "low_passthrough_max": 0.25,       # program spending / revenue
+    "salary_mill_min": 0.50,           # compensation / expenditures
+    "high_gov_dependency_min": 0.80,   # government revenue / revenue
+    "deficit_min": 0.0,                # $ of expenditures over revenue
+    "insolvency_revenue_cut": 0.05,    # revenue shock for the insolvency test
+    "shadow_min_shared": 2,            # directors an org pair must share
+    "shadow_min_partners": 10,         # orgs linked that strongly
+    "cluster_min_size": 2,             # smallest cluster that counts
+}
+
+
+def log(msg):
+    print(msg, flush=True)
+
+
+# ---------------------------------------------------------------------------
+# Inputs
+# ---------------------------------------------------------------------------
+def read_table(path):
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path, dtype={"bn": str, "org1_bn": str, "org2_bn": str}, low_memory=False)
+
+
+def _num(df, col):
+    if col in df:
+        return pd.to_numeric(df[col], errors="coerce").astype(float)
+    return pd.Series(np.nan, index=df.index)
+
+
+def _ratio(num, den):
+    return num / den.where(den > 0)
+
+
+def amounts(fin, compensation=None):
+    """The dollar amounts the flags are defined on, one row per BN of fin.
+
+    compensation: Series of Schedule 3 line 390 indexed by BN; preferred
+    over the financials' own compensation field where present.
+    """
+    bn = fin["bn"].astype(str).str.strip()
+    rev = _num(fin, "Total_Revenue")
+    exp = _num(fin, "Total_Expenditures")
+
+    program = _num(fin, "program_exp").fillna(_num(fin, "program_pct") / 100 * exp)
+
+    comp = _num(fin, "compensation").fillna(_num(fin, "compensation_pct_of_exp") / 100 * exp)
+    if compensation is not None:
+        comp = bn.map(compensation).astype(float).fillna(comp)
+
+    gov_parts = pd.concat([_num(fin, c) for c in ("fed_rev", "prov_rev", "muni_rev", "other_gov_rev")],
+                          axis=1).sum(axis=1, min_count=1)
+    gov = (_num(fin, "total_gov_rev").fillna(gov_parts)
+           .fillna(_num(fin, "gov_dependency_pct") / 100 * rev))
+
+    net = _num(fin, "net_assets").fillna(_num(fin, "Total_Assets") - _num(fin, "Total_Liabilities"))
+
+    return pd.DataFrame({"bn": bn, "revenue": rev, "expenditures": exp,
+                         "program": program, "compensation": comp, "gov_revenue": gov,
+                         "net_assets": net})
+
+
+def network_partners(edges, min_shared):
+    """Number of other orgs sharing >= min_shared directors, per BN."""
+    shared = pd.to_numeric(edges["n_shared_directors"], errors="coerce")
+    strong = edges.loc[shared >= min_shared, ["org1_bn", "org2_bn"]]
+    pairs = pd.concat([strong.rename(columns={"org1_bn": "bn", "org2_bn": "other"}),
+                       strong.rename(columns={"org2_bn": "bn", "org1_bn": "other"})])
+    return pairs.drop_duplicates().groupby("bn").size()
+
+
+def clustered_bns(clusters, min_size):
+    size = pd.to_numeric(clusters["cluster_size"], errors="coerce")
+    keep = clusters["cluster_id"].notna() & (clusters["cluster_id"].astype(str) != "") & (size >= min_size)
+    return set(clusters.loc[keep, "bn"].astype(str).str.strip())
+
+
+# ---------------------------------------------------------------------------
+# Flags
+# ---------------------------------------------------------------------------
+def flag_matrix(fin, compensation=None, clusters=None, edges=None, thresholds=None):
+    """bn + flag_* (int8) for every row of fin. clusters / edges may be None
+    (their flags are then 0)."""
+    t = dict(THRESHOLDS, **(thresholds or {}))
+    a = amounts(fin, compensation)
+    rev, exp = a["revenue"], a["expenditures"]
+
+    flags = {
+        "flag_low_passthrough": _ratio(a["program"], rev) < t["low_passthrough_max"],
+        "flag_salary_mill": _ratio(a["compensation"], exp) > t["salary_mill_min"],
+        "flag_high_gov_dependency": _ratio(a["gov_revenue"], rev) > t["high_gov_dependency_min"],
+        "flag_deficit": (exp - rev) > t["deficit_min"],
+        "flag_insolvency_5pct_cut":
+            (a["net_assets"] + (1 - t["insolvency_revenue_cut"]) * rev - exp) < 0,
+    }
+    if edges is not None:
+        partners = a["bn"].map(network_partners(edges, t["shadow_min_shared"])).fillna(0)
+        flags["flag_shadow_network"] = partners >= t["shadow_min_partners"]
+    else:
+        flags["flag_shadow_network"] = pd.Series(False, index=fin.index)
+    if clusters is not None:
+        flags["flag_in_director_cluster"] = a["bn"].isin(clustered_bns(clusters, t["cluster_min_size"]))
+    else:
+        flags["flag_in_director_cluster"] = pd.Series(False, index=fin.index)
+
+    out = pd.DataFrame({"bn": a["bn"]})
+    for col in FLAG_COLUMNS:
+        out[col] = flags[col].fillna(False).astype(np.int8).to_numpy()
+    return out
+
+
+def flagged_as_params(matrix):
+    """FLAGGED_AS batch params ({'bn', 'flag_type'}) for every set flag."""
+    oi, fi = np.nonzero(matrix[FLAG_COLUMNS].to_numpy() == 1)
+    bns = matrix["bn"].to_numpy()
+    types = np.array(FLAG_TYPES, dtype=object)
+    return [{"bn": b, "flag_type": f} for b, f in zip(bns[oi], types[fi])]
+
+
+def agreement(fin, matrix):
+    """Per flag: precomputed count, recomputed count, both, and agreement rate."""
+    rows = []
+    for col in FLAG_COLUMNS:
+        if col not in fin:
+            continue
+        old = pd.to_numeric(fin[col], errors="coerce").fillna(0).astype(int).to_numpy() == 1
+        new = matrix[col].to_numpy() == 1
+        rows.append({"flag": col[5:], "precomputed": int(old.sum()), "recomputed": int(new.sum()),
+                     "both": int((old & new).sum()), "agreement": float((old == new).mean())})
+    return pd.DataFrame(rows)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+def parse_overrides(pairs, path=None):
+    overrides = {}
+    if path:
+        with open(path, encoding="utf-8") as f:
+            overrides.update(json.load(f))
+    for pair in pairs or []:
+        key, _, value = pair.partition("=")
+        if key not in THRESHOLDS or not value:
+            raise SystemExit(f"--set expects one of {sorted(THRESHOLDS)} as key=value, got {pair!r}")
+        overrides[key] = type(THRESHOLDS[key])(float(value))
+    unknown = set(overrides) - set(THRESHOLDS)
+    if unknown:
+        raise SystemExit(f"Unknown thresholds: {sorted(unknown)}")
+    return overrides
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Recompute the CRA risk flags locally.")
+    ap.add_argument("--financials", default=os.path.join(DATA_DIR, "org_risk_flags.csv"))
+    ap.add_argument("--clusters", default=os.path.join(DATA_DIR, "org_clusters.csv"))
+    ap.add_argument("--edges", default=os.path.join(DATA_DIR, "org_network_edges.csv"))
+    ap.add_argument("--t3010-dir", default=t3010.T3010_DIR)
+    ap.add_argument("--no-schedule3", action="store_true", help="ignore Schedule 3 compensation")
+    ap.add_argument("--set", action="append", metavar="KEY=VALUE", help="override one threshold")
+    ap.add_argument("--thresholds", help="JSON file of threshold overrides")
+    ap.add_argument("--out", default=os.path.join(DATA_DIR, OUTPUT_CSV))
+    ap.add_argument("--no-compare", action="store_true", help="skip the agreement report")
+    args = ap.parse_args()
+
+    overrides = parse_overrides(args.set, args.thresholds)
+    t_start = time.time()
+
+    with metrics.span("flags.load") as sp:
+        fin = read_table(args.financials)
+        clusters = read_table(args.clusters) if os.path.exists(args.clusters) else None
+        edges = read_table(args.edges) if os.path.exists(args.edges) else None
+        compensation = None
+        if not args.no_schedule3 and os.path.exists(t3010.schedule_path("compensation", args.t3010_dir)):
+            comp = t3010.read_compensation(args.t3010_dir)
+            compensation = comp.set_index("bn")["total_compensation"].dropna()
+        sp.rows = len(fin)
+    log(f"Financials: {args.financials} ({len(fin):,} orgs)")
+    if compensation is not None:
+        n_matched = int(fin["bn"].astype(str).str.strip().isin(compensation.index).sum())
+        log(f"  Schedule 3 compensation: {len(compensation):,} filers, {n_matched:,} matched")
+    log(f"  Clusters: {'missing' if clusters is None else len(clusters)}, "
+        f"network edges: {'missing' if edges is None else len(edges)}")
+    if overrides:
+        log(f"  Threshold overrides: {overrides}")
+
+    with metrics.span("flags.compute") as sp:
+        matrix = flag_matrix(fin, compensation, clusters, edges, overrides)
+        sp.rows = len(matrix)
+    params = flagged_as_params(matrix)
+    log(f"Computed {len(FLAG_COLUMNS)} flags for {len(matrix):,} orgs -> {len(params):,} FLAGGED_AS edges "
+        f"in {time.time() - t_start:.2f}s")
+
+    if not args.no_compare:
+        report = agreement(fin, matrix)
+        if len(report):
+            log("")
+            log(f"  {'flag':22s} {'precomputed':>11} {'recomputed':>10} {'both':>7} {'agreement':>9}")
+            for r in report.itertuples():
+                log(f"  {r.flag:22s} {r.precomputed:>11,} {r.recomputed:>10,} {r.both:>7,} "
+                    f"{r.agreement:>9.1%}")
+
+    matrix.to_csv(args.out, index=False, encoding="utf-8")
+    log(f"Saved {args.out}")
+    publish(args.out, "risk_flags")
+
+
+if __name__ == "__main__":
+    main()
+    metrics.export("risk_flags", log)
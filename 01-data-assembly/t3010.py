@@ -0,0 +1,215 @@
+"""
+t3010.py
+========
+Loader for the CRA T3010 open-data extract in data/CRA-2024-T3010-Raw
+(or LINEAGE_T3010_DIR).
+
+Every schedule file shares the same key columns, which are renamed on
+read:
+
+  "BN/Registration number" -> bn                 (15-char, e.g. 100021237RR0001)
+  "Fiscal period end"      -> fiscal_period_end  (datetime)
+  "Form ID"                -> form_id            (T3010 form revision)
+  "Sequence number"        -> seq                (repeating schedules only)
+
+The remaining columns keep their T3010 line numbers ("300", "390", ...)
+or CRA headings. Dollar columns ("$7202086.00") are parsed to float
+(a stray "$" in a free-text column does not count); everything else
+stays a string. The files are Latin-1 (French accents).
+
+Usage:
+  python t3010.py                 # list the schedules with row / BN counts
+  python t3010.py compensation    # first rows of one schedule
+"""
+
+import os
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+T3010_DIR = os.environ.get("LINEAGE_T3010_DIR", os.path.join(ROOT, "data", "CRA-2024-T3010-Raw"))
+ENCODING = "latin-1"
+MONEY_SHARE = 0.9   # a column is dollars when this share of its values start with "$"
+
+SCHEDULE_FILES = {
+    "foundations": "Schedule 1_ Foundations.csv",
+    "activities_outside_canada": "Schedule 2_ Activities Outside Canada.csv",
+    "outside_canada_countries": "Schedule 2_ Activities Outside Canada - Country.csv",
+    "outside_canada_exports": "Schedule 2_ Activities Outside Canada - Destination.csv",
+    "outside_canada_recipients": "Schedule 2_ Activities Outside Canada - Recipient.csv",
+    "compensation": "Schedule 3_ Compensation.csv",
+    "non_cash_gifts": "Schedule 5_ Non-Cash gifts.csv",
+    "political_description": "Schedule 7_ Description.csv",
+    "political_outside_canada": "Schedule 7_ Political Activities - Outside Canada.csv",
+    "political_resources": "Schedule 7_ Political Activities - Resources.csv",
+    "non_qualified_donees": "Grants to Non-Qualified Donees.csv",
+}
+
+# Code tables shipped with the extract ("# " prefix)
+CODE_FILES = {
+    "categories": "# Category_Sub-Category.csv",
+    "countries": "# Country.csv",
+    "designations": "# Designation.csv",
+    "programs": "# Programs.csv",
+}
+
+KEY_COLUMNS = {
+    "BN/Registration number": "bn",
+    "Fiscal period end": "fiscal_period_end",
+    "Form ID": "form_id",
+    "Sequence number": "seq",
+    "Sequence Number": "seq",
+}
+
+# Schedule 3 lines -> names (T3010 form 23 / revision 27)
+COMPENSATION_LINES = {
+    "300": "n_full_time",                 # permanent full-time compensated positions
+    "305": "n_top10_1_to_39999",          # ten highest-paid full-time positions, by range
+    "310": "n_top10_40000_to_79999",
+    "315": "n_top10_80000_to_119999",
+    "320": "n_top10_120000_to_159999",
+    "325": "n_top10_160000_to_199999",
+    "330": "n_top10_200000_to_249999",
+    "335": "n_top10_250000_to_299999",
+    "340": "n_top10_300000_to_349999",
+    "345": "n_top10_350000_plus",
+    "370": "n_part_time",                 # part-time / part-year employees
+    "380": "part_time_compensation",      # $ spent on part-time / part-year employees
+    "390": "total_compensation",          # $ spent on all compensation
+}
+
+# Schedule 2 dollar lines (the remaining lines are Y/N answers)
+OUTSIDE_CANADA_LINES = {
+    "200": "outside_canada_expenditures",   # spent on activities outside Canada
+    "230": "resources_transferred",         # resources provided to others outside Canada
+}
+
+# Schedule 5 lines: 500-560 mark the kinds of non-cash gift receipted (Y)
+NON_CASH_LINES = {
+    "500": "artwork_wine_jewellery",
+    "505": "building_materials",
+    "510": "clothing_furniture_food",
+    "515": "vehicles",
+    "520": "cultural_properties",
+    "525": "ecological_properties",
+    "530": "life_insurance",
+    "535": "medical_equipment",
+    "540": "private_securities",
+    "545": "machinery_equipment",
+    "550": "public_securities",
+    "555": "books",
+    "560": "other",
+    "565": "other_description",
+    "580": "non_cash_total",                # $ of non-cash gifts receipted
+}
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+def schedule_path(name, t3010_dir=None):
+    filename = SCHEDULE_FILES.get(name, name)
+    return os.path.join(t3010_dir or T3010_DIR, filename)
+
+
+def money(values):
+    """'$1,234.50' strings -> float (blank -> NaN)."""
+    cleaned = values.astype(str).str.replace(r"[$,\s]", "", regex=True)
+    return pd.to_numeric(cleaned.replace({"": None, "nan": None}), errors="coerce")
+
+
+def read_schedule(name, t3010_dir=None, usecols=None):
+    """One schedule as a DataFrame with renamed keys and parsed dollar columns."""
+    return read_file(schedule_path(name, t3010_dir), usecols=usecols)
+
+
+def read_file(path, usecols=None, renames=None, encoding=ENCODING):
+    """read_schedule() for any CRA extract file; renames apply after KEY_COLUMNS."""
+    df = pd.read_csv(path, dtype=str, encoding=encoding, keep_default_na=False, usecols=usecols)
+    df = df.rename(columns=KEY_COLUMNS).rename(columns=renames or {})
+    if "bn" in df:
+        df["bn"] = df["bn"].str.strip()
+    if "fiscal_period_end" in df:
+        df["fiscal_period_end"] = pd.to_datetime(df["fiscal_period_end"], errors="coerce")
+    if "seq" in df:
+        df["seq"] = pd.to_numeric(df["seq"], errors="coerce").astype("Int64")
+    for col in df.columns:
+        if col in KEY_COLUMNS.values():
+            continue
+        filled = df[col][df[col] != ""]
+        if len(filled) and filled.str.startswith("$").mean() >= MONEY_SHARE:
+            df[col] = money(df[col])
+        else:
+            df[col] = df[col].replace("", np.nan)
+    return df
+
+
+def latest_filing(df):
+    """One row per BN: the return with the latest fiscal period end."""
+    return (df.sort_values(["bn", "fiscal_period_end"], kind="stable")
+              .drop_duplicates("bn", keep="last")
+              .reset_index(drop=True))
+
+
+def read_compensation(t3010_dir=None, latest=True):
+    """Schedule 3 with named lines; counts as numbers. One row per BN when latest."""
+    df = read_schedule("compensation", t3010_dir).rename(columns=COMPENSATION_LINES)
+    for col in COMPENSATION_LINES.values():
+        if col in df and not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    return latest_filing(df) if latest else df
+
+
+def read_categories(t3010_dir=None):
+    """Charity category -> charity type, one row per category.
+
+    Columns: category_code, category, charity_type (English descriptions).
+    """
+    df = pd.read_csv(os.path.join(t3010_dir or T3010_DIR, CODE_FILES["categories"]), dtype=str,
+                     encoding=ENCODING, keep_default_na=False)
+    df = df.rename(columns={"Category Code": "category_code", "Category English Desc": "category",
+                            "Charity Type English Desc": "charity_type"})
+    df = df[["category_code", "category", "charity_type"]].apply(lambda c: c.str.strip())
+    return df.drop_duplicates("category_code").reset_index(drop=True)
+
+
+def read_countries(t3010_dir=None):
+    """Country code -> English name (Series indexed by the two-letter code)."""
+    df = pd.read_csv(os.path.join(t3010_dir or T3010_DIR, CODE_FILES["countries"]), dtype=str,
+                     encoding=ENCODING, keep_default_na=False)
+    return df.set_index(df["Country Code"].str.strip())["English Name"].str.strip().rename("country")
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+def main():
+    sys.stdout.reconfigure(encoding="utf-8")
+
+    ap = argparse.ArgumentParser(description="Inspect the CRA T3010 extract.")
+    ap.add_argument("schedule", nargs="?", choices=sorted(SCHEDULE_FILES))
+    ap.add_argument("--dir", default=T3010_DIR)
+    args = ap.parse_args()
+
+    if args.schedule:
+        df = read_schedule(args.schedule, args.dir)
+        print(f"{schedule_path(args.schedule, args.dir)}: {len(df):,} rows")
+        print(df.head(10).to_string())
+        return
+    for name in SCHEDULE_FILES:
+        path = schedule_path(name, args.dir)
+        if not os.path.exists(path):
+            print(f"  {name:28s} (missing)")
+            continue
+        df = read_schedule(name, args.dir, usecols=["BN/Registration number"])
+        print(f"  {name:28s} {len(df):>9,} rows  {df['bn'].nunique():>7,} BNs")
+
+
+if __name__ == "__main__":
+    main()
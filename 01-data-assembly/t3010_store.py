@@ -0,0 +1,332 @@
+"""
+t3010_store.py
+==============
+Multi-year store for the CRA T3010 and Qualified Donee releases.
+
+Each release directory (data/CRA-2024-T3010-Raw, data/CRA-2024-QualifiedDonee,
+next year's CRA-2025-..., ...) is ingested once into Parquet under
+LINEAGE_T3010_STORE (default <repo>/t3010_store), partitioned Hive-style
+by fiscal-period-end year and T3010 form version:
+
+  <store>/<table>/year=2024/form=27/part-2024.parquet
+  <store>/_manifest.json     releases ingested (source file hashes, row
+                             counts) and the column type of every table
+
+Ingesting a new release only writes that release's part files; older
+years are never read or rewritten. Re-ingesting a release whose source
+files are unchanged is a no-op; a corrected release replaces only its
+own part files. A filing reported by two releases (an amended return)
+is read from the newer one.
+
+Schema mapping: form versions add, drop and rename fields (see
+"# Form Versioning Details.csv"), and the Qualified Donee files use their
+own headers. Every file is conformed on the way in:
+
+  FILE_ALIASES     older file names -> table (Schedule 7 was renamed in v24)
+  COLUMN_RENAMES   per-table header renames (BN / FPE / FormID / # -> keys)
+  VERSION_RENAMES  renames that apply only up to a given form version
+  NUMERIC          columns stored as float64 even without "$" (qual files)
+
+The first release to carry a column fixes its type in the manifest; later
+releases are cast to it, and columns a version lacks read back as null.
+
+Reads push both predicates down: the year filter prunes partitions, and
+the files are sorted by BN in small row groups, so a BN filter skips
+row groups by their min/max statistics.
+
+Usage:
+  python t3010_store.py ingest ../data/CRA-2024-T3010-Raw ../data/CRA-2024-QualifiedDonee
+  python t3010_store.py info
+  python t3010_store.py scan compensation --bn 100021237RR0001 --year 2023 2024
+"""
+
+import os
+import re
+import sys
+import json
+import glob
+import time
+import fnmatch
+import hashlib
+import argparse
+from datetime import datetime
+
+# Handle Windows Unicode issues
+sys.stdout.reconfigure(encoding='utf-8')
+sys.stderr.reconfigure(encoding='utf-8')
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "00-project-management"))
+import metrics
+import t3010
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+STORE_DIR = os.environ.get("LINEAGE_T3010_STORE", os.path.join(t3010.ROOT, "t3010_store"))
+MANIFEST_NAME = "_manifest.json"
+ROW_GROUP_SIZE = 4096           # BN-sorted; small groups make BN filters selective
+
+KEYS = ["bn", "fiscal_period_end", "seq"]
+PARTITIONING = ds.partitioning(pa.schema([("year", pa.int16()), ("form", pa.string())]), flavor="hive")
+
+TABLE_FILES = dict(t3010.SCHEDULE_FILES, qualified_donees="qual*.csv")
+FILE_ALIASES = {
+    "Schedule 7_ Political Activities - Description.csv": "political_description",   # before v24
+}
+COLUMN_RENAMES = {
+    "qualified_donees": {"BN": "bn", "FPE": "fiscal_period_end", "FormID": "form_id", "#": "seq",
+                         "DoneeBN": "donee_bn", "DoneeName": "donee_name", "Associated": "associated",
+                         "City": "city", "Province": "province", "TotalGifts": "total_gifts",
+                         "GiftsinKind": "gifts_in_kind", "PoliticalActivityGift": "political_activity_gift",
+                         "PoliticalActivityAmount": "political_activity_amount"},
+}
+# table -> [(last form version the rename applies to, {old: new})]
+VERSION_RENAMES = {}
+NUMERIC = {
+    "qualified_donees": ["total_gifts", "gifts_in_kind", "political_activity_amount"],
+}
+
+
+def log(msg):
+    print(msg, flush=True)
+
+
+# ---------------------------------------------------------------------------
+# Manifest
+# ---------------------------------------------------------------------------
+def read_manifest(root=STORE_DIR):
+    path = os.path.join(root, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"releases": {}, "schema": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_manifest(manifest, root=STORE_DIR):
+    os.makedirs(root, exist_ok=True)
+    tmp = os.path.join(root, MANIFEST_NAME + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(root, MANIFEST_NAME))
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Schema mapping
+# ---------------------------------------------------------------------------
+def find_tables(source_dirs):
+    """{table: path} for every known file in the release directories."""
+    found = {}
+    for d in source_dirs:
+        for path in sorted(glob.glob(os.path.join(d, "*.csv"))):
+            name = os.path.basename(path)
+            table = FILE_ALIASES.get(name)
+            if table is None:
+                table = next((t for t, pattern in TABLE_FILES.items()
+                              if fnmatch.fnmatch(name, pattern)), None)
+            if table:
+                found[table] = path
+    return found
+
+
+def conform(df, table, registry):
+    """Renamed, typed frame; registry (column -> dtype name) is extended in place."""
+    if "form_id" in df:
+        form = pd.to_numeric(df["form_id"], errors="coerce")
+        for max_form, renames in VERSION_RENAMES.get(table, []):
+            old = form <= max_form
+            for src, dst in renames.items():
+                if src in df:
+                    if dst not in df:
+                        df[dst] = pd.Series(np.nan, index=df.index, dtype=object)
+                    df.loc[old, dst] = df.loc[old, src]
+                    df = df.drop(columns=src)
+    for col in NUMERIC.get(table, []):
+        if col in df:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    df["seq"] = df["seq"] if "seq" in df else pd.array([pd.NA] * len(df), dtype="Int64")
+
+    for col in df.columns:
+        if col not in registry and col not in KEYS and df[col].isna().all():
+            continue    # typed by the first release that fills it; reads back null until then
+        kind = "float64" if pd.api.types.is_float_dtype(df[col]) else (
+            "int64" if pd.api.types.is_integer_dtype(df[col]) else (
+                "timestamp" if pd.api.types.is_datetime64_any_dtype(df[col]) else "string"))
+        registry.setdefault(col, kind)
+        want = registry[col]
+        if want == kind:
+            continue
+        if want == "float64":
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        elif want == "string":
+            df[col] = df[col].astype("string")
+    return df
+
+
+def arrow_schema(registry):
+    types = {"float64": pa.float64(), "int64": pa.int64(), "timestamp": pa.timestamp("us"),
+             "string": pa.string()}
+    return pa.schema([(col, types[kind]) for col, kind in registry.items()])
+
+
+# ---------------------------------------------------------------------------
+# Ingest
+# ---------------------------------------------------------------------------
+def release_of(source_dirs):
+    m = re.search(r"(?<!\d)(\d{4})(?!\d)", os.path.basename(os.path.normpath(source_dirs[0])))
+    if not m:
+        raise SystemExit("Cannot infer the release year from the directory name; pass --release")
+    return m.group(1)
+
+
+def _release_files(table_dir, release):
+    return glob.glob(os.path.join(table_dir, "year=*", "form=*", f"part-{release}.parquet"))
+
+
+def ingest(source_dirs, release=None, root=STORE_DIR, force=False):
+    """Append one release. Returns {table: rows written} (empty when unchanged)."""
+    release = release or release_of(source_dirs)
+    manifest = read_manifest(root)
+    tables = find_tables(source_dirs)
+    hashes = {os.path.basename(p): _sha256(p) for p in tables.values()}
+    previous = manifest["releases"].get(release)
+    if previous and previous["sources"] == hashes and not force:
+        log(f"Release {release} unchanged since {previous['ingested_at']} -- nothing to do")
+        return {}
+
+    written = {}
+    for table, path in sorted(tables.items()):
+        with metrics.span("store.ingest", table=table) as sp:
+            encoding = "utf-8-sig" if table == "qualified_donees" else t3010.ENCODING
+            df = t3010.read_file(path, renames=COLUMN_RENAMES.get(table), encoding=encoding)
+            registry = manifest["schema"].setdefault(table, {})
+            df = conform(df, table, registry)
+            df["release"] = release
+            registry.setdefault("release", "string")
+            year = df["fiscal_period_end"].dt.year.fillna(0).astype(int)
+            form = df["form_id"].fillna("").astype(str) if "form_id" in df else pd.Series("", index=df.index)
+
+            table_dir = os.path.join(root, table)
+            for old in _release_files(table_dir, release):
+                os.remove(old)
+            schema = arrow_schema(registry)
+            for (y, f), part in df.groupby([year, form], sort=True):
+                part = part.sort_values(KEYS, kind="stable")
+                arrow = pa.Table.from_pandas(part.reindex(columns=schema.names), schema=schema,
+                                             preserve_index=False)
+                out_dir = os.path.join(table_dir, f"year={y}", f"form={f or 'unknown'}")
+                os.makedirs(out_dir, exist_ok=True)
+                pq.write_table(arrow, os.path.join(out_dir, f"part-{release}.parquet"),
+                               row_group_size=ROW_GROUP_SIZE)
+            written[table] = len(df)
+            sp.rows = len(df)
+            sp.bytes = os.path.getsize(path)
+        log(f"  {table:28s} {len(df):>9,} rows  years {sorted(set(year) - {0})}")
+
+    manifest["releases"][release] = {
+        "ingested_at": datetime.now().isoformat(timespec="seconds"),
+        "source_dirs": [os.path.abspath(d) for d in source_dirs],
+        "sources": hashes,
+        "tables": written,
+    }
+    write_manifest(manifest, root)
+    return written
+
+
+# ---------------------------------------------------------------------------
+# Read
+# ---------------------------------------------------------------------------
+def dataset(table, root=STORE_DIR):
+    registry = read_manifest(root)["schema"].get(table)
+    if registry is None:
+        raise KeyError(f"{table} is not in the store at {root}")
+    schema = arrow_schema(registry)
+    schema = schema.append(pa.field("year", pa.int16())).append(pa.field("form", pa.string()))
+    return ds.dataset(os.path.join(root, table), format="parquet", partitioning=PARTITIONING, schema=schema)
+
+
+def scan(table, bns=None, years=None, columns=None, latest=True, root=STORE_DIR):
+    """Rows of one table, filtered in the scan. latest=True keeps, per filing,
+    only the newest release's copy."""
+    data = dataset(table, root)
+    where = None
+    if years is not None:
+        where = ds.field("year").isin([int(y) for y in years])
+    if bns is not None:
+        cond = ds.field("bn").isin(sorted(set(bns)))
+        where = cond if where is None else where & cond
+    cols = None
+    if columns is not None:
+        cols = list(dict.fromkeys(list(columns) + (KEYS + ["release"] if latest else [])))
+    with metrics.span("store.scan", table=table) as sp:
+        df = data.to_table(columns=cols, filter=where).to_pandas()
+        sp.rows = len(df)
+    if latest and len(df):
+        df = (df.sort_values("release", kind="stable")
+                .drop_duplicates(KEYS, keep="last")
+                .sort_values(KEYS, kind="stable")
+                .reset_index(drop=True))
+    return df
+
+
+def history(table, bns, columns=None, root=STORE_DIR):
+    """Every year's filings for the given BNs (year-over-year analysis)."""
+    return scan(table, bns=bns, columns=columns, root=root)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+def main():
+    ap = argparse.ArgumentParser(description="Partitioned multi-year T3010 store.")
+    ap.add_argument("--root", default=STORE_DIR)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("ingest", help="append one release")
+    p.add_argument("dirs", nargs="+")
+    p.add_argument("--release")
+    p.add_argument("--force", action="store_true")
+    sub.add_parser("info", help="releases and tables in the store")
+    p = sub.add_parser("scan", help="filtered read of one table")
+    p.add_argument("table")
+    p.add_argument("--bn", nargs="*")
+    p.add_argument("--year", nargs="*", type=int)
+    p.add_argument("--columns", nargs="*")
+    args = ap.parse_args()
+
+    if args.cmd == "ingest":
+        t0 = time.time()
+        written = ingest(args.dirs, args.release, args.root, args.force)
+        if written:
+            log(f"Ingested {sum(written.values()):,} rows into {len(written)} tables "
+                f"in {time.time() - t0:.1f}s -> {args.root}")
+        metrics.export("t3010_store", log)
+    elif args.cmd == "info":
+        manifest = read_manifest(args.root)
+        for release, info in sorted(manifest["releases"].items()):
+            log(f"Release {release} (ingested {info['ingested_at']}): "
+                f"{sum(info['tables'].values()):,} rows, {len(info['tables'])} tables")
+        for table in sorted(manifest["schema"]):
+            parts = sorted(glob.glob(os.path.join(args.root, table, "year=*", "form=*", "*.parquet")))
+            years = sorted({re.search(r"year=(\d+)", p).group(1) for p in parts})
+            log(f"  {table:28s} {len(parts):>4} files  years {', '.join(years)}")
+    else:
+        t0 = time.time()
+        df = scan(args.table, bns=args.bn, years=args.year, columns=args.columns, root=args.root)
+        log(f"{len(df):,} rows in {time.time() - t0:.3f}s")
+        log(df.head(20).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,502 @@
+"""
+warehouse.py
+============
+SQL warehouse connection layer for the Phase 0 data-assembly agents.
+
+connect() returns a DB-API connection (cursor / execute / fetchall /
+description / close) for one of two backends, chosen by the
+LINEAGE_WAREHOUSE environment variable:
+
+  databricks (default)  databricks.sql.connect() -- the production path
+  duckdb                an in-process DuckDB over local files, for
+                        development, testing and benchmarking offline
+
+The local warehouse lives under LINEAGE_WAREHOUSE_DIR (default
+<repo>/warehouse):
+
+  tables/<name>.parquet | <name>.csv | <name>/*.parquet
+      served as <catalog>.<schema>.<name>, e.g.
+      dbw_unitycatalog_test.default.goa_grants_disclosure
+  volumes/<catalog>/<schema>/<volume>/...
+      the files behind /Volumes/<catalog>/<schema>/<volume>/... paths
+
+The agents' SQL is translated on the way in, so the same statements run
+on both backends:
+
+  read_files('<path>', format => 'csv', header => true)
+                                  -> read_csv('<local path>', header = true)
+  csv.`<path>`                    -> headerless all-VARCHAR read_csv with
+                                     Spark's _c0, _c1, ... column names
+  <catalog>.<schema>.<table>      -> the registered view
+  `identifier`                    -> "identifier"
+  CAST(x AS T)                    -> TRY_CAST(x AS T)  (Databricks non-ANSI
+                                     casts yield NULL on bad input)
+  DESCRIBE [TABLE] t              -> col_name, data_type, comment rows
+  SHOW TABLES [IN c.s] [LIKE 'p'] -> database, tableName, isTemporary rows
+  LIST '<path>'                   -> path, name, size, modification_time rows
+
+Either way every statement and fetch is timed into the run metrics
+(00-project-management/metrics.py) as warehouse.execute / warehouse.fetch
+spans, labelled with the statement kind and the table or path it reads.
+
+Usage:
+  python warehouse.py list
+  python warehouse.py import goa_grants_disclosure grants_export.csv
+  python warehouse.py import-synthetic ../06-validation/synthetic/1x
+  python warehouse.py sql "SELECT COUNT(*) FROM dbw_unitycatalog_test.default.goa_cra_matched"
+"""
+
+import os
+import re
+import csv
+import glob
+import fnmatch
+import sys
+import argparse
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "00-project-management"))
+import metrics
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+WAREHOUSE_BACKEND = os.environ.get("LINEAGE_WAREHOUSE", "databricks").lower()
+WAREHOUSE_DIR = os.environ.get("LINEAGE_WAREHOUSE_DIR", os.path.join(ROOT, "warehouse"))
+DEFAULT_CATALOG = "dbw_unitycatalog_test"
+DEFAULT_SCHEMA = "default"
+VOLUME_PREFIX = "/Volumes/"
+
+# Synthetic Phase 0 CSV -> warehouse table it stands in for (agent_0b TABLES)
+SYNTHETIC_TABLES = {
+    "multi_board_directors.csv": "multi_board_directors",
+    "org_clusters.csv": "org_clusters_strong",
+    "org_risk_flags.csv": "ab_org_risk_flags",
+    "org_network_edges.csv": "org_network_edges_filtered",
+    "goa_cra_matched.csv": "goa_cra_matched",
+}
+SYNTHETIC_VOLUME = f"{DEFAULT_CATALOG}/uploads/uploaded_files"
+
+# Open Government G&C export: positions the 0d agents read by _cN
+FEDERAL_POSITIONS = {0: "ref_number", 5: "recipient_business_number", 6: "recipient_legal_name",
+                     10: "recipient_province", 16: "prog_name_en", 22: "agreement_value",
+                     25: "agreement_start_date", 37: "owner_org_title"}
+FEDERAL_WIDTH = 40
+
+
+def connect(**databricks_kwargs):
+    """Warehouse connection for the configured backend.
+
+    Takes databricks.sql.connect() keyword arguments; the DuckDB backend
+    only uses catalog and schema.
+    """
+    if WAREHOUSE_BACKEND == "duckdb":
+        return TimedConnection(LocalWarehouse(WAREHOUSE_DIR,
+                                              catalog=databricks_kwargs.get("catalog") or DEFAULT_CATALOG,
+                                              schema=databricks_kwargs.get("schema") or DEFAULT_SCHEMA),
+                               "duckdb")
+    if WAREHOUSE_BACKEND != "databricks":
+        raise ValueError(f"LINEAGE_WAREHOUSE must be 'databricks' or 'duckdb', not {WAREHOUSE_BACKEND!r}")
+    from databricks import sql as dbsql
+    return TimedConnection(dbsql.connect(**databricks_kwargs), "databricks")
+
+
+# ---------------------------------------------------------------------------
+# Instrumentation
+# ---------------------------------------------------------------------------
+_SOURCE = re.compile(r"\b(?:FROM|LIST|(?:DESCRIBE|DESC)(?:\s+TABLE)?|TABLES\s+(?:IN|FROM|LIKE))\s+"
+                     r"(?:read_files\s*\(\s*)?"
+                     r"((?:'[^']*')|(?:\w+\.)?`[^`]*`|[\w.]+)", re.IGNORECASE)
+
+
+def statement_label(sql):
+    """Short metrics label: statement kind plus the first table or path it reads."""
+    words = sql.split(None, 1)
+    kind = words[0].upper() if words else ""
+    m = _SOURCE.search(sql)
+    if not m:
+        return kind
+    source = m.group(1).strip("'`")
+    if "/" in source:
+        source = "/".join(source.rstrip("/").split("/")[-2:])
+    else:
+        source = source.split(".")[-1]
+    return f"{kind} {source}"
+
+
+class TimedConnection:
+    """Backend connection whose cursors record warehouse.execute / warehouse.fetch spans."""
+
+    def __init__(self, conn, backend):
+        self._conn = conn
+        self.backend = backend
+
+    def cursor(self, *args, **kwargs):
+        return TimedCursor(self._conn.cursor(*args, **kwargs), self.backend)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._conn.close()
+
+
+class TimedCursor:
+    """Cursor proxy timing execute() and each fetch; everything else passes through."""
+
+    def __init__(self, cursor, backend):
+        self._cur = cursor
+        self.backend = backend
+        self.statement = ""
+
+    def execute(self, sql, parameters=None, *args, **kwargs):
+        self.statement = statement_label(sql)
+        with metrics.span("warehouse.execute", backend=self.backend, statement=self.statement):
+            if parameters is None:
+                self._cur.execute(sql, *args, **kwargs)
+            else:
+                self._cur.execute(sql, parameters, *args, **kwargs)
+        return self
+
+    def _fetch(self, method, *args):
+        with metrics.span("warehouse.fetch", backend=self.backend, statement=self.statement) as sp:
+            rows = getattr(self._cur, method)(*args)
+            sp.rows = len(rows)
+        return rows
+
+    def fetchall(self):
+        return self._fetch("fetchall")
+
+    def fetchmany(self, size=None):
+        return self._fetch("fetchmany", *([] if size is None else [size]))
+
+    def fetchone(self):
+        with metrics.span("warehouse.fetch", backend=self.backend, statement=self.statement) as sp:
+            row = self._cur.fetchone()
+            sp.rows = int(row is not None)
+        return row
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cur.close()
+
+
+# ---------------------------------------------------------------------------
+# SQL translation
+# ---------------------------------------------------------------------------
+_READ_FILES = re.compile(r"read_files\s*\(\s*'([^']*)'((?:\s*,\s*\w+\s*=>\s*(?:'[^']*'|[\w.]+))*)\s*\)",
+                         re.IGNORECASE)
+_OPTION = re.compile(r"(\w+)\s*=>\s*('[^']*'|[\w.]+)")
+_FORMAT_PATH = re.compile(r"\b(csv|parquet|json)\.`([^`]*)`", re.IGNORECASE)
+_BACKTICK = re.compile(r"`([^`]*)`")
+_CAST = re.compile(r"(?<![\w.])CAST\s*\(", re.IGNORECASE)
+_LIST = re.compile(r"^LIST\s+'([^']*)'$", re.IGNORECASE)
+_SHOW_TABLES = re.compile(r"^SHOW\s+TABLES(?:\s+(?:IN|FROM)\s+[\w.`]+)?(?:\s+LIKE\s+'([^']*)')?$",
+                          re.IGNORECASE)
+_DESCRIBE = re.compile(r"^(?:DESCRIBE|DESC)(?:\s+TABLE)?\s+([\w.`]+)$", re.IGNORECASE)
+
+
+def _quote(s):
+    return "'" + s.replace("'", "''") + "'"
+
+
+def _csv_width(path):
+    """Column count of the first row of the first CSV matching path."""
+    files = sorted(glob.glob(path))
+    if not files:
+        raise FileNotFoundError(path)
+    with open(files[0], newline="", encoding="utf-8-sig", errors="replace") as f:
+        return len(next(csv.reader(f), []))
+
+
+class LocalWarehouse:
+    """DuckDB-backed stand-in for a Databricks SQL warehouse connection."""
+
+    def __init__(self, root=WAREHOUSE_DIR, catalog=DEFAULT_CATALOG, schema=DEFAULT_SCHEMA):
+        import duckdb
+
+        self.root = root
+        self.catalog = catalog
+        self.schema = schema
+        self.db = duckdb.connect()
+        self.tables = {}
+        for path in sorted(glob.glob(os.path.join(root, "tables", "*"))):
+            name, ext = os.path.splitext(os.path.basename(path))
+            if os.path.isdir(path):
+                source = f"read_parquet({_quote(os.path.join(path, '*.parquet'))})"
+            elif ext == ".parquet":
+                source = f"read_parquet({_quote(path)})"
+            elif ext == ".csv":
+                source = f"read_csv({_quote(path)}, header = true)"
+            else:
+                continue
+            self.db.execute(f'CREATE VIEW "{name}" AS SELECT * FROM {source}')
+            self.tables[name] = path
+        self._qualified = re.compile(
+            rf"\b{re.escape(catalog)}\.{re.escape(schema)}\.(\w+)|`{re.escape(catalog)}`\.`{re.escape(schema)}`\.`(\w+)`")
+
+    # -- paths ----------------------------------------------------------
+    def local_path(self, path):
+        """/Volumes/... -> file under <root>/volumes; a directory becomes a glob."""
+        if path.startswith(VOLUME_PREFIX):
+            path = os.path.join(self.root, "volumes", *path[len(VOLUME_PREFIX):].split("/"))
+        if path.endswith(os.sep) or os.path.isdir(path):
+            path = os.path.join(path, "*")
+        return path
+
+    def _reader(self, path, fmt, header, typed):
+        local = self.local_path(path)
+        fmt = fmt.lower()
+        if fmt == "parquet":
+            return f"read_parquet({_quote(local)})"
+        if fmt == "json":
+            return f"read_json_auto({_quote(local)})"
+        if local.endswith("*"):
+            local += ".csv"
+        if header:
+            return f"read_csv({_quote(local)}, header = true{'' if typed else ', all_varchar = true'})"
+        names = ", ".join(f"'_c{i}'" for i in range(_csv_width(local)))
+        return (f"read_csv({_quote(local)}, header = false, all_varchar = true, "
+                f"auto_detect = true, names = [{names}])")
+
+    def translate(self, sql):
+        """Databricks SQL -> DuckDB SQL (see module docstring)."""
+        def read_files(m):
+            opts = {k.lower(): v.strip("'") for k, v in _OPTION.findall(m.group(2))}
+            header = opts.get("header", "false").lower() == "true"
+            return self._reader(m.group(1), opts.get("format", "csv"), header, typed=True)
+
+        sql = _READ_FILES.sub(read_files, sql)
+        sql = _FORMAT_PATH.sub(lambda m: self._reader(m.group(2), m.group(1), header=False, typed=False), sql)
+        sql = self._qualified.sub(lambda m: f'"{m.group(1) or m.group(2)}"', sql)
+        sql = _BACKTICK.sub(lambda m: '"' + m.group(1).replace('"', '""') + '"', sql)
+        return _CAST.sub("TRY_CAST(", sql)
+
+    # -- commands DuckDB has no equivalent for ---------------------------
+    def command(self, sql):
+        """(columns, rows) for LIST / SHOW TABLES / DESCRIBE, else None."""
+        sql = sql.strip().rstrip(";").strip()
+        m = _LIST.match(sql)
+        if m:
+            base = self.local_path(m.group(1))
+            base = base[:-1] if base.endswith("*") else base
+            if not os.path.isdir(base):
+                raise FileNotFoundError(m.group(1))
+            rows = []
+            for name in sorted(os.listdir(base)):
+                full = os.path.join(base, name)
+                is_dir = os.path.isdir(full)
+                rows.append((m.group(1).rstrip("/") + "/" + name + ("/" if is_dir else ""),
+                             name + ("/" if is_dir else ""), 0 if is_dir else os.path.getsize(full),
+                             int(os.path.getmtime(full) * 1000)))
+            return ["path", "name", "size", "modification_time"], rows
+        m = _SHOW_TABLES.match(sql)
+        if m:
+            patterns = [p.strip().lower().replace("%", "*") for p in (m.group(1) or "*").split("|")]
+            names = [t for t in self.tables if any(fnmatch.fnmatchcase(t.lower(), p) for p in patterns)]
+            return ["database", "tableName", "isTemporary"], [(self.schema, t, False) for t in names]
+        m = _DESCRIBE.match(sql)
+        if m:
+            table = self.translate(m.group(1))
+            rows = self.db.execute(f"DESCRIBE {table}").fetchall()
+            return ["col_name", "data_type", "comment"], [(r[0], r[1].lower(), None) for r in rows]
+        return None
+
+    # -- DB-API ----------------------------------------------------------
+    def cursor(self):
+        return LocalCursor(self)
+
+    def close(self):
+        self.db.close()
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class LocalCursor:
+    """DB-API cursor over LocalWarehouse (enough for the agents and pd.read_sql)."""
+
+    arraysize = 10_000
+
+    def __init__(self, warehouse):
+        self.warehouse = warehouse
+        self._cur = None
+        self._rows = None
+        self.description = None
+
+    def execute(self, sql, parameters=None):
+        self._rows, self._cur = None, None
+        result = self.warehouse.command(sql)
+        if result is not None:
+            columns, self._rows = result
+            self.description = [(c, None, None, None, None, None, None) for c in columns]
+        else:
+            self._cur = self.warehouse.db.cursor()
+            self._cur.execute(self.warehouse.translate(sql), parameters or [])
+            self.description = self._cur.description
+        return self
+
+    @property
+    def rowcount(self):
+        return len(self._rows) if self._rows is not None else -1
+
+    def fetchall(self):
+        if self._rows is not None:
+            rows, self._rows = self._rows, []
+            return rows
+        return self._cur.fetchall()
+
+    def fetchmany(self, size=None):
+        size = size or self.arraysize
+        if self._rows is not None:
+            rows, self._rows = self._rows[:size], self._rows[size:]
+            return rows
+        return self._cur.fetchmany(size)
+
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def close(self):
+        if self._cur is not None:
+            self._cur.close()
+        self._cur, self._rows = None, None
+
+
+# ---------------------------------------------------------------------------
+# Populating the local warehouse
+# ---------------------------------------------------------------------------
+def import_table(name, source, root=WAREHOUSE_DIR, sql=None):
+    """Copy a CSV / Parquet file (or the result of sql) to tables/<name>.parquet."""
+    import duckdb
+
+    os.makedirs(os.path.join(root, "tables"), exist_ok=True)
+    dest = os.path.join(root, "tables", f"{name}.parquet")
+    if sql is None:
+        reader = "read_parquet" if source.endswith(".parquet") else "read_csv"
+        sql = f"SELECT * FROM {reader}({_quote(source)})"
+    db = duckdb.connect()
+    try:
+        db.execute(f"COPY ({sql}) TO {_quote(dest + '.tmp')} (FORMAT parquet)")
+        n = db.execute(f"SELECT COUNT(*) FROM read_parquet({_quote(dest + '.tmp')})").fetchone()[0]
+    finally:
+        db.close()
+    os.replace(dest + ".tmp", dest)
+    return dest, n
+
+
+def import_synthetic(src, root=WAREHOUSE_DIR):
+    """Load 06-validation/synthetic_data.py output as the warehouse the agents expect.
+
+    grants_aggregated.csv is expanded back into one goa_grants_disclosure row
+    per payment (string columns, as in the source table) and federal_grants.csv
+    into a headed G&C export with the columns at their Open Government positions.
+    """
+    import shutil
+    import duckdb
+
+    done = {}
+    for csv_name, table in SYNTHETIC_TABLES.items():
+        done[table] = import_table(table, os.path.join(src, csv_name), root)[1]
+
+    grants = _quote(os.path.join(src, "grants_aggregated.csv"))
+    done["goa_grants_disclosure"] = import_table("goa_grants_disclosure", None, root, sql=f"""
+        SELECT ministry AS Ministry, ministry AS BUName, recipient AS Recipient,
+               'Synthetic program' AS Program,
+               printf('%.3f', total_amount / n_payments) AS Amount, 'N' AS Lottery,
+               CAST(CAST(earliest_payment AS DATE)
+                    + CAST(floor(date_diff('day', CAST(earliest_payment AS DATE), CAST(latest_payment AS DATE))
+                                 * i / greatest(n_payments - 1, 1)) AS INTEGER) AS VARCHAR) AS PaymentDate,
+               CAST(fiscal_year AS VARCHAR) AS FiscalYear,
+               CAST(fiscal_year AS VARCHAR) || ' - ' || CAST(fiscal_year + 1 AS VARCHAR) AS DisplayFiscalYear,
+               CAST(fiscal_year AS VARCHAR) AS Fiscal_Year, NULL AS _rescued_data
+        FROM read_csv({grants}, header = true),
+             LATERAL (SELECT unnest(range(n_payments)) AS i)
+    """)[1]
+
+    ministry_dir = os.path.join(root, "volumes", *SYNTHETIC_VOLUME.split("/"), "Ministry Data")
+    os.makedirs(ministry_dir, exist_ok=True)
+    for name in ("org_entities.csv", "transform_events.csv"):
+        shutil.copyfile(os.path.join(src, "lineage", name), os.path.join(ministry_dir, name))
+
+    goc_dir = os.path.join(root, "volumes", *SYNTHETIC_VOLUME.split("/"), "GoC Grants")
+    os.makedirs(goc_dir, exist_ok=True)
+    columns = [FEDERAL_POSITIONS.get(i, f"field_{i}") for i in range(FEDERAL_WIDTH)]
+    source = {"recipient_business_number": "BN", "recipient_legal_name": "org_name",
+              "recipient_province": "province", "prog_name_en": "program",
+              "agreement_value": "amount", "agreement_start_date": "agreement_start_date",
+              "owner_org_title": "federal_department"}
+    select = ", ".join(
+        "'GC-' || CAST(row_number() OVER () AS VARCHAR) AS ref_number" if c == "ref_number"
+        else f'"{source[c]}" AS "{c}"' if c in source else f'NULL AS "{c}"' for c in columns)
+    db = duckdb.connect()
+    try:
+        db.execute(f"COPY (SELECT {select} FROM read_csv({_quote(os.path.join(src, 'federal_grants.csv'))}, "
+                   f"header = true)) TO {_quote(os.path.join(goc_dir, 'grants.csv'))} (HEADER, DELIMITER ',')")
+    finally:
+        db.close()
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local DuckDB stand-in for the Databricks SQL warehouse")
+    parser.add_argument("--root", default=WAREHOUSE_DIR, help="local warehouse directory")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list", help="tables and volume files")
+    p = sub.add_parser("import", help="load a CSV/Parquet file as a table")
+    p.add_argument("name")
+    p.add_argument("source")
+    p = sub.add_parser("import-synthetic", help="load synthetic_data.py output")
+    p.add_argument("source")
+    p = sub.add_parser("sql", help="run Databricks SQL against the local warehouse")
+    p.add_argument("statement")
+    p.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.cmd == "import":
+        dest, n = import_table(args.name, args.source, args.root)
+        print(f"{args.name}: {n:,} rows -> {dest}")
+    elif args.cmd == "import-synthetic":
+        for table, n in import_synthetic(args.source, args.root).items():
+            print(f"  {table:<32} {n:>12,}")
+        print(f"Volumes written under {os.path.join(args.root, 'volumes')}")
+    elif args.cmd == "list":
+        wh = LocalWarehouse(args.root)
+        print(f"Local warehouse: {args.root}")
+        for name, path in wh.tables.items():
+            n = wh.db.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
+            print(f"  {wh.catalog}.{wh.schema}.{name:<32} {n:>12,}  ({os.path.basename(path)})")
+        vol = os.path.join(args.root, "volumes")
+        for dirpath, _, files in sorted(os.walk(vol)):
+            for f in sorted(files):
+                full = os.path.join(dirpath, f)
+                print(f"  {VOLUME_PREFIX}{os.path.relpath(full, vol).replace(os.sep, '/')}"
+                      f"  ({os.path.getsize(full):,} bytes, "
+                      f"{datetime.fromtimestamp(os.path.getmtime(full)):%Y-%m-%d %H:%M})")
+    else:
+        wh = LocalWarehouse(args.root)
+        print(wh.translate(args.statement).strip())
+        cur = wh.cursor().execute(args.statement)
+        cols = [d[0] for d in cur.description]
+        print(" | ".join(cols))
+        for row in cur.fetchmany(args.limit):
+            print(" | ".join("" if v is None else str(v) for v in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+"""
+Agent 1 — Compensation Index onto Organization Nodes
+Operation Lineage Audit
+
+Writes compensation_index.csv (01-data-assembly/compensation.py) onto the
+Organization nodes as comp_* properties, in UNWIND batches:
+
+  comp_bands            top-10 position counts per Schedule 3 pay band
+  comp_total            line 390 total compensation
+  comp_top10_share      estimated share of it paid to the top-10 positions
+  comp_senior_share     share of top-10 positions paid $120K+
+  comp_avg_ft_pay       average full-time compensation
+  comp_pct_of_exp       compensation / expenditures
+  comp_*_pctile         percentile ranks within the peer group
+  comp_peer_group       category / charity type / All
+  comp_outlier          true at or above the outlier percentile
+
+comp_outlier and the percentile ranks are indexed, so governance queries
+can filter on them in the MATCH rather than joining external tables.
+Only charities that filed Schedule 3 are written; SET is idempotent.
+Written nodes are stamped (comp_refreshed), and an Organization that
+has comp_* properties from an earlier run but is no longer a filer has
+them all removed, so no stale pay figures stay queryable.
+"""
+
+import sys, os, time
+from datetime import datetime
+
+sys.stdout.reconfigure(encoding='utf-8')
+sys.stderr.reconfigure(encoding='utf-8')
+
+from graph_client import GraphClient
+from query_cache import bump_graph_version
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '00-project-management'))
+from artifact_store import ArtifactStore
+import metrics
+
+# ── Configuration ────────────────────────────────────────────────────
+NEO4J_URI      = "<YOUR_NEO4J_AURA_URI>"
+NEO4J_USER     = "neo4j"
+NEO4J_PASSWORD = "<YOUR_NEO4J_AURA_PASSWORD>"
+BATCH_SIZE     = 1000
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR   = os.environ.get('LINEAGE_DATA_DIR', os.path.join(SCRIPT_DIR, '..', '01-data-assembly'))
+INDEX_CSV  = "compensation_index.csv"
+
+BAND_COLUMNS = ['band_lt40k', 'band_40k', 'band_80k', 'band_120k', 'band_160k',
+                'band_200k', 'band_250k', 'band_300k', 'band_350k']   # compensation.BAND_COLUMNS
+PROPERTIES = {   # csv column -> Organization property (floats)
+    'total_compensation':     'comp_total',
+    'top10_share':            'comp_top10_share',
+    'senior_share':           'comp_senior_share',
+    'avg_ft_pay':             'comp_avg_ft_pay',
+    'part_time_share':        'comp_part_time_share',
+    'comp_pct_of_exp':        'comp_pct_of_exp',
+    'avg_ft_pay_pctile':      'comp_avg_ft_pay_pctile',
+    'comp_pct_of_exp_pctile': 'comp_pct_of_exp_pctile',
+}
+COMP_PROPERTIES = list(PROPERTIES.values()) + [
+    'comp_bands', 'comp_n_top10', 'comp_fiscal_period_end', 'comp_peer_group', 'comp_outlier', 'comp_refreshed']
+
+SCHEMA = [
+    "CREATE INDEX org_comp_outlier IF NOT EXISTS FOR (o:Organization) ON (o.comp_outlier)",
+    "CREATE INDEX org_comp_pay_pctile IF NOT EXISTS FOR (o:Organization) ON (o.comp_avg_ft_pay_pctile)",
+    "CREATE INDEX org_comp_exp_pctile IF NOT EXISTS FOR (o:Organization) ON (o.comp_pct_of_exp_pctile)",
+]
+
+# ── Helpers ──────────────────────────────────────────────────────────
+
+def log(msg):
+    ts = datetime.now().strftime("%H:%M:%S")
+    print(f"[{ts}] {msg}", flush=True)
+
+def safe_float(val):
+    if val is None or val == '' or val == 'NA' or val == 'nan':
+        return None
+    try:
+        return float(val)
+    except (ValueError, TypeError):
+        return None
+
+def comp_params(rows, stamp):
+    """One SET param per Schedule 3 filer."""
+    params = []
+    for row in rows:
+        if row.get('filed_schedule3') != '1':
+            continue
+        p = {prop: safe_float(row.get(col)) for col, prop in PROPERTIES.items()}
+        p['bn'] = row['bn'].strip()
+        p['comp_bands'] = [int(float(row.get(c) or 0)) for c in BAND_COLUMNS]
+        p['comp_n_top10'] = int(float(row.get('n_top10') or 0))
+        p['comp_fiscal_period_end'] = row.get('fiscal_period_end') or None
+        p['comp_peer_group'] = row.get('peer_group') or None
+        p['comp_outlier'] = row.get('comp_outlier') == '1'
+        p['comp_refreshed'] = stamp
+        params.append(p)
+    return params
+
+# ── Main ─────────────────────────────────────────────────────────────
+
+def main():
+    t_start = time.time()
+    log("=" * 72)
+    log("COMPENSATION INDEX -> ORGANIZATION NODES")
+    log("=" * 72)
+
+    stamp = datetime.now().isoformat(timespec='seconds')
+    with metrics.span('params', step='compensation') as sp:
+        rows = ArtifactStore().read_rows(INDEX_CSV, os.path.join(DATA_DIR, INDEX_CSV))
+        params = comp_params(rows, stamp)
+        sp.rows = len(params)
+    n_outliers = sum(p['comp_outlier'] for p in params)
+    log(f"  {INDEX_CSV}: {len(rows)} orgs, {len(params)} filed Schedule 3, {n_outliers} outliers")
+
+    graph = GraphClient(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+    for stmt in SCHEMA:
+        try:
+            graph.write(stmt)
+            log(f"  OK: {stmt[:60]}")
+        except Exception as e:
+            log(f"  WARN: {stmt[:60]}... => {e}")
+
+    n = graph.write_batches("""
+        UNWIND $items AS p
+        MATCH (o:Organization {bn: p.bn})
+        SET o += p
+    """, params, BATCH_SIZE, label='SET Organization comp_*',
+        progress=lambda done: log(f"    ... {done}/{len(params)} orgs") if done % 5000 < BATCH_SIZE else None)
+    # SET += with null values removes the properties
+    stale = graph.write("""
+        MATCH (o:Organization)
+        WHERE o.comp_bands IS NOT NULL AND (o.comp_refreshed IS NULL OR o.comp_refreshed <> $stamp)
+        SET o += $cleared
+    """, {'stamp': stamp, 'cleared': dict.fromkeys(COMP_PROPERTIES)})
+    log(f"  Sent {n} orgs in {time.time() - t_start:.1f}s "
+        f"({stale.get('properties_set', 0)} stale comp_* properties cleared)")
+    bump_graph_version(graph, 'agent_1_compensation')
+
+    written = graph.read_value("MATCH (o:Organization) WHERE o.comp_total IS NOT NULL RETURN count(o) AS c")
+    outliers = graph.read_value("MATCH (o:Organization) WHERE o.comp_outlier = true RETURN count(o) AS c")
+    log(f"  VALIDATE: {written} Organization nodes with comp_* ({outliers} outliers)")
+
+    log("")
+    log("-- NEO4J CALL TIMINGS --")
+    graph.report(log)
+    graph.close()
+
+if __name__ == '__main__':
+    main()
+    metrics.export('agent_1_compensation', log)
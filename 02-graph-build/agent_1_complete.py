@@ -5,21 +5,26 @@ Steps 1-9 completed. Step 10 (LOCATED_IN) was interrupted at ~8000/9145.
 Since all operations use MERGE, this is fully idempotent.
 """
 
-import sys, os, csv, time
+import sys, os, time
 from datetime import datetime
 
 sys.stdout.reconfigure(encoding='utf-8')
 sys.stderr.reconfigure(encoding='utf-8')
 
-from neo4j import GraphDatabase
+from graph_client import GraphClient
+from query_cache import bump_graph_version
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '00-project-management'))
+from artifact_store import ArtifactStore
+import metrics
 
 NEO4J_URI      = "<YOUR_NEO4J_AURA_URI>"
 NEO4J_USER     = "neo4j"
 NEO4J_PASSWORD = "<YOUR_NEO4J_AURA_PASSWORD>"
 BATCH_SIZE     = 500
 
-DATA_DIR   = r"C:\Users\alina\OneDrive\Desktop\lineage-audit\01-data-assembly"
-OUTPUT_DIR = r"C:\Users\alina\OneDrive\Desktop\lineage-audit\02-graph-build"
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR   = os.environ.get('LINEAGE_DATA_DIR', os.path.join(SCRIPT_DIR, '..', '01-data-assembly'))
+OUTPUT_DIR = SCRIPT_DIR
 LOG_PATH   = os.path.join(OUTPUT_DIR, "ingestion_log.md")
 
 LOG_LINES = []
@@ -49,13 +54,9 @@ def append_to_log():
         f.write("```\n")
 
 def read_csv(filename):
-    path = os.path.join(DATA_DIR, filename)
-    try:
-        with open(path, 'r', encoding='utf-8-sig') as f:
-            return list(csv.DictReader(f))
-    except UnicodeDecodeError:
-        with open(path, 'r', encoding='cp1252') as f:
-            return list(csv.DictReader(f))
+    """Latest stored version of a Phase 0 CSV, parsed once per content hash
+    (BOM-safe utf-8, cp1252 fallback). See 00-project-management/artifact_store.py."""
+    return ArtifactStore().read_rows(filename, os.path.join(DATA_DIR, filename))
 
 def safe_int(val):
     if val is None or val == '' or val == 'NA':
@@ -75,14 +76,13 @@ def main():
     log("AGENT 1A/1B COMPLETION -- Step 10 + Final Validation")
     log("=" * 72)
 
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+    graph = GraphClient(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
     log("Connected to Neo4j Aura")
 
     # Quick status check
-    with driver.session() as s:
-        for rel in ['SITS_ON', 'RECEIVED_GRANT', 'FLAGGED_AS', 'LOCATED_IN', 'SHARED_DIRECTORS']:
-            cnt = s.run(f"MATCH ()-[r:{rel}]->() RETURN count(r) AS c").single()['c']
-            log(f"  {rel}: {cnt}")
+    for rel in ['SITS_ON', 'RECEIVED_GRANT', 'FLAGGED_AS', 'LOCATED_IN', 'SHARED_DIRECTORS']:
+        cnt = graph.read_value(f"MATCH ()-[r:{rel}]->() RETURN count(r) AS c")
+        log(f"  {rel}: {cnt}")
 
     # Load org_risk_flags for step 10
     org_risk_data = read_csv("org_risk_flags.csv")
@@ -104,134 +104,138 @@ def main():
 
     n_located = 0
     for batch in batched(located_params, BATCH_SIZE):
-        with driver.session() as s:
-            s.run("""
-                UNWIND $items AS p
-                MATCH (o:Organization {bn: p.bn})
-                MERGE (r:Region {name: p.city})
-                ON CREATE SET r.kgl = '\u16AA', r.kgl_handle = 'geography'
-                MERGE (o)-[:LOCATED_IN]->(r)
-            """, items=batch)
+        graph.write("""
+            UNWIND $items AS p
+            MATCH (o:Organization {bn: p.bn})
+            MERGE (r:Region {name: p.city})
+            ON CREATE SET r.kgl = '\u16AA', r.kgl_handle = 'geography'
+            MERGE (o)-[:LOCATED_IN]->(r)
+        """, {'items': batch})
         n_located += len(batch)
         if n_located % 2000 == 0:
             log(f"    ... {n_located} LOCATED_IN edges processed")
     log(f"  Merged {n_located} LOCATED_IN edges in {time.time()-t0:.1f}s")
 
-    with driver.session() as s:
-        cnt = s.run("MATCH (:Organization)-[r:LOCATED_IN]->(:Region) RETURN count(r) AS c").single()['c']
-        log(f"  VALIDATE: {cnt} LOCATED_IN relationships in graph")
+    cnt = graph.read_value("MATCH (:Organization)-[r:LOCATED_IN]->(:Region) RETURN count(r) AS c")
+    log(f"  VALIDATE: {cnt} LOCATED_IN relationships in graph")
+
+    # Writes done -- invalidate cached query results
+    bump_graph_version(graph, 'agent_1_complete')
 
     # ── FINAL VALIDATION ─────────────────────────────────────────────
     log("")
     log("-- FINAL VALIDATION (targeted counts only) --")
-    with driver.session() as s:
-        log("  === Lineage Audit Node Counts ===")
-        for label, where in [
-            ('Organization', 'WHERE n.bn IS NOT NULL'),
-            ('Director', ''),
-            ('OrgEntity', ''),
-            ('FiscalYear', ''),
-            ('Region', ''),
-            ('RiskFlag', 'WHERE n.flag_type IS NOT NULL'),
-        ]:
-            cnt = s.run(f"MATCH (n:{label}) {where} RETURN count(n) AS c").single()['c']
-            log(f"    {label}: {cnt}")
-
-        log("  === Lineage Audit Relationship Counts ===")
-        for rel in ['RECEIVED_GRANT', 'SITS_ON', 'FLAGGED_AS', 'LOCATED_IN', 'SHARED_DIRECTORS']:
-            cnt = s.run(f"MATCH ()-[r:{rel}]->() RETURN count(r) AS c").single()['c']
-            log(f"    {rel}: {cnt}")
-
-        # Also count the existing lineage relationships
-        log("  === Existing Lineage Relationships ===")
-        for rel in ['SOURCE_OF', 'TARGET_OF', 'PARENT_OF', 'EVIDENCED_BY']:
-            cnt = s.run(f"MATCH ()-[r:{rel}]->() RETURN count(r) AS c").single()['c']
-            log(f"    {rel}: {cnt}")
-
-        # Spot checks
-        log("")
-        log("-- SPOT CHECKS --")
-
-        top_flags = s.run("""
-            MATCH (o:Organization)-[:FLAGGED_AS]->(f:RiskFlag)
-            WHERE o.bn IS NOT NULL
-            RETURN o.name AS name, o.bn AS bn, count(f) AS n_flags
-            ORDER BY n_flags DESC LIMIT 5
-        """).data()
-        log("  Top 5 orgs by number of risk flags:")
-        for r in top_flags:
-            log(f"    {r['name']} ({r['bn']}): {r['n_flags']} flags")
-
-        top_dirs = s.run("""
-            MATCH (d:Director)-[:SITS_ON]->(o:Organization)
-            RETURN d.normalized_name AS name, count(o) AS boards
-            ORDER BY boards DESC LIMIT 5
-        """).data()
-        log("  Top 5 directors by board seats (in graph):")
-        for r in top_dirs:
-            log(f"    {r['name']}: {r['boards']} boards")
-
-        grant_sample = s.run("""
-            MATCH (o:Organization)-[g:RECEIVED_GRANT]->(m:OrgEntity)
-            RETURN o.name AS org, m.name AS ministry, g.amount AS amount,
-                   g.fiscal_year AS fy, g.political_era AS era
-            ORDER BY g.amount DESC LIMIT 5
-        """).data()
-        log("  Top 5 grants by amount:")
-        for r in grant_sample:
-            amt = r['amount'] if r['amount'] else 0
-            log(f"    {r['org']} <- {r['ministry']}: ${amt:,.0f} ({r['fy']} {r['era']})")
-
-        ministry_conn = s.run("""
-            MATCH (m:OrgEntity)<-[g:RECEIVED_GRANT]-(o:Organization)
-            RETURN m.name AS ministry, count(DISTINCT o) AS n_orgs,
-                   count(g) AS n_grants, sum(g.amount) AS total_amount
-            ORDER BY n_orgs DESC LIMIT 5
-        """).data()
-        log("  Top 5 ministries by connected organizations:")
-        for r in ministry_conn:
-            amt = r['total_amount'] if r['total_amount'] else 0
-            log(f"    {r['ministry']}: {r['n_orgs']} orgs, {r['n_grants']} grants, ${amt:,.0f}")
-
-        cluster_info = s.run("""
-            MATCH (o:Organization)
-            WHERE o.cluster_id IS NOT NULL
-            RETURN count(o) AS n_clustered,
-                   count(DISTINCT o.cluster_id) AS n_clusters
-        """).data()
-        if cluster_info:
-            log(f"  Clustered orgs: {cluster_info[0]['n_clustered']} in {cluster_info[0]['n_clusters']} clusters")
-
-        cross = s.run("""
-            MATCH (o:Organization)-[:RECEIVED_GRANT]->(m:OrgEntity)
-            WHERE o.cluster_id IS NOT NULL
-            RETURN count(DISTINCT o) AS n_clustered_grantees,
-                   count(DISTINCT m) AS n_ministries
-        """).data()
-        if cross:
-            log(f"  Clustered orgs that received grants: {cross[0]['n_clustered_grantees']} from {cross[0]['n_ministries']} ministries")
-
-        # Cross-check: flagged orgs that also received grants
-        flagged_grantees = s.run("""
-            MATCH (o:Organization)-[:FLAGGED_AS]->(f:RiskFlag)
-            WHERE EXISTS { (o)-[:RECEIVED_GRANT]->(:OrgEntity) }
-            RETURN count(DISTINCT o) AS n_flagged_grantees,
-                   count(DISTINCT f) AS n_flag_types
-        """).data()
-        if flagged_grantees:
-            log(f"  Flagged orgs that received grants: {flagged_grantees[0]['n_flagged_grantees']} across {flagged_grantees[0]['n_flag_types']} flag types")
-
-        # Region distribution
-        region_dist = s.run("""
-            MATCH (r:Region)<-[:LOCATED_IN]-(o:Organization)
-            RETURN r.name AS region, count(o) AS n_orgs
-            ORDER BY n_orgs DESC LIMIT 10
-        """).data()
-        log("  Top 10 regions by organization count:")
-        for r in region_dist:
-            log(f"    {r['region']}: {r['n_orgs']} orgs")
-
-    driver.close()
+    log("  === Lineage Audit Node Counts ===")
+    for label, where in [
+        ('Organization', 'WHERE n.bn IS NOT NULL'),
+        ('Director', ''),
+        ('OrgEntity', ''),
+        ('FiscalYear', ''),
+        ('Region', ''),
+        ('RiskFlag', 'WHERE n.flag_type IS NOT NULL'),
+    ]:
+        cnt = graph.read_value(f"MATCH (n:{label}) {where} RETURN count(n) AS c")
+        log(f"    {label}: {cnt}")
+
+    log("  === Lineage Audit Relationship Counts ===")
+    for rel in ['RECEIVED_GRANT', 'SITS_ON', 'FLAGGED_AS', 'LOCATED_IN', 'SHARED_DIRECTORS']:
+        cnt = graph.read_value(f"MATCH ()-[r:{rel}]->() RETURN count(r) AS c")
+        log(f"    {rel}: {cnt}")
+
+    # Also count the existing lineage relationships
+    log("  === Existing Lineage Relationships ===")
+    for rel in ['SOURCE_OF', 'TARGET_OF', 'PARENT_OF', 'EVIDENCED_BY']:
+        cnt = graph.read_value(f"MATCH ()-[r:{rel}]->() RETURN count(r) AS c")
+        log(f"    {rel}: {cnt}")
+
+    # Spot checks
+    log("")
+    log("-- SPOT CHECKS --")
+
+    top_flags = graph.read("""
+        MATCH (o:Organization)-[:FLAGGED_AS]->(f:RiskFlag)
+        WHERE o.bn IS NOT NULL
+        RETURN o.name AS name, o.bn AS bn, count(f) AS n_flags
+        ORDER BY n_flags DESC LIMIT 5
+    """)
+    log("  Top 5 orgs by number of risk flags:")
+    for r in top_flags:
+        log(f"    {r['name']} ({r['bn']}): {r['n_flags']} flags")
+
+    top_dirs = graph.read("""
+        MATCH (d:Director)-[:SITS_ON]->(o:Organization)
+        RETURN d.normalized_name AS name, count(o) AS boards
+        ORDER BY boards DESC LIMIT 5
+    """)
+    log("  Top 5 directors by board seats (in graph):")
+    for r in top_dirs:
+        log(f"    {r['name']}: {r['boards']} boards")
+
+    grant_sample = graph.read("""
+        MATCH (o:Organization)-[g:RECEIVED_GRANT]->(m:OrgEntity)
+        RETURN o.name AS org, m.name AS ministry, g.amount AS amount,
+               g.fiscal_year AS fy, g.political_era AS era
+        ORDER BY g.amount DESC LIMIT 5
+    """)
+    log("  Top 5 grants by amount:")
+    for r in grant_sample:
+        amt = r['amount'] if r['amount'] else 0
+        log(f"    {r['org']} <- {r['ministry']}: ${amt:,.0f} ({r['fy']} {r['era']})")
+
+    ministry_conn = graph.read("""
+        MATCH (m:OrgEntity)<-[g:RECEIVED_GRANT]-(o:Organization)
+        RETURN m.name AS ministry, count(DISTINCT o) AS n_orgs,
+               count(g) AS n_grants, sum(g.amount) AS total_amount
+        ORDER BY n_orgs DESC LIMIT 5
+    """)
+    log("  Top 5 ministries by connected organizations:")
+    for r in ministry_conn:
+        amt = r['total_amount'] if r['total_amount'] else 0
+        log(f"    {r['ministry']}: {r['n_orgs']} orgs, {r['n_grants']} grants, ${amt:,.0f}")
+
+    cluster_info = graph.read("""
+        MATCH (o:Organization)
+        WHERE o.cluster_id IS NOT NULL
+        RETURN count(o) AS n_clustered,
+               count(DISTINCT o.cluster_id) AS n_clusters
+    """)
+    if cluster_info:
+        log(f"  Clustered orgs: {cluster_info[0]['n_clustered']} in {cluster_info[0]['n_clusters']} clusters")
+
+    cross = graph.read("""
+        MATCH (o:Organization)-[:RECEIVED_GRANT]->(m:OrgEntity)
+        WHERE o.cluster_id IS NOT NULL
+        RETURN count(DISTINCT o) AS n_clustered_grantees,
+               count(DISTINCT m) AS n_ministries
+    """)
+    if cross:
+        log(f"  Clustered orgs that received grants: {cross[0]['n_clustered_grantees']} from {cross[0]['n_ministries']} ministries")
+
+    # Cross-check: flagged orgs that also received grants
+    flagged_grantees = graph.read("""
+        MATCH (o:Organization)-[:FLAGGED_AS]->(f:RiskFlag)
+        WHERE EXISTS { (o)-[:RECEIVED_GRANT]->(:OrgEntity) }
+        RETURN count(DISTINCT o) AS n_flagged_grantees,
+               count(DISTINCT f) AS n_flag_types
+    """)
+    if flagged_grantees:
+        log(f"  Flagged orgs that received grants: {flagged_grantees[0]['n_flagged_grantees']} across {flagged_grantees[0]['n_flag_types']} flag types")
+
+    # Region distribution
+    region_dist = graph.read("""
+        MATCH (r:Region)<-[:LOCATED_IN]-(o:Organization)
+        RETURN r.name AS region, count(o) AS n_orgs
+        ORDER BY n_orgs DESC LIMIT 10
+    """)
+    log("  Top 10 regions by organization count:")
+    for r in region_dist:
+        log(f"    {r['region']}: {r['n_orgs']} orgs")
+
+    log("")
+    log("-- NEO4J CALL TIMINGS --")
+    graph.report(log)
+    graph.close()
+    metrics.export('agent_1_complete', log)
 
     elapsed = time.time() - t_start
     log("")
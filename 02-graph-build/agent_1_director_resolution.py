@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+"""
+Agent 1 — Resolved Directors into Neo4j
+Operation Lineage Audit
+
+Writes the output of 01-data-assembly/director_resolution.py back to the
+graph. Director nodes stay keyed by normalized_name (one per spelling);
+each resolved person becomes a ResolvedDirector {director_id} on top:
+
+  (r:ResolvedDirector)-[:RESOLVES]->(d:Director)       one per spelling
+  (r:ResolvedDirector)-[:SERVES_ON]->(o:Organization)  one per board
+  (d:Director)-[s:SITS_ON]->(o)                        s.director_id set
+
+so a name shared by two people has SITS_ON edges with two director_ids,
+and one person spelled two ways has a single ResolvedDirector. Only
+Director and Organization nodes already in the graph get edges. Every
+write is a batched UNWIND. Nodes and edges are stamped with the run:
+ResolvedDirector nodes missing from it (ids retired by a merge) are
+deleted, and so are RESOLVES and SERVES_ON edges it did not write (a
+spelling or board that moved to another person when a name split).
+Board counts per person:
+
+  MATCH (r:ResolvedDirector)-[:SERVES_ON]->(o:Organization)
+  RETURN r.name, count(o) AS boards ORDER BY boards DESC
+"""
+
+import sys, os, time
+from datetime import datetime
+
+sys.stdout.reconfigure(encoding='utf-8')
+sys.stderr.reconfigure(encoding='utf-8')
+
+from graph_client import GraphClient
+from query_cache import bump_graph_version
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '00-project-management'))
+from artifact_store import ArtifactStore
+import metrics
+
+# ── Configuration ────────────────────────────────────────────────────
+NEO4J_URI      = "<YOUR_NEO4J_AURA_URI>"
+NEO4J_USER     = "neo4j"
+NEO4J_PASSWORD = "<YOUR_NEO4J_AURA_PASSWORD>"
+BATCH_SIZE     = 1000
+
+SCRIPT_DIR   = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR     = os.environ.get('LINEAGE_DATA_DIR', os.path.join(SCRIPT_DIR, '..', '01-data-assembly'))
+RECORDS_CSV  = "director_resolution.csv"
+ENTITIES_CSV = "director_entities.csv"
+
+SCHEMA = [
+    "CREATE CONSTRAINT resolved_director_id IF NOT EXISTS FOR (r:ResolvedDirector) REQUIRE r.director_id IS UNIQUE",
+    "CREATE INDEX sits_on_director_id IF NOT EXISTS FOR ()-[s:SITS_ON]-() ON (s.director_id)",
+]
+
+# ── Helpers ──────────────────────────────────────────────────────────
+
+def log(msg):
+    ts = datetime.now().strftime("%H:%M:%S")
+    print(f"[{ts}] {msg}", flush=True)
+
+def entity_params(rows, stamp):
+    return [{
+        'id':        row['director_id'],
+        'name':      row['name'],
+        'names':     row['names'].split(';'),
+        'n_boards':  int(row['n_boards']),
+        'n_names':   int(row['n_names']),
+        'split':     row['split'] == 'True',
+        'stamp':     stamp,
+    } for row in rows]
+
+def record_params(rows, stamp):
+    """(director_id, director_name, bn) per record, and distinct (id, spelling) pairs."""
+    records, spellings = [], set()
+    for row in rows:
+        bn = row['bn'].strip()
+        if not bn:
+            continue
+        records.append({'id': row['director_id'], 'name': row['director_name'], 'bn': bn, 'stamp': stamp})
+        spellings.add((row['director_id'], row['director_name']))
+    return records, [{'id': i, 'name': n, 'stamp': stamp} for i, n in sorted(spellings)]
+
+# ── Main ─────────────────────────────────────────────────────────────
+
+def main():
+    t_start = time.time()
+    log("=" * 72)
+    log("RESOLVED DIRECTORS -> ResolvedDirector NODES")
+    log("=" * 72)
+
+    store = ArtifactStore()
+    ent_rows = store.read_rows(ENTITIES_CSV, os.path.join(DATA_DIR, ENTITIES_CSV))
+    rec_rows = store.read_rows(RECORDS_CSV, os.path.join(DATA_DIR, RECORDS_CSV))
+    log(f"  {ENTITIES_CSV}: {len(ent_rows)} persons, {RECORDS_CSV}: {len(rec_rows)} records")
+
+    graph = GraphClient(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+    for stmt in SCHEMA:
+        try:
+            graph.write(stmt)
+            log(f"  OK: {stmt[:60]}")
+        except Exception as e:
+            log(f"  WARN: {stmt[:60]}... => {e}")
+
+    stamp = datetime.now().isoformat(timespec='seconds')
+    with metrics.span('params', step='ResolvedDirector') as sp:
+        people = entity_params(ent_rows, stamp)
+        records, spellings = record_params(rec_rows, stamp)
+        sp.rows = len(people) + len(records)
+
+    graph.write_batches("""
+        UNWIND $items AS p
+        MERGE (r:ResolvedDirector {director_id: p.id})
+        SET r.name      = p.name,
+            r.names     = p.names,
+            r.n_boards  = p.n_boards,
+            r.n_names   = p.n_names,
+            r.split     = p.split,
+            r.refreshed = p.stamp
+    """, people, BATCH_SIZE, label='MERGE ResolvedDirector')
+    graph.write_batches("""
+        UNWIND $items AS p
+        MATCH (r:ResolvedDirector {director_id: p.id})
+        MATCH (d:Director {normalized_name: p.name})
+        MERGE (r)-[e:RESOLVES]->(d)
+        SET e.refreshed = p.stamp
+    """, spellings, BATCH_SIZE, label='MERGE RESOLVES')
+    graph.write_batches("""
+        UNWIND $items AS p
+        MATCH (r:ResolvedDirector {director_id: p.id})
+        MATCH (o:Organization {bn: p.bn})
+        MERGE (r)-[e:SERVES_ON]->(o)
+        SET e.refreshed = p.stamp
+        WITH r, o, p
+        MATCH (d:Director {normalized_name: p.name})-[s:SITS_ON]->(o)
+        SET s.director_id = p.id
+    """, records, BATCH_SIZE, label='MERGE SERVES_ON + SET SITS_ON.director_id')
+
+    stale = graph.write("""
+        MATCH (r:ResolvedDirector) WHERE r.refreshed <> $stamp
+        DETACH DELETE r
+    """, {'stamp': stamp})
+    stale_edges = graph.write("""
+        MATCH (:ResolvedDirector)-[e:RESOLVES|SERVES_ON]->()
+        WHERE e.refreshed IS NULL OR e.refreshed <> $stamp
+        DELETE e
+    """, {'stamp': stamp})
+    log(f"  Loaded in {time.time() - t_start:.1f}s "
+        f"({stale.get('nodes_deleted', 0)} retired ResolvedDirector nodes, "
+        f"{stale_edges.get('relationships_deleted', 0)} stale RESOLVES / SERVES_ON edges removed)")
+    bump_graph_version(graph, 'agent_1_director_resolution')
+
+    n_res = graph.read_value("MATCH (r:ResolvedDirector) RETURN count(r) AS c")
+    n_dir = graph.read_value("MATCH (d:Director) RETURN count(d) AS c")
+    n_shared = graph.read_value("""
+        MATCH (d:Director)<-[:RESOLVES]-(r:ResolvedDirector)
+        WITH d, count(r) AS people WHERE people > 1 RETURN count(d) AS c
+    """)
+    log(f"  VALIDATE: {n_res} ResolvedDirector nodes over {n_dir} Director nodes, "
+        f"{n_shared} names shared by more than one person")
+    for r in graph.read("""
+        MATCH (r:ResolvedDirector)-[:SERVES_ON]->(o:Organization)
+        RETURN r.director_id AS id, r.name AS name, r.n_names AS n_names, count(o) AS boards
+        ORDER BY boards DESC LIMIT 10
+    """):
+        log(f"    {r['id']} {r['name'][:40]}: {r['boards']} boards ({r['n_names']} spellings)")
+
+    log("")
+    log("-- NEO4J CALL TIMINGS --")
+    graph.report(log)
+    graph.close()
+
+if __name__ == '__main__':
+    main()
+    metrics.export('agent_1_director_resolution', log)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+"""
+Agent 1 — Political Donations into Neo4j
+Operation Lineage Audit
+
+Loads director_donations.csv (01-data-assembly/donations.py) as
+Director -[DONATED_TO]-> PoliticalParty edges, one per director, party
+and year (MERGEd on year, so reruns update in place), carrying amount,
+n_contributions, match confidence, postal areas and recipients. Only
+Directors already in the graph get edges. Every write is a batched
+UNWIND. Edges are stamped with the run; those the run did not write
+(a relinked contributor, a corrected party) are deleted, and so are
+PoliticalParty nodes left with no edges; with no donations at all, that
+clears the layer.
+
+With DONATED_TO.year and PoliticalParty.code indexed, the README's core
+question runs as one traversal:
+
+  MATCH (:PoliticalParty {code: 'NDP'})<-[e:DONATED_TO]-(d:Director)-[:SITS_ON]->(o:Organization)
+  WHERE o.cluster_id IS NOT NULL AND e.year >= 2015 AND e.year <= 2019
+  WITH o, collect(DISTINCT d.normalized_name) AS donors
+  MATCH (o)-[g:RECEIVED_GRANT {political_era: 'NDP'}]->(:OrgEntity)
+  RETURN o.cluster_id, o.name, donors, sum(g.amount) AS ndp_funding
+"""
+
+import sys, os, time
+from datetime import datetime
+
+sys.stdout.reconfigure(encoding='utf-8')
+sys.stderr.reconfigure(encoding='utf-8')
+
+from graph_client import GraphClient
+from query_cache import bump_graph_version
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '00-project-management'))
+from artifact_store import ArtifactStore
+import metrics
+
+# ── Configuration ────────────────────────────────────────────────────
+NEO4J_URI      = "<YOUR_NEO4J_AURA_URI>"
+NEO4J_USER     = "neo4j"
+NEO4J_PASSWORD = "<YOUR_NEO4J_AURA_PASSWORD>"
+BATCH_SIZE     = 1000
+
+SCRIPT_DIR    = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR      = os.environ.get('LINEAGE_DATA_DIR', os.path.join(SCRIPT_DIR, '..', '01-data-assembly'))
+DONATIONS_CSV = "director_donations.csv"
+
+SCHEMA = [
+    "CREATE CONSTRAINT political_party_code IF NOT EXISTS FOR (p:PoliticalParty) REQUIRE p.code IS UNIQUE",
+    "CREATE INDEX donated_to_year IF NOT EXISTS FOR ()-[e:DONATED_TO]-() ON (e.year)",
+    "CREATE INDEX donated_to_confidence IF NOT EXISTS FOR ()-[e:DONATED_TO]-() ON (e.confidence)",
+]
+
+# ── Helpers ──────────────────────────────────────────────────────────
+
+def log(msg):
+    ts = datetime.now().strftime("%H:%M:%S")
+    print(f"[{ts}] {msg}", flush=True)
+
+def safe_float(val):
+    if val is None or val == '' or val == 'NA' or val == 'nan':
+        return None
+    try:
+        return float(val)
+    except (ValueError, TypeError):
+        return None
+
+def donation_params(rows, stamp):
+    params = []
+    for row in rows:
+        director, party = row['director'].strip(), row['party'].strip()
+        if not director or not party or not row['year']:
+            continue
+        params.append({
+            'director':     director,
+            'party':        party,
+            'year':         int(float(row['year'])),
+            'amount':       safe_float(row['amount']),
+            'n':            int(float(row['n_contributions'] or 0)),
+            'confidence':   row['confidence'] or None,
+            'postal_areas': [a for a in row['postal_areas'].split(';') if a],
+            'recipients':   [r for r in (row.get('recipients') or '').split(';') if r],
+            'stamp':        stamp,
+        })
+    return params
+
+# ── Main ─────────────────────────────────────────────────────────────
+
+def main():
+    t_start = time.time()
+    log("=" * 72)
+    log("POLITICAL DONATIONS -> DONATED_TO EDGES")
+    log("=" * 72)
+
+    rows = ArtifactStore().read_rows(DONATIONS_CSV, os.path.join(DATA_DIR, DONATIONS_CSV))
+    log(f"  {DONATIONS_CSV}: {len(rows)} director / party / year totals")
+    if not rows:
+        log("  No linked donations (no contributor exports); removing any earlier DONATED_TO edges")
+
+    graph = GraphClient(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+    for stmt in SCHEMA:
+        try:
+            graph.write(stmt)
+            log(f"  OK: {stmt[:60]}")
+        except Exception as e:
+            log(f"  WARN: {stmt[:60]}... => {e}")
+
+    stamp = datetime.now().isoformat(timespec='seconds')
+    with metrics.span('params', step='DONATED_TO') as sp:
+        params = donation_params(rows, stamp)
+        sp.rows = len(params)
+    parties = sorted({p['party'] for p in params})
+    graph.write("""
+        UNWIND $items AS code
+        MERGE (p:PoliticalParty {code: code})
+        ON CREATE SET p.data_source = 'Elections Alberta'
+    """, {'items': parties})
+    log(f"  PoliticalParty nodes: {', '.join(parties)}")
+
+    graph.write_batches("""
+        UNWIND $items AS p
+        MATCH (d:Director {normalized_name: p.director})
+        MATCH (party:PoliticalParty {code: p.party})
+        MERGE (d)-[e:DONATED_TO {year: p.year}]->(party)
+        SET e.amount          = p.amount,
+            e.n_contributions = p.n,
+            e.confidence      = p.confidence,
+            e.postal_areas    = p.postal_areas,
+            e.recipients      = p.recipients,
+            e.refreshed       = p.stamp
+    """, params, BATCH_SIZE, label='MERGE DONATED_TO')
+    stale = graph.write("""
+        MATCH ()-[e:DONATED_TO]->() WHERE e.refreshed IS NULL OR e.refreshed <> $stamp
+        DELETE e
+    """, {'stamp': stamp})
+    orphans = graph.write("""
+        MATCH (p:PoliticalParty) WHERE NOT (p)<-[:DONATED_TO]-()
+        DETACH DELETE p
+    """)
+    log(f"  Loaded in {time.time() - t_start:.1f}s "
+        f"({stale.get('relationships_deleted', 0)} stale DONATED_TO edges, "
+        f"{orphans.get('nodes_deleted', 0)} empty PoliticalParty nodes removed)")
+    bump_graph_version(graph, 'agent_1_donations')
+
+    cnt = graph.read_value("MATCH ()-[e:DONATED_TO]->() RETURN count(e) AS c")
+    n_dir = graph.read_value("MATCH (d:Director)-[:DONATED_TO]->() RETURN count(DISTINCT d) AS c")
+    log(f"  VALIDATE: {cnt} DONATED_TO relationships from {n_dir} Directors")
+    for r in graph.read("""
+        MATCH (:PoliticalParty {code: 'NDP'})<-[e:DONATED_TO]-(d:Director)-[:SITS_ON]->(o:Organization)
+        WHERE o.cluster_id IS NOT NULL AND e.year >= 2015 AND e.year <= 2019
+        WITH o, collect(DISTINCT d) AS ds
+        OPTIONAL MATCH (o)-[g:RECEIVED_GRANT {political_era: 'NDP'}]->(:OrgEntity)
+        WITH o, ds, sum(g.amount) AS funding
+        WITH o.cluster_id AS cluster, collect(ds) AS dss, count(o) AS orgs, sum(funding) AS funding
+        UNWIND dss AS ds
+        UNWIND ds AS d
+        RETURN cluster, count(DISTINCT d) AS donors, orgs, funding
+        ORDER BY funding DESC LIMIT 10
+    """):
+        log(f"    cluster {r['cluster']}: {r['donors']} NDP donors on {r['orgs']} orgs, "
+            f"${r['funding'] or 0:,.0f} NDP-era funding")
+
+    log("")
+    log("-- NEO4J CALL TIMINGS --")
+    graph.report(log)
+    graph.close()
+
+if __name__ == '__main__':
+    main()
+    metrics.export('agent_1_donations', log)
@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+"""
+Agent 1 — Non-Qualified-Donee Grants into Neo4j
+Operation Lineage Audit
+
+Loads donee_grants.csv (01-data-assembly/donee_linkage.py) as
+Organization -[GRANTED_TO]-> recipient edges, one per grant line
+(keyed by fiscal_period_end + seq, so reruns MERGE in place):
+
+  recipient linked to an Organization  -> that Organization (by bn)
+  recipient linked to a Director       -> that Director (by normalized_name)
+  unmatched                            -> GrantRecipient {key: normalized name}
+
+Only grantors already in the graph get edges. Every write is a batched
+UNWIND. Edges are stamped with the run and those it did not write (a
+recipient relinked to another node) are deleted, along with
+GrantRecipient nodes left without edges. Each grantor gets
+Organization.is_foundation (it filed Schedule 1). GRANTED_TO.own_director
+marks grants to a director of the granting charity itself, e.g. from
+foundations:
+
+  MATCH (f:Organization {is_foundation: true})-[g:GRANTED_TO {own_director: true}]->(d:Director)
+  RETURN f.name, d.normalized_name, g.amount, g.purpose
+"""
+
+import sys, os, time
+from datetime import datetime
+
+sys.stdout.reconfigure(encoding='utf-8')
+sys.stderr.reconfigure(encoding='utf-8')
+
+from graph_client import GraphClient
+from query_cache import bump_graph_version
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '00-project-management'))
+from artifact_store import ArtifactStore
+import metrics
+
+# ── Configuration ────────────────────────────────────────────────────
+NEO4J_URI      = "<YOUR_NEO4J_AURA_URI>"
+NEO4J_USER     = "neo4j"
+NEO4J_PASSWORD = "<YOUR_NEO4J_AURA_PASSWORD>"
+BATCH_SIZE     = 1000
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR   = os.environ.get('LINEAGE_DATA_DIR', os.path.join(SCRIPT_DIR, '..', '01-data-assembly'))
+GRANTS_CSV = "donee_grants.csv"
+
+SCHEMA = [
+    "CREATE CONSTRAINT grant_recipient_key IF NOT EXISTS FOR (r:GrantRecipient) REQUIRE r.key IS UNIQUE",
+    "CREATE INDEX granted_to_own_director IF NOT EXISTS FOR ()-[g:GRANTED_TO]-() ON (g.own_director)",
+    "CREATE INDEX org_is_foundation IF NOT EXISTS FOR (o:Organization) ON (o.is_foundation)",
+]
+
+# Target pattern per match_type; p.target is the key value
+TARGETS = {
+    'organization': "MATCH (t:Organization {bn: p.target})",
+    'director':     "MATCH (t:Director {normalized_name: p.target})",
+    'none':         "MERGE (t:GrantRecipient {key: p.target}) "
+                    "ON CREATE SET t.name = p.recipient, t.kind = p.kind, t.data_source = 'CRA_T3010'",
+}
+
+# ── Helpers ──────────────────────────────────────────────────────────
+
+def log(msg):
+    ts = datetime.now().strftime("%H:%M:%S")
+    print(f"[{ts}] {msg}", flush=True)
+
+def safe_float(val):
+    if val is None or val == '' or val == 'NA' or val == 'nan':
+        return None
+    try:
+        return float(val)
+    except (ValueError, TypeError):
+        return None
+
+def grant_params(rows, existing_bns, stamp):
+    """GRANTED_TO params grouped by match_type, for grantors in the graph."""
+    by_type = {t: [] for t in TARGETS}
+    for row in rows:
+        bn = row['bn'].strip()
+        if bn not in existing_bns:
+            continue
+        mtype = row.get('match_type') or 'none'
+        by_type[mtype].append({
+            'bn':           bn,
+            'target':       row['match_id'] if mtype != 'none' else row['recipient_norm'],
+            'recipient':    row['recipient'],
+            'kind':         row['recipient_kind'],
+            'fy_end':       row['fiscal_period_end'],
+            'seq':          int(float(row['seq'] or 0)),
+            'amount':       safe_float(row['cash']),
+            'non_cash':     safe_float(row['non_cash']),
+            'purpose':      row.get('purpose') or None,
+            'country_code': row.get('country_code') or None,
+            'score':        safe_float(row['match_score']),
+            'own_director': row.get('own_director') == '1',
+            'stamp':        stamp,
+        })
+    return by_type
+
+def grantor_params(rows, existing_bns):
+    """One {bn, is_foundation} per grantor in the graph."""
+    grantors = {}
+    for row in rows:
+        bn = row['bn'].strip()
+        if bn in existing_bns:
+            grantors[bn] = grantors.get(bn, False) or row.get('is_foundation') == '1'
+    return [{'bn': bn, 'is_foundation': f} for bn, f in sorted(grantors.items())]
+
+# ── Main ─────────────────────────────────────────────────────────────
+
+def main():
+    t_start = time.time()
+    log("=" * 72)
+    log("NON-QUALIFIED-DONEE GRANTS -> GRANTED_TO EDGES")
+    log("=" * 72)
+
+    rows = ArtifactStore().read_rows(GRANTS_CSV, os.path.join(DATA_DIR, GRANTS_CSV))
+    log(f"  {GRANTS_CSV}: {len(rows)} grants")
+
+    graph = GraphClient(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+    for stmt in SCHEMA:
+        try:
+            graph.write(stmt)
+            log(f"  OK: {stmt[:60]}")
+        except Exception as e:
+            log(f"  WARN: {stmt[:60]}... => {e}")
+
+    existing = set(r['bn'] for r in graph.read("""
+        MATCH (o:Organization) WHERE o.bn IS NOT NULL RETURN o.bn AS bn
+    """))
+    stamp = datetime.now().isoformat(timespec='seconds')
+    with metrics.span('params', step='GRANTED_TO') as sp:
+        by_type = grant_params(rows, existing, stamp)
+        sp.rows = sum(len(v) for v in by_type.values())
+    log(f"  Grants from charities in the graph: {sp.rows} "
+        f"({', '.join(f'{t}: {len(v)}' for t, v in by_type.items())})")
+
+    for mtype, params in by_type.items():
+        graph.write_batches(f"""
+            UNWIND $items AS p
+            MATCH (g:Organization {{bn: p.bn}})
+            {TARGETS[mtype]}
+            MERGE (g)-[e:GRANTED_TO {{fiscal_period_end: p.fy_end, seq: p.seq}}]->(t)
+            SET e.amount       = p.amount,
+                e.non_cash     = p.non_cash,
+                e.purpose      = p.purpose,
+                e.country_code = p.country_code,
+                e.match_score  = p.score,
+                e.own_director = p.own_director,
+                e.refreshed    = p.stamp
+        """, params, BATCH_SIZE, label=f'MERGE GRANTED_TO ({mtype})')
+    grantors = grantor_params(rows, existing)
+    graph.write_batches("""
+        UNWIND $items AS p
+        MATCH (o:Organization {bn: p.bn})
+        SET o.is_foundation = p.is_foundation
+    """, grantors, BATCH_SIZE, label='SET Organization.is_foundation')
+    stale = graph.write("""
+        MATCH ()-[e:GRANTED_TO]->() WHERE e.refreshed IS NULL OR e.refreshed <> $stamp
+        DELETE e
+    """, {'stamp': stamp})
+    orphans = graph.write("""
+        MATCH (r:GrantRecipient) WHERE NOT (r)<-[:GRANTED_TO]-()
+        DETACH DELETE r
+    """)
+    log(f"  Loaded in {time.time() - t_start:.1f}s "
+        f"({sum(g['is_foundation'] for g in grantors)} of {len(grantors)} grantors are foundations; "
+        f"{stale.get('relationships_deleted', 0)} stale GRANTED_TO edges, "
+        f"{orphans.get('nodes_deleted', 0)} empty GrantRecipient nodes removed)")
+    bump_graph_version(graph, 'agent_1_donee_grants')
+
+    cnt = graph.read_value("MATCH ()-[e:GRANTED_TO]->() RETURN count(e) AS c")
+    n_rec = graph.read_value("MATCH (r:GrantRecipient) RETURN count(r) AS c")
+    log(f"  VALIDATE: {cnt} GRANTED_TO relationships, {n_rec} GrantRecipient nodes")
+    for r in graph.read("""
+        MATCH (f:Organization)-[g:GRANTED_TO {own_director: true}]->(d:Director)
+        RETURN f.name AS grantor, d.normalized_name AS director, sum(g.amount) AS amount
+        ORDER BY amount DESC LIMIT 10
+    """):
+        log(f"    {r['grantor'][:40]} -> {r['director']}: ${r['amount'] or 0:,.0f}")
+
+    log("")
+    log("-- NEO4J CALL TIMINGS --")
+    graph.report(log)
+    graph.close()
+
+if __name__ == '__main__':
+    main()
+    metrics.export('agent_1_donee_grants', log)
@@ -9,20 +9,27 @@ Ingests federal_grants.csv (109,583 rows) into the graph:
   - Filters to non-null federal_department
   - Aggregates by BN x federal_department x fiscal_year
   - MERGEs FederalDepartment nodes
-  - MERGEs FUNDED_BY_FED relationships (only where Organization node exists)
+  - MERGEs FUNDED_BY_FED relationships (only where Organization node exists;
+    bare roots are first completed from the shared bn_dictionary.csv, then
+    BNs match exactly, else on the 9-digit root via bn_ids)
 
 Addresses cleaning decisions C14 and DQ9.
 Uses MERGE exclusively for idempotent ingestion.
 """
 
-import sys, os, csv, time, re
+import sys, os, time, re
 from datetime import datetime
 from collections import defaultdict
 
 sys.stdout.reconfigure(encoding='utf-8')
 sys.stderr.reconfigure(encoding='utf-8')
 
-from neo4j import GraphDatabase
+from graph_client import GraphClient
+from query_cache import CachedCypher, bump_graph_version
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '00-project-management'))
+from artifact_store import ArtifactStore
+import bn_ids
+import metrics
 
 # -- Configuration --------------------------------------------------------
 NEO4J_URI      = "<YOUR_NEO4J_AURA_URI>"
@@ -30,8 +37,9 @@ NEO4J_USER     = "neo4j"
 NEO4J_PASSWORD = "<YOUR_NEO4J_AURA_PASSWORD>"
 BATCH_SIZE     = 500
 
-DATA_DIR   = r"C:\Users\alina\OneDrive\Desktop\lineage-audit\01-data-assembly"
-OUTPUT_DIR = r"C:\Users\alina\OneDrive\Desktop\lineage-audit\02-graph-build"
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR   = os.environ.get('LINEAGE_DATA_DIR', os.path.join(SCRIPT_DIR, '..', '01-data-assembly'))
+OUTPUT_DIR = SCRIPT_DIR
 CSV_PATH   = os.path.join(DATA_DIR, "federal_grants.csv")
 
 LOG_LINES = []
@@ -70,15 +78,8 @@ def batched(iterable, n):
         yield iterable[i:i+n]
 
 def read_federal_csv():
-    """Read federal_grants.csv with utf-8-sig to handle BOM, fallback to cp1252."""
-    try:
-        with open(CSV_PATH, 'r', encoding='utf-8-sig') as f:
-            reader = csv.DictReader(f)
-            return list(reader)
-    except UnicodeDecodeError:
-        with open(CSV_PATH, 'r', encoding='cp1252') as f:
-            reader = csv.DictReader(f)
-            return list(reader)
+    """Latest stored version of federal_grants.csv (BOM-safe utf-8, cp1252 fallback)."""
+    return ArtifactStore().read_rows("federal_grants.csv", CSV_PATH)
 
 # -- Main -----------------------------------------------------------------
 
@@ -182,25 +183,42 @@ def main():
     log("-- STEP 3: Connect to Neo4j / Check Existing Org Nodes --")
     t0 = time.time()
 
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+    graph = GraphClient(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
     log("  Connected to Neo4j Aura")
 
     # Get all existing Organization BNs from the graph
-    with driver.session() as s:
-        result = s.run("""
-            MATCH (o:Organization)
-            WHERE o.bn IS NOT NULL
-            RETURN o.bn AS bn
-        """)
-        existing_bns = set(record['bn'] for record in result)
+    existing_bns = bn_ids.BnSet.from_values(r['bn'] for r in graph.read("""
+        MATCH (o:Organization)
+        WHERE o.bn IS NOT NULL
+        RETURN o.bn AS bn
+    """))
 
     log(f"  Existing Organization nodes with BN: {len(existing_bns)}")
 
-    # Filter agg_records to only those where BN exists in graph
-    matched_records = [r for r in agg_records if r['bn'] in existing_bns]
-    unmatched_bns = set(r['bn'] for r in agg_records if r['bn'] not in existing_bns)
+    # Resolve each CSV BN to a graph BN: exact, else by 9-digit root (bare
+    # roots and other program accounts of the same charity)
+    dictionary = bn_ids.BnDictionary.load(os.path.join(DATA_DIR, bn_ids.DICT_CSV), missing_ok=True)
+    canonical, n_completed = dictionary.canonical([r['bn'] for r in agg_records])
+    log(f"  Bare roots completed from {bn_ids.DICT_CSV} ({len(dictionary)} BNs): {n_completed}")
+    codes = bn_ids.encode(canonical)
+    resolved = existing_bns.resolve(codes)
+    by_root = (resolved >= 0) & (resolved != codes)
+    graph_bns = bn_ids.decode(resolved).tolist()
+    merged = {}
+    for r, bn, ok in zip(agg_records, graph_bns, resolved >= 0):
+        if not ok:
+            continue
+        key = (bn, r['dept'], r['fy'])
+        if key in merged:
+            merged[key]['amount'] = round(merged[key]['amount'] + r['amount'], 2)
+            merged[key]['n_grants'] += r['n_grants']
+        else:
+            merged[key] = dict(r, bn=bn)
+    matched_records = list(merged.values())
+    unmatched_bns = set(r['bn'] for r, ok in zip(agg_records, resolved >= 0) if not ok)
 
     log(f"  Aggregated edges matching existing Org nodes: {len(matched_records)}")
+    log(f"  BNs matched by root only: {len(set(codes[by_root]))}")
     log(f"  BNs in CSV but NOT in graph: {len(unmatched_bns)}")
     log(f"  BNs in CSV that ARE in graph: {len(set(r['bn'] for r in matched_records))}")
 
@@ -227,13 +245,12 @@ def main():
         "CREATE CONSTRAINT fed_dept_name IF NOT EXISTS FOR (fd:FederalDepartment) REQUIRE fd.name IS UNIQUE",
         "CREATE INDEX fed_dept_idx IF NOT EXISTS FOR (fd:FederalDepartment) ON (fd.name)",
     ]
-    with driver.session() as s:
-        for stmt in schema_statements:
-            try:
-                s.run(stmt)
-                log(f"  OK: {stmt[:60]}")
-            except Exception as e:
-                log(f"  WARN: {stmt[:60]}... => {e}")
+    for stmt in schema_statements:
+        try:
+            graph.write(stmt)
+            log(f"  OK: {stmt[:60]}")
+        except Exception as e:
+            log(f"  WARN: {stmt[:60]}... => {e}")
 
     log(f"  Step 4 completed in {time.time()-t0:.1f}s")
     flush_log()
@@ -249,22 +266,20 @@ def main():
     log(f"  FederalDepartment nodes to MERGE: {len(dept_params)}")
 
     n_depts = 0
-    with driver.session() as s:
-        for batch in batched(dept_params, BATCH_SIZE):
-            s.run("""
-                UNWIND $items AS p
-                MERGE (fd:FederalDepartment {name: p.name})
-                SET fd.data_source = 'GoC_Grants',
-                    fd.kgl         = 'program',
-                    fd.kgl_handle  = 'program'
-            """, items=batch)
-            n_depts += len(batch)
+    for batch in batched(dept_params, BATCH_SIZE):
+        graph.write("""
+            UNWIND $items AS p
+            MERGE (fd:FederalDepartment {name: p.name})
+            SET fd.data_source = 'GoC_Grants',
+                fd.kgl         = 'program',
+                fd.kgl_handle  = 'program'
+        """, {'items': batch})
+        n_depts += len(batch)
 
     log(f"  Merged {n_depts} FederalDepartment nodes")
 
-    with driver.session() as s:
-        cnt = s.run("MATCH (fd:FederalDepartment) RETURN count(fd) AS c").single()['c']
-        log(f"  VALIDATE: {cnt} FederalDepartment nodes in graph")
+    cnt = graph.read_value("MATCH (fd:FederalDepartment) RETURN count(fd) AS c")
+    log(f"  VALIDATE: {cnt} FederalDepartment nodes in graph")
 
     log(f"  Step 5 completed in {time.time()-t0:.1f}s")
     flush_log()
@@ -280,27 +295,26 @@ def main():
 
     n_edges = 0
     n_batches = 0
-    with driver.session() as s:
-        for batch in batched(matched_records, BATCH_SIZE):
-            s.run("""
-                UNWIND $items AS p
-                MATCH (o:Organization {bn: p.bn})
-                MERGE (fd:FederalDepartment {name: p.dept})
-                MERGE (o)-[r:FUNDED_BY_FED {fiscal_year: p.fy}]->(fd)
-                SET r.amount   = p.amount,
-                    r.n_grants = p.n_grants
-            """, items=batch)
-            n_edges += len(batch)
-            n_batches += 1
-            if n_edges % 5000 == 0 or n_batches == 1:
-                log(f"    ... {n_edges}/{len(matched_records)} FUNDED_BY_FED edges merged")
-                flush_log()
+    for batch in batched(matched_records, BATCH_SIZE):
+        graph.write("""
+            UNWIND $items AS p
+            MATCH (o:Organization {bn: p.bn})
+            MERGE (fd:FederalDepartment {name: p.dept})
+            MERGE (o)-[r:FUNDED_BY_FED {fiscal_year: p.fy}]->(fd)
+            SET r.amount   = p.amount,
+                r.n_grants = p.n_grants
+        """, {'items': batch})
+        n_edges += len(batch)
+        n_batches += 1
+        if n_edges % 5000 == 0 or n_batches == 1:
+            log(f"    ... {n_edges}/{len(matched_records)} FUNDED_BY_FED edges merged")
+            flush_log()
 
     log(f"  Merged {n_edges} FUNDED_BY_FED edges in {time.time()-t0:.1f}s")
+    bump_graph_version(graph, 'agent_1_federal_grants')
 
-    with driver.session() as s:
-        cnt = s.run("MATCH ()-[r:FUNDED_BY_FED]->() RETURN count(r) AS c").single()['c']
-        log(f"  VALIDATE: {cnt} FUNDED_BY_FED relationships in graph")
+    cnt = graph.read_value("MATCH ()-[r:FUNDED_BY_FED]->() RETURN count(r) AS c")
+    log(f"  VALIDATE: {cnt} FUNDED_BY_FED relationships in graph")
 
     flush_log()
 
@@ -310,107 +324,111 @@ def main():
     log("")
     log("-- STEP 7: Verification & Spot Checks --")
     t0 = time.time()
-
-    with driver.session() as s:
-        # Count FUNDED_BY_FED relationships
-        cnt_rels = s.run("MATCH ()-[r:FUNDED_BY_FED]->() RETURN count(r) AS c").single()['c']
-        log(f"  Total FUNDED_BY_FED relationships: {cnt_rels}")
-
-        # Count FederalDepartment nodes
-        cnt_depts = s.run("MATCH (fd:FederalDepartment) RETURN count(fd) AS c").single()['c']
-        log(f"  Total FederalDepartment nodes: {cnt_depts}")
-
-        # Top departments by number of funded organizations
-        top_depts = s.run("""
-            MATCH (o:Organization)-[r:FUNDED_BY_FED]->(fd:FederalDepartment)
-            RETURN fd.name AS dept,
-                   count(DISTINCT o) AS n_orgs,
-                   count(r) AS n_edges,
-                   sum(r.amount) AS total_amount
-            ORDER BY n_orgs DESC
-            LIMIT 10
-        """).data()
-        log("  Top 10 federal departments by number of funded AB orgs:")
-        for r in top_depts:
-            amt = r['total_amount'] if r['total_amount'] else 0
-            log(f"    {r['dept'][:60]}: {r['n_orgs']} orgs, {r['n_edges']} edges, ${amt:,.0f}")
-
-        # Orgs receiving BOTH GOA grants (RECEIVED_GRANT) and federal (FUNDED_BY_FED)
-        n_dual_funded = s.run("""
-            MATCH (o:Organization)-[:RECEIVED_GRANT]->(m:OrgEntity)
-            WHERE EXISTS { (o)-[:FUNDED_BY_FED]->(:FederalDepartment) }
-            RETURN count(DISTINCT o) AS n_dual_funded
-        """).single()['n_dual_funded']
-        log(f"  Organizations receiving BOTH GOA and federal grants: {n_dual_funded}")
-
-        # Sample dual-funded orgs
-        dual_samples = s.run("""
-            MATCH (o:Organization)-[g:RECEIVED_GRANT]->(m:OrgEntity)
-            WHERE EXISTS { (o)-[:FUNDED_BY_FED]->(:FederalDepartment) }
-            WITH o, count(DISTINCT m) AS n_ministries
-            MATCH (o)-[f:FUNDED_BY_FED]->(fd:FederalDepartment)
-            WITH o, n_ministries,
-                 count(DISTINCT fd) AS n_fed_depts,
-                 sum(f.amount) AS fed_total
-            RETURN o.name AS org_name,
-                   o.bn AS bn,
-                   n_ministries AS goa_ministries,
-                   n_fed_depts AS fed_departments,
-                   fed_total AS fed_funding_total
-            ORDER BY fed_funding_total DESC
-            LIMIT 10
-        """).data()
-        log("  Top 10 dual-funded orgs (GOA + Federal):")
-        for r in dual_samples:
-            amt = r['fed_funding_total'] if r['fed_funding_total'] else 0
-            log(f"    {r['org_name']} (BN {r['bn']}): "
-                f"{r['goa_ministries']} GOA ministries, "
-                f"{r['fed_departments']} fed depts, "
-                f"${amt:,.0f} fed total")
-
-        # Orgs with only federal funding (no GOA)
-        fed_only = s.run("""
-            MATCH (o:Organization)-[:FUNDED_BY_FED]->(:FederalDepartment)
-            WHERE NOT EXISTS { (o)-[:RECEIVED_GRANT]->(:OrgEntity) }
-              AND o.bn IS NOT NULL
-            RETURN count(DISTINCT o) AS cnt
-        """).single()['cnt']
-        log(f"  Organizations with federal funding ONLY (no GOA): {fed_only}")
-
-        # Orgs with only GOA funding (no federal)
-        goa_only = s.run("""
-            MATCH (o:Organization)-[:RECEIVED_GRANT]->(:OrgEntity)
-            WHERE NOT EXISTS { (o)-[:FUNDED_BY_FED]->(:FederalDepartment) }
-              AND o.bn IS NOT NULL
-            RETURN count(DISTINCT o) AS cnt
-        """).single()['cnt']
-        log(f"  Organizations with GOA funding ONLY (no federal): {goa_only}")
-
-        # Fiscal year distribution of FUNDED_BY_FED
-        fy_dist = s.run("""
-            MATCH ()-[r:FUNDED_BY_FED]->()
-            RETURN r.fiscal_year AS fy, count(r) AS cnt, sum(r.amount) AS total
-            ORDER BY r.fiscal_year
-        """).data()
-        log("  FUNDED_BY_FED by fiscal year:")
-        for r in fy_dist:
-            amt = r['total'] if r['total'] else 0
-            log(f"    {r['fy']}: {r['cnt']} edges, ${amt:,.0f}")
-
-        # Risk-flagged orgs that receive federal funding
-        flagged_fed = s.run("""
-            MATCH (o:Organization)-[:FUNDED_BY_FED]->(:FederalDepartment)
-            WHERE EXISTS { (o)-[:FLAGGED_AS]->(:RiskFlag) }
-            RETURN count(DISTINCT o) AS cnt
-        """).single()['cnt']
-        log(f"  Risk-flagged orgs receiving federal funding: {flagged_fed}")
-
-    log(f"  Step 7 completed in {time.time()-t0:.1f}s")
+    cy = CachedCypher(graph)
+
+    # Count FUNDED_BY_FED relationships
+    cnt_rels = cy.single("MATCH ()-[r:FUNDED_BY_FED]->() RETURN count(r) AS c")['c']
+    log(f"  Total FUNDED_BY_FED relationships: {cnt_rels}")
+
+    # Count FederalDepartment nodes
+    cnt_depts = cy.single("MATCH (fd:FederalDepartment) RETURN count(fd) AS c")['c']
+    log(f"  Total FederalDepartment nodes: {cnt_depts}")
+
+    # Top departments by number of funded organizations
+    top_depts = cy.run("""
+        MATCH (o:Organization)-[r:FUNDED_BY_FED]->(fd:FederalDepartment)
+        RETURN fd.name AS dept,
+               count(DISTINCT o) AS n_orgs,
+               count(r) AS n_edges,
+               sum(r.amount) AS total_amount
+        ORDER BY n_orgs DESC
+        LIMIT 10
+    """)
+    log("  Top 10 federal departments by number of funded AB orgs:")
+    for r in top_depts:
+        amt = r['total_amount'] if r['total_amount'] else 0
+        log(f"    {r['dept'][:60]}: {r['n_orgs']} orgs, {r['n_edges']} edges, ${amt:,.0f}")
+
+    # Orgs receiving BOTH GOA grants (RECEIVED_GRANT) and federal (FUNDED_BY_FED)
+    n_dual_funded = cy.single("""
+        MATCH (o:Organization)-[:RECEIVED_GRANT]->(m:OrgEntity)
+        WHERE EXISTS { (o)-[:FUNDED_BY_FED]->(:FederalDepartment) }
+        RETURN count(DISTINCT o) AS n_dual_funded
+    """)['n_dual_funded']
+    log(f"  Organizations receiving BOTH GOA and federal grants: {n_dual_funded}")
+
+    # Sample dual-funded orgs
+    dual_samples = cy.run("""
+        MATCH (o:Organization)-[g:RECEIVED_GRANT]->(m:OrgEntity)
+        WHERE EXISTS { (o)-[:FUNDED_BY_FED]->(:FederalDepartment) }
+        WITH o, count(DISTINCT m) AS n_ministries
+        MATCH (o)-[f:FUNDED_BY_FED]->(fd:FederalDepartment)
+        WITH o, n_ministries,
+             count(DISTINCT fd) AS n_fed_depts,
+             sum(f.amount) AS fed_total
+        RETURN o.name AS org_name,
+               o.bn AS bn,
+               n_ministries AS goa_ministries,
+               n_fed_depts AS fed_departments,
+               fed_total AS fed_funding_total
+        ORDER BY fed_funding_total DESC
+        LIMIT 10
+    """)
+    log("  Top 10 dual-funded orgs (GOA + Federal):")
+    for r in dual_samples:
+        amt = r['fed_funding_total'] if r['fed_funding_total'] else 0
+        log(f"    {r['org_name']} (BN {r['bn']}): "
+            f"{r['goa_ministries']} GOA ministries, "
+            f"{r['fed_departments']} fed depts, "
+            f"${amt:,.0f} fed total")
+
+    # Orgs with only federal funding (no GOA)
+    fed_only = cy.single("""
+        MATCH (o:Organization)-[:FUNDED_BY_FED]->(:FederalDepartment)
+        WHERE NOT EXISTS { (o)-[:RECEIVED_GRANT]->(:OrgEntity) }
+          AND o.bn IS NOT NULL
+        RETURN count(DISTINCT o) AS cnt
+    """)['cnt']
+    log(f"  Organizations with federal funding ONLY (no GOA): {fed_only}")
+
+    # Orgs with only GOA funding (no federal)
+    goa_only = cy.single("""
+        MATCH (o:Organization)-[:RECEIVED_GRANT]->(:OrgEntity)
+        WHERE NOT EXISTS { (o)-[:FUNDED_BY_FED]->(:FederalDepartment) }
+          AND o.bn IS NOT NULL
+        RETURN count(DISTINCT o) AS cnt
+    """)['cnt']
+    log(f"  Organizations with GOA funding ONLY (no federal): {goa_only}")
+
+    # Fiscal year distribution of FUNDED_BY_FED
+    fy_dist = cy.run("""
+        MATCH ()-[r:FUNDED_BY_FED]->()
+        RETURN r.fiscal_year AS fy, count(r) AS cnt, sum(r.amount) AS total
+        ORDER BY r.fiscal_year
+    """)
+    log("  FUNDED_BY_FED by fiscal year:")
+    for r in fy_dist:
+        amt = r['total'] if r['total'] else 0
+        log(f"    {r['fy']}: {r['cnt']} edges, ${amt:,.0f}")
+
+    # Risk-flagged orgs that receive federal funding
+    flagged_fed = cy.single("""
+        MATCH (o:Organization)-[:FUNDED_BY_FED]->(:FederalDepartment)
+        WHERE EXISTS { (o)-[:FLAGGED_AS]->(:RiskFlag) }
+        RETURN count(DISTINCT o) AS cnt
+    """)['cnt']
+    log(f"  Risk-flagged orgs receiving federal funding: {flagged_fed}")
+
+    log(f"  Step 7 completed in {time.time()-t0:.1f}s ({cy.summary()})")
 
     # ================================================================
     # DONE
     # ================================================================
-    driver.close()
+    log("")
+    log("-- NEO4J CALL TIMINGS --")
+    graph.report(log)
+    graph.close()
+    metrics.export('agent_1_federal_grants', log)
 
     elapsed = time.time() - t_start
     log("")
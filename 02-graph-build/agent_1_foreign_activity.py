@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+"""
+Agent 1 — Foreign Activity Edges to Countries
+Operation Lineage Audit
+
+Loads the Schedule 2 / 5 index (01-data-assembly/foreign_activity.py):
+
+  - MERGEs one Country node per CRA country code (code, name = CRA
+    English country name). Countries get their own label: Region is
+    unique on name and holds the charities' cities, and a country and a
+    city can share a name.
+  - MERGEs Organization -[ACTIVE_IN]-> Country edges weighted by the
+    estimated dollar flow (program spend share + exports + recipient
+    transfers, each also kept as its own property; foreign_activity.py
+    nets the recipient transfers out of the program spend so the sum
+    counts each dollar once)
+  - SETs foreign_weight, n_foreign_countries and non_cash_total on the
+    Organization nodes
+
+Only charities already in the graph get edges. Country.code is unique
+and ACTIVE_IN.weight indexed, so e.g. clustered charities sending funds
+abroad resolve by index:
+
+  MATCH (o:Organization)-[f:ACTIVE_IN]->(c:Country)
+  WHERE o.cluster_id IS NOT NULL AND f.weight > 100000
+  RETURN o.name, c.name, f.weight
+"""
+
+import sys, os, time
+from datetime import datetime
+
+sys.stdout.reconfigure(encoding='utf-8')
+sys.stderr.reconfigure(encoding='utf-8')
+
+from graph_client import GraphClient
+from query_cache import bump_graph_version
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '00-project-management'))
+from artifact_store import ArtifactStore
+import metrics
+
+# ── Configuration ────────────────────────────────────────────────────
+NEO4J_URI      = "<YOUR_NEO4J_AURA_URI>"
+NEO4J_USER     = "neo4j"
+NEO4J_PASSWORD = "<YOUR_NEO4J_AURA_PASSWORD>"
+BATCH_SIZE     = 1000
+
+SCRIPT_DIR  = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR    = os.environ.get('LINEAGE_DATA_DIR', os.path.join(SCRIPT_DIR, '..', '01-data-assembly'))
+FLOWS_CSV   = "foreign_flows.csv"
+BN_CSV      = "foreign_activity_bn.csv"
+COUNTRY_CSV = "foreign_activity_country.csv"
+
+SCHEMA = [
+    "CREATE CONSTRAINT country_code IF NOT EXISTS FOR (c:Country) REQUIRE c.code IS UNIQUE",
+    "CREATE INDEX country_name IF NOT EXISTS FOR (c:Country) ON (c.name)",
+    "CREATE INDEX active_in_weight IF NOT EXISTS FOR ()-[f:ACTIVE_IN]-() ON (f.weight)",
+]
+
+# ── Helpers ──────────────────────────────────────────────────────────
+
+def log(msg):
+    ts = datetime.now().strftime("%H:%M:%S")
+    print(f"[{ts}] {msg}", flush=True)
+
+def safe_float(val):
+    if val is None or val == '' or val == 'NA' or val == 'nan':
+        return None
+    try:
+        return float(val)
+    except (ValueError, TypeError):
+        return None
+
+def read_csv(filename):
+    return ArtifactStore().read_rows(filename, os.path.join(DATA_DIR, filename))
+
+# ── Main ─────────────────────────────────────────────────────────────
+
+def main():
+    t_start = time.time()
+    log("=" * 72)
+    log("FOREIGN ACTIVITY -> ACTIVE_IN EDGES")
+    log("=" * 72)
+
+    with metrics.span('params', step='ACTIVE_IN') as sp:
+        country_params = [{'code': r['country_code'], 'name': r['country']}
+                          for r in read_csv(COUNTRY_CSV)]
+        edge_params = [{'bn': r['bn'].strip(), 'code': r['country_code'],
+                        'weight': safe_float(r['weight']),
+                        'program': safe_float(r['program']),
+                        'export_value': safe_float(r['export_value']),
+                        'recipient_amount': safe_float(r['recipient_amount'])}
+                       for r in read_csv(FLOWS_CSV)]
+        org_params = [{'bn': r['bn'].strip(),
+                       'foreign_weight': safe_float(r['foreign_weight']),
+                       'n_foreign_countries': int(r['n_countries'] or 0),
+                       'non_cash_total': safe_float(r['non_cash_total'])}
+                      for r in read_csv(BN_CSV)]
+        sp.rows = len(edge_params)
+    log(f"  {len(country_params)} countries, {len(edge_params)} BN-country flows, {len(org_params)} BNs")
+
+    graph = GraphClient(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+    for stmt in SCHEMA:
+        try:
+            graph.write(stmt)
+            log(f"  OK: {stmt[:60]}")
+        except Exception as e:
+            log(f"  WARN: {stmt[:60]}... => {e}")
+
+    graph.write_batches("""
+        UNWIND $items AS p
+        MERGE (c:Country {code: p.code})
+        SET c.name = p.name, c.kgl = '\u16AA', c.kgl_handle = 'geography'
+    """, country_params, BATCH_SIZE, label='MERGE Country')
+
+    existing = set(r['bn'] for r in graph.read("""
+        MATCH (o:Organization) WHERE o.bn IS NOT NULL RETURN o.bn AS bn
+    """))
+    edge_params = [p for p in edge_params if p['bn'] in existing]
+    org_params = [p for p in org_params if p['bn'] in existing]
+    log(f"  In graph: {len(org_params)} Organizations, {len(edge_params)} ACTIVE_IN edges")
+
+    graph.write_batches("""
+        UNWIND $items AS p
+        MATCH (o:Organization {bn: p.bn})
+        MATCH (c:Country {code: p.code})
+        MERGE (o)-[f:ACTIVE_IN]->(c)
+        SET f.weight           = p.weight,
+            f.program          = p.program,
+            f.export_value     = p.export_value,
+            f.recipient_amount = p.recipient_amount
+    """, edge_params, BATCH_SIZE, label='MERGE ACTIVE_IN')
+
+    graph.write_batches("""
+        UNWIND $items AS p
+        MATCH (o:Organization {bn: p.bn})
+        SET o.foreign_weight      = p.foreign_weight,
+            o.n_foreign_countries = p.n_foreign_countries,
+            o.non_cash_total      = p.non_cash_total
+    """, org_params, BATCH_SIZE, label='SET Organization foreign_*')
+    log(f"  Loaded in {time.time() - t_start:.1f}s")
+    bump_graph_version(graph, 'agent_1_foreign_activity')
+
+    cnt = graph.read_value("MATCH ()-[f:ACTIVE_IN]->() RETURN count(f) AS c")
+    log(f"  VALIDATE: {cnt} ACTIVE_IN relationships in graph")
+    for r in graph.read("""
+        MATCH (o:Organization)-[f:ACTIVE_IN]->(c:Country)
+        WHERE o.cluster_id IS NOT NULL
+        RETURN c.name AS country, count(DISTINCT o) AS n_orgs, sum(f.weight) AS weight
+        ORDER BY weight DESC LIMIT 10
+    """):
+        log(f"    {r['country'][:40]}: {r['n_orgs']} clustered orgs, ${r['weight'] or 0:,.0f}")
+
+    log("")
+    log("-- NEO4J CALL TIMINGS --")
+    graph.report(log)
+    graph.close()
+
+if __name__ == '__main__':
+    main()
+    metrics.export('agent_1_foreign_activity', log)
@@ -19,23 +19,32 @@ IMPORTANT DISCOVERIES from graph inspection:
   - Graph has ~134M+ nodes total — AVOID full graph scans
 """
 
-import sys, os, csv, ast, time, json, math
+import sys, os, ast, time, json, math
 from datetime import datetime
 from collections import defaultdict
 
 sys.stdout.reconfigure(encoding='utf-8')
 sys.stderr.reconfigure(encoding='utf-8')
 
-from neo4j import GraphDatabase
+from graph_client import GraphClient
+from query_cache import bump_graph_version
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '00-project-management'))
+from artifact_store import ArtifactStore
+import metrics
 
 # ── Configuration ────────────────────────────────────────────────────
-NEO4J_URI      = "<YOUR_NEO4J_AURA_URI>"
-NEO4J_USER     = "neo4j"
-NEO4J_PASSWORD = "<YOUR_NEO4J_AURA_PASSWORD>"
+# Overridable so 06-validation/benchmark.py can point a build at a local Neo4j
+NEO4J_URI      = os.environ.get('NEO4J_URI', "<YOUR_NEO4J_AURA_URI>")
+NEO4J_USER     = os.environ.get('NEO4J_USER', "neo4j")
+NEO4J_PASSWORD = os.environ.get('NEO4J_PASSWORD', "<YOUR_NEO4J_AURA_PASSWORD>")
 BATCH_SIZE     = 500
 
-DATA_DIR   = r"C:\Users\alina\OneDrive\Desktop\lineage-audit\01-data-assembly"
-OUTPUT_DIR = r"C:\Users\alina\OneDrive\Desktop\lineage-audit\02-graph-build"
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR   = os.environ.get('LINEAGE_DATA_DIR', os.path.join(SCRIPT_DIR, '..', '01-data-assembly'))
+OUTPUT_DIR = os.environ.get('LINEAGE_OUTPUT_DIR', SCRIPT_DIR)
+# 'warehouse': flags as precomputed in ab_org_risk_flags (org_risk_flags.csv)
+# 'recomputed': 01-data-assembly/risk_flags.py output (risk_flag_matrix.csv)
+RISK_FLAGS = os.environ.get('LINEAGE_RISK_FLAGS', 'warehouse')
 
 LOG_LINES = []
 LOG_PATH  = os.path.join(OUTPUT_DIR, "ingestion_log.md")
@@ -57,16 +66,9 @@ def flush_log():
         f.write("```\n")
 
 def read_csv(filename):
-    """Read CSV with utf-8-sig to handle BOM, fallback to cp1252."""
-    path = os.path.join(DATA_DIR, filename)
-    try:
-        with open(path, 'r', encoding='utf-8-sig') as f:
-            reader = csv.DictReader(f)
-            return list(reader)
-    except UnicodeDecodeError:
-        with open(path, 'r', encoding='cp1252') as f:
-            reader = csv.DictReader(f)
-            return list(reader)
+    """Latest stored version of a Phase 0 CSV, parsed once per content hash
+    (BOM-safe utf-8, cp1252 fallback). See 00-project-management/artifact_store.py."""
+    return ArtifactStore().read_rows(filename, os.path.join(DATA_DIR, filename))
 
 def safe_float(val):
     if val is None or val == '' or val == 'NA':
@@ -116,42 +118,41 @@ def main():
     log("AGENT 1A/1B -- KGL v1.3 Graph Builder -- START")
     log("=" * 72)
 
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+    graph = GraphClient(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
     log("Connected to Neo4j Aura")
 
     # ── PHASE 0: Inspect existing graph (targeted queries only) ──────
     log("")
     log("-- PHASE 0: Existing Graph State (targeted label counts) --")
     t0 = time.time()
-    with driver.session() as s:
-        # Only count labels we care about — avoids scanning 134M+ nodes
-        target_labels = [
-            'OrgEntity', 'TransformEvent', 'SourceDocument',
-            'Organization', 'Director', 'Person',
-            'FiscalYear', 'Region', 'RiskFlag',
-        ]
-        for label in target_labels:
-            cnt = s.run(f"MATCH (n:{label}) RETURN count(n) AS c").single()['c']
-            log(f"  {label}: {cnt}")
-
-        # Target relationship types we care about
-        target_rels = [
-            'SOURCE_OF', 'TARGET_OF', 'PARENT_OF', 'EVIDENCED_BY',
-            'RECEIVED_GRANT', 'SITS_ON', 'FLAGGED_AS',
-            'LOCATED_IN', 'SHARED_DIRECTORS', 'CLUSTER_MEMBER',
-        ]
-        for rel in target_rels:
-            cnt = s.run(f"MATCH ()-[r:{rel}]->() RETURN count(r) AS c").single()['c']
-            if cnt > 0:
-                log(f"  Rel {rel}: {cnt}")
-
-        # Inspect OrgEntity (ministry) nodes
-        orgentity_sample = s.run("""
-            MATCH (m:OrgEntity)
-            RETURN m.canonical_id AS cid, m.name AS name
-            ORDER BY m.canonical_id LIMIT 5
-        """).data()
-        log(f"  OrgEntity sample: {orgentity_sample}")
+    # Only count labels we care about — avoids scanning 134M+ nodes
+    target_labels = [
+        'OrgEntity', 'TransformEvent', 'SourceDocument',
+        'Organization', 'Director', 'Person',
+        'FiscalYear', 'Region', 'RiskFlag',
+    ]
+    for label in target_labels:
+        cnt = graph.read_value(f"MATCH (n:{label}) RETURN count(n) AS c")
+        log(f"  {label}: {cnt}")
+
+    # Target relationship types we care about
+    target_rels = [
+        'SOURCE_OF', 'TARGET_OF', 'PARENT_OF', 'EVIDENCED_BY',
+        'RECEIVED_GRANT', 'SITS_ON', 'FLAGGED_AS',
+        'LOCATED_IN', 'SHARED_DIRECTORS', 'CLUSTER_MEMBER',
+    ]
+    for rel in target_rels:
+        cnt = graph.read_value(f"MATCH ()-[r:{rel}]->() RETURN count(r) AS c")
+        if cnt > 0:
+            log(f"  Rel {rel}: {cnt}")
+
+    # Inspect OrgEntity (ministry) nodes
+    orgentity_sample = graph.read("""
+        MATCH (m:OrgEntity)
+        RETURN m.canonical_id AS cid, m.name AS name
+        ORDER BY m.canonical_id LIMIT 5
+    """)
+    log(f"  OrgEntity sample: {orgentity_sample}")
 
     log(f"  Phase 0 completed in {time.time()-t0:.1f}s")
     flush_log()
@@ -173,16 +174,15 @@ def main():
         "CREATE INDEX org_name IF NOT EXISTS FOR (o:Organization) ON (o.name)",
         "CREATE INDEX director_name IF NOT EXISTS FOR (d:Director) ON (d.normalized_name)",
     ]
-    with driver.session() as s:
-        for stmt in schema_statements:
-            try:
-                s.run(stmt)
-                # Extract the constraint/index name from statement
-                parts = stmt.split("IF NOT EXISTS")
-                label_hint = parts[0].strip().split()[-1] if parts else stmt[:40]
-                log(f"  OK: {label_hint}")
-            except Exception as e:
-                log(f"  WARN: {stmt[:60]}... => {e}")
+    for stmt in schema_statements:
+        try:
+            graph.write(stmt)
+            # Extract the constraint/index name from statement
+            parts = stmt.split("IF NOT EXISTS")
+            label_hint = parts[0].strip().split()[-1] if parts else stmt[:40]
+            log(f"  OK: {label_hint}")
+        except Exception as e:
+            log(f"  WARN: {stmt[:60]}... => {e}")
     log(f"  Schema DDL completed in {time.time()-t0:.1f}s")
     flush_log()
 
@@ -196,20 +196,18 @@ def main():
     fiscal_years = sorted(set(row['fiscal_year'] for row in grants_data if row.get('fiscal_year')))
     log(f"  Unique fiscal years: {fiscal_years}")
 
-    with driver.session() as s:
-        fy_params = []
-        for fy in fiscal_years:
-            fy_val = int(fy) if fy.isdigit() else fy
-            fy_params.append({'year': fy_val})
-        s.run("""
-            UNWIND $items AS p
-            MERGE (fy:FiscalYear {year: p.year})
-            SET fy.kgl = '\u27F2', fy.kgl_handle = 'timeframe'
-        """, items=fy_params)
-
-    with driver.session() as s:
-        cnt = s.run("MATCH (fy:FiscalYear) RETURN count(fy) AS c").single()['c']
-        log(f"  VALIDATE: {cnt} FiscalYear nodes in graph")
+    fy_params = []
+    for fy in fiscal_years:
+        fy_val = int(fy) if fy.isdigit() else fy
+        fy_params.append({'year': fy_val})
+    graph.write("""
+        UNWIND $items AS p
+        MERGE (fy:FiscalYear {year: p.year})
+        SET fy.kgl = '\u27F2', fy.kgl_handle = 'timeframe'
+    """, {'items': fy_params})
+
+    cnt = graph.read_value("MATCH (fy:FiscalYear) RETURN count(fy) AS c")
+    log(f"  VALIDATE: {cnt} FiscalYear nodes in graph")
     log(f"  Completed in {time.time()-t0:.1f}s")
     flush_log()
 
@@ -226,17 +224,15 @@ def main():
     ))
     log(f"  Unique cities/regions: {len(cities)}")
 
-    with driver.session() as s:
-        for batch in batched(cities, BATCH_SIZE):
-            s.run("""
-                UNWIND $items AS name
-                MERGE (r:Region {name: name})
-                SET r.kgl = '\u16AA', r.kgl_handle = 'geography'
-            """, items=batch)
-
-    with driver.session() as s:
-        cnt = s.run("MATCH (r:Region) RETURN count(r) AS c").single()['c']
-        log(f"  VALIDATE: {cnt} Region nodes in graph")
+    for batch in batched(cities, BATCH_SIZE):
+        graph.write("""
+            UNWIND $items AS name
+            MERGE (r:Region {name: name})
+            SET r.kgl = '\u16AA', r.kgl_handle = 'geography'
+        """, {'items': batch})
+
+    cnt = graph.read_value("MATCH (r:Region) RETURN count(r) AS c")
+    log(f"  VALIDATE: {cnt} Region nodes in graph")
     log(f"  Completed in {time.time()-t0:.1f}s")
     flush_log()
 
@@ -253,16 +249,14 @@ def main():
         'shadow_network':      'Organization is part of a shadow governance network',
         'in_director_cluster': 'Organization is in a shared-director cluster',
     }
-    with driver.session() as s:
-        for ftype, desc in flag_types.items():
-            s.run("""
-                MERGE (f:RiskFlag {flag_type: $type})
-                SET f.kgl = '\u27E1', f.kgl_handle = 'measurement', f.description = $desc
-            """, type=ftype, desc=desc)
-
-    with driver.session() as s:
-        cnt = s.run("MATCH (f:RiskFlag) WHERE f.flag_type IS NOT NULL RETURN count(f) AS c").single()['c']
-        log(f"  VALIDATE: {cnt} RiskFlag nodes with flag_type in graph")
+    for ftype, desc in flag_types.items():
+        graph.write("""
+            MERGE (f:RiskFlag {flag_type: $type})
+            SET f.kgl = '\u27E1', f.kgl_handle = 'measurement', f.description = $desc
+        """, {'type': ftype, 'desc': desc})
+
+    cnt = graph.read_value("MATCH (f:RiskFlag) WHERE f.flag_type IS NOT NULL RETURN count(f) AS c")
+    log(f"  VALIDATE: {cnt} RiskFlag nodes with flag_type in graph")
     log(f"  Completed in {time.time()-t0:.1f}s")
     flush_log()
 
@@ -271,70 +265,70 @@ def main():
     log("-- STEP 4: Organization Nodes (CRA charities with BN) --")
     t0 = time.time()
 
-    org_params = []
-    for row in org_risk_data:
-        bn = row.get('bn', '').strip()
-        if not bn:
-            continue
-        org_params.append({
-            'bn':           bn,
-            'name':         row.get('Legal_name', '').strip(),
-            'account_name': row.get('Account_name', '').strip(),
-            'city':         row.get('City', '').strip(),
-            'category':     row.get('Category_English_Desc', '').strip(),
-            'total_revenue':       safe_float(row.get('Total_Revenue')),
-            'total_expenditures':  safe_float(row.get('Total_Expenditures')),
-            'gov_dependency_pct':  safe_float(row.get('gov_dependency_pct')),
-            'program_pct':         safe_float(row.get('program_pct')),
-            'admin_pct':           safe_float(row.get('admin_pct')),
-            'fundraising_pct':     safe_float(row.get('fundraising_pct')),
-            'compensation_pct':    safe_float(row.get('compensation_pct_of_exp')),
-            'total_gov_rev':       safe_float(row.get('total_gov_rev')),
-            'prov_rev':            safe_float(row.get('prov_rev')),
-            'fed_rev':             safe_float(row.get('fed_rev')),
-            'total_assets':        safe_float(row.get('Total_Assets')),
-            'total_liabilities':   safe_float(row.get('Total_Liabilities')),
-            'net_assets':          safe_float(row.get('net_assets')),
-        })
+    with metrics.span('params', step='Organization') as sp:
+        org_params = []
+        for row in org_risk_data:
+            bn = row.get('bn', '').strip()
+            if not bn:
+                continue
+            org_params.append({
+                'bn':           bn,
+                'name':         row.get('Legal_name', '').strip(),
+                'account_name': row.get('Account_name', '').strip(),
+                'city':         row.get('City', '').strip(),
+                'category':     row.get('Category_English_Desc', '').strip(),
+                'total_revenue':       safe_float(row.get('Total_Revenue')),
+                'total_expenditures':  safe_float(row.get('Total_Expenditures')),
+                'gov_dependency_pct':  safe_float(row.get('gov_dependency_pct')),
+                'program_pct':         safe_float(row.get('program_pct')),
+                'admin_pct':           safe_float(row.get('admin_pct')),
+                'fundraising_pct':     safe_float(row.get('fundraising_pct')),
+                'compensation_pct':    safe_float(row.get('compensation_pct_of_exp')),
+                'total_gov_rev':       safe_float(row.get('total_gov_rev')),
+                'prov_rev':            safe_float(row.get('prov_rev')),
+                'fed_rev':             safe_float(row.get('fed_rev')),
+                'total_assets':        safe_float(row.get('Total_Assets')),
+                'total_liabilities':   safe_float(row.get('Total_Liabilities')),
+                'net_assets':          safe_float(row.get('net_assets')),
+            })
+        sp.rows = len(org_params)
 
     log(f"  Prepared {len(org_params)} Organization params")
 
     n_org_created = 0
-    with driver.session() as s:
-        for batch in batched(org_params, BATCH_SIZE):
-            s.run("""
-                UNWIND $items AS p
-                MERGE (o:Organization {bn: p.bn})
-                SET o.name              = p.name,
-                    o.account_name      = p.account_name,
-                    o.city              = p.city,
-                    o.category          = p.category,
-                    o.total_revenue     = p.total_revenue,
-                    o.total_expenditures = p.total_expenditures,
-                    o.gov_dependency_pct = p.gov_dependency_pct,
-                    o.program_pct       = p.program_pct,
-                    o.admin_pct         = p.admin_pct,
-                    o.fundraising_pct   = p.fundraising_pct,
-                    o.compensation_pct  = p.compensation_pct,
-                    o.total_gov_rev     = p.total_gov_rev,
-                    o.prov_rev          = p.prov_rev,
-                    o.fed_rev           = p.fed_rev,
-                    o.total_assets      = p.total_assets,
-                    o.total_liabilities = p.total_liabilities,
-                    o.net_assets        = p.net_assets,
-                    o.kgl               = '\u16B4',
-                    o.kgl_handle        = 'organization',
-                    o.data_source       = 'CRA_T3010'
-            """, items=batch)
-            n_org_created += len(batch)
-            if n_org_created % 2000 == 0:
-                log(f"    ... {n_org_created} Organization nodes merged")
+    for batch in batched(org_params, BATCH_SIZE):
+        graph.write("""
+            UNWIND $items AS p
+            MERGE (o:Organization {bn: p.bn})
+            SET o.name              = p.name,
+                o.account_name      = p.account_name,
+                o.city              = p.city,
+                o.category          = p.category,
+                o.total_revenue     = p.total_revenue,
+                o.total_expenditures = p.total_expenditures,
+                o.gov_dependency_pct = p.gov_dependency_pct,
+                o.program_pct       = p.program_pct,
+                o.admin_pct         = p.admin_pct,
+                o.fundraising_pct   = p.fundraising_pct,
+                o.compensation_pct  = p.compensation_pct,
+                o.total_gov_rev     = p.total_gov_rev,
+                o.prov_rev          = p.prov_rev,
+                o.fed_rev           = p.fed_rev,
+                o.total_assets      = p.total_assets,
+                o.total_liabilities = p.total_liabilities,
+                o.net_assets        = p.net_assets,
+                o.kgl               = '\u16B4',
+                o.kgl_handle        = 'organization',
+                o.data_source       = 'CRA_T3010'
+        """, {'items': batch})
+        n_org_created += len(batch)
+        if n_org_created % 2000 == 0:
+            log(f"    ... {n_org_created} Organization nodes merged")
     log(f"  Merged {n_org_created} Organization nodes in {time.time()-t0:.1f}s")
 
     # Validate — count only orgs with bn (ours)
-    with driver.session() as s:
-        cnt = s.run("MATCH (o:Organization) WHERE o.bn IS NOT NULL RETURN count(o) AS c").single()['c']
-        log(f"  VALIDATE: {cnt} Organization nodes with BN in graph")
+    cnt = graph.read_value("MATCH (o:Organization) WHERE o.bn IS NOT NULL RETURN count(o) AS c")
+    log(f"  VALIDATE: {cnt} Organization nodes with BN in graph")
     flush_log()
 
     # Build org BN set for later steps
@@ -347,45 +341,45 @@ def main():
     directors_data = read_csv("multi_board_directors.csv")
     log(f"  Loaded multi_board_directors.csv: {len(directors_data)} rows")
 
-    director_params = []
-    director_bns = {}  # name -> list of BNs (for step 6)
-    skipped_directors = 0
-    for row in directors_data:
-        name = row.get('clean_name_no_initial', '').strip()
-        if not name:
-            skipped_directors += 1
-            continue
-        n_boards = safe_int(row.get('n_boards'))
-        n_nal = safe_int(row.get('n_non_arms_length'))
-        bns = parse_linked_bns(row.get('linked_bns', ''))
-        director_bns[name] = bns
-        director_params.append({
-            'name':     name,
-            'n_boards': n_boards,
-            'n_non_arms_length': n_nal,
-        })
+    with metrics.span('params', step='Director') as sp:
+        director_params = []
+        director_bns = {}  # name -> list of BNs (for step 6)
+        skipped_directors = 0
+        for row in directors_data:
+            name = row.get('clean_name_no_initial', '').strip()
+            if not name:
+                skipped_directors += 1
+                continue
+            n_boards = safe_int(row.get('n_boards'))
+            n_nal = safe_int(row.get('n_non_arms_length'))
+            bns = parse_linked_bns(row.get('linked_bns', ''))
+            director_bns[name] = bns
+            director_params.append({
+                'name':     name,
+                'n_boards': n_boards,
+                'n_non_arms_length': n_nal,
+            })
+        sp.rows = len(director_params)
 
     log(f"  Prepared {len(director_params)} Director params (skipped {skipped_directors})")
 
     n_dir_created = 0
-    with driver.session() as s:
-        for batch in batched(director_params, BATCH_SIZE):
-            s.run("""
-                UNWIND $items AS p
-                MERGE (d:Director {normalized_name: p.name})
-                SET d.n_boards          = p.n_boards,
-                    d.n_non_arms_length = p.n_non_arms_length,
-                    d.kgl               = '\u25CE',
-                    d.kgl_handle        = 'person'
-            """, items=batch)
-            n_dir_created += len(batch)
-            if n_dir_created % 5000 == 0:
-                log(f"    ... {n_dir_created} Director nodes merged")
+    for batch in batched(director_params, BATCH_SIZE):
+        graph.write("""
+            UNWIND $items AS p
+            MERGE (d:Director {normalized_name: p.name})
+            SET d.n_boards          = p.n_boards,
+                d.n_non_arms_length = p.n_non_arms_length,
+                d.kgl               = '\u25CE',
+                d.kgl_handle        = 'person'
+        """, {'items': batch})
+        n_dir_created += len(batch)
+        if n_dir_created % 5000 == 0:
+            log(f"    ... {n_dir_created} Director nodes merged")
     log(f"  Merged {n_dir_created} Director nodes in {time.time()-t0:.1f}s")
 
-    with driver.session() as s:
-        cnt = s.run("MATCH (d:Director) RETURN count(d) AS c").single()['c']
-        log(f"  VALIDATE: {cnt} Director nodes in graph")
+    cnt = graph.read_value("MATCH (d:Director) RETURN count(d) AS c")
+    log(f"  VALIDATE: {cnt} Director nodes in graph")
     flush_log()
 
     # ── STEP 6: SITS_ON edges (directors -> organizations) ───────────
@@ -395,37 +389,37 @@ def main():
 
     log(f"  Known Organization BNs: {len(org_bn_set)}")
 
-    sits_on_params = []
-    total_bn_refs = 0
-    matched_bn_refs = 0
-    for name, bns in director_bns.items():
-        for bn in bns:
-            total_bn_refs += 1
-            if bn in org_bn_set:
-                matched_bn_refs += 1
-                sits_on_params.append({'name': name, 'bn': bn})
+    with metrics.span('params', step='SITS_ON') as sp:
+        sits_on_params = []
+        total_bn_refs = 0
+        matched_bn_refs = 0
+        for name, bns in director_bns.items():
+            for bn in bns:
+                total_bn_refs += 1
+                if bn in org_bn_set:
+                    matched_bn_refs += 1
+                    sits_on_params.append({'name': name, 'bn': bn})
+        sp.rows = len(sits_on_params)
 
     log(f"  Total director->BN references: {total_bn_refs}")
     log(f"  Matched to known orgs: {matched_bn_refs} ({100*matched_bn_refs/max(total_bn_refs,1):.1f}%)")
     log(f"  SITS_ON edges to create: {len(sits_on_params)}")
 
     n_sits = 0
-    with driver.session() as s:
-        for batch in batched(sits_on_params, BATCH_SIZE):
-            s.run("""
-                UNWIND $items AS p
-                MATCH (d:Director {normalized_name: p.name})
-                MATCH (o:Organization {bn: p.bn})
-                MERGE (d)-[:SITS_ON]->(o)
-            """, items=batch)
-            n_sits += len(batch)
-            if n_sits % 5000 == 0:
-                log(f"    ... {n_sits} SITS_ON edges processed")
+    for batch in batched(sits_on_params, BATCH_SIZE):
+        graph.write("""
+            UNWIND $items AS p
+            MATCH (d:Director {normalized_name: p.name})
+            MATCH (o:Organization {bn: p.bn})
+            MERGE (d)-[:SITS_ON]->(o)
+        """, {'items': batch})
+        n_sits += len(batch)
+        if n_sits % 5000 == 0:
+            log(f"    ... {n_sits} SITS_ON edges processed")
     log(f"  Merged {n_sits} SITS_ON edges in {time.time()-t0:.1f}s")
 
-    with driver.session() as s:
-        cnt = s.run("MATCH (:Director)-[r:SITS_ON]->(:Organization) RETURN count(r) AS c").single()['c']
-        log(f"  VALIDATE: {cnt} SITS_ON relationships in graph")
+    cnt = graph.read_value("MATCH (:Director)-[r:SITS_ON]->(:Organization) RETURN count(r) AS c")
+    log(f"  VALIDATE: {cnt} SITS_ON relationships in graph")
     flush_log()
 
     # ── STEP 7: RECEIVED_GRANT edges (org -> OrgEntity/ministry) ─────
@@ -461,12 +455,11 @@ def main():
     log(f"  Extended name->BN lookup: {len(name_to_bn)} entries (added org_risk_flags names)")
 
     # Load OrgEntity (ministry) nodes from graph
-    with driver.session() as s:
-        ministry_info = s.run("""
-            MATCH (m:OrgEntity)
-            RETURN m.canonical_id AS cid, m.name AS name, m.normalized_name AS norm
-            ORDER BY m.name
-        """).data()
+    ministry_info = graph.read("""
+        MATCH (m:OrgEntity)
+        RETURN m.canonical_id AS cid, m.name AS name, m.normalized_name AS norm
+        ORDER BY m.name
+    """)
     log(f"  OrgEntity (ministry) nodes in graph: {len(ministry_info)}")
 
     # Build ministry lookups
@@ -484,53 +477,55 @@ def main():
     log(f"  Ministry name lookup entries: {len(ministry_name_upper_map)}")
 
     # Process all 702K grant rows
-    grant_edge_params = []
-    unmatched_recipients = 0
-    unmatched_ministries = 0
-    unmatched_ministry_names = defaultdict(int)
-    total_grant_rows = len(grants_data)
-    matched_grant_rows = 0
-
-    for row in grants_data:
-        recipient = row.get('recipient', '').strip()
-        ministry  = row.get('ministry', '').strip()
-        fy        = row.get('fiscal_year', '').strip()
-        era       = row.get('political_era', '').strip()
-        amount    = safe_float(row.get('total_amount'))
-        n_pay     = safe_int(row.get('n_payments'))
-        cid       = row.get('canonical_ministry_id', '').strip()
-        earliest  = row.get('earliest_payment', '').strip()
-        latest    = row.get('latest_payment', '').strip()
-
-        # Resolve recipient to BN
-        bn = name_to_bn.get(recipient.upper())
-        if not bn or bn not in org_bn_set:
-            unmatched_recipients += 1
-            continue
-
-        # Resolve ministry — prefer canonical_id, fall back to name
-        ministry_match_key = None
-        if cid and cid in ministry_cid_set:
-            ministry_match_key = ('cid', cid)
-        elif ministry.upper() in ministry_name_upper_map:
-            ministry_match_key = ('name', ministry_name_upper_map[ministry.upper()])
-        else:
-            unmatched_ministries += 1
-            unmatched_ministry_names[ministry] += 1
-            continue
-
-        matched_grant_rows += 1
-        grant_edge_params.append({
-            'bn':        bn,
-            'match_type': ministry_match_key[0],
-            'match_val':  ministry_match_key[1],
-            'fy':         fy,
-            'era':        era,
-            'amount':     amount,
-            'n_payments': n_pay,
-            'earliest':   earliest,
-            'latest':     latest,
-        })
+    with metrics.span('params', step='RECEIVED_GRANT') as sp:
+        grant_edge_params = []
+        unmatched_recipients = 0
+        unmatched_ministries = 0
+        unmatched_ministry_names = defaultdict(int)
+        total_grant_rows = len(grants_data)
+        matched_grant_rows = 0
+
+        for row in grants_data:
+            recipient = row.get('recipient', '').strip()
+            ministry  = row.get('ministry', '').strip()
+            fy        = row.get('fiscal_year', '').strip()
+            era       = row.get('political_era', '').strip()
+            amount    = safe_float(row.get('total_amount'))
+            n_pay     = safe_int(row.get('n_payments'))
+            cid       = row.get('canonical_ministry_id', '').strip()
+            earliest  = row.get('earliest_payment', '').strip()
+            latest    = row.get('latest_payment', '').strip()
+
+            # Resolve recipient to BN
+            bn = name_to_bn.get(recipient.upper())
+            if not bn or bn not in org_bn_set:
+                unmatched_recipients += 1
+                continue
+
+            # Resolve ministry — prefer canonical_id, fall back to name
+            ministry_match_key = None
+            if cid and cid in ministry_cid_set:
+                ministry_match_key = ('cid', cid)
+            elif ministry.upper() in ministry_name_upper_map:
+                ministry_match_key = ('name', ministry_name_upper_map[ministry.upper()])
+            else:
+                unmatched_ministries += 1
+                unmatched_ministry_names[ministry] += 1
+                continue
+
+            matched_grant_rows += 1
+            grant_edge_params.append({
+                'bn':        bn,
+                'match_type': ministry_match_key[0],
+                'match_val':  ministry_match_key[1],
+                'fy':         fy,
+                'era':        era,
+                'amount':     amount,
+                'n_payments': n_pay,
+                'earliest':   earliest,
+                'latest':     latest,
+            })
+        sp.rows = len(grant_edge_params)
 
     log(f"  Grant rows total: {total_grant_rows}")
     log(f"  Matched (org+ministry): {matched_grant_rows} ({100*matched_grant_rows/max(total_grant_rows,1):.1f}%)")
@@ -548,44 +543,42 @@ def main():
     log(f"    by name:         {len(name_grants)}")
 
     n_grants = 0
-    with driver.session() as s:
-        # Canonical ID matches -> target OrgEntity
-        for batch in batched(cid_grants, BATCH_SIZE):
-            s.run("""
-                UNWIND $items AS p
-                MATCH (o:Organization {bn: p.bn})
-                MATCH (m:OrgEntity {canonical_id: p.match_val})
-                MERGE (o)-[g:RECEIVED_GRANT {fiscal_year: p.fy, political_era: p.era}]->(m)
-                SET g.amount     = p.amount,
-                    g.n_payments = p.n_payments,
-                    g.earliest   = p.earliest,
-                    g.latest     = p.latest
-            """, items=batch)
-            n_grants += len(batch)
-            if n_grants % 2000 == 0:
-                log(f"    ... {n_grants} RECEIVED_GRANT edges processed (cid)")
-
-        # Name matches -> target OrgEntity
-        for batch in batched(name_grants, BATCH_SIZE):
-            s.run("""
-                UNWIND $items AS p
-                MATCH (o:Organization {bn: p.bn})
-                MATCH (m:OrgEntity {name: p.match_val})
-                MERGE (o)-[g:RECEIVED_GRANT {fiscal_year: p.fy, political_era: p.era}]->(m)
-                SET g.amount     = p.amount,
-                    g.n_payments = p.n_payments,
-                    g.earliest   = p.earliest,
-                    g.latest     = p.latest
-            """, items=batch)
-            n_grants += len(batch)
-            if n_grants % 2000 == 0:
-                log(f"    ... {n_grants} RECEIVED_GRANT edges processed (name)")
+    # Canonical ID matches -> target OrgEntity
+    for batch in batched(cid_grants, BATCH_SIZE):
+        graph.write("""
+            UNWIND $items AS p
+            MATCH (o:Organization {bn: p.bn})
+            MATCH (m:OrgEntity {canonical_id: p.match_val})
+            MERGE (o)-[g:RECEIVED_GRANT {fiscal_year: p.fy, political_era: p.era}]->(m)
+            SET g.amount     = p.amount,
+                g.n_payments = p.n_payments,
+                g.earliest   = p.earliest,
+                g.latest     = p.latest
+        """, {'items': batch})
+        n_grants += len(batch)
+        if n_grants % 2000 == 0:
+            log(f"    ... {n_grants} RECEIVED_GRANT edges processed (cid)")
+
+    # Name matches -> target OrgEntity
+    for batch in batched(name_grants, BATCH_SIZE):
+        graph.write("""
+            UNWIND $items AS p
+            MATCH (o:Organization {bn: p.bn})
+            MATCH (m:OrgEntity {name: p.match_val})
+            MERGE (o)-[g:RECEIVED_GRANT {fiscal_year: p.fy, political_era: p.era}]->(m)
+            SET g.amount     = p.amount,
+                g.n_payments = p.n_payments,
+                g.earliest   = p.earliest,
+                g.latest     = p.latest
+        """, {'items': batch})
+        n_grants += len(batch)
+        if n_grants % 2000 == 0:
+            log(f"    ... {n_grants} RECEIVED_GRANT edges processed (name)")
 
     log(f"  Merged {n_grants} RECEIVED_GRANT edges in {time.time()-t0:.1f}s")
 
-    with driver.session() as s:
-        cnt = s.run("MATCH (:Organization)-[r:RECEIVED_GRANT]->(:OrgEntity) RETURN count(r) AS c").single()['c']
-        log(f"  VALIDATE: {cnt} RECEIVED_GRANT relationships in graph")
+    cnt = graph.read_value("MATCH (:Organization)-[r:RECEIVED_GRANT]->(:OrgEntity) RETURN count(r) AS c")
+    log(f"  VALIDATE: {cnt} RECEIVED_GRANT relationships in graph")
     flush_log()
 
     # ── STEP 8: FLAGGED_AS edges ─────────────────────────────────────
@@ -603,35 +596,39 @@ def main():
         'flag_in_director_cluster': 'in_director_cluster',
     }
 
-    flag_params = []
-    for row in org_risk_data:
-        bn = row.get('bn', '').strip()
-        if not bn:
-            continue
-        for col, flag_type in flag_col_map.items():
-            val = row.get(col, '').strip()
-            if val == '1':
-                flag_params.append({'bn': bn, 'flag_type': flag_type})
+    # Same flag_* column layout in both sources
+    flag_rows = read_csv("risk_flag_matrix.csv") if RISK_FLAGS == 'recomputed' else org_risk_data
+    log(f"  Flag source: {RISK_FLAGS}")
+
+    with metrics.span('params', step='FLAGGED_AS') as sp:
+        flag_params = []
+        for row in flag_rows:
+            bn = row.get('bn', '').strip()
+            if not bn:
+                continue
+            for col, flag_type in flag_col_map.items():
+                val = row.get(col, '').strip()
+                if val == '1':
+                    flag_params.append({'bn': bn, 'flag_type': flag_type})
+        sp.rows = len(flag_params)
 
     log(f"  FLAGGED_AS edges to create: {len(flag_params)}")
 
     n_flags = 0
-    with driver.session() as s:
-        for batch in batched(flag_params, BATCH_SIZE):
-            s.run("""
-                UNWIND $items AS p
-                MATCH (o:Organization {bn: p.bn})
-                MATCH (f:RiskFlag {flag_type: p.flag_type})
-                MERGE (o)-[:FLAGGED_AS]->(f)
-            """, items=batch)
-            n_flags += len(batch)
-            if n_flags % 2000 == 0:
-                log(f"    ... {n_flags} FLAGGED_AS edges processed")
+    for batch in batched(flag_params, BATCH_SIZE):
+        graph.write("""
+            UNWIND $items AS p
+            MATCH (o:Organization {bn: p.bn})
+            MATCH (f:RiskFlag {flag_type: p.flag_type})
+            MERGE (o)-[:FLAGGED_AS]->(f)
+        """, {'items': batch})
+        n_flags += len(batch)
+        if n_flags % 2000 == 0:
+            log(f"    ... {n_flags} FLAGGED_AS edges processed")
     log(f"  Merged {n_flags} FLAGGED_AS edges in {time.time()-t0:.1f}s")
 
-    with driver.session() as s:
-        cnt = s.run("MATCH (:Organization)-[r:FLAGGED_AS]->(:RiskFlag) RETURN count(r) AS c").single()['c']
-        log(f"  VALIDATE: {cnt} FLAGGED_AS relationships in graph")
+    cnt = graph.read_value("MATCH (:Organization)-[r:FLAGGED_AS]->(:RiskFlag) RETURN count(r) AS c")
+    log(f"  VALIDATE: {cnt} FLAGGED_AS relationships in graph")
     flush_log()
 
     # ── STEP 9: Cluster properties + SHARED_DIRECTORS edges ──────────
@@ -643,21 +640,22 @@ def main():
     cluster_data = read_csv("org_clusters.csv")
     log(f"  Loaded org_clusters.csv: {len(cluster_data)} rows")
 
-    cluster_params = []
-    for row in cluster_data:
-        bn = row.get('bn', '').strip()
-        cid_val = safe_int(row.get('cluster_id'))
-        cs  = safe_int(row.get('cluster_size'))
-        if bn and cid_val is not None:
-            cluster_params.append({'bn': bn, 'cluster_id': cid_val, 'cluster_size': cs})
-
-    with driver.session() as s:
-        for batch in batched(cluster_params, BATCH_SIZE):
-            s.run("""
-                UNWIND $items AS p
-                MATCH (o:Organization {bn: p.bn})
-                SET o.cluster_id = p.cluster_id, o.cluster_size = p.cluster_size
-            """, items=batch)
+    with metrics.span('params', step='cluster_id') as sp:
+        cluster_params = []
+        for row in cluster_data:
+            bn = row.get('bn', '').strip()
+            cid_val = safe_int(row.get('cluster_id'))
+            cs  = safe_int(row.get('cluster_size'))
+            if bn and cid_val is not None:
+                cluster_params.append({'bn': bn, 'cluster_id': cid_val, 'cluster_size': cs})
+        sp.rows = len(cluster_params)
+
+    for batch in batched(cluster_params, BATCH_SIZE):
+        graph.write("""
+            UNWIND $items AS p
+            MATCH (o:Organization {bn: p.bn})
+            SET o.cluster_id = p.cluster_id, o.cluster_size = p.cluster_size
+        """, {'items': batch})
     log(f"  Set cluster_id on {len(cluster_params)} orgs in {time.time()-t0:.1f}s")
 
     # 9b: SHARED_DIRECTORS edges from org_network_edges
@@ -666,38 +664,38 @@ def main():
     log(f"  Loaded org_network_edges.csv: {len(network_data)} rows")
 
     # Filter to edges where BOTH orgs are in our Alberta org set
-    shared_dir_params = []
-    for row in network_data:
-        bn1 = row.get('org1_bn', '').strip()
-        bn2 = row.get('org2_bn', '').strip()
-        if bn1 in org_bn_set and bn2 in org_bn_set:
-            n_shared_val = safe_int(row.get('n_shared_directors'))
-            shared_dir_params.append({
-                'bn1': bn1,
-                'bn2': bn2,
-                'n_shared': n_shared_val,
-            })
+    with metrics.span('params', step='SHARED_DIRECTORS') as sp:
+        shared_dir_params = []
+        for row in network_data:
+            bn1 = row.get('org1_bn', '').strip()
+            bn2 = row.get('org2_bn', '').strip()
+            if bn1 in org_bn_set and bn2 in org_bn_set:
+                n_shared_val = safe_int(row.get('n_shared_directors'))
+                shared_dir_params.append({
+                    'bn1': bn1,
+                    'bn2': bn2,
+                    'n_shared': n_shared_val,
+                })
+        sp.rows = len(shared_dir_params)
 
     log(f"  SHARED_DIRECTORS edges (both orgs in set): {len(shared_dir_params)} of {len(network_data)} total")
 
     n_shared = 0
-    with driver.session() as s:
-        for batch in batched(shared_dir_params, BATCH_SIZE):
-            s.run("""
-                UNWIND $items AS p
-                MATCH (o1:Organization {bn: p.bn1})
-                MATCH (o2:Organization {bn: p.bn2})
-                MERGE (o1)-[c:SHARED_DIRECTORS]->(o2)
-                SET c.n_shared_directors = p.n_shared
-            """, items=batch)
-            n_shared += len(batch)
-            if n_shared % 10000 == 0:
-                log(f"    ... {n_shared} SHARED_DIRECTORS edges processed")
+    for batch in batched(shared_dir_params, BATCH_SIZE):
+        graph.write("""
+            UNWIND $items AS p
+            MATCH (o1:Organization {bn: p.bn1})
+            MATCH (o2:Organization {bn: p.bn2})
+            MERGE (o1)-[c:SHARED_DIRECTORS]->(o2)
+            SET c.n_shared_directors = p.n_shared
+        """, {'items': batch})
+        n_shared += len(batch)
+        if n_shared % 10000 == 0:
+            log(f"    ... {n_shared} SHARED_DIRECTORS edges processed")
     log(f"  Merged {n_shared} SHARED_DIRECTORS edges in {time.time()-t1:.1f}s")
 
-    with driver.session() as s:
-        cnt = s.run("MATCH (:Organization)-[r:SHARED_DIRECTORS]->(:Organization) RETURN count(r) AS c").single()['c']
-        log(f"  VALIDATE: {cnt} SHARED_DIRECTORS relationships in graph")
+    cnt = graph.read_value("MATCH (:Organization)-[r:SHARED_DIRECTORS]->(:Organization) RETURN count(r) AS c")
+    log(f"  VALIDATE: {cnt} SHARED_DIRECTORS relationships in graph")
     log(f"  Step 9 total: {time.time()-t0:.1f}s")
     flush_log()
 
@@ -706,125 +704,131 @@ def main():
     log("-- STEP 10: LOCATED_IN Edges --")
     t0 = time.time()
 
-    located_params = []
-    for row in org_risk_data:
-        bn   = row.get('bn', '').strip()
-        city = row.get('City', '').strip()
-        if bn and city:
-            located_params.append({'bn': bn, 'city': city})
+    with metrics.span('params', step='LOCATED_IN') as sp:
+        located_params = []
+        for row in org_risk_data:
+            bn   = row.get('bn', '').strip()
+            city = row.get('City', '').strip()
+            if bn and city:
+                located_params.append({'bn': bn, 'city': city})
+        sp.rows = len(located_params)
 
     log(f"  LOCATED_IN edges to create: {len(located_params)}")
 
     n_located = 0
-    with driver.session() as s:
-        for batch in batched(located_params, BATCH_SIZE):
-            s.run("""
-                UNWIND $items AS p
-                MATCH (o:Organization {bn: p.bn})
-                MERGE (r:Region {name: p.city})
-                ON CREATE SET r.kgl = '\u16AA', r.kgl_handle = 'geography'
-                MERGE (o)-[:LOCATED_IN]->(r)
-            """, items=batch)
-            n_located += len(batch)
+    for batch in batched(located_params, BATCH_SIZE):
+        graph.write("""
+            UNWIND $items AS p
+            MATCH (o:Organization {bn: p.bn})
+            MERGE (r:Region {name: p.city})
+            ON CREATE SET r.kgl = '\u16AA', r.kgl_handle = 'geography'
+            MERGE (o)-[:LOCATED_IN]->(r)
+        """, {'items': batch})
+        n_located += len(batch)
     log(f"  Merged {n_located} LOCATED_IN edges in {time.time()-t0:.1f}s")
 
-    with driver.session() as s:
-        cnt = s.run("MATCH (:Organization)-[r:LOCATED_IN]->(:Region) RETURN count(r) AS c").single()['c']
-        log(f"  VALIDATE: {cnt} LOCATED_IN relationships in graph")
+    cnt = graph.read_value("MATCH (:Organization)-[r:LOCATED_IN]->(:Region) RETURN count(r) AS c")
+    log(f"  VALIDATE: {cnt} LOCATED_IN relationships in graph")
     flush_log()
 
+    # Writes done -- invalidate cached query results
+    bump_graph_version(graph, 'agent_1_graph_builder')
+
     # ── FINAL VALIDATION ─────────────────────────────────────────────
     log("")
     log("-- FINAL VALIDATION (targeted counts only) --")
-    with driver.session() as s:
-        # Count our specific node types
-        log("  === Lineage Audit Node Counts ===")
-        for label, where in [
-            ('Organization', 'WHERE n.bn IS NOT NULL'),
-            ('Director', ''),
-            ('OrgEntity', ''),
-            ('FiscalYear', ''),
-            ('Region', ''),
-            ('RiskFlag', 'WHERE n.flag_type IS NOT NULL'),
-        ]:
-            cnt = s.run(f"MATCH (n:{label}) {where} RETURN count(n) AS c").single()['c']
-            log(f"  {label}: {cnt}")
-
-        log("  === Lineage Audit Relationship Counts ===")
-        for rel in ['RECEIVED_GRANT', 'SITS_ON', 'FLAGGED_AS', 'LOCATED_IN', 'SHARED_DIRECTORS']:
-            cnt = s.run(f"MATCH ()-[r:{rel}]->() RETURN count(r) AS c").single()['c']
-            log(f"  {rel}: {cnt}")
-
-        # Spot checks
-        log("")
-        log("-- SPOT CHECKS --")
-
-        # Orgs with most flags
-        top_flags = s.run("""
-            MATCH (o:Organization)-[:FLAGGED_AS]->(f:RiskFlag)
-            WHERE o.bn IS NOT NULL
-            RETURN o.name AS name, o.bn AS bn, count(f) AS n_flags
-            ORDER BY n_flags DESC LIMIT 5
-        """).data()
-        log("  Top 5 orgs by number of risk flags:")
-        for r in top_flags:
-            log(f"    {r['name']} ({r['bn']}): {r['n_flags']} flags")
-
-        # Directors on most boards (in our graph)
-        top_dirs = s.run("""
-            MATCH (d:Director)-[:SITS_ON]->(o:Organization)
-            RETURN d.normalized_name AS name, count(o) AS boards
-            ORDER BY boards DESC LIMIT 5
-        """).data()
-        log("  Top 5 directors by board seats (in graph):")
-        for r in top_dirs:
-            log(f"    {r['name']}: {r['boards']} boards")
-
-        # Grant flow sample
-        grant_sample = s.run("""
-            MATCH (o:Organization)-[g:RECEIVED_GRANT]->(m:OrgEntity)
-            RETURN o.name AS org, m.name AS ministry, g.amount AS amount,
-                   g.fiscal_year AS fy, g.political_era AS era
-            ORDER BY g.amount DESC LIMIT 5
-        """).data()
-        log("  Top 5 grants by amount:")
-        for r in grant_sample:
-            amt = r['amount'] if r['amount'] else 0
-            log(f"    {r['org']} <- {r['ministry']}: ${amt:,.0f} ({r['fy']} {r['era']})")
-
-        # Ministry connectivity
-        ministry_conn = s.run("""
-            MATCH (m:OrgEntity)<-[g:RECEIVED_GRANT]-(o:Organization)
-            RETURN m.name AS ministry, count(DISTINCT o) AS n_orgs,
-                   count(g) AS n_grants, sum(g.amount) AS total_amount
-            ORDER BY n_orgs DESC LIMIT 5
-        """).data()
-        log("  Top 5 ministries by connected organizations:")
-        for r in ministry_conn:
-            amt = r['total_amount'] if r['total_amount'] else 0
-            log(f"    {r['ministry']}: {r['n_orgs']} orgs, {r['n_grants']} grants, ${amt:,.0f}")
-
-        # Cluster summary
-        cluster_info = s.run("""
-            MATCH (o:Organization)
-            WHERE o.cluster_id IS NOT NULL
-            RETURN count(o) AS n_clustered,
-                   count(DISTINCT o.cluster_id) AS n_clusters
-        """).data()
-        if cluster_info:
-            log(f"  Clustered orgs: {cluster_info[0]['n_clustered']} in {cluster_info[0]['n_clusters']} clusters")
-
-        # Cross-check: orgs in clusters that also received grants
-        cross = s.run("""
-            MATCH (o:Organization)-[:RECEIVED_GRANT]->(m:OrgEntity)
-            WHERE o.cluster_id IS NOT NULL
-            RETURN count(DISTINCT o) AS n_clustered_grantees,
-                   count(DISTINCT m) AS n_ministries
-        """).data()
-        if cross:
-            log(f"  Clustered orgs that received grants: {cross[0]['n_clustered_grantees']} from {cross[0]['n_ministries']} ministries")
-
-    driver.close()
+    # Count our specific node types
+    log("  === Lineage Audit Node Counts ===")
+    for label, where in [
+        ('Organization', 'WHERE n.bn IS NOT NULL'),
+        ('Director', ''),
+        ('OrgEntity', ''),
+        ('FiscalYear', ''),
+        ('Region', ''),
+        ('RiskFlag', 'WHERE n.flag_type IS NOT NULL'),
+    ]:
+        cnt = graph.read_value(f"MATCH (n:{label}) {where} RETURN count(n) AS c")
+        log(f"  {label}: {cnt}")
+
+    log("  === Lineage Audit Relationship Counts ===")
+    for rel in ['RECEIVED_GRANT', 'SITS_ON', 'FLAGGED_AS', 'LOCATED_IN', 'SHARED_DIRECTORS']:
+        cnt = graph.read_value(f"MATCH ()-[r:{rel}]->() RETURN count(r) AS c")
+        log(f"  {rel}: {cnt}")
+
+    # Spot checks
+    log("")
+    log("-- SPOT CHECKS --")
+
+    # Orgs with most flags
+    top_flags = graph.read("""
+        MATCH (o:Organization)-[:FLAGGED_AS]->(f:RiskFlag)
+        WHERE o.bn IS NOT NULL
+        RETURN o.name AS name, o.bn AS bn, count(f) AS n_flags
+        ORDER BY n_flags DESC LIMIT 5
+    """)
+    log("  Top 5 orgs by number of risk flags:")
+    for r in top_flags:
+        log(f"    {r['name']} ({r['bn']}): {r['n_flags']} flags")
+
+    # Directors on most boards (in our graph)
+    top_dirs = graph.read("""
+        MATCH (d:Director)-[:SITS_ON]->(o:Organization)
+        RETURN d.normalized_name AS name, count(o) AS boards
+        ORDER BY boards DESC LIMIT 5
+    """)
+    log("  Top 5 directors by board seats (in graph):")
+    for r in top_dirs:
+        log(f"    {r['name']}: {r['boards']} boards")
+
+    # Grant flow sample
+    grant_sample = graph.read("""
+        MATCH (o:Organization)-[g:RECEIVED_GRANT]->(m:OrgEntity)
+        RETURN o.name AS org, m.name AS ministry, g.amount AS amount,
+               g.fiscal_year AS fy, g.political_era AS era
+        ORDER BY g.amount DESC LIMIT 5
+    """)
+    log("  Top 5 grants by amount:")
+    for r in grant_sample:
+        amt = r['amount'] if r['amount'] else 0
+        log(f"    {r['org']} <- {r['ministry']}: ${amt:,.0f} ({r['fy']} {r['era']})")
+
+    # Ministry connectivity
+    ministry_conn = graph.read("""
+        MATCH (m:OrgEntity)<-[g:RECEIVED_GRANT]-(o:Organization)
+        RETURN m.name AS ministry, count(DISTINCT o) AS n_orgs,
+               count(g) AS n_grants, sum(g.amount) AS total_amount
+        ORDER BY n_orgs DESC LIMIT 5
+    """)
+    log("  Top 5 ministries by connected organizations:")
+    for r in ministry_conn:
+        amt = r['total_amount'] if r['total_amount'] else 0
+        log(f"    {r['ministry']}: {r['n_orgs']} orgs, {r['n_grants']} grants, ${amt:,.0f}")
+
+    # Cluster summary
+    cluster_info = graph.read("""
+        MATCH (o:Organization)
+        WHERE o.cluster_id IS NOT NULL
+        RETURN count(o) AS n_clustered,
+               count(DISTINCT o.cluster_id) AS n_clusters
+    """)
+    if cluster_info:
+        log(f"  Clustered orgs: {cluster_info[0]['n_clustered']} in {cluster_info[0]['n_clusters']} clusters")
+
+    # Cross-check: orgs in clusters that also received grants
+    cross = graph.read("""
+        MATCH (o:Organization)-[:RECEIVED_GRANT]->(m:OrgEntity)
+        WHERE o.cluster_id IS NOT NULL
+        RETURN count(DISTINCT o) AS n_clustered_grantees,
+               count(DISTINCT m) AS n_ministries
+    """)
+    if cross:
+        log(f"  Clustered orgs that received grants: {cross[0]['n_clustered_grantees']} from {cross[0]['n_ministries']} ministries")
+
+    log("")
+    log("-- NEO4J CALL TIMINGS --")
+    graph.report(log)
+    graph.close()
+    metrics.export('agent_1_graph_builder', log)
 
     elapsed = time.time() - t_start
     log("")
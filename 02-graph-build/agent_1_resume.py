@@ -4,22 +4,27 @@ Agent 1A/1B -- Resume script for Steps 8-10 + Final Validation
 Session expired during FLAGGED_AS edge creation. Steps 1-7 completed.
 """
 
-import sys, os, csv, time, json
+import sys, os, time, json
 from datetime import datetime
 from collections import defaultdict
 
 sys.stdout.reconfigure(encoding='utf-8')
 sys.stderr.reconfigure(encoding='utf-8')
 
-from neo4j import GraphDatabase
+from graph_client import GraphClient
+from query_cache import bump_graph_version
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '00-project-management'))
+from artifact_store import ArtifactStore
+import metrics
 
 NEO4J_URI      = "<YOUR_NEO4J_AURA_URI>"
 NEO4J_USER     = "neo4j"
 NEO4J_PASSWORD = "<YOUR_NEO4J_AURA_PASSWORD>"
 BATCH_SIZE     = 500
 
-DATA_DIR   = r"C:\Users\alina\OneDrive\Desktop\lineage-audit\01-data-assembly"
-OUTPUT_DIR = r"C:\Users\alina\OneDrive\Desktop\lineage-audit\02-graph-build"
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR   = os.environ.get('LINEAGE_DATA_DIR', os.path.join(SCRIPT_DIR, '..', '01-data-assembly'))
+OUTPUT_DIR = SCRIPT_DIR
 LOG_PATH   = os.path.join(OUTPUT_DIR, "ingestion_log.md")
 
 LOG_LINES = []
@@ -54,13 +59,9 @@ def flush_log():
         f.write("```\n")
 
 def read_csv(filename):
-    path = os.path.join(DATA_DIR, filename)
-    try:
-        with open(path, 'r', encoding='utf-8-sig') as f:
-            return list(csv.DictReader(f))
-    except UnicodeDecodeError:
-        with open(path, 'r', encoding='cp1252') as f:
-            return list(csv.DictReader(f))
+    """Latest stored version of a Phase 0 CSV, parsed once per content hash
+    (BOM-safe utf-8, cp1252 fallback). See 00-project-management/artifact_store.py."""
+    return ArtifactStore().read_rows(filename, os.path.join(DATA_DIR, filename))
 
 def safe_float(val):
     if val is None or val == '' or val == 'NA':
@@ -82,34 +83,19 @@ def batched(iterable, n):
     for i in range(0, len(iterable), n):
         yield iterable[i:i+n]
 
-def run_with_retry(driver, cypher, params, max_retries=3):
-    """Execute a Cypher statement with automatic retry on session expiry."""
-    for attempt in range(max_retries):
-        try:
-            with driver.session() as s:
-                result = s.run(cypher, **params)
-                return result.consume()
-        except Exception as e:
-            if attempt < max_retries - 1 and ('SessionExpired' in str(type(e).__name__) or 'ServiceUnavailable' in str(type(e).__name__)):
-                log(f"    RETRY {attempt+1}: Connection error, waiting 5s...")
-                time.sleep(5)
-            else:
-                raise
-
 def main():
     t_start = time.time()
     log("=" * 72)
     log("AGENT 1A/1B RESUME -- Steps 8-10 + Final Validation")
     log("=" * 72)
 
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+    graph = GraphClient(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
     log("Connected to Neo4j Aura")
 
     # Quick status check
-    with driver.session() as s:
-        for rel in ['SITS_ON', 'RECEIVED_GRANT', 'FLAGGED_AS', 'LOCATED_IN', 'SHARED_DIRECTORS']:
-            cnt = s.run(f"MATCH ()-[r:{rel}]->() RETURN count(r) AS c").single()['c']
-            log(f"  {rel}: {cnt}")
+    for rel in ['SITS_ON', 'RECEIVED_GRANT', 'FLAGGED_AS', 'LOCATED_IN', 'SHARED_DIRECTORS']:
+        cnt = graph.read_value(f"MATCH ()-[r:{rel}]->() RETURN count(r) AS c")
+        log(f"  {rel}: {cnt}")
 
     # Load org_risk_flags for steps 8, 9, 10
     org_risk_data = read_csv("org_risk_flags.csv")
@@ -145,21 +131,19 @@ def main():
 
     n_flags = 0
     for batch in batched(flag_params, BATCH_SIZE):
-        with driver.session() as s:
-            s.run("""
-                UNWIND $items AS p
-                MATCH (o:Organization {bn: p.bn})
-                MATCH (f:RiskFlag {flag_type: p.flag_type})
-                MERGE (o)-[:FLAGGED_AS]->(f)
-            """, items=batch)
+        graph.write("""
+            UNWIND $items AS p
+            MATCH (o:Organization {bn: p.bn})
+            MATCH (f:RiskFlag {flag_type: p.flag_type})
+            MERGE (o)-[:FLAGGED_AS]->(f)
+        """, {'items': batch})
         n_flags += len(batch)
         if n_flags % 2000 == 0:
             log(f"    ... {n_flags} FLAGGED_AS edges processed")
     log(f"  Merged {n_flags} FLAGGED_AS edges in {time.time()-t0:.1f}s")
 
-    with driver.session() as s:
-        cnt = s.run("MATCH (:Organization)-[r:FLAGGED_AS]->(:RiskFlag) RETURN count(r) AS c").single()['c']
-        log(f"  VALIDATE: {cnt} FLAGGED_AS relationships in graph")
+    cnt = graph.read_value("MATCH (:Organization)-[r:FLAGGED_AS]->(:RiskFlag) RETURN count(r) AS c")
+    log(f"  VALIDATE: {cnt} FLAGGED_AS relationships in graph")
     flush_log()
 
     # ── STEP 9: Cluster properties + SHARED_DIRECTORS edges ──────────
@@ -180,12 +164,11 @@ def main():
             cluster_params.append({'bn': bn, 'cluster_id': cid_val, 'cluster_size': cs})
 
     for batch in batched(cluster_params, BATCH_SIZE):
-        with driver.session() as s:
-            s.run("""
-                UNWIND $items AS p
-                MATCH (o:Organization {bn: p.bn})
-                SET o.cluster_id = p.cluster_id, o.cluster_size = p.cluster_size
-            """, items=batch)
+        graph.write("""
+            UNWIND $items AS p
+            MATCH (o:Organization {bn: p.bn})
+            SET o.cluster_id = p.cluster_id, o.cluster_size = p.cluster_size
+        """, {'items': batch})
     log(f"  Set cluster_id on {len(cluster_params)} orgs in {time.time()-t0:.1f}s")
 
     # 9b: SHARED_DIRECTORS edges from org_network_edges
@@ -209,22 +192,20 @@ def main():
 
     n_shared = 0
     for batch in batched(shared_dir_params, BATCH_SIZE):
-        with driver.session() as s:
-            s.run("""
-                UNWIND $items AS p
-                MATCH (o1:Organization {bn: p.bn1})
-                MATCH (o2:Organization {bn: p.bn2})
-                MERGE (o1)-[c:SHARED_DIRECTORS]->(o2)
-                SET c.n_shared_directors = p.n_shared
-            """, items=batch)
+        graph.write("""
+            UNWIND $items AS p
+            MATCH (o1:Organization {bn: p.bn1})
+            MATCH (o2:Organization {bn: p.bn2})
+            MERGE (o1)-[c:SHARED_DIRECTORS]->(o2)
+            SET c.n_shared_directors = p.n_shared
+        """, {'items': batch})
         n_shared += len(batch)
         if n_shared % 10000 == 0:
             log(f"    ... {n_shared} SHARED_DIRECTORS edges processed")
     log(f"  Merged {n_shared} SHARED_DIRECTORS edges in {time.time()-t1:.1f}s")
 
-    with driver.session() as s:
-        cnt = s.run("MATCH (:Organization)-[r:SHARED_DIRECTORS]->(:Organization) RETURN count(r) AS c").single()['c']
-        log(f"  VALIDATE: {cnt} SHARED_DIRECTORS relationships in graph")
+    cnt = graph.read_value("MATCH (:Organization)-[r:SHARED_DIRECTORS]->(:Organization) RETURN count(r) AS c")
+    log(f"  VALIDATE: {cnt} SHARED_DIRECTORS relationships in graph")
     log(f"  Step 9 total: {time.time()-t0:.1f}s")
     flush_log()
 
@@ -244,109 +225,113 @@ def main():
 
     n_located = 0
     for batch in batched(located_params, BATCH_SIZE):
-        with driver.session() as s:
-            s.run("""
-                UNWIND $items AS p
-                MATCH (o:Organization {bn: p.bn})
-                MERGE (r:Region {name: p.city})
-                ON CREATE SET r.kgl = '\u16AA', r.kgl_handle = 'geography'
-                MERGE (o)-[:LOCATED_IN]->(r)
-            """, items=batch)
+        graph.write("""
+            UNWIND $items AS p
+            MATCH (o:Organization {bn: p.bn})
+            MERGE (r:Region {name: p.city})
+            ON CREATE SET r.kgl = '\u16AA', r.kgl_handle = 'geography'
+            MERGE (o)-[:LOCATED_IN]->(r)
+        """, {'items': batch})
         n_located += len(batch)
         if n_located % 2000 == 0:
             log(f"    ... {n_located} LOCATED_IN edges processed")
     log(f"  Merged {n_located} LOCATED_IN edges in {time.time()-t0:.1f}s")
 
-    with driver.session() as s:
-        cnt = s.run("MATCH (:Organization)-[r:LOCATED_IN]->(:Region) RETURN count(r) AS c").single()['c']
-        log(f"  VALIDATE: {cnt} LOCATED_IN relationships in graph")
+    cnt = graph.read_value("MATCH (:Organization)-[r:LOCATED_IN]->(:Region) RETURN count(r) AS c")
+    log(f"  VALIDATE: {cnt} LOCATED_IN relationships in graph")
     flush_log()
 
+    # Writes done -- invalidate cached query results
+    bump_graph_version(graph, 'agent_1_resume')
+
     # ── FINAL VALIDATION ─────────────────────────────────────────────
     log("")
     log("-- FINAL VALIDATION (targeted counts only) --")
-    with driver.session() as s:
-        log("  === Lineage Audit Node Counts ===")
-        for label, where in [
-            ('Organization', 'WHERE n.bn IS NOT NULL'),
-            ('Director', ''),
-            ('OrgEntity', ''),
-            ('FiscalYear', ''),
-            ('Region', ''),
-            ('RiskFlag', 'WHERE n.flag_type IS NOT NULL'),
-        ]:
-            cnt = s.run(f"MATCH (n:{label}) {where} RETURN count(n) AS c").single()['c']
-            log(f"  {label}: {cnt}")
-
-        log("  === Lineage Audit Relationship Counts ===")
-        for rel in ['RECEIVED_GRANT', 'SITS_ON', 'FLAGGED_AS', 'LOCATED_IN', 'SHARED_DIRECTORS']:
-            cnt = s.run(f"MATCH ()-[r:{rel}]->() RETURN count(r) AS c").single()['c']
-            log(f"  {rel}: {cnt}")
-
-        # Spot checks
-        log("")
-        log("-- SPOT CHECKS --")
-
-        top_flags = s.run("""
-            MATCH (o:Organization)-[:FLAGGED_AS]->(f:RiskFlag)
-            WHERE o.bn IS NOT NULL
-            RETURN o.name AS name, o.bn AS bn, count(f) AS n_flags
-            ORDER BY n_flags DESC LIMIT 5
-        """).data()
-        log("  Top 5 orgs by number of risk flags:")
-        for r in top_flags:
-            log(f"    {r['name']} ({r['bn']}): {r['n_flags']} flags")
-
-        top_dirs = s.run("""
-            MATCH (d:Director)-[:SITS_ON]->(o:Organization)
-            RETURN d.normalized_name AS name, count(o) AS boards
-            ORDER BY boards DESC LIMIT 5
-        """).data()
-        log("  Top 5 directors by board seats (in graph):")
-        for r in top_dirs:
-            log(f"    {r['name']}: {r['boards']} boards")
-
-        grant_sample = s.run("""
-            MATCH (o:Organization)-[g:RECEIVED_GRANT]->(m:OrgEntity)
-            RETURN o.name AS org, m.name AS ministry, g.amount AS amount,
-                   g.fiscal_year AS fy, g.political_era AS era
-            ORDER BY g.amount DESC LIMIT 5
-        """).data()
-        log("  Top 5 grants by amount:")
-        for r in grant_sample:
-            amt = r['amount'] if r['amount'] else 0
-            log(f"    {r['org']} <- {r['ministry']}: ${amt:,.0f} ({r['fy']} {r['era']})")
-
-        ministry_conn = s.run("""
-            MATCH (m:OrgEntity)<-[g:RECEIVED_GRANT]-(o:Organization)
-            RETURN m.name AS ministry, count(DISTINCT o) AS n_orgs,
-                   count(g) AS n_grants, sum(g.amount) AS total_amount
-            ORDER BY n_orgs DESC LIMIT 5
-        """).data()
-        log("  Top 5 ministries by connected organizations:")
-        for r in ministry_conn:
-            amt = r['total_amount'] if r['total_amount'] else 0
-            log(f"    {r['ministry']}: {r['n_orgs']} orgs, {r['n_grants']} grants, ${amt:,.0f}")
-
-        cluster_info = s.run("""
-            MATCH (o:Organization)
-            WHERE o.cluster_id IS NOT NULL
-            RETURN count(o) AS n_clustered,
-                   count(DISTINCT o.cluster_id) AS n_clusters
-        """).data()
-        if cluster_info:
-            log(f"  Clustered orgs: {cluster_info[0]['n_clustered']} in {cluster_info[0]['n_clusters']} clusters")
-
-        cross = s.run("""
-            MATCH (o:Organization)-[:RECEIVED_GRANT]->(m:OrgEntity)
-            WHERE o.cluster_id IS NOT NULL
-            RETURN count(DISTINCT o) AS n_clustered_grantees,
-                   count(DISTINCT m) AS n_ministries
-        """).data()
-        if cross:
-            log(f"  Clustered orgs that received grants: {cross[0]['n_clustered_grantees']} from {cross[0]['n_ministries']} ministries")
-
-    driver.close()
+    log("  === Lineage Audit Node Counts ===")
+    for label, where in [
+        ('Organization', 'WHERE n.bn IS NOT NULL'),
+        ('Director', ''),
+        ('OrgEntity', ''),
+        ('FiscalYear', ''),
+        ('Region', ''),
+        ('RiskFlag', 'WHERE n.flag_type IS NOT NULL'),
+    ]:
+        cnt = graph.read_value(f"MATCH (n:{label}) {where} RETURN count(n) AS c")
+        log(f"  {label}: {cnt}")
+
+    log("  === Lineage Audit Relationship Counts ===")
+    for rel in ['RECEIVED_GRANT', 'SITS_ON', 'FLAGGED_AS', 'LOCATED_IN', 'SHARED_DIRECTORS']:
+        cnt = graph.read_value(f"MATCH ()-[r:{rel}]->() RETURN count(r) AS c")
+        log(f"  {rel}: {cnt}")
+
+    # Spot checks
+    log("")
+    log("-- SPOT CHECKS --")
+
+    top_flags = graph.read("""
+        MATCH (o:Organization)-[:FLAGGED_AS]->(f:RiskFlag)
+        WHERE o.bn IS NOT NULL
+        RETURN o.name AS name, o.bn AS bn, count(f) AS n_flags
+        ORDER BY n_flags DESC LIMIT 5
+    """)
+    log("  Top 5 orgs by number of risk flags:")
+    for r in top_flags:
+        log(f"    {r['name']} ({r['bn']}): {r['n_flags']} flags")
+
+    top_dirs = graph.read("""
+        MATCH (d:Director)-[:SITS_ON]->(o:Organization)
+        RETURN d.normalized_name AS name, count(o) AS boards
+        ORDER BY boards DESC LIMIT 5
+    """)
+    log("  Top 5 directors by board seats (in graph):")
+    for r in top_dirs:
+        log(f"    {r['name']}: {r['boards']} boards")
+
+    grant_sample = graph.read("""
+        MATCH (o:Organization)-[g:RECEIVED_GRANT]->(m:OrgEntity)
+        RETURN o.name AS org, m.name AS ministry, g.amount AS amount,
+               g.fiscal_year AS fy, g.political_era AS era
+        ORDER BY g.amount DESC LIMIT 5
+    """)
+    log("  Top 5 grants by amount:")
+    for r in grant_sample:
+        amt = r['amount'] if r['amount'] else 0
+        log(f"    {r['org']} <- {r['ministry']}: ${amt:,.0f} ({r['fy']} {r['era']})")
+
+    ministry_conn = graph.read("""
+        MATCH (m:OrgEntity)<-[g:RECEIVED_GRANT]-(o:Organization)
+        RETURN m.name AS ministry, count(DISTINCT o) AS n_orgs,
+               count(g) AS n_grants, sum(g.amount) AS total_amount
+        ORDER BY n_orgs DESC LIMIT 5
+    """)
+    log("  Top 5 ministries by connected organizations:")
+    for r in ministry_conn:
+        amt = r['total_amount'] if r['total_amount'] else 0
+        log(f"    {r['ministry']}: {r['n_orgs']} orgs, {r['n_grants']} grants, ${amt:,.0f}")
+
+    cluster_info = graph.read("""
+        MATCH (o:Organization)
+        WHERE o.cluster_id IS NOT NULL
+        RETURN count(o) AS n_clustered,
+               count(DISTINCT o.cluster_id) AS n_clusters
+    """)
+    if cluster_info:
+        log(f"  Clustered orgs: {cluster_info[0]['n_clustered']} in {cluster_info[0]['n_clusters']} clusters")
+
+    cross = graph.read("""
+        MATCH (o:Organization)-[:RECEIVED_GRANT]->(m:OrgEntity)
+        WHERE o.cluster_id IS NOT NULL
+        RETURN count(DISTINCT o) AS n_clustered_grantees,
+               count(DISTINCT m) AS n_ministries
+    """)
+    if cross:
+        log(f"  Clustered orgs that received grants: {cross[0]['n_clustered_grantees']} from {cross[0]['n_ministries']} ministries")
+
+    log("")
+    log("-- NEO4J CALL TIMINGS --")
+    graph.report(log)
+    graph.close()
+    metrics.export('agent_1_resume', log)
 
     elapsed = time.time() - t_start
     log("")
@@ -5,13 +5,14 @@ import sys
 sys.stdout.reconfigure(encoding='utf-8')
 sys.stderr.reconfigure(encoding='utf-8')
 
-from neo4j import GraphDatabase
+from graph_client import GraphClient
+from query_cache import bump_graph_version
 
 NEO4J_URI      = "<YOUR_NEO4J_AURA_URI>"
 NEO4J_USER     = "neo4j"
 NEO4J_PASSWORD = "<YOUR_NEO4J_AURA_PASSWORD>"
 
-driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+driver = GraphClient(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
 
 with driver.session() as s:
     # Count before
@@ -41,5 +42,6 @@ with driver.session() as s:
     print(f"FUNDED_BY_FED edges after cleanup: {cnt_after}")
     print(f"FederalDepartment nodes after cleanup: {cnt_depts}")
 
+bump_graph_version(driver, 'cleanup_none_dept')
 driver.close()
 print("Cleanup complete.")
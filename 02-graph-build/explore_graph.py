@@ -1,6 +1,6 @@
 import sys; sys.stdout.reconfigure(encoding='utf-8')
-from neo4j import GraphDatabase
-d = GraphDatabase.driver('<YOUR_NEO4J_AURA_URI>', auth=('neo4j','<YOUR_NEO4J_AURA_PASSWORD>'))
+from graph_client import GraphClient
+d = GraphClient('<YOUR_NEO4J_AURA_URI>', 'neo4j', '<YOUR_NEO4J_AURA_PASSWORD>')
 s = d.session()
 
 print("=== RELATIONSHIP TYPES ===")
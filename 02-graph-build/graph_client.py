@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+"""
+Shared Neo4j Client
+Operation Lineage Audit
+
+One tuned Bolt driver (connection pool) per process, shared by the
+graph-build, query and validation scripts:
+
+  - read() / write() run managed transactions (execute_read /
+    execute_write). On a routing URI (neo4j:// or neo4j+s://, as on Aura)
+    reads go to read replicas / followers and writes to the leader.
+  - TransientError, SessionExpired and ServiceUnavailable are retried
+    with exponential backoff and full jitter (RETRY_* below), on top of
+    the driver's own in-transaction retries, so a long load rides out an
+    Aura leader switch or connection drop. Every write in this repo is a
+    MERGE, so replaying a batch whose commit outcome is unknown is safe.
+  - Each call is timed under a label (calls, attempts, rows, total / max
+    seconds); report() logs the table at the end of a run. Calls are also
+    recorded as neo4j.read / neo4j.write spans in the run metrics
+    (00-project-management/metrics.py), so each batch write and each
+    query lands in a latency histogram.
+
+The client is also a drop-in for the raw driver -- session(),
+verify_connectivity() and close() pass through -- so older code written
+as `with driver.session() as s:` shares the same pool.
+
+Usage:
+  python graph_client.py ping     # connectivity, server, pool settings
+"""
+
+import sys, os, time, random, threading, argparse
+from datetime import datetime
+from collections import defaultdict
+
+from neo4j import GraphDatabase, READ_ACCESS, WRITE_ACCESS
+from neo4j.exceptions import TransientError, SessionExpired, ServiceUnavailable
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '00-project-management'))
+import metrics
+
+# ── Configuration ────────────────────────────────────────────────────
+NEO4J_URI      = os.environ.get('NEO4J_URI', "<YOUR_NEO4J_AURA_URI>")
+NEO4J_USER     = os.environ.get('NEO4J_USER', "neo4j")
+NEO4J_PASSWORD = os.environ.get('NEO4J_PASSWORD', "<YOUR_NEO4J_AURA_PASSWORD>")
+
+POOL_CONFIG = {
+    'max_connection_pool_size': 50,
+    'connection_acquisition_timeout': 120,   # s; queue for a connection rather than fail
+    'max_connection_lifetime': 240,          # s; recycle before Aura drops idle connections
+    'liveness_check_timeout': 30,            # s; ping connections idle longer than this
+    'connection_timeout': 30,
+    'keep_alive': True,
+    'max_transaction_retry_time': 15,        # s; the driver's own retries, inside ours
+}
+
+RETRY_ATTEMPTS = 6        # tries per call, including the first
+RETRY_BASE     = 1.0      # s; backoff before the 2nd try, doubled each time
+RETRY_CAP      = 30.0     # s; longest single backoff
+RETRYABLE      = (TransientError, SessionExpired, ServiceUnavailable)
+
+def log(msg):
+    ts = datetime.now().strftime("%H:%M:%S")
+    print(f"[{ts}] {msg}", flush=True)
+
+
+def backoff(attempt, base=RETRY_BASE, cap=RETRY_CAP):
+    """Full-jitter exponential backoff before retry number `attempt` (1-based)."""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+def _label(cypher):
+    first = ' '.join(cypher.split())
+    return first[:60] + ('...' if len(first) > 60 else '')
+
+def _counters(summary):
+    return {k: v for k, v in vars(summary.counters).items() if not k.startswith('_')}
+
+
+class GraphClient:
+    """Pooled Neo4j driver with retried managed transactions and call timing."""
+
+    def __init__(self, uri=NEO4J_URI, user=NEO4J_USER, password=NEO4J_PASSWORD,
+                 database=None, retries=RETRY_ATTEMPTS, **config):
+        self.uri = uri
+        self.database = database
+        self.retries = max(1, retries)
+        self.config = dict(POOL_CONFIG, **config)
+        self.driver = GraphDatabase.driver(uri, auth=(user, password), **self.config)
+        self.metrics = defaultdict(lambda: {'calls': 0, 'attempts': 0, 'rows': 0,
+                                            'seconds': 0.0, 'max_seconds': 0.0, 'failures': 0})
+        self._lock = threading.Lock()
+
+    # ── Driver pass-through ──────────────────────────────────────────
+    def session(self, **kwargs):
+        if self.database:
+            kwargs.setdefault('database', self.database)
+        return self.driver.session(**kwargs)
+
+    def verify_connectivity(self):
+        return self.driver.verify_connectivity()
+
+    def close(self):
+        self.driver.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ── Managed transactions ─────────────────────────────────────────
+    def _call(self, access, work, label, rows=None):
+        t0 = time.perf_counter()
+        attempt = 0
+        try:
+            while True:
+                attempt += 1
+                try:
+                    with self.session(default_access_mode=access) as s:
+                        if access == READ_ACCESS:
+                            result = s.execute_read(work)
+                        else:
+                            result = s.execute_write(work)
+                    break
+                except RETRYABLE as e:
+                    if attempt >= self.retries:
+                        raise
+                    wait = backoff(attempt)
+                    log(f"    RETRY {attempt}/{self.retries - 1} [{label}]: "
+                        f"{type(e).__name__}, waiting {wait:.1f}s")
+                    time.sleep(wait)
+        except Exception:
+            self._record(access, label, time.perf_counter() - t0, attempt, 0, failed=True)
+            raise
+        if rows is None:
+            rows = len(result) if isinstance(result, list) else 0
+        self._record(access, label, time.perf_counter() - t0, attempt, rows)
+        return result
+
+    def read(self, cypher, params=None, label=None):
+        """Records as a list of dicts (like `session.run(...).data()`), from a reader."""
+        return self._call(READ_ACCESS, lambda tx: tx.run(cypher, params or {}).data(),
+                          label or _label(cypher))
+
+    def read_single(self, cypher, params=None, label=None):
+        rows = self.read(cypher, params, label)
+        return rows[0] if rows else None
+
+    def read_value(self, cypher, params=None, label=None):
+        """First column of the first record (e.g. a count), or None."""
+        row = self.read_single(cypher, params, label)
+        return next(iter(row.values())) if row else None
+
+    def write(self, cypher, params=None, label=None):
+        """Run a write in its own retried transaction; returns the update counters.
+
+        Rows recorded for the call are the length of an `items` batch param, if any.
+        """
+        items = (params or {}).get('items')
+        return self._call(WRITE_ACCESS, lambda tx: _counters(tx.run(cypher, params or {}).consume()),
+                          label or _label(cypher), rows=len(items) if isinstance(items, list) else 0)
+
+    def write_batches(self, cypher, items, batch_size, param='items', label=None, progress=None):
+        """UNWIND-style load: one retried transaction per batch of `items`.
+
+        progress(n_done) is called after each batch. Returns the number of items sent.
+        """
+        label = label or _label(cypher)
+        done = 0
+        for i in range(0, len(items), batch_size):
+            batch = items[i:i + batch_size]
+            self._call(WRITE_ACCESS, lambda tx: _counters(tx.run(cypher, {param: batch}).consume()),
+                       label, rows=len(batch))
+            done += len(batch)
+            if progress:
+                progress(done)
+        return done
+
+    # ── Metrics ──────────────────────────────────────────────────────
+    def _record(self, access, label, seconds, attempts, rows, failed=False):
+        metrics.observe('neo4j.read' if access == READ_ACCESS else 'neo4j.write',
+                        seconds, rows, error=failed, query=label)
+        with self._lock:
+            m = self.metrics[label]
+            m['calls'] += 1
+            m['attempts'] += attempts
+            m['rows'] += rows
+            m['seconds'] += seconds
+            m['max_seconds'] = max(m['max_seconds'], seconds)
+            m['failures'] += int(failed)
+
+    def stats(self):
+        """Per-label metrics, slowest total first."""
+        with self._lock:
+            items = [dict(label=k, **v) for k, v in self.metrics.items()]
+        return sorted(items, key=lambda m: -m['seconds'])
+
+    def report(self, log=log, top=20):
+        stats = self.stats()
+        if not stats:
+            return
+        total = sum(m['seconds'] for m in stats)
+        retries = sum(m['attempts'] - m['calls'] for m in stats)
+        log(f"  Neo4j calls: {sum(m['calls'] for m in stats):,} in {total:.1f}s "
+            f"({retries} retries, {sum(m['failures'] for m in stats)} failed)")
+        for m in stats[:top]:
+            log(f"    {m['seconds']:8.2f}s  {m['calls']:>6,} calls  max {m['max_seconds']:6.2f}s"
+                f"  {m['attempts'] - m['calls']:>3} retries  {m['label']}")
+
+
+def main():
+    sys.stdout.reconfigure(encoding='utf-8')
+
+    ap = argparse.ArgumentParser(description="Shared Neo4j client.")
+    ap.add_argument('command', choices=['ping'])
+    args = ap.parse_args()
+
+    with GraphClient() as graph:
+        graph.verify_connectivity()
+        info = graph.driver.get_server_info()
+        log(f"Connected to {info.address} ({info.agent}, protocol {info.protocol_version})")
+        n = graph.read_value("MATCH (v:GraphVersion) RETURN count(v) AS c", label='ping')
+        log(f"  GraphVersion markers: {n}")
+        for k, v in graph.config.items():
+            log(f"  {k} = {v}")
+        graph.report()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+"""
+Graph Snapshot Export
+Operation Lineage Audit
+
+Exports the raw graph tables behind the governance queries and validation
+tests to local Parquet files (streamed by result_export.py), so analyses
+can be rerun (and swept over alternative definitions) without live Cypher:
+
+    grants            Organization -[RECEIVED_GRANT]-> OrgEntity, one row per edge
+    organizations     Organization nodes with a BN
+    event_links       TransformEvent -- OrgEntity, role = TARGET_OF / SOURCE_OF
+    shared_directors  Organization -[SHARED_DIRECTORS]-> Organization
+    risk_flags        Organization -[FLAGGED_AS]-> RiskFlag
+    foreign_activity  Organization -[ACTIVE_IN]-> Country, weighted
+
+Each export lands in its own version directory named after the graph
+change timestamp and content hash, with a manifest.json recording row
+counts, per-label/type graph counts and the snapshot id that downstream
+caches key on. Re-exporting an unchanged graph writes nothing new; when
+the GraphVersion marker (query_cache.py) matches the latest snapshot the
+tables are not even re-read.
+agent_2_governance_queries.py and statistical_tests.py read the LATEST
+version by default and only reach Neo4j with --refresh.
+
+Usage:
+  python graph_snapshot.py export [--root DIR] [--force]
+  python graph_snapshot.py list   [--root DIR]
+  python graph_snapshot.py info   [--root DIR] [--version V]
+"""
+
+import sys, os, json, time, shutil, hashlib, argparse
+from datetime import datetime
+
+from query_cache import GRAPH_KEY, READ_CYPHER
+from result_export import export_parquet
+
+# ── Configuration ────────────────────────────────────────────────────
+NEO4J_URI      = "<YOUR_NEO4J_AURA_URI>"
+NEO4J_USER     = "neo4j"
+NEO4J_PASSWORD = "<YOUR_NEO4J_AURA_PASSWORD>"
+
+SCRIPT_DIR    = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT_DIR  = os.path.join(SCRIPT_DIR, "snapshot")
+MANIFEST_NAME = "manifest.json"
+LATEST_NAME   = "LATEST"
+
+SNAPSHOT_QUERIES = {
+    "grants": """
+        MATCH (o:Organization)-[g:RECEIVED_GRANT]->(m:OrgEntity)
+        WHERE o.bn IS NOT NULL
+        RETURN o.bn AS bn, m.canonical_id AS ministry_id, m.name AS ministry_name,
+               g.fiscal_year AS fiscal_year, g.political_era AS political_era,
+               toFloat(g.amount) AS amount, g.n_payments AS n_payments,
+               toString(g.earliest) AS earliest, toString(g.latest) AS latest
+    """,
+    "organizations": """
+        MATCH (o:Organization)
+        WHERE o.bn IS NOT NULL
+        RETURN o.bn AS bn, o.name AS name, o.city AS city,
+               o.cluster_id AS cluster_id, o.cluster_size AS cluster_size,
+               o.comp_avg_ft_pay AS comp_avg_ft_pay, o.comp_pct_of_exp AS comp_pct_of_exp,
+               o.comp_avg_ft_pay_pctile AS comp_avg_ft_pay_pctile,
+               o.comp_pct_of_exp_pctile AS comp_pct_of_exp_pctile, o.comp_outlier AS comp_outlier
+    """,
+    "event_links": """
+        MATCH (evt:TransformEvent)-[r:TARGET_OF|SOURCE_OF]-(m:OrgEntity)
+        RETURN evt.event_id AS event_id, evt.event_type AS event_type,
+               toString(evt.event_date) AS event_date,
+               evt.political_context AS political_context,
+               type(r) AS role, m.canonical_id AS ministry_id, m.name AS ministry_name
+    """,
+    "shared_directors": """
+        MATCH (a:Organization)-[s:SHARED_DIRECTORS]->(b:Organization)
+        WHERE a.bn IS NOT NULL AND b.bn IS NOT NULL
+        RETURN a.bn AS bn1, b.bn AS bn2, s.n_shared_directors AS n_shared_directors
+    """,
+    "risk_flags": """
+        MATCH (o:Organization)-[:FLAGGED_AS]->(f:RiskFlag)
+        WHERE o.bn IS NOT NULL
+        RETURN o.bn AS bn, f.flag_type AS flag_type
+    """,
+    "foreign_activity": """
+        MATCH (o:Organization)-[f:ACTIVE_IN]->(c:Country)
+        WHERE o.bn IS NOT NULL
+        RETURN o.bn AS bn, c.code AS country_code, c.name AS country,
+               toFloat(f.weight) AS weight
+    """,
+}
+
+def log(msg):
+    ts = datetime.now().strftime("%H:%M:%S")
+    print(f"[{ts}] {msg}", flush=True)
+
+
+# ── Versioned layout ─────────────────────────────────────────────────
+#   snapshot/
+#     LATEST                          -> name of the newest version
+#     20260212T101500_3f2a9c1e/       -> <graph_changed_at>_<content hash>
+#       manifest.json, grants.parquet, ...
+
+def _file_hash(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+def list_versions(root=SNAPSHOT_DIR):
+    if not os.path.isdir(root):
+        return []
+    return sorted(d for d in os.listdir(root)
+                  if os.path.exists(os.path.join(root, d, MANIFEST_NAME)))
+
+def resolve_snapshot(path=SNAPSHOT_DIR, version=None):
+    """Directory of one snapshot version.
+
+    path may be a version directory itself, or the snapshot root; under the
+    root, version=None means the LATEST pointer.
+    """
+    if version is None and os.path.exists(os.path.join(path, MANIFEST_NAME)):
+        return path
+    if version is None:
+        pointer = os.path.join(path, LATEST_NAME)
+        if not os.path.exists(pointer):
+            raise FileNotFoundError(
+                f"No snapshot under {path} (run: python graph_snapshot.py export, or --refresh)")
+        with open(pointer, encoding='utf-8') as f:
+            version = f.read().strip()
+    vdir = os.path.join(path, version)
+    if not os.path.exists(os.path.join(vdir, MANIFEST_NAME)):
+        raise FileNotFoundError(f"Snapshot version {version} not found under {path}")
+    return vdir
+
+def read_manifest(path=SNAPSHOT_DIR, version=None):
+    with open(os.path.join(resolve_snapshot(path, version), MANIFEST_NAME), encoding='utf-8') as f:
+        return json.load(f)
+
+def load_snapshot(path=SNAPSHOT_DIR, version=None, tables=None):
+    """Return (manifest, {table_name: DataFrame})."""
+    import pandas as pd
+
+    vdir = resolve_snapshot(path, version)
+    manifest = read_manifest(vdir)
+    names = tables or list(manifest["tables"])
+    frames = {n: pd.read_parquet(os.path.join(vdir, f"{n}.parquet")) for n in names}
+    return manifest, frames
+
+
+# ── Export ───────────────────────────────────────────────────────────
+def graph_counts(session):
+    """Node counts per label and relationship counts per type (cheap change fingerprint)."""
+    counts = {}
+    for r in session.run("MATCH (n) UNWIND labels(n) AS l RETURN l AS k, count(*) AS c"):
+        counts[f"node:{r['k']}"] = r['c']
+    for r in session.run("MATCH ()-[r]->() RETURN type(r) AS k, count(*) AS c"):
+        counts[f"rel:{r['k']}"] = r['c']
+    return dict(sorted(counts.items()))
+
+def export_snapshot(driver, root=SNAPSHOT_DIR, force=False):
+    """Export every SNAPSHOT_QUERIES table into a new version directory.
+
+    graph_changed_at comes from the GraphVersion marker when the graph has
+    one, else the export time. An unchanged marker skips the export; an
+    unchanged content hash skips writing a new version.
+    """
+    try:
+        previous = read_manifest(root)
+    except FileNotFoundError:
+        previous = None
+
+    with driver.session() as s:
+        rec = s.run(READ_CYPHER, key=GRAPH_KEY).single()
+    marker = rec.data() if rec else None
+    if (not force and marker and previous
+            and previous.get("graph_version") == marker["version"]):
+        log(f"  Graph version {marker['version']} unchanged -- keeping {previous['version']}")
+        return previous
+
+    os.makedirs(root, exist_ok=True)
+    tmp = os.path.join(root, f".tmp-{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    exported_at = datetime.now()
+    tables = {}
+    with driver.session() as s:
+        counts = graph_counts(s)
+    for name, cypher in SNAPSHOT_QUERIES.items():
+        t0 = time.time()
+        path = os.path.join(tmp, f"{name}.parquet")
+        n, _ = export_parquet(driver, cypher, path)
+        tables[name] = {"rows": n, "sha256": _file_hash(path)}
+        log(f"  {name}: {n:,} rows in {time.time()-t0:.1f}s")
+
+    digest = hashlib.sha256(json.dumps(
+        {k: v["sha256"] for k, v in sorted(tables.items())}).encode()).hexdigest()
+    snapshot_id = digest[:16]
+
+    if previous and previous["snapshot_id"] == snapshot_id:
+        shutil.rmtree(tmp)
+        if marker and previous.get("graph_version") != marker["version"]:
+            # Marker moved but content did not: remember it so the next
+            # refresh can skip the export
+            previous["graph_version"] = marker["version"]
+            with open(os.path.join(root, previous["version"], MANIFEST_NAME), 'w', encoding='utf-8') as f:
+                json.dump(previous, f, indent=2)
+        log(f"  Graph unchanged since {previous['graph_changed_at']} -- keeping {previous['version']}")
+        return previous
+
+    version = f"{exported_at:%Y%m%dT%H%M%S}_{snapshot_id[:8]}"
+    manifest = {
+        "version": version,
+        "snapshot_id": snapshot_id,
+        "graph_version": marker["version"] if marker else None,
+        "graph_changed_at": (marker["updated_at"] if marker
+                             else exported_at.isoformat(timespec='seconds')),
+        "exported_at": exported_at.isoformat(timespec='seconds'),
+        "previous_version": previous["version"] if previous else None,
+        "source": NEO4J_URI,
+        "graph_counts": counts,
+        "tables": tables,
+    }
+    with open(os.path.join(tmp, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(root, version))
+    with open(os.path.join(root, LATEST_NAME), 'w', encoding='utf-8') as f:
+        f.write(version + "\n")
+    return manifest
+
+def refresh_snapshot(root=SNAPSHOT_DIR, force=False):
+    """Connect to Neo4j Aura, export, close. Used by the analysis scripts' --refresh."""
+    from graph_client import GraphClient
+
+    driver = GraphClient(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+    try:
+        driver.verify_connectivity()
+        log("Connected to Neo4j Aura -- refreshing snapshot")
+        return export_snapshot(driver, root, force)
+    finally:
+        driver.close()
+
+
+def main():
+    sys.stdout.reconfigure(encoding='utf-8')
+
+    ap = argparse.ArgumentParser(description="Export graph tables to a versioned local Parquet snapshot.")
+    ap.add_argument('command', choices=['export', 'info', 'list'])
+    ap.add_argument('--root', default=SNAPSHOT_DIR, help="snapshot root directory")
+    ap.add_argument('--version', help="with info: a specific version (default: LATEST)")
+    ap.add_argument('--force', action='store_true', help="with export: ignore the graph-version marker")
+    args = ap.parse_args()
+
+    if args.command == 'info':
+        print(json.dumps(read_manifest(args.root, args.version), indent=2))
+        return
+    if args.command == 'list':
+        for v in list_versions(args.root):
+            m = read_manifest(args.root, v)
+            print(f"{v}\tchanged {m['graph_changed_at']}\t"
+                  + ", ".join(f"{k}={t['rows']}" for k, t in m['tables'].items()))
+        return
+
+    manifest = refresh_snapshot(args.root, args.force)
+    log(f"Snapshot {manifest['version']} at {args.root}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+#!/usr/bin/env python
+"""
+Index & Constraint Advisor
+Operation Lineage Audit
+
+Reads the Cypher embedded in the analysis scripts (03-governance-queries,
+06-validation, 05-html-artifacts by default), extracts every label/type
+property predicate, and compares them with the indexes that exist:
+
+  --live     SHOW INDEXES on Neo4j Aura; selectivity sampled from the graph
+  default    the CREATE INDEX / CONSTRAINT statements in 02-graph-build;
+             selectivity from the local graph snapshot when one exists
+
+Predicates are taken from WHERE clauses (=, IN, ranges, STARTS WITH,
+CONTAINS, IS NOT NULL) and inline pattern maps such as
+`(member:Organization {cluster_id: cluster_id})`. Uncovered predicates
+become node or relationship-property RANGE indexes (TEXT for CONTAINS /
+ENDS WITH); two or more equality predicates on one variable also yield a
+composite candidate. Properties wrapped in a function
+(`toString(evt.event_date) >= ...`) cannot use any index and are listed
+separately so the query can be rewritten.
+
+Outputs (next to this script):
+  index_advisor_report.md   predicates, coverage, selectivity, DDL
+  index_advisor.cypher      CREATE INDEX ... IF NOT EXISTS statements
+
+Usage:
+  python index_advisor.py [--live] [--apply] [--sample 10000] [DIR ...]
+"""
+
+import sys, os, re, ast, glob, argparse
+from collections import defaultdict
+from datetime import datetime
+
+# ── Configuration ────────────────────────────────────────────────────
+NEO4J_URI      = "<YOUR_NEO4J_AURA_URI>"
+NEO4J_USER     = "neo4j"
+NEO4J_PASSWORD = "<YOUR_NEO4J_AURA_PASSWORD>"
+
+SCRIPT_DIR   = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR     = os.path.dirname(SCRIPT_DIR)
+DEFAULT_DIRS = ['03-governance-queries', '06-validation', '05-html-artifacts']
+REPORT_PATH  = os.path.join(SCRIPT_DIR, "index_advisor_report.md")
+DDL_PATH     = os.path.join(SCRIPT_DIR, "index_advisor.cypher")
+SAMPLE_SIZE  = 10_000
+MAX_FRACTION = 0.30    # equality lookups returning more than this share gain little
+
+# Where the snapshot keeps each property (offline selectivity)
+SNAPSHOT_COLUMNS = {
+    ('Organization', 'bn'):                ('organizations', 'bn', None),
+    ('Organization', 'name'):              ('organizations', 'name', None),
+    ('Organization', 'city'):              ('organizations', 'city', None),
+    ('Organization', 'cluster_id'):        ('organizations', 'cluster_id', None),
+    ('RECEIVED_GRANT', 'political_era'):   ('grants', 'political_era', None),
+    ('RECEIVED_GRANT', 'fiscal_year'):     ('grants', 'fiscal_year', None),
+    ('RECEIVED_GRANT', 'amount'):          ('grants', 'amount', None),
+    ('TransformEvent', 'event_id'):        ('event_links', 'event_id', 'event_id'),
+    ('TransformEvent', 'event_type'):      ('event_links', 'event_type', 'event_id'),
+    ('TransformEvent', 'event_date'):      ('event_links', 'event_date', 'event_id'),
+    ('TransformEvent', 'political_context'): ('event_links', 'political_context', 'event_id'),
+    ('OrgEntity', 'canonical_id'):         ('event_links', 'ministry_id', 'ministry_id'),
+    ('RiskFlag', 'flag_type'):             ('risk_flags', 'flag_type', None),
+    ('SHARED_DIRECTORS', 'n_shared_directors'): ('shared_directors', 'n_shared_directors', None),
+}
+
+CLAUSE_END = r'(?=\b(?:RETURN|WITH|MATCH|OPTIONAL|ORDER|UNWIND|CALL|SET|MERGE|CREATE|DELETE|LIMIT)\b|\}|$)'
+_WHERE     = re.compile(r'\bWHERE\b(.*?)' + CLAUSE_END, re.S | re.I)
+_NODE      = re.compile(r'\(\s*(\w+)?\s*((?::\s*`?\w+`?)+)\s*(\{[^}]*\})?')
+_REL       = re.compile(r'\[\s*(\w+)?\s*:\s*([\w|`]+)(?:\s*\*[^\]{]*)?\s*(\{[^}]*\})?')
+_MAP_KEY   = re.compile(r'(\w+)\s*:')
+_OPS       = r'(=~|=|<>|<=|>=|<|>|\bIN\b|\bSTARTS\s+WITH\b|\bENDS\s+WITH\b|\bCONTAINS\b|\bIS\s+NOT\s+NULL\b)'
+_PRED      = re.compile(r'(?<![\w.(])(\w+)\.(\w+)\s*' + _OPS, re.I)
+_WRAPPED   = re.compile(r'\b(\w+)\(\s*(\w+)\.(\w+)\s*\)\s*' + _OPS, re.I)
+_DDL_INDEX = re.compile(r'CREATE\s+(?:(TEXT|RANGE|POINT)\s+)?INDEX\s+(\w+).*?FOR\s*(\(\s*\w*\s*:\s*(\w+)\s*\)|\(\)\s*-\s*\[\s*\w*\s*:\s*(\w+)\s*\]\s*-\s*>?\s*\(\))\s*ON\s*\(([^)]*)\)', re.I | re.S)
+_DDL_CONS  = re.compile(r'CREATE\s+CONSTRAINT\s+(\w+).*?FOR\s*\(\s*\w*\s*:\s*(\w+)\s*\)\s*REQUIRE\s*\(?([^)]*?)\)?\s+IS\s+(?:UNIQUE|NODE\s+KEY)', re.I | re.S)
+
+def log(msg):
+    ts = datetime.now().strftime("%H:%M:%S")
+    print(f"[{ts}] {msg}", flush=True)
+
+
+# ── Cypher extraction ────────────────────────────────────────────────
+def _string_value(node):
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.JoinedStr):
+        return ''.join(v.value if isinstance(v, ast.Constant) else '__expr__' for v in node.values)
+    return None
+
+def cypher_strings(path):
+    """(line, text) for every string literal in a .py file that reads like Cypher."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename=path)
+    except (SyntaxError, UnicodeDecodeError):
+        return []
+    out = []
+    for node in ast.walk(tree):
+        text = _string_value(node)
+        if text and re.search(r'\bMATCH\b', text) and ('(' in text):
+            out.append((node.lineno, text))
+    return out
+
+def _kind(op):
+    op = re.sub(r'\s+', ' ', op.upper())
+    if op in ('=', 'IN'):
+        return 'equality'
+    if op in ('CONTAINS', 'ENDS WITH'):
+        return 'text'
+    if op == 'IS NOT NULL':
+        return 'exists'
+    if op == '=~' or op == '<>':
+        return 'scan'
+    return 'range'
+
+def extract_predicates(cypher):
+    """[(entity, is_rel, prop, kind, wrapped_fn)] for one query string."""
+    text = re.sub(r'//[^\n]*', '', cypher)
+    var_entity = {}
+    preds = []
+    for var, labels, props in _NODE.findall(text):
+        label = labels.replace('`', '').split(':')[1].strip()
+        if var:
+            var_entity.setdefault(var, (label, False))
+        for key in _MAP_KEY.findall(props or ''):
+            preds.append((label, False, key, 'equality', None))
+    for var, types, props in _REL.findall(text):
+        rtypes = [t for t in types.replace('`', '').split('|') if t]
+        if var and len(rtypes) == 1:
+            var_entity.setdefault(var, (rtypes[0], True))
+        for key in _MAP_KEY.findall(props or ''):
+            for t in rtypes:
+                preds.append((t, True, key, 'equality', None))
+
+    for where in _WHERE.findall(text):
+        for var, prop, op in _PRED.findall(where):
+            if var in var_entity:
+                ent, is_rel = var_entity[var]
+                preds.append((ent, is_rel, prop, _kind(op), None))
+        for fn, var, prop, op in _WRAPPED.findall(where):
+            if var in var_entity:
+                ent, is_rel = var_entity[var]
+                preds.append((ent, is_rel, prop, _kind(op), fn))
+    return preds
+
+def scan_sources(dirs):
+    """{(entity, is_rel, prop): {'kinds', 'wrapped', 'sites'}} plus composite candidates."""
+    found = defaultdict(lambda: {'kinds': set(), 'wrapped': set(), 'sites': set()})
+    composites = defaultdict(set)
+    for d in dirs:
+        for path in sorted(glob.glob(os.path.join(ROOT_DIR, d, '**', '*.py'), recursive=True)):
+            rel = os.path.relpath(path, ROOT_DIR)
+            for line, cypher in cypher_strings(path):
+                preds = extract_predicates(cypher)
+                eq = defaultdict(set)
+                for ent, is_rel, prop, kind, fn in preds:
+                    rec = found[(ent, is_rel, prop)]
+                    rec['sites'].add(f"{rel}:{line}")
+                    if fn:
+                        rec['wrapped'].add(fn)
+                    else:
+                        rec['kinds'].add(kind)
+                        if kind == 'equality':
+                            eq[(ent, is_rel)].add(prop)
+                for (ent, is_rel), props in eq.items():
+                    if len(props) > 1:
+                        composites[(ent, is_rel, tuple(sorted(props)))].add(f"{rel}:{line}")
+    return dict(found), dict(composites)
+
+
+# ── Existing indexes ─────────────────────────────────────────────────
+def _props(spec):
+    return tuple(p.split('.')[-1].strip() for p in spec.split(',') if p.strip())
+
+def indexes_from_ddl(dirs=('02-graph-build',)):
+    """[{name, type, entity, props}] from CREATE statements in the build scripts."""
+    out = []
+    for d in dirs:
+        for path in sorted(glob.glob(os.path.join(ROOT_DIR, d, '*.py'))):
+            for _, text in ((0, s) for s in _all_strings(path)):
+                for m in _DDL_INDEX.finditer(text):
+                    kind, name, _, label, rtype, props = m.groups()
+                    out.append({'name': name, 'type': (kind or 'RANGE').upper(),
+                                'entity': label or rtype, 'props': _props(props)})
+                for m in _DDL_CONS.finditer(text):
+                    name, label, props = m.groups()
+                    out.append({'name': name, 'type': 'RANGE', 'entity': label,
+                                'props': _props(props)})
+    return out
+
+def _all_strings(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename=path)
+    except (SyntaxError, UnicodeDecodeError):
+        return []
+    return [t for t in (_string_value(n) for n in ast.walk(tree)) if t]
+
+def indexes_from_graph(session):
+    out = []
+    for r in session.run("""
+        SHOW INDEXES YIELD name, type, entityType, labelsOrTypes, properties
+        WHERE labelsOrTypes IS NOT NULL
+        RETURN name, type, labelsOrTypes, properties
+    """):
+        for ent in r['labelsOrTypes']:
+            out.append({'name': r['name'], 'type': r['type'], 'entity': ent,
+                        'props': tuple(r['properties'] or ())})
+    return out
+
+def covered(indexes, entity, prop, kinds):
+    need_text = kinds <= {'text'}
+    for ix in indexes:
+        if ix['entity'] != entity or not ix['props'] or ix['props'][0] != prop:
+            continue
+        if ix['type'] == 'TEXT' and not need_text:
+            continue
+        return ix['name']
+    return None
+
+
+# ── Selectivity ──────────────────────────────────────────────────────
+def selectivity_from_graph(session, entity, is_rel, prop, sample):
+    match = f"MATCH ()-[x:`{entity}`]->()" if is_rel else f"MATCH (x:`{entity}`)"
+    r = session.run(f"""
+        {match}
+        WITH x LIMIT $sample
+        RETURN count(x) AS n, count(x.`{prop}`) AS nonnull, count(DISTINCT x.`{prop}`) AS distinct
+    """, sample=sample).single()
+    return dict(r) if r else None
+
+def selectivity_from_snapshot(tables, entity, prop):
+    spec = SNAPSHOT_COLUMNS.get((entity, prop))
+    if not spec or spec[0] not in tables:
+        return None
+    table, col, key = spec
+    df = tables[table]
+    if key:
+        df = df.drop_duplicates(key)
+    s = df[col]
+    return {'n': len(s), 'nonnull': int(s.notna().sum()), 'distinct': int(s.nunique())}
+
+def describe(stats):
+    """(rows fraction per equality lookup, text) from sampled counts."""
+    if not stats or not stats['n']:
+        return None, 'no sample'
+    if not stats['distinct']:
+        return 0.0, f"{stats['n']:,} sampled, property never set"
+    frac = stats['nonnull'] / stats['distinct'] / stats['n']
+    return frac, (f"{stats['distinct']:,} distinct / {stats['nonnull']:,} set of "
+                  f"{stats['n']:,} sampled (~{frac:.2%} of rows per value)")
+
+
+# ── DDL ──────────────────────────────────────────────────────────────
+def index_name(entity, is_rel, props, text=False):
+    base = '_'.join([('rel_' if is_rel else '') + entity.lower()] + [p.lower() for p in props])
+    return ('txt_' if text else 'idx_') + base
+
+def ddl(entity, is_rel, props, text=False):
+    v = 'r' if is_rel else 'n'
+    target = f"()-[{v}:{entity}]-()" if is_rel else f"({v}:{entity})"
+    on = ', '.join(f"{v}.{p}" for p in props)
+    kind = 'TEXT INDEX' if text else 'INDEX'
+    return f"CREATE {kind} {index_name(entity, is_rel, props, text)} IF NOT EXISTS FOR {target} ON ({on})"
+
+
+def advise(found, composites, indexes, sample_fn):
+    rows, statements = [], []
+    for (entity, is_rel, prop), rec in sorted(found.items(), key=lambda kv: kv[0][:3:2]):
+        kinds = rec['kinds'] - {'scan'}
+        existing = covered(indexes, entity, prop, kinds) if kinds else None
+        frac, sel = describe(sample_fn(entity, is_rel, prop))
+        action = ''
+        if kinds and not existing:
+            text_only = kinds <= {'text'}
+            low = (frac is not None and frac > MAX_FRACTION and kinds <= {'equality', 'exists'})
+            stmt = ddl(entity, is_rel, (prop,), text=text_only)
+            if low:
+                action = 'low benefit (commented out)'
+                statements.append(f"// low selectivity: {sel}")
+                statements.append(f"// {stmt};")
+            else:
+                action = 'create'
+                statements.append(stmt + ';')
+            if 'text' in kinds and not text_only:
+                statements.append(ddl(entity, is_rel, (prop,), text=True) + ';')
+        rows.append({
+            'entity': entity, 'is_rel': is_rel, 'prop': prop,
+            'kinds': ', '.join(sorted(rec['kinds'])) or '—',
+            'wrapped': ', '.join(sorted(rec['wrapped'])),
+            'existing': existing or '', 'selectivity': sel, 'action': action,
+            'sites': sorted(rec['sites']),
+        })
+    for (entity, is_rel, props), sites in sorted(composites.items()):
+        if not any(ix['entity'] == entity and ix['props'] == props for ix in indexes):
+            statements.append(f"// composite, used together at {', '.join(sorted(sites))}")
+            statements.append(ddl(entity, is_rel, props) + ';')
+    return rows, statements
+
+def write_outputs(rows, statements, source):
+    with open(DDL_PATH, 'w', encoding='utf-8') as f:
+        f.write(f"// Generated by index_advisor.py on {datetime.now():%Y-%m-%d %H:%M} ({source})\n")
+        f.write("\n".join(statements) + ("\n" if statements else ""))
+
+    lines = [
+        "# Index Advisor Report",
+        "",
+        f"**Generated:** {datetime.now():%Y-%m-%d %H:%M:%S}  ",
+        f"**Indexes from:** {source}",
+        "",
+        "| Label / type | Property | Predicates | Existing index | Selectivity | Action |",
+        "|---|---|---|---|---|---|",
+    ]
+    for r in rows:
+        ent = f"[:{r['entity']}]" if r['is_rel'] else f":{r['entity']}"
+        lines.append(f"| `{ent}` | `{r['prop']}` | {r['kinds']} | {r['existing'] or '—'} | "
+                     f"{r['selectivity']} | {r['action'] or '—'} |")
+
+    wrapped = [r for r in rows if r['wrapped']]
+    if wrapped:
+        lines += ["", "## Predicates that cannot use an index", "",
+                  "The property is wrapped in a function, so every candidate row is read "
+                  "and converted. Compare the native value instead "
+                  "(e.g. `evt.event_date >= date('2015-05-24')`).", ""]
+        for r in wrapped:
+            lines.append(f"- `{r['wrapped']}({r['entity']}.{r['prop']})` at {', '.join(r['sites'])}")
+
+    lines += ["", "## Generated DDL", "", "```cypher"] + statements + ["```", ""]
+    with open(REPORT_PATH, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines))
+
+
+def main():
+    sys.stdout.reconfigure(encoding='utf-8')
+
+    ap = argparse.ArgumentParser(description="Suggest indexes for the Cypher used by the analysis scripts.")
+    ap.add_argument('dirs', nargs='*', default=DEFAULT_DIRS, help="folders to scan (relative to the repo)")
+    ap.add_argument('--live', action='store_true', help="use SHOW INDEXES and sample the live graph")
+    ap.add_argument('--apply', action='store_true', help="with --live: run the generated DDL")
+    ap.add_argument('--sample', type=int, default=SAMPLE_SIZE)
+    args = ap.parse_args()
+
+    found, composites = scan_sources(args.dirs)
+    log(f"Found {len(found)} label/type property predicates in {', '.join(args.dirs)}")
+
+    if args.live:
+        from graph_client import GraphClient
+        driver = GraphClient(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+        try:
+            with driver.session() as s:
+                indexes = indexes_from_graph(s)
+                rows, statements = advise(found, composites, indexes,
+                                          lambda e, r, p: selectivity_from_graph(s, e, r, p, args.sample))
+                if args.apply:
+                    for stmt in statements:
+                        if not stmt.startswith('//'):
+                            s.run(stmt.rstrip(';'))
+                            log(f"  applied: {stmt}")
+        finally:
+            driver.close()
+        source = "SHOW INDEXES (live)"
+    else:
+        indexes = indexes_from_ddl()
+        tables = {}
+        try:
+            from graph_snapshot import load_snapshot
+            _, tables = load_snapshot()
+        except (FileNotFoundError, ImportError):
+            log("  No graph snapshot -- selectivity not estimated")
+        rows, statements = advise(found, composites, indexes,
+                                  lambda e, r, p: selectivity_from_snapshot(tables, e, p))
+        source = "CREATE statements in 02-graph-build"
+
+    write_outputs(rows, statements, source)
+    n_new = sum(1 for st in statements if not st.startswith('//'))
+    log(f"  {len(indexes)} existing indexes, {n_new} suggested")
+    log(f"Report: {REPORT_PATH}")
+    log(f"DDL:    {DDL_PATH}")
+
+if __name__ == "__main__":
+    main()
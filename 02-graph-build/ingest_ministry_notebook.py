@@ -559,6 +559,27 @@ print(f"\nRelationships total: {rel_executed} operations, {rel_errors} errors")
 
 # COMMAND ----------
 
+# MAGIC %md
+# MAGIC ## 6b. Bump Graph Version
+# MAGIC
+# MAGIC Invalidates locally cached query results (`02-graph-build/query_cache.py`).
+# MAGIC Same Cypher as `query_cache.BUMP_CYPHER`; inlined because the notebook
+# MAGIC cannot import from the repo.
+
+# COMMAND ----------
+
+with driver.session() as session:
+    marker = session.run("""
+        MERGE (v:GraphVersion {key: 'lineage-audit'})
+        SET v.version = coalesce(v.version, 0) + 1,
+            v.updated_at = datetime(),
+            v.updated_by = 'ingest_ministry_notebook'
+        RETURN v.version AS version
+    """).single()
+print(f"Graph version -> {marker['version']}")
+
+# COMMAND ----------
+
 # MAGIC %md
 # MAGIC ## 7. Verification & Statistics
 
@@ -584,7 +605,7 @@ with driver.session() as session:
     # KGL compliance: check all nodes have kgl + kgl_handle
     result = session.run("""
         MATCH (n)
-        WHERE n.kgl IS NULL OR n.kgl_handle IS NULL
+        WHERE (n.kgl IS NULL OR n.kgl_handle IS NULL) AND NOT n:GraphVersion
         RETURN labels(n)[0] AS label, count(n) AS missing
     """)
     kgl_missing = {r['label']: r['missing'] for r in result}
@@ -0,0 +1,491 @@
+#!/usr/bin/env python
+"""
+Ministry Lineage Transitive-Closure Index
+Operation Lineage Audit
+
+Precomputes, for every OrgEntity, all descendants and ancestors reachable
+through SOURCE_OF -> TransformEvent -> TARGET_OF chains, together with the
+event path, event dates and the funding split fraction at each step.
+
+The closure is written to a compact local JSON index (lineage_closure.json)
+so "where did this 2016 ministry's grantees end up in 2024" becomes a dict
+lookup instead of a recursive Cypher traversal. Optionally the closure is
+also MERGEd into the graph as shortcut edges:
+
+    (ancestor:OrgEntity)-[:LINEAGE_OF {fraction, hops, event_path, ...}]->(descendant:OrgEntity)
+
+Split fractions:
+  - An explicit fraction from lineage_split_fractions.csv
+    (event_id, target_id, fraction) always wins.
+  - Otherwise the event's funding is shared equally across its targets
+    (SPLIT into 3 -> 1/3 each; RENAME / MERGE -> 1.0).
+  - TRANSFER sources persist after the event, so TRANSFER shares should be
+    set explicitly whenever the transferred portion is known.
+
+Usage:
+  python lineage_closure.py                       # build from Neo4j Aura
+  python lineage_closure.py --from-csv DIR        # build from merged lineage CSVs
+  python lineage_closure.py --write-edges         # also MERGE LINEAGE_OF edges
+  python lineage_closure.py --lookup EM-001 --as-of 2024-03-31
+"""
+
+import sys, os, csv, json, time, argparse
+from datetime import datetime
+from collections import defaultdict, deque
+
+from query_cache import bump_graph_version
+
+# ── Configuration ────────────────────────────────────────────────────
+NEO4J_URI      = "<YOUR_NEO4J_AURA_URI>"
+NEO4J_USER     = "neo4j"
+NEO4J_PASSWORD = "<YOUR_NEO4J_AURA_PASSWORD>"
+BATCH_SIZE     = 500
+
+SCRIPT_DIR     = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_DIR     = SCRIPT_DIR
+INDEX_PATH     = os.path.join(OUTPUT_DIR, "lineage_closure.json")
+FRACTIONS_PATH = os.path.join(OUTPUT_DIR, "lineage_split_fractions.csv")
+LOG_PATH       = os.path.join(OUTPUT_DIR, "lineage_closure_log.md")
+
+INDEX_VERSION = 2
+
+# Sources of these event types keep existing after the event
+PERSISTING_SOURCE_TYPES = {'TRANSFER'}
+
+LOG_LINES = []
+
+def log(msg):
+    ts = datetime.now().strftime("%H:%M:%S")
+    line = f"[{ts}] {msg}"
+    print(line, flush=True)
+    LOG_LINES.append(line)
+
+def flush_log():
+    with open(LOG_PATH, 'w', encoding='utf-8') as f:
+        f.write("# Lineage Closure Log\n\n")
+        f.write(f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+        f.write("```\n")
+        for line in LOG_LINES:
+            f.write(line + "\n")
+        f.write("```\n")
+
+def batched(iterable, n):
+    for i in range(0, len(iterable), n):
+        yield iterable[i:i+n]
+
+
+# ── Input loading ────────────────────────────────────────────────────
+LINEAGE_CYPHER = """
+MATCH (source:OrgEntity)-[:SOURCE_OF]->(evt:TransformEvent)-[:TARGET_OF]->(target:OrgEntity)
+RETURN source.canonical_id AS source_id, target.canonical_id AS target_id,
+       evt.event_id AS event_id, evt.event_type AS event_type,
+       toString(evt.event_date) AS event_date, evt.political_context AS context
+ORDER BY event_date, event_id
+"""
+
+ENTITY_CYPHER = """
+MATCH (m:OrgEntity)
+RETURN m.canonical_id AS cid, m.name AS name, m.level AS level,
+       toString(m.start_date) AS start_date, toString(m.end_date) AS end_date
+"""
+
+def fetch_from_graph(driver):
+    """Pull OrgEntity nodes and lineage steps from Neo4j."""
+    with driver.session() as s:
+        entities = s.run(ENTITY_CYPHER).data()
+        steps = s.run(LINEAGE_CYPHER).data()
+    return entities, steps
+
+def read_plain_csv(path):
+    try:
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            return list(csv.DictReader(f))
+    except UnicodeDecodeError:
+        with open(path, 'r', encoding='cp1252') as f:
+            return list(csv.DictReader(f))
+
+def fetch_from_csv(csv_dir):
+    """Read the merged lineage CSVs used by ingest_ministry_notebook.py."""
+    org_rows = read_plain_csv(os.path.join(csv_dir, 'org_entities.csv'))
+    evt_rows = read_plain_csv(os.path.join(csv_dir, 'transform_events.csv'))
+    src_rows = read_plain_csv(os.path.join(csv_dir, 'edges_source_of.csv'))
+    tgt_rows = read_plain_csv(os.path.join(csv_dir, 'edges_target_of.csv'))
+
+    entities = [{
+        'cid': r['canonical_id'], 'name': r.get('name'), 'level': r.get('level'),
+        'start_date': r.get('start_date') or None, 'end_date': r.get('end_date') or None,
+    } for r in org_rows]
+
+    events = {r['event_id']: r for r in evt_rows}
+    targets_by_event = defaultdict(list)
+    for r in tgt_rows:
+        targets_by_event[r['event_id']].append(r['target_entity_id'])
+
+    steps = []
+    for r in src_rows:
+        evt = events.get(r['event_id'], {})
+        for tgt in targets_by_event.get(r['event_id'], []):
+            steps.append({
+                'source_id':  r['source_entity_id'],
+                'target_id':  tgt,
+                'event_id':   r['event_id'],
+                'event_type': evt.get('event_type'),
+                'event_date': evt.get('event_date') or None,
+                'context':    evt.get('political_context'),
+            })
+    return entities, steps
+
+def load_fraction_overrides(path=FRACTIONS_PATH):
+    """{(event_id, target_id): fraction} from the optional overrides CSV."""
+    if not os.path.exists(path):
+        return {}
+    overrides = {}
+    for r in read_plain_csv(path):
+        try:
+            overrides[(r['event_id'].strip(), r['target_id'].strip())] = float(r['fraction'])
+        except (KeyError, ValueError, AttributeError):
+            continue
+    return overrides
+
+
+# ── Closure ──────────────────────────────────────────────────────────
+def assign_fractions(steps, overrides=None):
+    """Attach a 'fraction' to every step: explicit override, else equal share per event."""
+    overrides = overrides or {}
+    n_targets = defaultdict(set)
+    for st in steps:
+        n_targets[(st['event_id'], st['source_id'])].add(st['target_id'])
+
+    for st in steps:
+        key = (st['event_id'], st['target_id'])
+        if st.get('fraction') is not None:
+            continue
+        if key in overrides:
+            st['fraction'] = overrides[key]
+        else:
+            st['fraction'] = 1.0 / len(n_targets[(st['event_id'], st['source_id'])])
+    return steps
+
+def build_adjacency(steps):
+    """source_id -> list of steps, ordered by event date."""
+    adj = defaultdict(list)
+    for st in steps:
+        if st['source_id'] and st['target_id'] and st['source_id'] != st['target_id']:
+            adj[st['source_id']].append(st)
+    for out in adj.values():
+        out.sort(key=lambda st: (st.get('event_date') or '', st['event_id']))
+    return adj
+
+def _settle_order(start, succ, key):
+    """States reachable from start, in topological order of their strongly
+    connected components (iterative Tarjan); states within one component,
+    i.e. a same-date cycle, are ordered by key."""
+    index, low, stack, on_stack, components = {start: 0}, {start: 0}, [start], {start}, []
+    work = [(start, iter(succ[start]))]
+    while work:
+        node, edges = work[-1]
+        for _, nxt in edges:
+            if nxt not in index:
+                index[nxt] = low[nxt] = len(index)
+                stack.append(nxt)
+                on_stack.add(nxt)
+                work.append((nxt, iter(succ[nxt])))
+                break
+            if nxt in on_stack:
+                low[node] = min(low[node], index[nxt])
+        else:
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    state = stack.pop()
+                    on_stack.discard(state)
+                    component.append(state)
+                    if state == node:
+                        break
+                components.append(sorted(component, key=key))
+    return [state for component in reversed(components) for state in component]
+
+def _walk(root, adj):
+    """All descendants of root with summed fraction, the fraction arriving
+at each date, and the dominant path.
+
+    Steps are only followed forward in time (event dates non-decreasing),
+    and funding never re-enters an entity it already passed through, which
+    keeps rename-back cycles from looping. The walk is over (entity, arrival
+    date) states, each settled once in topological order, so a diamond in
+    the DAG merges its branches instead of enumerating every path.
+    """
+    start = (root, '')
+    succ = defaultdict(list)
+    depth = {start: 0}
+    queue = deque([start])
+    while queue:
+        state = queue.popleft()
+        node, last_date = state
+        for st in adj.get(node, ()):
+            d = st.get('event_date') or ''
+            tgt = st['target_id']
+            if tgt == root or (last_date and d and d < last_date):
+                continue
+            nxt = (tgt, d or last_date)
+            succ[state].append((st, nxt))
+            if nxt not in depth:
+                depth[nxt] = depth[state] + 1
+                queue.append(nxt)
+
+    mass = {start: 1.0}
+    best = {start: ((), 1.0)}                  # dominant path and its fraction
+    through = {start: frozenset([root])}       # entities on any path into the state
+    settled = set()
+    for state in _settle_order(start, succ, key=lambda s: (depth[s], s[0])):
+        settled.add(state)
+        if state not in mass:                  # only reachable through a dropped cycle step
+            continue
+        frac, (path, path_frac), seen = mass[state], best[state], through[state]
+        for st, nxt in succ[state]:
+            if nxt in settled or nxt[0] in seen:
+                continue
+            p, f = path + (st,), path_frac * st['fraction']
+            mass[nxt] = mass.get(nxt, 0.0) + frac * st['fraction']
+            b = best.get(nxt)
+            if b is None or f > b[1] or (f == b[1] and len(p) < len(b[0])):
+                best[nxt] = (p, f)
+            through[nxt] = through.get(nxt, frozenset([nxt[0]])) | seen
+
+    reached = {}
+    for state in mass:
+        if state == start:
+            continue
+        entry = reached.get(state[0])
+        if entry is None:
+            reached[state[0]] = entry = {'fraction': 0.0, 'arrivals': defaultdict(float),
+                                         'best': None, 'best_frac': -1.0}
+        entry['fraction'] += mass[state]
+        entry['arrivals'][state[1]] += mass[state]
+        p, f = best[state]
+        if f > entry['best_frac'] or (f == entry['best_frac'] and len(p) < len(entry['best'])):
+            entry['best'], entry['best_frac'] = p, f
+    return reached
+
+def build_closure(entities, steps, overrides=None, source_label='neo4j'):
+    """Build the full closure index dict from entity and step lists."""
+    assign_fractions(steps, overrides)
+    adj = build_adjacency(steps)
+
+    ents = {}
+    for e in entities:
+        if e.get('cid'):
+            ents[e['cid']] = {'name': e.get('name'), 'level': e.get('level'), 'ended': None}
+    for st in steps:
+        for cid in (st['source_id'], st['target_id']):
+            ents.setdefault(cid, {'name': None, 'level': None, 'ended': None})
+        if (st.get('event_type') or '').upper() not in PERSISTING_SOURCE_TYPES and st.get('event_date'):
+            ent = ents[st['source_id']]
+            if ent['ended'] is None or st['event_date'] < ent['ended']:
+                ent['ended'] = st['event_date']
+
+    descendants = {}
+    ancestors = defaultdict(list)
+    for cid in sorted(adj):
+        reached = _walk(cid, adj)
+        if not reached:
+            continue
+        out = {}
+        for tgt, entry in sorted(reached.items()):
+            path = entry['best']
+            dates = [st.get('event_date') for st in path]
+            known = [d for d in dates if d]
+            out[tgt] = {
+                'fraction':       round(entry['fraction'], 6),
+                'arrivals':       {d: round(f, 6) for d, f in sorted(entry['arrivals'].items())},
+                'hops':           len(path),
+                'events':         [st['event_id'] for st in path],
+                'event_types':    [st.get('event_type') for st in path],
+                'dates':          dates,
+                'step_fractions': [round(st['fraction'], 6) for st in path],
+                'first_date':     min(known) if known else None,
+                'last_date':      max(known) if known else None,
+            }
+            ancestors[tgt].append(cid)
+        descendants[cid] = out
+
+    return {
+        'version':     INDEX_VERSION,
+        'built_at':    datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'source':      source_label,
+        'n_steps':     len(steps),
+        'entities':    ents,
+        'descendants': descendants,
+        'ancestors':   {k: sorted(v) for k, v in ancestors.items()},
+    }
+
+
+# ── Lookup API ───────────────────────────────────────────────────────
+class LineageIndex:
+    """Constant-time successor/predecessor lookups over a saved closure."""
+
+    def __init__(self, index):
+        self.index = index
+        self.entities = index['entities']
+        self._desc = index['descendants']
+        self._anc = index['ancestors']
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def save(self, path=INDEX_PATH):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, separators=(',', ':'))
+        return path
+
+    def name(self, cid):
+        return (self.entities.get(cid) or {}).get('name') or cid
+
+    def descendants(self, cid):
+        """{descendant_id: entry} for every entity downstream of cid."""
+        return self._desc.get(cid, {})
+
+    def ancestors(self, cid):
+        """{ancestor_id: entry} for every entity upstream of cid."""
+        return {a: self._desc[a][cid] for a in self._anc.get(cid, ())}
+
+    def path(self, ancestor, descendant):
+        return self._desc.get(ancestor, {}).get(descendant)
+
+    def is_active(self, cid, as_of):
+        ended = (self.entities.get(cid) or {}).get('ended')
+        return ended is None or ended > as_of
+
+    def successors_as_of(self, cid, as_of):
+        """Entities cid's mandate had landed in by as_of, with funding share.
+
+        Returns {cid: fraction}: the share arriving over every path whose
+        last event is dated on or before as_of (the per-date 'arrivals'),
+        not the best path's date alone. An entity that was never
+        restructured by as_of maps to itself with fraction 1.0.
+        """
+        if self.is_active(cid, as_of):
+            return {cid: 1.0}
+        out = {}
+        for tgt, entry in self.descendants(cid).items():
+            if not self.is_active(tgt, as_of):
+                continue
+            arrivals = entry.get('arrivals')
+            if arrivals is None:               # index built before INDEX_VERSION 2
+                arrivals = {entry['last_date'] or '': entry['fraction']}
+            frac = sum(f for d, f in arrivals.items() if not d or d <= as_of)
+            if frac > 0:
+                out[tgt] = round(frac, 6)
+        return out
+
+
+# ── Graph write-back ─────────────────────────────────────────────────
+def write_lineage_edges(driver, index):
+    """MERGE (ancestor)-[:LINEAGE_OF]->(descendant) shortcut edges, then bump the graph version."""
+    params = []
+    for anc, out in index['descendants'].items():
+        for desc, e in out.items():
+            params.append({
+                'anc': anc, 'desc': desc,
+                'fraction': e['fraction'], 'hops': e['hops'],
+                'event_path': e['events'], 'first_date': e['first_date'],
+                'last_date': e['last_date'],
+            })
+
+    n = 0
+    with driver.session() as s:
+        s.run("MATCH ()-[l:LINEAGE_OF]->() DELETE l")
+        for batch in batched(params, BATCH_SIZE):
+            s.run("""
+                UNWIND $items AS p
+                MATCH (a:OrgEntity {canonical_id: p.anc})
+                MATCH (d:OrgEntity {canonical_id: p.desc})
+                MERGE (a)-[l:LINEAGE_OF]->(d)
+                SET l.fraction   = p.fraction,
+                    l.hops       = p.hops,
+                    l.event_path = p.event_path,
+                    l.first_date = p.first_date,
+                    l.last_date  = p.last_date
+            """, items=batch)
+            n += len(batch)
+    bump_graph_version(driver, 'lineage_closure')
+    return n
+
+
+# ── Main ─────────────────────────────────────────────────────────────
+def main():
+    sys.stdout.reconfigure(encoding='utf-8')
+    sys.stderr.reconfigure(encoding='utf-8')
+
+    ap = argparse.ArgumentParser(description="Build the ministry lineage closure index.")
+    ap.add_argument('--from-csv', metavar='DIR', help="build from merged lineage CSVs instead of Neo4j")
+    ap.add_argument('--write-edges', action='store_true', help="MERGE LINEAGE_OF shortcut edges")
+    ap.add_argument('--lookup', metavar='CID', help="print descendants of CID from the saved index")
+    ap.add_argument('--as-of', metavar='DATE', help="with --lookup: where CID had landed by DATE")
+    args = ap.parse_args()
+
+    if args.lookup:
+        idx = LineageIndex.load()
+        if args.as_of:
+            for cid, frac in sorted(idx.successors_as_of(args.lookup, args.as_of).items()):
+                print(f"{cid}\t{idx.name(cid)}\t{frac:.4f}")
+        else:
+            for cid, e in sorted(idx.descendants(args.lookup).items()):
+                print(f"{cid}\t{idx.name(cid)}\t{e['fraction']:.4f}\t{' > '.join(e['events'])}")
+        return
+
+    t_start = time.time()
+    log("=" * 72)
+    log("LINEAGE CLOSURE INDEX -- START")
+    log("=" * 72)
+
+    driver = None
+    if args.from_csv:
+        entities, steps = fetch_from_csv(args.from_csv)
+        source_label = f"csv:{args.from_csv}"
+        log(f"Loaded lineage CSVs from {args.from_csv}")
+    else:
+        from graph_client import GraphClient
+        driver = GraphClient(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+        log("Connected to Neo4j Aura")
+        entities, steps = fetch_from_graph(driver)
+        source_label = 'neo4j'
+    log(f"  OrgEntity nodes: {len(entities)}")
+    log(f"  Lineage steps (source -> event -> target): {len(steps)}")
+
+    overrides = load_fraction_overrides()
+    log(f"  Explicit split fractions: {len(overrides)}")
+
+    t0 = time.time()
+    index = build_closure(entities, steps, overrides, source_label)
+    n_pairs = sum(len(v) for v in index['descendants'].values())
+    log(f"  Closure pairs: {n_pairs} from {len(index['descendants'])} ancestors")
+    log(f"  Built in {time.time()-t0:.2f}s")
+
+    path = LineageIndex(index).save()
+    log(f"  Wrote {path} ({os.path.getsize(path):,} bytes)")
+
+    if args.write_edges:
+        if driver is None:
+            from graph_client import GraphClient
+            driver = GraphClient(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+        t0 = time.time()
+        n = write_lineage_edges(driver, index)
+        log(f"  Merged {n} LINEAGE_OF edges in {time.time()-t0:.1f}s")
+
+    if driver is not None:
+        driver.close()
+
+    log(f"Total elapsed: {time.time()-t_start:.1f}s")
+    flush_log()
+    print(f"\nLog written to: {LOG_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+"""
+Cypher Query Result Cache
+Operation Lineage Audit
+
+Caches read-only Cypher results on local disk, keyed on the query text
+(whitespace-normalized) and its parameters, and scoped to the graph
+version recorded on a single marker node:
+
+    (:GraphVersion {key: 'lineage-audit', version, updated_at, updated_by})
+
+Every script that writes to the graph calls bump_graph_version() when its
+writes are done, which increments the version and so invalidates every
+cached result at once. Readers pay one small marker lookup per run instead
+of re-running the schema probes and heavy governance queries against Aura.
+
+If the marker node does not exist yet (graph built before this cache),
+results are never cached -- run `python query_cache.py bump` once.
+
+Usage:
+  python query_cache.py status   # marker + cache size
+  python query_cache.py bump     # mark the graph as changed
+  python query_cache.py clear    # drop all cached results
+"""
+
+import sys, os, json, pickle, shutil, hashlib, argparse, re
+from datetime import datetime
+
+# ── Configuration ────────────────────────────────────────────────────
+NEO4J_URI      = "<YOUR_NEO4J_AURA_URI>"
+NEO4J_USER     = "neo4j"
+NEO4J_PASSWORD = "<YOUR_NEO4J_AURA_PASSWORD>"
+
+SCRIPT_DIR  = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR   = os.path.join(SCRIPT_DIR, "query_cache")
+GRAPH_KEY   = "lineage-audit"
+
+BUMP_CYPHER = """
+    MERGE (v:GraphVersion {key: $key})
+    SET v.version = coalesce(v.version, 0) + 1,
+        v.updated_at = datetime(),
+        v.updated_by = $writer
+    RETURN v.version AS version, toString(v.updated_at) AS updated_at, v.updated_by AS updated_by
+"""
+
+READ_CYPHER = """
+    MATCH (v:GraphVersion {key: $key})
+    RETURN v.version AS version, toString(v.updated_at) AS updated_at, v.updated_by AS updated_by
+"""
+
+_WS = re.compile(r'\s+')
+
+
+def log(msg):
+    ts = datetime.now().strftime("%H:%M:%S")
+    print(f"[{ts}] {msg}", flush=True)
+
+
+# ── Graph-version marker ─────────────────────────────────────────────
+def bump_graph_version(driver, writer):
+    """Record that `writer` changed the graph; invalidates all cached results."""
+    with driver.session() as s:
+        marker = s.run(BUMP_CYPHER, key=GRAPH_KEY, writer=writer).single().data()
+    log(f"  Graph version -> {marker['version']} ({writer})")
+    return marker
+
+def read_graph_version(driver):
+    """Marker as a dict, or None when the graph has never been bumped."""
+    with driver.session() as s:
+        rec = s.run(READ_CYPHER, key=GRAPH_KEY).single()
+    return rec.data() if rec else None
+
+
+# ── Cache ────────────────────────────────────────────────────────────
+def query_key(cypher, params=None):
+    norm = _WS.sub(' ', cypher).strip()
+    raw = json.dumps({"q": norm, "p": params or {}}, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class CachedCypher:
+    """Read-only Cypher execution with a per-graph-version result cache.
+
+    run() returns `session.run(...).data()`; single() returns the first
+    record as a dict (or None). Pass enabled=False to always hit Neo4j.
+    """
+
+    def __init__(self, driver, cache_dir=CACHE_DIR, enabled=True):
+        self.driver = driver
+        self.cache_dir = cache_dir
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._marker = False   # not read yet
+        self._memory = {}
+
+    @property
+    def marker(self):
+        if self._marker is False:
+            self._marker = read_graph_version(self.driver) if self.enabled else None
+            if self.enabled and self._marker is None:
+                log("  No GraphVersion marker in graph -- query cache disabled "
+                    "(run: python query_cache.py bump)")
+        return self._marker
+
+    def _version_dir(self):
+        return os.path.join(self.cache_dir, f"v{self.marker['version']}")
+
+    def _prune(self, keep):
+        """Drop result directories for older graph versions."""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for d in os.listdir(self.cache_dir):
+            if d != keep and d.startswith('v'):
+                shutil.rmtree(os.path.join(self.cache_dir, d), ignore_errors=True)
+
+    def run(self, cypher, **params):
+        if self.marker is None:
+            self.misses += 1
+            return self._fetch(cypher, params)
+
+        key = query_key(cypher, params)
+        if key in self._memory:
+            self.hits += 1
+            return self._memory[key]
+
+        vdir = self._version_dir()
+        path = os.path.join(vdir, f"{key}.pkl")
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                rows = pickle.load(f)
+            self.hits += 1
+        else:
+            rows = self._fetch(cypher, params)
+            if not os.path.isdir(vdir):
+                self._prune(os.path.basename(vdir))
+                os.makedirs(vdir, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, 'wb') as f:
+                pickle.dump(rows, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+            self.misses += 1
+        self._memory[key] = rows
+        return rows
+
+    def single(self, cypher, **params):
+        rows = self.run(cypher, **params)
+        return rows[0] if rows else None
+
+    def _fetch(self, cypher, params):
+        if hasattr(self.driver, 'read'):   # GraphClient: routed, retried, timed
+            return self.driver.read(cypher, params)
+        with self.driver.session() as s:
+            return s.run(cypher, **params).data()
+
+    def summary(self):
+        total = self.hits + self.misses
+        state = (f"graph version {self.marker['version']}" if self.marker
+                 else "disabled")
+        return f"query cache ({state}): {self.hits}/{total} hits"
+
+
+def main():
+    sys.stdout.reconfigure(encoding='utf-8')
+
+    ap = argparse.ArgumentParser(description="Graph-version scoped Cypher result cache.")
+    ap.add_argument('command', choices=['status', 'bump', 'clear'])
+    ap.add_argument('--cache-dir', default=CACHE_DIR)
+    ap.add_argument('--writer', default='manual', help="with bump: recorded as updated_by")
+    args = ap.parse_args()
+
+    if args.command == 'clear':
+        shutil.rmtree(args.cache_dir, ignore_errors=True)
+        log(f"Cleared {args.cache_dir}")
+        return
+
+    from graph_client import GraphClient
+    driver = GraphClient(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+    try:
+        if args.command == 'bump':
+            bump_graph_version(driver, args.writer)
+            return
+        marker = read_graph_version(driver)
+        log(f"Marker: {marker}")
+        if os.path.isdir(args.cache_dir):
+            for d in sorted(os.listdir(args.cache_dir)):
+                n = len(os.listdir(os.path.join(args.cache_dir, d)))
+                log(f"  {d}: {n} cached results")
+    finally:
+        driver.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+#!/usr/bin/env python
+"""
+Streaming Cypher Result Export
+Operation Lineage Audit
+
+Writes a Cypher result straight from the Bolt cursor to CSV or Parquet,
+FETCH_SIZE records at a time, without building the list of dicts that
+`.data()` returns. Memory stays flat however many rows come back, and the
+first rows are on disk as soon as the first batch arrives.
+
+Parquet column types are inferred from the first rows that carry a value
+in every column (columns still empty after INFER_ROWS start as strings),
+and every later batch is cast to that schema. A batch that does not fit
+widens it (first values in an empty column, int -> float); the rows
+already written are then rewritten under the wider schema. Types that do
+not unify (string vs int) need an explicit schema.
+
+Value conversion (both formats):
+  neo4j Date/DateTime/Time  -> Python date/datetime/time (ISO text in CSV)
+  Duration, Point, nodes    -> str()
+  lists                     -> Parquet list columns; '|'-joined in CSV,
+                               as in the 03-governance-queries CSVs
+
+Usage:
+  python result_export.py org_era_funding  org_era_funding.parquet
+  python result_export.py lineage_chains   lineage_chains.csv
+  python result_export.py --cypher-file q.cypher out.parquet [--fetch-size 5000]
+"""
+
+import sys, os, csv, time, argparse
+from datetime import datetime
+
+# ── Configuration ────────────────────────────────────────────────────
+NEO4J_URI      = "<YOUR_NEO4J_AURA_URI>"
+NEO4J_USER     = "neo4j"
+NEO4J_PASSWORD = "<YOUR_NEO4J_AURA_PASSWORD>"
+
+FETCH_SIZE  = 5000     # records per Bolt PULL, and per writer batch
+INFER_ROWS  = 50_000   # max rows buffered while inferring Parquet types
+LIST_SEP    = '|'
+
+# Named exports too large to materialize on a national graph
+EXPORTS = {
+    "org_era_funding": """
+        MATCH (o:Organization)-[g:RECEIVED_GRANT]->(:OrgEntity)
+        WHERE o.bn IS NOT NULL
+        WITH o, g.political_era AS era, sum(g.amount) AS total, count(g) AS n_grants
+        RETURN o.bn AS bn, o.name AS name, o.cluster_id AS cluster_id,
+               era, total, n_grants
+        ORDER BY bn, era
+    """,
+    "lineage_chains": """
+        MATCH path = (root:OrgEntity)-[:SOURCE_OF|TARGET_OF*2..]->(leaf:OrgEntity)
+        WHERE NOT ()-[:TARGET_OF]->(root)
+          AND NOT (leaf)-[:SOURCE_OF]->()
+        RETURN root.canonical_id AS root_id, leaf.canonical_id AS leaf_id,
+               [n IN nodes(path) WHERE n:OrgEntity | n.name] AS chain,
+               [n IN nodes(path) WHERE n:TransformEvent | n.event_id] AS events,
+               [n IN nodes(path) WHERE n:TransformEvent | toString(n.event_date)] AS event_dates
+    """,
+}
+
+def log(msg):
+    ts = datetime.now().strftime("%H:%M:%S")
+    print(f"[{ts}] {msg}", flush=True)
+
+
+# ── Cursor -> batches ────────────────────────────────────────────────
+def _native(v):
+    if v is None or isinstance(v, (str, int, float, bool)):
+        return v
+    if isinstance(v, list):
+        return [_native(x) for x in v]
+    if isinstance(v, dict):
+        return {k: _native(x) for k, x in v.items()}
+    to_native = getattr(v, 'to_native', None)
+    if to_native is not None:
+        try:
+            return to_native()
+        except (ValueError, OverflowError):
+            pass
+    return str(v)
+
+def stream_batches(driver, cypher, params=None, fetch_size=FETCH_SIZE):
+    """Yield the result keys, then lists of value tuples, fetch_size rows each."""
+    with driver.session(fetch_size=fetch_size) as s:
+        result = s.run(cypher, params or {})
+        yield list(result.keys())
+        batch = []
+        for rec in result:
+            batch.append(tuple(_native(v) for v in rec.values()))
+            if len(batch) >= fetch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+# ── Writers ──────────────────────────────────────────────────────────
+def _csv_cell(v):
+    if isinstance(v, list):
+        return LIST_SEP.join('' if x is None else str(x) for x in v)
+    if hasattr(v, 'isoformat'):
+        return v.isoformat()
+    return v
+
+def export_csv(driver, cypher, path, params=None, fetch_size=FETCH_SIZE):
+    """Stream a query result to CSV. Returns the row count."""
+    batches = stream_batches(driver, cypher, params, fetch_size)
+    keys = next(batches)
+    n = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(keys)
+        for batch in batches:
+            writer.writerows([_csv_cell(v) for v in row] for row in batch)
+            n += len(batch)
+    return n
+
+def _infer_schema(keys, rows):
+    """Schema of the rows, and the columns typed as string only because they were all null."""
+    import pyarrow as pa
+
+    fields, placeholders = [], set()
+    for i, k in enumerate(keys):
+        t = pa.array([r[i] for r in rows]).type
+        if pa.types.is_null(t):
+            t = pa.string()
+            placeholders.add(i)
+        fields.append(pa.field(k, t))
+    return pa.schema(fields), placeholders
+
+def _all_typed(rows, width):
+    seen = [False] * width
+    for r in rows:
+        for i, v in enumerate(r):
+            if v is not None:
+                seen[i] = True
+    return all(seen)
+
+def _widened(field, t):
+    """The field widened to also hold type t (null -> anything, int -> float, ...), or None."""
+    import pyarrow as pa
+
+    try:
+        return pa.unify_schemas([pa.schema([field]), pa.schema([pa.field(field.name, t)])],
+                                promote_options='permissive').field(0)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return None
+
+def export_parquet(driver, cypher, path, params=None, fetch_size=FETCH_SIZE, schema=None):
+    """Stream a query result to Parquet. Returns (row count, schema).
+
+    An inferred schema is widened when a later batch needs it (a column
+    that was all null gets its first values, ints turn into floats): the
+    rows already written are rewritten under the wider schema, one row
+    group at a time. An explicit schema is never changed.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    batches = stream_batches(driver, cypher, params, fetch_size)
+    keys = next(batches)
+    explicit = schema is not None
+    placeholders = set()
+    partial = path + '.partial'
+    writer, pending, n = None, [], 0
+
+    def arrays(rows):
+        cols = [list(c) for c in zip(*rows)] if rows else [[] for _ in keys]
+        if explicit:
+            try:
+                return [pa.array(values, type=f.type) for values, f in zip(cols, schema)]
+            except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, OverflowError) as e:
+                raise ValueError(f"rows after {n:,} do not fit the given schema") from e
+        out, wider = [], schema
+        for i, (values, field) in enumerate(zip(cols, schema)):
+            try:
+                arr = pa.array(values)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, OverflowError) as e:
+                raise ValueError(f"column {field.name!r} mixes types after {n:,} rows; "
+                                 f"pass an explicit schema") from e
+            if i in placeholders and arr.null_count < len(arr):
+                placeholders.discard(i)
+                field = pa.field(field.name, pa.null())
+            if arr.type != field.type:
+                field = _widened(field, arr.type)
+                if field is None:
+                    raise ValueError(f"column {schema[i].name!r} no longer fits type {schema[i].type} "
+                                     f"after {n:,} rows; pass an explicit schema")
+                wider = wider.set(i, field)
+            out.append(arr)
+        if wider != schema:
+            promote(wider)
+        return [arr.cast(f.type) for arr, f in zip(out, schema)]
+
+    def promote(wider):
+        nonlocal writer, schema
+        log(f"  Widening Parquet schema after {n:,} rows: "
+            + ', '.join(f"{a.name} {a.type} -> {b.type}" for a, b in zip(schema, wider) if a != b))
+        schema = wider
+        if writer is None:
+            return
+        writer.close()
+        written = partial + '.old'
+        os.replace(partial, written)
+        writer = pq.ParquetWriter(partial, schema)
+        for rb in pq.ParquetFile(written).iter_batches():
+            writer.write_table(pa.Table.from_batches([rb]).cast(schema))
+        os.remove(written)
+
+    def write(rows):
+        nonlocal writer
+        cols = arrays(rows)
+        if writer is None:
+            writer = pq.ParquetWriter(partial, schema)
+        writer.write_table(pa.Table.from_arrays(cols, schema=schema))
+
+    try:
+        for batch in batches:
+            if writer is None:
+                pending.extend(batch)
+                if not explicit and not _all_typed(pending, len(keys)) and len(pending) < INFER_ROWS:
+                    continue
+                if not explicit:
+                    schema, placeholders = _infer_schema(keys, pending)
+                write(pending)
+                n += len(pending)
+                pending = None
+            else:
+                write(batch)
+                n += len(batch)
+        if writer is None:
+            if not explicit:
+                schema, placeholders = _infer_schema(keys, pending)
+            write(pending)
+            n += len(pending)
+        writer.close()
+        writer = None
+        os.replace(partial, path)
+    finally:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(partial):
+            os.remove(partial)
+    return n, schema
+
+def export(driver, cypher, path, params=None, fetch_size=FETCH_SIZE):
+    """CSV or Parquet by file extension. Returns the row count."""
+    if path.endswith('.parquet'):
+        return export_parquet(driver, cypher, path, params, fetch_size)[0]
+    return export_csv(driver, cypher, path, params, fetch_size)
+
+
+def main():
+    sys.stdout.reconfigure(encoding='utf-8')
+
+    ap = argparse.ArgumentParser(description="Stream a Cypher result to CSV or Parquet.")
+    ap.add_argument('query', nargs='?', choices=sorted(EXPORTS), help="named export")
+    ap.add_argument('out', help="output path (.csv or .parquet)")
+    ap.add_argument('--cypher-file', help="run the Cypher in this file instead of a named export")
+    ap.add_argument('--fetch-size', type=int, default=FETCH_SIZE)
+    args = ap.parse_args()
+
+    if args.cypher_file:
+        with open(args.cypher_file, encoding='utf-8') as f:
+            cypher = f.read()
+    elif args.query:
+        cypher = EXPORTS[args.query]
+    else:
+        ap.error("give a named export or --cypher-file")
+
+    from graph_client import GraphClient
+    driver = GraphClient(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+    try:
+        t0 = time.time()
+        n = export(driver, cypher, args.out, fetch_size=args.fetch_size)
+        log(f"Wrote {n:,} rows to {args.out} in {time.time()-t0:.1f}s")
+    finally:
+        driver.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python
+"""
+Temporal Grant-Graph Projections
+Operation Lineage Audit
+
+RECEIVED_GRANT edges carry fiscal_year and political_era as properties, so
+every temporal question filters the whole edge set. This builds, once per
+graph snapshot (graph_snapshot.py), a compact edge index sorted by
+(fiscal_year, era): integer org / ministry ids plus amount and payment
+count, with an offset table per (fiscal_year, political_era) group.
+
+Eras run in order, so a fiscal year, an era, and "everything up to year Y"
+are each one contiguous range of that index: a slice is a pair of array
+views, not a filter.
+
+    from temporal_graph import graph_as_of, TemporalGraph
+
+    g2017 = graph_as_of(2017)                       # fiscal year 2017 only
+    upto  = graph_as_of(2017, cumulative=True)      # 2010 .. 2017
+    tg    = TemporalGraph.load()
+    ndp, kenney = tg.era('NDP'), tg.era('UCP_Kenney')
+    ndp.matrix()             # orgs x ministries CSR of summed amounts
+    kenney.funding_by_org()  # Series bn -> amount
+    ndp.frame()              # snapshot-shaped grant rows for the slice
+
+The index is stored next to the snapshot tables as temporal.npz and
+rebuilt when the snapshot id changes.
+
+Usage:
+  python temporal_graph.py build [--root DIR] [--version V]
+  python temporal_graph.py info  [--root DIR] [--version V]
+"""
+
+import sys, os, json, time, argparse
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from graph_snapshot import SNAPSHOT_DIR, resolve_snapshot, read_manifest, load_snapshot
+
+# ── Configuration ────────────────────────────────────────────────────
+INDEX_NAME    = "temporal.npz"
+INDEX_VERSION = 1
+
+def log(msg):
+    ts = datetime.now().strftime("%H:%M:%S")
+    print(f"[{ts}] {msg}", flush=True)
+
+
+# ── Slices ───────────────────────────────────────────────────────────
+class GrantSlice:
+    """The grant edges of one or more (fiscal_year, era) groups."""
+
+    def __init__(self, graph, groups):
+        self.graph = graph
+        self.groups = groups
+        ranges = _merge_ranges([(graph.offsets[i], graph.offsets[i + 1]) for i in groups])
+        cols = ('org', 'ministry', 'amount', 'n_payments', 'group')
+        if len(ranges) == 1:
+            lo, hi = ranges[0]
+            for c in cols:
+                setattr(self, c, getattr(graph, c)[lo:hi])
+        else:
+            for c in cols:
+                arr = getattr(graph, c)
+                setattr(self, c, np.concatenate([arr[lo:hi] for lo, hi in ranges]) if ranges
+                        else arr[:0])
+
+    def __len__(self):
+        return len(self.org)
+
+    @property
+    def fiscal_years(self):
+        return sorted({str(self.graph.group_fy[i]) for i in self.groups})
+
+    @property
+    def eras(self):
+        return list(dict.fromkeys(str(self.graph.group_era[i]) for i in self.groups))
+
+    def matrix(self, weight='amount'):
+        """Orgs x ministries CSR (rows: graph.bns, cols: graph.ministries), duplicates summed."""
+        data = getattr(self, weight) if weight else np.ones(len(self))
+        return sparse.csr_matrix((data, (self.org, self.ministry)),
+                                 shape=(len(self.graph.bns), len(self.graph.ministries)))
+
+    def funding_by_org(self):
+        sums = np.bincount(self.org, weights=self.amount, minlength=len(self.graph.bns))
+        active = np.unique(self.org)
+        return pd.Series(sums[active], index=self.graph.bns[active], name='amount')
+
+    def funding_by_ministry(self):
+        sums = np.bincount(self.ministry, weights=self.amount, minlength=len(self.graph.ministries))
+        active = np.unique(self.ministry)
+        return pd.Series(sums[active], index=self.graph.ministries[active], name='amount')
+
+    def orgs(self):
+        return self.graph.bns[np.unique(self.org)]
+
+    def frame(self):
+        """Rows shaped like the snapshot grants table (bn, ministry_id, fiscal_year, ...)."""
+        g = self.graph
+        return pd.DataFrame({
+            'bn':            g.bns[self.org],
+            'ministry_id':   g.ministries[self.ministry],
+            'fiscal_year':   g.group_fy[self.group],
+            'political_era': g.group_era[self.group],
+            'amount':        self.amount,
+            'n_payments':    self.n_payments,
+        })
+
+def _merge_ranges(ranges):
+    out = []
+    for lo, hi in sorted(ranges):
+        if hi <= lo:
+            continue
+        if out and lo <= out[-1][1]:
+            out[-1] = (out[-1][0], max(out[-1][1], hi))
+        else:
+            out.append((lo, hi))
+    return out
+
+
+# ── Index ────────────────────────────────────────────────────────────
+class TemporalGraph:
+    """Grant edges grouped by (fiscal_year, political_era), one contiguous run per group."""
+
+    ARRAYS = ('bns', 'ministries', 'group_fy', 'group_era', 'offsets',
+              'org', 'ministry', 'amount', 'n_payments', 'group')
+
+    def __init__(self, arrays, snapshot_id=None):
+        for name in self.ARRAYS:
+            setattr(self, name, arrays[name])
+        self.snapshot_id = snapshot_id
+        self._by_fy = {}
+        self._by_era = {}
+        for i, (fy, era) in enumerate(zip(self.group_fy.tolist(), self.group_era.tolist())):
+            self._by_fy.setdefault(fy, []).append(i)
+            self._by_era.setdefault(era, []).append(i)
+
+    @classmethod
+    def from_grants(cls, grants, snapshot_id=None):
+        """Index a snapshot grants table."""
+        org, bns = pd.factorize(grants['bn'], sort=True)
+        ministry, ministries = pd.factorize(grants['ministry_id'].fillna(''), sort=True)
+        fy = grants['fiscal_year'].fillna('').astype(str).to_numpy()
+        era = grants['political_era'].fillna('').astype(str).to_numpy()
+
+        # Eras in order of their first fiscal year, so each era is one run
+        first = pd.Series(fy).groupby(era).min().sort_values(kind='stable')
+        era_rank = pd.Series(np.arange(len(first)), index=first.index)
+        keys = pd.DataFrame({'fy': fy, 'rank': era_rank.reindex(era).to_numpy(), 'era': era})
+        gid, groups = pd.factorize(pd.MultiIndex.from_frame(keys[['fy', 'rank', 'era']]), sort=True)
+        order = np.argsort(gid, kind='stable')
+        counts = np.bincount(gid, minlength=len(groups))
+        arrays = {
+            'bns':        np.asarray(bns, dtype=str),
+            'ministries': np.asarray(ministries, dtype=str),
+            'group_fy':   np.asarray(groups.get_level_values(0), dtype=str),
+            'group_era':  np.asarray(groups.get_level_values(2), dtype=str),
+            'offsets':    np.concatenate([[0], np.cumsum(counts)]).astype(np.int64),
+            'org':        org[order].astype(np.int32),
+            'ministry':   ministry[order].astype(np.int32),
+            'amount':     grants['amount'].fillna(0).to_numpy(dtype=np.float64)[order],
+            'n_payments': grants['n_payments'].fillna(0).to_numpy(dtype=np.int32)[order],
+            'group':      gid[order].astype(np.int32),
+        }
+        return cls(arrays, snapshot_id)
+
+    @classmethod
+    def load(cls, path=SNAPSHOT_DIR, version=None, rebuild=False):
+        """The index for one snapshot version, built and saved on first use."""
+        vdir = resolve_snapshot(path, version)
+        manifest = read_manifest(vdir)
+        index_path = os.path.join(vdir, INDEX_NAME)
+        if not rebuild and os.path.exists(index_path):
+            with np.load(index_path, allow_pickle=False) as z:
+                meta = json.loads(str(z['meta']))
+                if (meta.get('snapshot_id') == manifest['snapshot_id']
+                        and meta.get('index_version') == INDEX_VERSION):
+                    return cls({n: z[n] for n in cls.ARRAYS}, manifest['snapshot_id'])
+        _, tables = load_snapshot(vdir, tables=['grants'])
+        graph = cls.from_grants(tables['grants'], manifest['snapshot_id'])
+        graph.save(index_path)
+        return graph
+
+    def save(self, path):
+        meta = json.dumps({'snapshot_id': self.snapshot_id, 'index_version': INDEX_VERSION})
+        tmp = path + '.tmp.npz'
+        np.savez(tmp, meta=np.array(meta), **{n: getattr(self, n) for n in self.ARRAYS})
+        os.replace(tmp, path)
+
+    # ── Slices ───────────────────────────────────────────────────────
+    @property
+    def fiscal_years(self):
+        return sorted(self._by_fy)
+
+    @property
+    def eras(self):
+        return list(self._by_era)
+
+    def era(self, *eras):
+        """Edges paid in the given political era(s)."""
+        missing = [e for e in eras if e not in self._by_era]
+        if missing:
+            raise KeyError(f"Unknown era(s) {missing}; have {self.eras}")
+        return GrantSlice(self, [i for e in eras for i in self._by_era[e]])
+
+    def fiscal_year(self, year):
+        return GrantSlice(self, self._by_fy.get(str(year), []))
+
+    def as_of(self, year, cumulative=False):
+        """Fiscal year `year`, or with cumulative every fiscal year up to it."""
+        year = str(year)
+        if not cumulative:
+            return self.fiscal_year(year)
+        return GrantSlice(self, [i for i, fy in enumerate(self.group_fy) if fy and fy <= year])
+
+    def slice(self, era=None, fiscal_year=None):
+        """Groups matching both filters (either may be None)."""
+        groups = [i for i, (fy, e) in enumerate(zip(self.group_fy, self.group_era))
+                  if (era is None or e == era) and (fiscal_year is None or fy == str(fiscal_year))]
+        return GrantSlice(self, groups)
+
+    def summary(self):
+        """(fiscal_year, era, edges, amount) per group."""
+        return [(fy, era, int(self.offsets[i + 1] - self.offsets[i]),
+                 float(self.amount[self.offsets[i]:self.offsets[i + 1]].sum()))
+                for i, (fy, era) in enumerate(zip(self.group_fy, self.group_era))]
+
+
+_LOADED = {}
+
+def graph_as_of(year, cumulative=False, path=SNAPSHOT_DIR, version=None):
+    """Grant graph slice for fiscal year `year` from the (cached) snapshot index."""
+    key = (os.path.abspath(path), version)
+    if key not in _LOADED:
+        _LOADED[key] = TemporalGraph.load(path, version)
+    return _LOADED[key].as_of(year, cumulative)
+
+
+def main():
+    sys.stdout.reconfigure(encoding='utf-8')
+
+    ap = argparse.ArgumentParser(description="Per-fiscal-year / per-era grant graph index over a snapshot.")
+    ap.add_argument('command', choices=['build', 'info'])
+    ap.add_argument('--root', default=SNAPSHOT_DIR, help="snapshot root directory")
+    ap.add_argument('--version', help="snapshot version (default: LATEST)")
+    args = ap.parse_args()
+
+    t0 = time.time()
+    graph = TemporalGraph.load(args.root, args.version, rebuild=args.command == 'build')
+    log(f"Temporal index for snapshot {graph.snapshot_id}: {len(graph.org):,} edges, "
+        f"{len(graph.bns):,} orgs, {len(graph.ministries):,} ministries, "
+        f"{len(graph.group_fy)} (fiscal year, era) groups in {time.time() - t0:.1f}s")
+    for fy, era, n, amount in graph.summary():
+        log(f"  {fy or '-':<6} {era or '-':<12} {n:>10,} edges  ${amount:,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -11,23 +11,41 @@ Adapted to actual graph schema:
   - Clusters: cluster_id property on Organization nodes
   - SHARED_DIRECTORS edges between Organization nodes
   - RECEIVED_GRANT edges: Organization -> OrgEntity
+
+Runs against the local graph snapshot (02-graph-build/graph_snapshot.py)
+by default, via the pandas equivalents in snapshot_queries.py. Neo4j is
+only contacted with --refresh (re-export the snapshot) or --live (run the
+Cypher below directly). Live results are cached per graph version by
+02-graph-build/query_cache.py, so repeated live runs against an unchanged
+graph only read the GraphVersion marker.
+
+Usage:
+  python agent_2_governance_queries.py                 # latest snapshot
+  python agent_2_governance_queries.py --refresh       # re-export, then run
+  python agent_2_governance_queries.py --live          # Cypher against Aura
+  python agent_2_governance_queries.py --live --no-cache
+  python agent_2_governance_queries.py --version 20260212T101500_3f2a9c1e
 """
 
-import sys, os, csv, json, time
+import sys, os, csv, json, time, argparse
 from datetime import datetime
 from collections import defaultdict
 
 sys.stdout.reconfigure(encoding='utf-8')
 sys.stderr.reconfigure(encoding='utf-8')
 
-from neo4j import GraphDatabase
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SCRIPT_DIR, '..', '02-graph-build'))
+from graph_snapshot import SNAPSHOT_DIR, refresh_snapshot
+from query_cache import CachedCypher
+from snapshot_queries import SnapshotQueries
 
 # ── Configuration ────────────────────────────────────────────────────
 NEO4J_URI      = "<YOUR_NEO4J_AURA_URI>"
 NEO4J_USER     = "neo4j"
 NEO4J_PASSWORD = "<YOUR_NEO4J_AURA_PASSWORD>"
 
-OUTPUT_DIR = r"C:\Users\alina\OneDrive\Desktop\lineage-audit\03-governance-queries"
+OUTPUT_DIR = SCRIPT_DIR
 LOG_LINES = []
 LOG_PATH = os.path.join(OUTPUT_DIR, "query_log.md")
 
@@ -56,170 +74,362 @@ def write_csv(filename, rows, fieldnames):
     return path
 
 
-def main():
-    t_start = time.time()
-    log("=" * 72)
-    log("AGENT 2 — GOVERNANCE ANALYSIS QUERIES — START")
-    log("=" * 72)
+# ── Live (Neo4j) query source ────────────────────────────────────────
+Q1_CYPHER = """
+    // Find organizations receiving grants through NDP-restructured ministries
+    MATCH (org:Organization)-[g:RECEIVED_GRANT]->(m:OrgEntity)
+    WHERE m.canonical_id IN $ndp_ministry_ids
+      AND org.bn IS NOT NULL
+    WITH org, m,
+         sum(CASE WHEN g.political_era = 'NDP' THEN g.amount ELSE 0 END) AS ndp_funding,
+         sum(CASE WHEN g.political_era IN ['UCP_Kenney', 'UCP_Smith'] THEN g.amount ELSE 0 END) AS ucp_funding,
+         sum(CASE WHEN g.political_era = 'PC' THEN g.amount ELSE 0 END) AS pc_funding,
+         count(g) AS n_grants
+    WITH org,
+         collect(DISTINCT m.name) AS ndp_ministries,
+         sum(ndp_funding) AS total_ndp,
+         sum(ucp_funding) AS total_ucp,
+         sum(pc_funding) AS total_pc,
+         sum(n_grants) AS total_grants
+
+    // Enrich with risk flags
+    OPTIONAL MATCH (org)-[:FLAGGED_AS]->(flag:RiskFlag)
+    WITH org, ndp_ministries, total_ndp, total_ucp, total_pc, total_grants,
+         collect(DISTINCT flag.flag_type) AS risk_flags
+
+    WHERE total_ndp > 0 OR total_ucp > 0  // Any funding through NDP-restructured ministries
+    RETURN org.name AS org_name, org.bn AS bn, org.city AS city,
+           org.cluster_id AS cluster_id, org.cluster_size AS cluster_size,
+           total_ndp, total_ucp, total_pc,
+           CASE WHEN total_ndp > 0 THEN round((total_ucp - total_ndp) * 100.0 / total_ndp) ELSE null END AS delta_pct,
+           total_grants, ndp_ministries, risk_flags,
+           size(risk_flags) AS n_flags
+    ORDER BY total_ndp DESC
+"""
 
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-    log("Connected to Neo4j Aura")
+Q2_CYPHER = """
+    // All orgs that received NDP-era grants through NDP-restructured ministries
+    MATCH (org:Organization)-[g:RECEIVED_GRANT]->(m:OrgEntity)
+    WHERE m.canonical_id IN $ndp_ministry_ids
+      AND g.political_era = 'NDP'
+      AND org.bn IS NOT NULL
+    WITH org, sum(g.amount) AS ndp_funding
+
+    // Split by cluster membership
+    WITH org, ndp_funding,
+         CASE WHEN org.cluster_id IS NOT NULL THEN true ELSE false END AS is_clustered
+
+    // Aggregate
+    WITH is_clustered,
+         count(org) AS n_orgs,
+         sum(ndp_funding) AS total_funding,
+         avg(ndp_funding) AS avg_per_org,
+         percentileCont(ndp_funding, 0.5) AS median_per_org,
+         percentileCont(ndp_funding, 0.75) AS p75_per_org,
+         percentileCont(ndp_funding, 0.95) AS p95_per_org,
+         min(ndp_funding) AS min_per_org,
+         max(ndp_funding) AS max_per_org
+
+    RETURN is_clustered, n_orgs, total_funding,
+           round(avg_per_org) AS avg_per_org,
+           round(median_per_org) AS median_per_org,
+           round(p75_per_org) AS p75_per_org,
+           round(p95_per_org) AS p95_per_org,
+           round(min_per_org) AS min_per_org,
+           round(max_per_org) AS max_per_org
+    ORDER BY is_clustered DESC
+"""
 
-    # ── STEP 0: Schema verification ──────────────────────────────────
-    log("")
-    log("-- STEP 0: Verify Graph Schema --")
-    with driver.session() as s:
-        # Verify TransformEvent -> OrgEntity relationship direction
-        # Check both directions
-        fwd = s.run("""
-            MATCH (evt:TransformEvent)-[r:TARGET_OF]->(m:OrgEntity)
-            RETURN count(r) AS c
-        """).single()['c']
-        rev = s.run("""
-            MATCH (m:OrgEntity)-[r:TARGET_OF]->(evt:TransformEvent)
-            RETURN count(r) AS c
-        """).single()['c']
-        log(f"  TARGET_OF direction: evt->OrgEntity={fwd}, OrgEntity->evt={rev}")
-
-        fwd_s = s.run("""
-            MATCH (evt:TransformEvent)-[r:SOURCE_OF]->(m:OrgEntity)
-            RETURN count(r) AS c
-        """).single()['c']
-        rev_s = s.run("""
-            MATCH (m:OrgEntity)-[r:SOURCE_OF]->(evt:TransformEvent)
-            RETURN count(r) AS c
-        """).single()['c']
-        log(f"  SOURCE_OF direction: evt->OrgEntity={fwd_s}, OrgEntity->evt={rev_s}")
-
-        # Sample TransformEvent
-        sample_evt = s.run("""
-            MATCH (evt:TransformEvent)
-            RETURN evt.event_id AS eid, evt.event_date AS edate,
-                   evt.event_type AS etype, evt.political_context AS ctx
-            LIMIT 5
-        """).data()
-        log(f"  TransformEvent sample: {sample_evt}")
-
-        # Check event_date type
-        date_types = s.run("""
-            MATCH (evt:TransformEvent)
-            WHERE evt.event_date IS NOT NULL
-            RETURN DISTINCT apoc.meta.cypher.type(evt.event_date) AS dtype
-        """).data()
-        log(f"  event_date types: {date_types}")
-
-        # Check relationship patterns for NDP events
-        ndp_events = s.run("""
-            MATCH (evt:TransformEvent)
-            WHERE evt.political_context CONTAINS 'NDP' OR evt.political_context CONTAINS 'ndp'
-               OR (evt.event_date IS NOT NULL AND toString(evt.event_date) >= '2015-05-24'
-                   AND toString(evt.event_date) <= '2019-04-29')
-            RETURN count(evt) AS c
-        """).single()['c']
-        log(f"  NDP-era TransformEvents: {ndp_events}")
-
-        # Sample the relationship patterns
-        rel_sample = s.run("""
-            MATCH (evt:TransformEvent)-[r]->(m:OrgEntity)
-            RETURN type(r) AS rel_type, evt.event_id AS eid, m.name AS ministry,
-                   evt.event_date AS edate
-            LIMIT 10
-        """).data()
-        log(f"  TransformEvent->OrgEntity relationships sample: {json.dumps(rel_sample, default=str)}")
-
-        rel_sample2 = s.run("""
-            MATCH (m:OrgEntity)-[r]->(evt:TransformEvent)
-            RETURN type(r) AS rel_type, evt.event_id AS eid, m.name AS ministry,
-                   evt.event_date AS edate
-            LIMIT 10
-        """).data()
-        log(f"  OrgEntity->TransformEvent relationships sample: {json.dumps(rel_sample2, default=str)}")
-
-        # Check RECEIVED_GRANT political_era values
-        eras = s.run("""
-            MATCH ()-[g:RECEIVED_GRANT]->()
-            RETURN DISTINCT g.political_era AS era, count(g) AS cnt
-            ORDER BY cnt DESC
-        """).data()
-        log(f"  RECEIVED_GRANT political_era distribution: {json.dumps(eras, default=str)}")
-
-        # Check cluster_id distribution on Organizations
-        cluster_stats = s.run("""
-            MATCH (o:Organization)
-            WHERE o.cluster_id IS NOT NULL AND o.bn IS NOT NULL
-            RETURN count(DISTINCT o) AS n_clustered,
-                   count(DISTINCT o.cluster_id) AS n_clusters
-        """).single()
-        log(f"  Clustered orgs: {cluster_stats['n_clustered']} in {cluster_stats['n_clusters']} clusters")
+Q2B_CYPHER = """
+    MATCH (org:Organization)-[g:RECEIVED_GRANT]->(m:OrgEntity)
+    WHERE m.canonical_id IN $ndp_ministry_ids
+      AND org.bn IS NOT NULL
+    WITH org,
+         sum(CASE WHEN g.political_era = 'NDP' THEN g.amount ELSE 0 END) AS ndp_funding,
+         sum(CASE WHEN g.political_era IN ['UCP_Kenney', 'UCP_Smith'] THEN g.amount ELSE 0 END) AS ucp_funding,
+         sum(CASE WHEN g.political_era = 'PC' THEN g.amount ELSE 0 END) AS pc_funding,
+         sum(g.amount) AS total_all
+
+    WITH org, ndp_funding, ucp_funding, pc_funding, total_all,
+         CASE WHEN org.cluster_id IS NOT NULL THEN true ELSE false END AS is_clustered
+
+    RETURN is_clustered,
+           count(org) AS n_orgs,
+           sum(ndp_funding) AS total_ndp,
+           sum(ucp_funding) AS total_ucp,
+           sum(pc_funding) AS total_pc,
+           sum(total_all) AS total_all,
+           avg(ndp_funding) AS avg_ndp,
+           avg(ucp_funding) AS avg_ucp,
+           avg(pc_funding) AS avg_pc
+    ORDER BY is_clustered DESC
+"""
 
-    flush_log()
+Q3_CYPHER = """
+    // Find all clustered organizations with grants through NDP-restructured ministries
+    MATCH (org:Organization)-[g:RECEIVED_GRANT]->(m:OrgEntity)
+    WHERE m.canonical_id IN $ndp_ministry_ids
+      AND org.cluster_id IS NOT NULL
+      AND org.bn IS NOT NULL
+    WITH org.cluster_id AS cluster_id, org,
+         sum(CASE WHEN g.political_era = 'NDP' THEN g.amount ELSE 0 END) AS org_ndp,
+         sum(CASE WHEN g.political_era IN ['UCP_Kenney', 'UCP_Smith'] THEN g.amount ELSE 0 END) AS org_ucp,
+         collect(DISTINCT m.name) AS org_ministries
+
+    // Aggregate per cluster
+    WITH cluster_id,
+         count(DISTINCT org) AS cluster_grant_recipients,
+         sum(org_ndp) AS cluster_ndp_total,
+         sum(org_ucp) AS cluster_ucp_total,
+         collect(DISTINCT org.name)[..8] AS sample_orgs
+
+    // Get cluster size and flags
+    OPTIONAL MATCH (member:Organization {cluster_id: cluster_id})
+    WITH cluster_id, cluster_grant_recipients, cluster_ndp_total, cluster_ucp_total,
+         sample_orgs, count(DISTINCT member) AS total_cluster_size
+
+    // Get risk flags for cluster members
+    OPTIONAL MATCH (flagged:Organization {cluster_id: cluster_id})-[:FLAGGED_AS]->(f:RiskFlag)
+    WITH cluster_id, cluster_grant_recipients, cluster_ndp_total, cluster_ucp_total,
+         sample_orgs, total_cluster_size,
+         count(DISTINCT f.flag_type) AS distinct_flag_types,
+         count(f) AS total_flags_in_cluster
+
+    WHERE cluster_ndp_total > 0
+    RETURN cluster_id, total_cluster_size, cluster_grant_recipients,
+           cluster_ndp_total, cluster_ucp_total,
+           CASE WHEN cluster_ndp_total > 0
+                THEN round((cluster_ucp_total - cluster_ndp_total) * 100.0 / cluster_ndp_total)
+                ELSE null END AS delta_pct,
+           distinct_flag_types, total_flags_in_cluster,
+           sample_orgs
+    ORDER BY cluster_ndp_total DESC
+"""
 
-    # ── STEP 1: Determine correct relationship direction ─────────────
-    log("")
-    log("-- STEP 1: Determine TransformEvent relationship patterns --")
-    with driver.session() as s:
-        # Get all NDP-era transform events by checking political_context or date range
-        all_events = s.run("""
-            MATCH (evt:TransformEvent)
-            RETURN evt.event_id AS eid, evt.event_date AS edate,
-                   evt.event_type AS etype, evt.political_context AS ctx,
-                   evt.notes AS notes
-            ORDER BY toString(evt.event_date)
-        """).data()
-        log(f"  Total TransformEvents: {len(all_events)}")
-
-        # Categorize events by political context
-        ndp_events_list = []
-        ucp_events_list = []
-        for evt in all_events:
-            ctx = str(evt.get('ctx') or '').upper()
-            edate = str(evt.get('edate') or '')
-            if 'NDP' in ctx or ('2015-05-24' <= edate <= '2019-04-29'):
-                ndp_events_list.append(evt)
-            elif 'UCP' in ctx or edate >= '2019-04-30':
-                ucp_events_list.append(evt)
-
-        log(f"  NDP events: {len(ndp_events_list)}")
-        log(f"  UCP events: {len(ucp_events_list)}")
-        for evt in ndp_events_list[:5]:
-            log(f"    {evt['eid']}: {evt['edate']} {evt['etype']} - {evt.get('ctx','')}")
-
-        # Find which OrgEntity nodes are targets of NDP restructuring
-        # Try both relationship patterns to find what works
-        ndp_target_ministries_v1 = s.run("""
-            MATCH (evt:TransformEvent)-[:TARGET_OF]->(m:OrgEntity)
-            WHERE evt.political_context CONTAINS 'NDP'
-               OR (toString(evt.event_date) >= '2015-05-24'
-                   AND toString(evt.event_date) <= '2019-04-29')
-            RETURN DISTINCT m.canonical_id AS cid, m.name AS name
-        """).data()
-        log(f"  NDP target ministries (evt-[:TARGET_OF]->OrgEntity): {len(ndp_target_ministries_v1)}")
-        for m in ndp_target_ministries_v1[:10]:
-            log(f"    {m['cid']}: {m['name']}")
+SYM1_CYPHER = """
+    MATCH (org:Organization)-[g:RECEIVED_GRANT]->(m:OrgEntity)
+    WHERE m.canonical_id IN $ucp_ministry_ids
+      AND org.bn IS NOT NULL
+    WITH org,
+         sum(CASE WHEN g.political_era IN ['UCP_Kenney', 'UCP_Smith'] THEN g.amount ELSE 0 END) AS ucp_funding,
+         sum(CASE WHEN g.political_era = 'NDP' THEN g.amount ELSE 0 END) AS ndp_funding,
+         count(g) AS n_grants
+    WHERE ucp_funding > 0 OR ndp_funding > 0
+    WITH CASE WHEN org.cluster_id IS NOT NULL THEN true ELSE false END AS is_clustered,
+         count(org) AS n_orgs,
+         sum(ucp_funding) AS total_ucp,
+         sum(ndp_funding) AS total_ndp,
+         avg(ucp_funding) AS avg_ucp,
+         avg(ndp_funding) AS avg_ndp
+    RETURN is_clustered, n_orgs, total_ucp, total_ndp,
+           round(avg_ucp) AS avg_ucp, round(avg_ndp) AS avg_ndp
+    ORDER BY is_clustered DESC
+"""
 
-        ndp_target_ministries_v2 = s.run("""
-            MATCH (m:OrgEntity)-[:TARGET_OF]->(evt:TransformEvent)
-            WHERE evt.political_context CONTAINS 'NDP'
-               OR (toString(evt.event_date) >= '2015-05-24'
-                   AND toString(evt.event_date) <= '2019-04-29')
-            RETURN DISTINCT m.canonical_id AS cid, m.name AS name
-        """).data()
-        log(f"  NDP target ministries (OrgEntity-[:TARGET_OF]->evt): {len(ndp_target_ministries_v2)}")
-        for m in ndp_target_ministries_v2[:10]:
-            log(f"    {m['cid']}: {m['name']}")
+BONUS_CYPHER = """
+    MATCH (org:Organization)-[g:RECEIVED_GRANT]->(m:OrgEntity)
+    WHERE m.canonical_id IN $ndp_ministry_ids
+      AND org.bn IS NOT NULL
+    WITH g.political_era AS era,
+         count(DISTINCT org) AS n_orgs,
+         sum(g.amount) AS total_amount,
+         count(g) AS n_grants,
+         avg(g.amount) AS avg_grant
+    RETURN era, n_orgs, total_amount, n_grants, round(avg_grant) AS avg_grant
+    ORDER BY total_amount DESC
+"""
 
-        # Pick the version that found results
-        if len(ndp_target_ministries_v1) >= len(ndp_target_ministries_v2):
-            ndp_ministries = ndp_target_ministries_v1
-            target_pattern = "(evt:TransformEvent)-[:TARGET_OF]->(m:OrgEntity)"
-        else:
-            ndp_ministries = ndp_target_ministries_v2
-            target_pattern = "(m:OrgEntity)-[:TARGET_OF]->(evt:TransformEvent)"
+BONUS2_CYPHER = """
+    // Find pairs of orgs that share directors AND both got NDP grants
+    MATCH (o1:Organization)-[sd:SHARED_DIRECTORS]->(o2:Organization)
+    WHERE o1.bn IS NOT NULL AND o2.bn IS NOT NULL
+    MATCH (o1)-[g1:RECEIVED_GRANT {political_era: 'NDP'}]->(m1:OrgEntity)
+    WHERE m1.canonical_id IN $ndp_ministry_ids
+    MATCH (o2)-[g2:RECEIVED_GRANT {political_era: 'NDP'}]->(m2:OrgEntity)
+    WHERE m2.canonical_id IN $ndp_ministry_ids
+    WITH o1, o2, sd.n_shared_directors AS n_shared,
+         sum(DISTINCT g1.amount) AS o1_ndp, sum(DISTINCT g2.amount) AS o2_ndp
+    RETURN o1.name AS org1, o2.name AS org2, n_shared,
+           o1_ndp, o2_ndp,
+           o1.cluster_id AS cluster1, o2.cluster_id AS cluster2
+    ORDER BY n_shared DESC, o1_ndp + o2_ndp DESC
+    LIMIT 25
+"""
 
-        log(f"  Using pattern: {target_pattern}")
-        log(f"  NDP-restructured ministries: {len(ndp_ministries)}")
-        ndp_ministry_ids = [m['cid'] for m in ndp_ministries]
-        log(f"  IDs: {ndp_ministry_ids}")
+NDP_FWD_CYPHER = """
+    MATCH (evt:TransformEvent)-[:TARGET_OF]->(m:OrgEntity)
+    WHERE evt.political_context CONTAINS 'NDP'
+       OR (toString(evt.event_date) >= '2015-05-24'
+           AND toString(evt.event_date) <= '2019-04-29')
+    RETURN DISTINCT m.canonical_id AS cid, m.name AS name
+"""
+
+UCP_FWD_CYPHER = """
+    MATCH (evt:TransformEvent)-[:TARGET_OF]->(m:OrgEntity)
+    WHERE evt.political_context CONTAINS 'UCP'
+       OR toString(evt.event_date) >= '2019-04-30'
+    RETURN DISTINCT m.canonical_id AS cid, m.name AS name
+"""
+
+UCP_REV_CYPHER = """
+    MATCH (m:OrgEntity)-[:TARGET_OF]->(evt:TransformEvent)
+    WHERE evt.political_context CONTAINS 'UCP'
+       OR toString(evt.event_date) >= '2019-04-30'
+    RETURN DISTINCT m.canonical_id AS cid, m.name AS name
+"""
+
+UCP_ANY_CYPHER = """
+    MATCH (evt:TransformEvent)-[r]-(m:OrgEntity)
+    WHERE evt.political_context CONTAINS 'UCP'
+       OR toString(evt.event_date) >= '2019-04-30'
+    RETURN DISTINCT m.canonical_id AS cid, m.name AS name
+"""
+
+
+def verify_schema(cy):
+    """STEP 0 schema probes (live mode only)."""
+    # Verify TransformEvent -> OrgEntity relationship direction
+    # Check both directions
+    fwd = cy.single("""
+        MATCH (evt:TransformEvent)-[r:TARGET_OF]->(m:OrgEntity)
+        RETURN count(r) AS c
+    """)['c']
+    rev = cy.single("""
+        MATCH (m:OrgEntity)-[r:TARGET_OF]->(evt:TransformEvent)
+        RETURN count(r) AS c
+    """)['c']
+    log(f"  TARGET_OF direction: evt->OrgEntity={fwd}, OrgEntity->evt={rev}")
+
+    fwd_s = cy.single("""
+        MATCH (evt:TransformEvent)-[r:SOURCE_OF]->(m:OrgEntity)
+        RETURN count(r) AS c
+    """)['c']
+    rev_s = cy.single("""
+        MATCH (m:OrgEntity)-[r:SOURCE_OF]->(evt:TransformEvent)
+        RETURN count(r) AS c
+    """)['c']
+    log(f"  SOURCE_OF direction: evt->OrgEntity={fwd_s}, OrgEntity->evt={rev_s}")
+
+    # Sample TransformEvent
+    sample_evt = cy.run("""
+        MATCH (evt:TransformEvent)
+        RETURN evt.event_id AS eid, evt.event_date AS edate,
+               evt.event_type AS etype, evt.political_context AS ctx
+        LIMIT 5
+    """)
+    log(f"  TransformEvent sample: {sample_evt}")
+
+    # Check event_date type
+    date_types = cy.run("""
+        MATCH (evt:TransformEvent)
+        WHERE evt.event_date IS NOT NULL
+        RETURN DISTINCT apoc.meta.cypher.type(evt.event_date) AS dtype
+    """)
+    log(f"  event_date types: {date_types}")
+
+    # Check relationship patterns for NDP events
+    ndp_events = cy.single("""
+        MATCH (evt:TransformEvent)
+        WHERE evt.political_context CONTAINS 'NDP' OR evt.political_context CONTAINS 'ndp'
+           OR (evt.event_date IS NOT NULL AND toString(evt.event_date) >= '2015-05-24'
+               AND toString(evt.event_date) <= '2019-04-29')
+        RETURN count(evt) AS c
+    """)['c']
+    log(f"  NDP-era TransformEvents: {ndp_events}")
+
+    # Sample the relationship patterns
+    rel_sample = cy.run("""
+        MATCH (evt:TransformEvent)-[r]->(m:OrgEntity)
+        RETURN type(r) AS rel_type, evt.event_id AS eid, m.name AS ministry,
+               evt.event_date AS edate
+        LIMIT 10
+    """)
+    log(f"  TransformEvent->OrgEntity relationships sample: {json.dumps(rel_sample, default=str)}")
+
+    rel_sample2 = cy.run("""
+        MATCH (m:OrgEntity)-[r]->(evt:TransformEvent)
+        RETURN type(r) AS rel_type, evt.event_id AS eid, m.name AS ministry,
+               evt.event_date AS edate
+        LIMIT 10
+    """)
+    log(f"  OrgEntity->TransformEvent relationships sample: {json.dumps(rel_sample2, default=str)}")
+
+    # Check RECEIVED_GRANT political_era values
+    eras = cy.run("""
+        MATCH ()-[g:RECEIVED_GRANT]->()
+        RETURN DISTINCT g.political_era AS era, count(g) AS cnt
+        ORDER BY cnt DESC
+    """)
+    log(f"  RECEIVED_GRANT political_era distribution: {json.dumps(eras, default=str)}")
+
+    # Check cluster_id distribution on Organizations
+    cluster_stats = cy.single("""
+        MATCH (o:Organization)
+        WHERE o.cluster_id IS NOT NULL AND o.bn IS NOT NULL
+        RETURN count(DISTINCT o) AS n_clustered,
+               count(DISTINCT o.cluster_id) AS n_clusters
+    """)
+    log(f"  Clustered orgs: {cluster_stats['n_clustered']} in {cluster_stats['n_clusters']} clusters")
+
+
+def find_ndp_ministries(cy):
+    """STEP 1: NDP-restructured ministry IDs and the TARGET_OF direction that found them."""
+    # Get all NDP-era transform events by checking political_context or date range
+    all_events = cy.run("""
+        MATCH (evt:TransformEvent)
+        RETURN evt.event_id AS eid, evt.event_date AS edate,
+               evt.event_type AS etype, evt.political_context AS ctx,
+               evt.notes AS notes
+        ORDER BY toString(evt.event_date)
+    """)
+    log(f"  Total TransformEvents: {len(all_events)}")
+
+    # Categorize events by political context
+    ndp_events_list = []
+    ucp_events_list = []
+    for evt in all_events:
+        ctx = str(evt.get('ctx') or '').upper()
+        edate = str(evt.get('edate') or '')
+        if 'NDP' in ctx or ('2015-05-24' <= edate <= '2019-04-29'):
+            ndp_events_list.append(evt)
+        elif 'UCP' in ctx or edate >= '2019-04-30':
+            ucp_events_list.append(evt)
+
+    log(f"  NDP events: {len(ndp_events_list)}")
+    log(f"  UCP events: {len(ucp_events_list)}")
+    for evt in ndp_events_list[:5]:
+        log(f"    {evt['eid']}: {evt['edate']} {evt['etype']} - {evt.get('ctx','')}")
+
+    # Find which OrgEntity nodes are targets of NDP restructuring
+    # Try both relationship patterns to find what works
+    ndp_target_ministries_v1 = cy.run(NDP_FWD_CYPHER)
+    log(f"  NDP target ministries (evt-[:TARGET_OF]->OrgEntity): {len(ndp_target_ministries_v1)}")
+    for m in ndp_target_ministries_v1[:10]:
+        log(f"    {m['cid']}: {m['name']}")
+
+    ndp_target_ministries_v2 = cy.run("""
+        MATCH (m:OrgEntity)-[:TARGET_OF]->(evt:TransformEvent)
+        WHERE evt.political_context CONTAINS 'NDP'
+           OR (toString(evt.event_date) >= '2015-05-24'
+               AND toString(evt.event_date) <= '2019-04-29')
+        RETURN DISTINCT m.canonical_id AS cid, m.name AS name
+    """)
+    log(f"  NDP target ministries (OrgEntity-[:TARGET_OF]->evt): {len(ndp_target_ministries_v2)}")
+    for m in ndp_target_ministries_v2[:10]:
+        log(f"    {m['cid']}: {m['name']}")
+
+    # Pick the version that found results
+    if len(ndp_target_ministries_v1) >= len(ndp_target_ministries_v2):
+        ndp_ministries = ndp_target_ministries_v1
+        target_pattern = "(evt:TransformEvent)-[:TARGET_OF]->(m:OrgEntity)"
+    else:
+        ndp_ministries = ndp_target_ministries_v2
+        target_pattern = "(m:OrgEntity)-[:TARGET_OF]->(evt:TransformEvent)"
+
+    log(f"  Using pattern: {target_pattern}")
+    log(f"  NDP-restructured ministries: {len(ndp_ministries)}")
+    ndp_ministry_ids = [m['cid'] for m in ndp_ministries]
+    log(f"  IDs: {ndp_ministry_ids}")
 
     flush_log()
 
@@ -228,21 +438,125 @@ def main():
     if not ndp_ministry_ids:
         log("  WARNING: No NDP-restructured ministries found via TARGET_OF")
         log("  Trying: all OrgEntity with any NDP-era TransformEvent connection")
-        with driver.session() as s:
-            # Try any relationship between TransformEvent and OrgEntity
-            ndp_ministries_fallback = s.run("""
-                MATCH (evt:TransformEvent)-[r]-(m:OrgEntity)
-                WHERE evt.political_context CONTAINS 'NDP'
-                   OR (toString(evt.event_date) >= '2015-05-24'
-                       AND toString(evt.event_date) <= '2019-04-29')
-                RETURN DISTINCT m.canonical_id AS cid, m.name AS name, type(r) AS rel
-            """).data()
-            log(f"  Fallback NDP-linked ministries: {len(ndp_ministries_fallback)}")
-            for m in ndp_ministries_fallback[:15]:
-                log(f"    {m['cid']}: {m['name']} via {m['rel']}")
-
-            ndp_ministry_ids = list(set(m['cid'] for m in ndp_ministries_fallback if m.get('cid')))
-            log(f"  Unique NDP ministry IDs: {len(ndp_ministry_ids)}")
+        # Try any relationship between TransformEvent and OrgEntity
+        ndp_ministries_fallback = cy.run("""
+            MATCH (evt:TransformEvent)-[r]-(m:OrgEntity)
+            WHERE evt.political_context CONTAINS 'NDP'
+               OR (toString(evt.event_date) >= '2015-05-24'
+                   AND toString(evt.event_date) <= '2019-04-29')
+            RETURN DISTINCT m.canonical_id AS cid, m.name AS name, type(r) AS rel
+        """)
+        log(f"  Fallback NDP-linked ministries: {len(ndp_ministries_fallback)}")
+        for m in ndp_ministries_fallback[:15]:
+            log(f"    {m['cid']}: {m['name']} via {m['rel']}")
+
+        ndp_ministry_ids = list(set(m['cid'] for m in ndp_ministries_fallback if m.get('cid')))
+        log(f"  Unique NDP ministry IDs: {len(ndp_ministry_ids)}")
+
+    return ndp_ministry_ids, target_pattern
+
+
+class LiveQueries:
+    """Cypher against Neo4j Aura; same interface as snapshot_queries.SnapshotQueries."""
+
+    def __init__(self, cy, target_pattern):
+        self.cy = cy
+        self.target_pattern = target_pattern
+
+    def _run(self, cypher, **params):
+        return self.cy.run(cypher, **params)
+
+    def q1(self, ids):
+        return self._run(Q1_CYPHER, ndp_ministry_ids=ids)
+
+    def q2(self, ids):
+        return self._run(Q2_CYPHER, ndp_ministry_ids=ids)
+
+    def q2b(self, ids):
+        return self._run(Q2B_CYPHER, ndp_ministry_ids=ids)
+
+    def q3(self, ids):
+        return self._run(Q3_CYPHER, ndp_ministry_ids=ids)
+
+    def ucp_ministries(self):
+        # UCP-era transform events
+        if "(evt:TransformEvent)-[:TARGET_OF]->(m:OrgEntity)" in self.target_pattern:
+            found = self._run(UCP_FWD_CYPHER)
+        else:
+            found = self._run(UCP_REV_CYPHER)
+        if not found:
+            # Fallback: any relationship
+            found = self._run(UCP_ANY_CYPHER)
+        return found
+
+    def sym1(self, ids):
+        return self._run(SYM1_CYPHER, ucp_ministry_ids=ids)
+
+    def bonus(self, ids):
+        return self._run(BONUS_CYPHER, ndp_ministry_ids=ids)
+
+    def bonus2(self, ids):
+        return self._run(BONUS2_CYPHER, ndp_ministry_ids=ids)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Agent 2 governance analysis queries.")
+    ap.add_argument('--live', action='store_true', help="run the Cypher against Neo4j Aura")
+    ap.add_argument('--refresh', action='store_true', help="re-export the graph snapshot first")
+    ap.add_argument('--snapshot', default=SNAPSHOT_DIR, help="snapshot root or version directory")
+    ap.add_argument('--version', help="snapshot version (default: LATEST)")
+    ap.add_argument('--no-cache', action='store_true', help="with --live: bypass the query result cache")
+    args = ap.parse_args()
+
+    t_start = time.time()
+    log("=" * 72)
+    log("AGENT 2 — GOVERNANCE ANALYSIS QUERIES — START")
+    log("=" * 72)
+
+    if args.refresh:
+        refresh_snapshot(args.snapshot)
+
+    driver = None
+    if args.live:
+        from graph_client import GraphClient
+        driver = GraphClient(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+        log("Connected to Neo4j Aura")
+        cy = CachedCypher(driver, enabled=not args.no_cache)
+
+        # ── STEP 0: Schema verification ──────────────────────────────
+        log("")
+        log("-- STEP 0: Verify Graph Schema --")
+        verify_schema(cy)
+        flush_log()
+
+        # ── STEP 1: Determine correct relationship direction ─────────
+        log("")
+        log("-- STEP 1: Determine TransformEvent relationship patterns --")
+        ndp_ministry_ids, target_pattern = find_ndp_ministries(cy)
+        q = LiveQueries(cy, target_pattern)
+    else:
+        q = SnapshotQueries.load(args.snapshot, args.version)
+        mf = q.manifest
+        log(f"Using graph snapshot {mf['version']} "
+            f"(graph changed {mf['graph_changed_at']}, exported {mf['exported_at']})")
+
+        log("")
+        log("-- STEP 0: Snapshot Tables --")
+        for name, info in mf['tables'].items():
+            log(f"  {name}: {info['rows']:,} rows")
+        flush_log()
+
+        log("")
+        log("-- STEP 1: NDP-restructured ministries (snapshot) --")
+        ndp_ministries = q.ndp_ministries()
+        if not ndp_ministries:
+            log("  WARNING: No NDP-restructured ministries found via TARGET_OF")
+            log("  Trying: all OrgEntity with any NDP-era TransformEvent connection")
+            ndp_ministries = q.ndp_ministries_any_rel()
+        ndp_ministry_ids = [m['cid'] for m in ndp_ministries]
+        log(f"  NDP-restructured ministries: {len(ndp_ministry_ids)}")
+        for m in ndp_ministries[:10]:
+            log(f"    {m['cid']}: {m['name']}")
 
     flush_log()
 
@@ -253,38 +567,7 @@ def main():
     log("=" * 72)
     t0 = time.time()
 
-    with driver.session() as s:
-        q1_results = s.run("""
-            // Find organizations receiving grants through NDP-restructured ministries
-            MATCH (org:Organization)-[g:RECEIVED_GRANT]->(m:OrgEntity)
-            WHERE m.canonical_id IN $ndp_ministry_ids
-              AND org.bn IS NOT NULL
-            WITH org, m,
-                 sum(CASE WHEN g.political_era = 'NDP' THEN g.amount ELSE 0 END) AS ndp_funding,
-                 sum(CASE WHEN g.political_era IN ['UCP_Kenney', 'UCP_Smith'] THEN g.amount ELSE 0 END) AS ucp_funding,
-                 sum(CASE WHEN g.political_era = 'PC' THEN g.amount ELSE 0 END) AS pc_funding,
-                 count(g) AS n_grants
-            WITH org,
-                 collect(DISTINCT m.name) AS ndp_ministries,
-                 sum(ndp_funding) AS total_ndp,
-                 sum(ucp_funding) AS total_ucp,
-                 sum(pc_funding) AS total_pc,
-                 sum(n_grants) AS total_grants
-
-            // Enrich with risk flags
-            OPTIONAL MATCH (org)-[:FLAGGED_AS]->(flag:RiskFlag)
-            WITH org, ndp_ministries, total_ndp, total_ucp, total_pc, total_grants,
-                 collect(DISTINCT flag.flag_type) AS risk_flags
-
-            WHERE total_ndp > 0 OR total_ucp > 0  // Any funding through NDP-restructured ministries
-            RETURN org.name AS org_name, org.bn AS bn, org.city AS city,
-                   org.cluster_id AS cluster_id, org.cluster_size AS cluster_size,
-                   total_ndp, total_ucp, total_pc,
-                   CASE WHEN total_ndp > 0 THEN round((total_ucp - total_ndp) * 100.0 / total_ndp) ELSE null END AS delta_pct,
-                   total_grants, ndp_ministries, risk_flags,
-                   size(risk_flags) AS n_flags
-            ORDER BY total_ndp DESC
-        """, ndp_ministry_ids=ndp_ministry_ids).data()
+    q1_results = q.q1(ndp_ministry_ids)
 
     log(f"  Query 1 returned {len(q1_results)} organizations")
     log(f"  Completed in {time.time()-t0:.1f}s")
@@ -338,40 +621,8 @@ def main():
     log("=" * 72)
     t0 = time.time()
 
-    with driver.session() as s:
-        # Compare clustered vs non-clustered orgs funding through NDP-restructured ministries
-        q2_results = s.run("""
-            // All orgs that received NDP-era grants through NDP-restructured ministries
-            MATCH (org:Organization)-[g:RECEIVED_GRANT]->(m:OrgEntity)
-            WHERE m.canonical_id IN $ndp_ministry_ids
-              AND g.political_era = 'NDP'
-              AND org.bn IS NOT NULL
-            WITH org, sum(g.amount) AS ndp_funding
-
-            // Split by cluster membership
-            WITH org, ndp_funding,
-                 CASE WHEN org.cluster_id IS NOT NULL THEN true ELSE false END AS is_clustered
-
-            // Aggregate
-            WITH is_clustered,
-                 count(org) AS n_orgs,
-                 sum(ndp_funding) AS total_funding,
-                 avg(ndp_funding) AS avg_per_org,
-                 percentileCont(ndp_funding, 0.5) AS median_per_org,
-                 percentileCont(ndp_funding, 0.75) AS p75_per_org,
-                 percentileCont(ndp_funding, 0.95) AS p95_per_org,
-                 min(ndp_funding) AS min_per_org,
-                 max(ndp_funding) AS max_per_org
-
-            RETURN is_clustered, n_orgs, total_funding,
-                   round(avg_per_org) AS avg_per_org,
-                   round(median_per_org) AS median_per_org,
-                   round(p75_per_org) AS p75_per_org,
-                   round(p95_per_org) AS p95_per_org,
-                   round(min_per_org) AS min_per_org,
-                   round(max_per_org) AS max_per_org
-            ORDER BY is_clustered DESC
-        """, ndp_ministry_ids=ndp_ministry_ids).data()
+    # Compare clustered vs non-clustered orgs funding through NDP-restructured ministries
+    q2_results = q.q2(ndp_ministry_ids)
 
     log(f"  Query 2 returned {len(q2_results)} rows")
     log(f"  Completed in {time.time()-t0:.1f}s")
@@ -402,31 +653,7 @@ def main():
     # ── QUERY 2b: Same comparison but for ALL eras (not just NDP) ────
     log("")
     log("-- Query 2b: Clustered vs Non-Clustered (ALL eras) --")
-    with driver.session() as s:
-        q2b_results = s.run("""
-            MATCH (org:Organization)-[g:RECEIVED_GRANT]->(m:OrgEntity)
-            WHERE m.canonical_id IN $ndp_ministry_ids
-              AND org.bn IS NOT NULL
-            WITH org,
-                 sum(CASE WHEN g.political_era = 'NDP' THEN g.amount ELSE 0 END) AS ndp_funding,
-                 sum(CASE WHEN g.political_era IN ['UCP_Kenney', 'UCP_Smith'] THEN g.amount ELSE 0 END) AS ucp_funding,
-                 sum(CASE WHEN g.political_era = 'PC' THEN g.amount ELSE 0 END) AS pc_funding,
-                 sum(g.amount) AS total_all
-
-            WITH org, ndp_funding, ucp_funding, pc_funding, total_all,
-                 CASE WHEN org.cluster_id IS NOT NULL THEN true ELSE false END AS is_clustered
-
-            RETURN is_clustered,
-                   count(org) AS n_orgs,
-                   sum(ndp_funding) AS total_ndp,
-                   sum(ucp_funding) AS total_ucp,
-                   sum(pc_funding) AS total_pc,
-                   sum(total_all) AS total_all,
-                   avg(ndp_funding) AS avg_ndp,
-                   avg(ucp_funding) AS avg_ucp,
-                   avg(pc_funding) AS avg_pc
-            ORDER BY is_clustered DESC
-        """, ndp_ministry_ids=ndp_ministry_ids).data()
+    q2b_results = q.q2b(ndp_ministry_ids)
 
     if q2b_results:
         for r in q2b_results:
@@ -442,47 +669,7 @@ def main():
     log("=" * 72)
     t0 = time.time()
 
-    with driver.session() as s:
-        q3_results = s.run("""
-            // Find all clustered organizations with grants through NDP-restructured ministries
-            MATCH (org:Organization)-[g:RECEIVED_GRANT]->(m:OrgEntity)
-            WHERE m.canonical_id IN $ndp_ministry_ids
-              AND org.cluster_id IS NOT NULL
-              AND org.bn IS NOT NULL
-            WITH org.cluster_id AS cluster_id, org,
-                 sum(CASE WHEN g.political_era = 'NDP' THEN g.amount ELSE 0 END) AS org_ndp,
-                 sum(CASE WHEN g.political_era IN ['UCP_Kenney', 'UCP_Smith'] THEN g.amount ELSE 0 END) AS org_ucp,
-                 collect(DISTINCT m.name) AS org_ministries
-
-            // Aggregate per cluster
-            WITH cluster_id,
-                 count(DISTINCT org) AS cluster_grant_recipients,
-                 sum(org_ndp) AS cluster_ndp_total,
-                 sum(org_ucp) AS cluster_ucp_total,
-                 collect(DISTINCT org.name)[..8] AS sample_orgs
-
-            // Get cluster size and flags
-            OPTIONAL MATCH (member:Organization {cluster_id: cluster_id})
-            WITH cluster_id, cluster_grant_recipients, cluster_ndp_total, cluster_ucp_total,
-                 sample_orgs, count(DISTINCT member) AS total_cluster_size
-
-            // Get risk flags for cluster members
-            OPTIONAL MATCH (flagged:Organization {cluster_id: cluster_id})-[:FLAGGED_AS]->(f:RiskFlag)
-            WITH cluster_id, cluster_grant_recipients, cluster_ndp_total, cluster_ucp_total,
-                 sample_orgs, total_cluster_size,
-                 count(DISTINCT f.flag_type) AS distinct_flag_types,
-                 count(f) AS total_flags_in_cluster
-
-            WHERE cluster_ndp_total > 0
-            RETURN cluster_id, total_cluster_size, cluster_grant_recipients,
-                   cluster_ndp_total, cluster_ucp_total,
-                   CASE WHEN cluster_ndp_total > 0
-                        THEN round((cluster_ucp_total - cluster_ndp_total) * 100.0 / cluster_ndp_total)
-                        ELSE null END AS delta_pct,
-                   distinct_flag_types, total_flags_in_cluster,
-                   sample_orgs
-            ORDER BY cluster_ndp_total DESC
-        """, ndp_ministry_ids=ndp_ministry_ids).data()
+    q3_results = q.q3(ndp_ministry_ids)
 
     log(f"  Query 3 returned {len(q3_results)} clusters")
     log(f"  Completed in {time.time()-t0:.1f}s")
@@ -528,61 +715,17 @@ def main():
     t0 = time.time()
 
     # Find UCP-restructured ministries
-    with driver.session() as s:
-        # UCP-era transform events
-        if "(evt:TransformEvent)-[:TARGET_OF]->(m:OrgEntity)" in target_pattern:
-            ucp_ministries = s.run("""
-                MATCH (evt:TransformEvent)-[:TARGET_OF]->(m:OrgEntity)
-                WHERE evt.political_context CONTAINS 'UCP'
-                   OR toString(evt.event_date) >= '2019-04-30'
-                RETURN DISTINCT m.canonical_id AS cid, m.name AS name
-            """).data()
-        else:
-            ucp_ministries = s.run("""
-                MATCH (m:OrgEntity)-[:TARGET_OF]->(evt:TransformEvent)
-                WHERE evt.political_context CONTAINS 'UCP'
-                   OR toString(evt.event_date) >= '2019-04-30'
-                RETURN DISTINCT m.canonical_id AS cid, m.name AS name
-            """).data()
-
-        if not ucp_ministries:
-            # Fallback: any relationship
-            ucp_ministries = s.run("""
-                MATCH (evt:TransformEvent)-[r]-(m:OrgEntity)
-                WHERE evt.political_context CONTAINS 'UCP'
-                   OR toString(evt.event_date) >= '2019-04-30'
-                RETURN DISTINCT m.canonical_id AS cid, m.name AS name
-            """).data()
-
-        ucp_ministry_ids = [m['cid'] for m in ucp_ministries if m.get('cid')]
-        log(f"  UCP-restructured ministries: {len(ucp_ministry_ids)}")
-        for m in ucp_ministries[:10]:
-            log(f"    {m['cid']}: {m['name']}")
+    ucp_ministries = q.ucp_ministries()
+    ucp_ministry_ids = [m['cid'] for m in ucp_ministries if m.get('cid')]
+    log(f"  UCP-restructured ministries: {len(ucp_ministry_ids)}")
+    for m in ucp_ministries[:10]:
+        log(f"    {m['cid']}: {m['name']}")
 
     flush_log()
 
     if ucp_ministry_ids:
         # Symmetry Query 1: UCP funding trace
-        with driver.session() as s:
-            sym1 = s.run("""
-                MATCH (org:Organization)-[g:RECEIVED_GRANT]->(m:OrgEntity)
-                WHERE m.canonical_id IN $ucp_ministry_ids
-                  AND org.bn IS NOT NULL
-                WITH org,
-                     sum(CASE WHEN g.political_era IN ['UCP_Kenney', 'UCP_Smith'] THEN g.amount ELSE 0 END) AS ucp_funding,
-                     sum(CASE WHEN g.political_era = 'NDP' THEN g.amount ELSE 0 END) AS ndp_funding,
-                     count(g) AS n_grants
-                WHERE ucp_funding > 0 OR ndp_funding > 0
-                WITH CASE WHEN org.cluster_id IS NOT NULL THEN true ELSE false END AS is_clustered,
-                     count(org) AS n_orgs,
-                     sum(ucp_funding) AS total_ucp,
-                     sum(ndp_funding) AS total_ndp,
-                     avg(ucp_funding) AS avg_ucp,
-                     avg(ndp_funding) AS avg_ndp
-                RETURN is_clustered, n_orgs, total_ucp, total_ndp,
-                       round(avg_ucp) AS avg_ucp, round(avg_ndp) AS avg_ndp
-                ORDER BY is_clustered DESC
-            """, ucp_ministry_ids=ucp_ministry_ids).data()
+        sym1 = q.sym1(ucp_ministry_ids)
 
         log(f"  UCP Symmetry: Clustered vs Non-Clustered through UCP-restructured ministries:")
         for r in sym1:
@@ -605,19 +748,7 @@ def main():
     log("=" * 72)
     log("BONUS: Same NDP-restructured ministries across ALL eras")
     log("=" * 72)
-    with driver.session() as s:
-        bonus = s.run("""
-            MATCH (org:Organization)-[g:RECEIVED_GRANT]->(m:OrgEntity)
-            WHERE m.canonical_id IN $ndp_ministry_ids
-              AND org.bn IS NOT NULL
-            WITH g.political_era AS era,
-                 count(DISTINCT org) AS n_orgs,
-                 sum(g.amount) AS total_amount,
-                 count(g) AS n_grants,
-                 avg(g.amount) AS avg_grant
-            RETURN era, n_orgs, total_amount, n_grants, round(avg_grant) AS avg_grant
-            ORDER BY total_amount DESC
-        """, ndp_ministry_ids=ndp_ministry_ids).data()
+    bonus = q.bonus(ndp_ministry_ids)
 
     if bonus:
         log(f"  Funding through NDP-RESTRUCTURED ministries by political era:")
@@ -631,23 +762,7 @@ def main():
     log("=" * 72)
     log("BONUS 2: Shared director links among top NDP grant recipients")
     log("=" * 72)
-    with driver.session() as s:
-        shared_dir_grants = s.run("""
-            // Find pairs of orgs that share directors AND both got NDP grants
-            MATCH (o1:Organization)-[sd:SHARED_DIRECTORS]->(o2:Organization)
-            WHERE o1.bn IS NOT NULL AND o2.bn IS NOT NULL
-            MATCH (o1)-[g1:RECEIVED_GRANT {political_era: 'NDP'}]->(m1:OrgEntity)
-            WHERE m1.canonical_id IN $ndp_ministry_ids
-            MATCH (o2)-[g2:RECEIVED_GRANT {political_era: 'NDP'}]->(m2:OrgEntity)
-            WHERE m2.canonical_id IN $ndp_ministry_ids
-            WITH o1, o2, sd.n_shared_directors AS n_shared,
-                 sum(DISTINCT g1.amount) AS o1_ndp, sum(DISTINCT g2.amount) AS o2_ndp
-            RETURN o1.name AS org1, o2.name AS org2, n_shared,
-                   o1_ndp, o2_ndp,
-                   o1.cluster_id AS cluster1, o2.cluster_id AS cluster2
-            ORDER BY n_shared DESC, o1_ndp + o2_ndp DESC
-            LIMIT 25
-        """, ndp_ministry_ids=ndp_ministry_ids).data()
+    shared_dir_grants = q.bonus2(ndp_ministry_ids)
 
     log(f"  Shared director pairs (both NDP grantees): {len(shared_dir_grants)}")
     for r in shared_dir_grants[:15]:
@@ -678,10 +793,13 @@ def main():
                 lines = sum(1 for _ in fh) - 1  # subtract header
             log(f"  {f}: {lines} rows")
 
-    driver.close()
+    if driver is not None:
+        log(cy.summary())
+        driver.close()
     flush_log()
     print(f"\nLog written to: {LOG_PATH}")
 
 
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+"""
+Shared-Director Pair Ranking
+Operation Lineage Audit — Phase 2
+
+Top-k SHARED_DIRECTORS pairs by funding, over the Parquet snapshot from
+02-graph-build/graph_snapshot.py. BONUS 2 in agent_2_governance_queries.py
+joins every shared-director edge against both ends' NDP grants, sorts the
+lot and keeps 25; here the work is split so a ranking touches each edge
+once:
+
+  rollup   per-org funding per era (orgs x eras, summed once per
+           ministry set and cached)
+  edges    the SHARED_DIRECTORS list as integer arrays
+  top-k    partition-based selection (np.partition, O(edges)), then a
+           sort of the k survivors only
+
+Either end of a pair can be scored on its own era set (NDP x UCP_Kenney
+asks which NDP grantees share directors with Kenney-era grantees; both
+orientations of each edge are ranked). Weightings:
+
+  lexicographic  n_shared, then combined funding (BONUS 2's ORDER BY)
+  product        n_shared x combined funding
+  combined       combined funding
+  min            n_shared x the smaller end's funding
+
+or any callable (n_shared, funding1, funding2) -> score.
+
+SnapshotQueries.bonus2 uses this ranker; the live Cypher is unchanged.
+
+Usage:
+  python pair_ranking.py                                          # NDP x NDP, top 25
+  python pair_ranking.py --eras NDP --eras2 UCP_Kenney --weight product -k 100
+  python pair_ranking.py --ndp-ministries --weight min
+"""
+
+import sys, os, time, argparse
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SCRIPT_DIR, '..', '02-graph-build'))
+from graph_snapshot import SNAPSHOT_DIR, load_snapshot
+
+# ── Configuration ────────────────────────────────────────────────────
+DEFAULT_K      = 25
+DEFAULT_WEIGHT = 'lexicographic'
+MAX_CACHED     = 16        # candidate edge sets kept per ranker
+
+WEIGHTS = {
+    'product':  lambda n, f1, f2: n * (f1 + f2),
+    'combined': lambda n, f1, f2: f1 + f2,
+    'min':      lambda n, f1, f2: n * np.minimum(f1, f2),
+}
+
+def log(msg):
+    ts = datetime.now().strftime("%H:%M:%S")
+    print(f"[{ts}] {msg}", flush=True)
+
+
+def top_k(keys, k, idx=None):
+    """Positions of the k largest rows by keys (primary first, all descending),
+    ties broken by position. Selection by partition, so only the survivors are sorted."""
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if idx is None:
+        idx = np.arange(len(keys[0]))
+    if len(idx) > k:
+        primary = keys[0][idx]
+        kth = np.partition(primary, len(idx) - k)[len(idx) - k]
+        above, tied = idx[primary > kth], idx[primary == kth]
+        need = k - len(above)
+        tied = top_k(keys[1:], need, tied) if len(keys) > 1 else tied[:need]
+        idx = np.concatenate([above, tied])
+    order = np.lexsort([idx] + [-key[idx] for key in reversed(keys)])
+    return idx[order][:k]
+
+
+class PairRanker:
+    """Top-k shared-director pairs over per-org era rollups."""
+
+    def __init__(self, shared, grants):
+        codes, bns = pd.factorize(pd.concat([shared['bn1'], shared['bn2'], grants['bn']],
+                                            ignore_index=True).astype(str))
+        n_sd = len(shared)
+        self.bns = np.asarray(bns, dtype=object)
+        self.src = codes[:n_sd].astype(np.int32)
+        self.dst = codes[n_sd:2 * n_sd].astype(np.int32)
+        self.n_shared = shared['n_shared_directors'].to_numpy(dtype=float)
+
+        self.g_org = codes[2 * n_sd:].astype(np.int32)
+        era_codes, eras = pd.factorize(grants['political_era'].fillna(''))
+        self.g_era = era_codes.astype(np.int32)
+        self.eras = [str(e) for e in eras]
+        ministry_codes, self.ministries = pd.factorize(grants['ministry_id'])
+        self.g_ministry = ministry_codes.astype(np.int32)
+        self.g_amount = grants['amount'].fillna(0).to_numpy(dtype=float)
+        self._rollups = {}
+        self._candidates = {}
+
+    @classmethod
+    def load(cls, path=SNAPSHOT_DIR, version=None):
+        _, tables = load_snapshot(path, version, tables=['shared_directors', 'grants'])
+        return cls(tables['shared_directors'], tables['grants'])
+
+    def rollup(self, ministry_ids=None, distinct=False):
+        """(funding, grant counts): orgs x eras, optionally through the given ministries only.
+
+        distinct sums each org's distinct amounts per era, as Cypher's sum(DISTINCT g.amount).
+        """
+        key = (frozenset(ministry_ids) if ministry_ids is not None else None, distinct)
+        if key not in self._rollups:
+            if key[0] is not None:
+                selected = np.zeros(len(self.ministries) + 1, dtype=bool)   # last slot: no ministry (-1)
+                selected[self.ministries.get_indexer(list(key[0]))] = True
+                selected[-1] = False
+                keep = selected[self.g_ministry]
+            else:
+                keep = np.ones(len(self.g_org), dtype=bool)
+            cell = self.g_org[keep].astype(np.int64) * len(self.eras) + self.g_era[keep]
+            amount = self.g_amount[keep]
+            size = len(self.bns) * len(self.eras)
+            counts = np.bincount(cell, minlength=size)
+            if distinct:
+                first = ~pd.DataFrame({'cell': cell, 'amount': amount}).duplicated().to_numpy()
+                cell, amount = cell[first], amount[first]
+            sums = np.bincount(cell, weights=amount, minlength=size)
+            shape = (len(self.bns), len(self.eras))
+            self._rollups[key] = (sums.reshape(shape), counts.reshape(shape))
+        return self._rollups[key]
+
+    def funding(self, eras, ministry_ids=None, distinct=False):
+        """Per-org funding over an era set, and whether the org has any such grant."""
+        sums, counts = self.rollup(ministry_ids, distinct)
+        cols = [self.eras.index(e) for e in eras if e in self.eras]
+        return sums[:, cols].sum(axis=1), counts[:, cols].sum(axis=1) > 0
+
+    def _edges(self, eras, eras2, ministry_ids, distinct, require_both):
+        """Candidate edges {'edges': (src, dst, n_shared, n_shared or 0, funding1, funding2)},
+        cached per era pair and ministry set so reranking with another k or weight skips the gather."""
+        key = (tuple(eras), tuple(eras2), frozenset(ministry_ids) if ministry_ids is not None else None,
+               distinct, require_both)
+        if key not in self._candidates:
+            f1, has1 = self.funding(eras, ministry_ids, distinct)
+            f2, has2 = self.funding(eras2, ministry_ids, distinct)
+            src, dst, n = self.src, self.dst, self.n_shared
+            if eras2 != eras:
+                src, dst, n = np.concatenate([src, dst]), np.concatenate([dst, src]), np.concatenate([n, n])
+            if require_both:
+                # Only edges whose ends both have grants in their eras; positions stay ordered
+                sel = np.flatnonzero(has1[src] & has2[dst])
+                src, dst, n = src[sel], dst[sel], n[sel]
+            if len(self._candidates) >= MAX_CACHED:
+                self._candidates.pop(next(iter(self._candidates)))
+            self._candidates[key] = {'edges': (src, dst, n, np.nan_to_num(n), f1[src], f2[dst])}
+        return self._candidates[key]
+
+    @staticmethod
+    def _by_n_shared(cand, k):
+        """Lexicographic top-k: edges pre-sorted by n_shared (once per candidate set), so
+        only the n_shared level the k-th pair falls in is ranked by funding."""
+        _, _, _, n0, a, b = cand['edges']
+        if 'levels' not in cand:
+            order = np.argsort(-n0, kind='stable')
+            ends = np.append(np.flatnonzero(np.diff(n0[order])) + 1, len(order))
+            cand['levels'] = (order, ends)
+        order, ends = cand['levels']
+        if len(order) <= k:
+            chosen = order
+        else:
+            level = np.searchsorted(ends, k)            # first level whose end reaches k
+            start = ends[level - 1] if level else 0
+            tied = order[start:ends[level]]
+            chosen = np.concatenate([order[:start], tied[top_k([a[tied] + b[tied]], k - start)]])
+        return top_k([n0, a + b], k, np.sort(chosen))
+
+    def top(self, k=DEFAULT_K, eras=('NDP',), eras2=None, weight=DEFAULT_WEIGHT,
+            ministry_ids=None, require_both=True, distinct=False):
+        """The k best pairs as dicts: bn1, bn2, n_shared, funding1, funding2, score.
+
+        funding1 is bn1's funding over `eras`, funding2 bn2's over `eras2`
+        (default: the same eras). With different era sets both orientations
+        of each edge compete. A NaN score from a weight callable ranks last.
+        """
+        if k <= 0:
+            return []
+        eras = list(eras)
+        eras2 = list(eras2) if eras2 is not None else eras
+        cand = self._edges(eras, eras2, ministry_ids, distinct, require_both)
+        src, dst, n, n0, a, b = cand['edges']
+
+        if weight == 'lexicographic':
+            best = self._by_n_shared(cand, k)
+            score = a + b
+        else:
+            score = np.asarray((WEIGHTS[weight] if isinstance(weight, str) else weight)(n0, a, b), dtype=float)
+            best = top_k([np.where(np.isnan(score), -np.inf, score)], k)
+        return [{
+            'bn1': str(self.bns[src[i]]), 'bn2': str(self.bns[dst[i]]),
+            'n_shared': None if np.isnan(n[i]) else int(n[i]),
+            'funding1': float(a[i]), 'funding2': float(b[i]),
+            'score': None if np.isnan(score[i]) else float(score[i]),
+        } for i in best]
+
+
+def main():
+    sys.stdout.reconfigure(encoding='utf-8')
+
+    ap = argparse.ArgumentParser(description="Top-k shared-director pairs by era funding.")
+    ap.add_argument('--snapshot', default=SNAPSHOT_DIR, help="snapshot root or version directory")
+    ap.add_argument('--version', help="snapshot version (default: LATEST)")
+    ap.add_argument('-k', type=int, default=DEFAULT_K)
+    ap.add_argument('--eras', default='NDP', help="comma-separated eras for the first org")
+    ap.add_argument('--eras2', help="comma-separated eras for the second org (default: --eras)")
+    ap.add_argument('--weight', default=DEFAULT_WEIGHT, choices=['lexicographic'] + sorted(WEIGHTS))
+    ap.add_argument('--ndp-ministries', action='store_true',
+                    help="only grants through NDP-restructured ministries (as BONUS 2)")
+    args = ap.parse_args()
+
+    t0 = time.time()
+    _, tables = load_snapshot(args.snapshot, args.version)
+    ranker = PairRanker(tables['shared_directors'], tables['grants'])
+    names = tables['organizations'].drop_duplicates('bn').set_index('bn')['name']
+    ids = None
+    if args.ndp_ministries:
+        from snapshot_queries import SnapshotQueries
+        ids = [m['cid'] for m in SnapshotQueries(tables).ndp_ministries()]
+    log(f"{len(ranker.src):,} shared-director edges, {len(ranker.bns):,} orgs, "
+        f"eras {', '.join(ranker.eras)} (loaded in {time.time() - t0:.1f}s)")
+
+    eras = args.eras.split(',')
+    eras2 = args.eras2.split(',') if args.eras2 else None
+    t1 = time.time()
+    ranker.rollup(ids)
+    t2 = time.time()
+    rows = ranker.top(args.k, eras, eras2, args.weight, ids)
+    t3 = time.time()
+    ranker.top(args.k, eras, eras2, args.weight, ids)
+    t4 = time.time()
+    log(f"Rollup {1000 * (t2 - t1):.0f} ms, top-{args.k} {1000 * (t3 - t2):.1f} ms "
+        f"({1000 * (t4 - t3):.1f} ms with the candidate edges cached)")
+    for r in rows:
+        log(f"  {r['n_shared'] or 0:>3.0f}  {str(names.get(r['bn1']))[:34]:<34} "
+            f"{str(names.get(r['bn2']))[:34]:<34} ${r['funding1']:>14,.0f} ${r['funding2']:>14,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+"""
+Governance Query Profiler
+Operation Lineage Audit — Phase 2
+
+Runs every named query in agent_2_governance_queries.py under PROFILE
+against Neo4j Aura and records, per plan operator: db hits, rows,
+estimated rows, page-cache hits/misses and time. Each run is stored as
+profiles/<YYYY-MM-DD>.json (a second run on the same day replaces it) and
+summarized in profiles/profile_report.md, which flags:
+
+  - regressions: total db hits or time up by more than --threshold
+    against the most recent earlier profile
+  - missing index use: label / relationship-type / all-nodes scans whose
+    rows are then filtered on a property (e.g. Query 3's
+    `member:Organization {cluster_id: ...}` lookup), listed as the
+    label.property an index would serve
+
+Results are consumed server-side (nothing is materialized client-side)
+and the query cache is bypassed.
+
+Usage:
+  python profile_queries.py                    # all queries
+  python profile_queries.py --queries q3,bonus2 --repeat 3
+"""
+
+import sys, os, re, json, time, argparse
+from datetime import datetime, date
+
+sys.stdout.reconfigure(encoding='utf-8')
+sys.stderr.reconfigure(encoding='utf-8')
+
+import agent_2_governance_queries as a2
+
+# ── Configuration ────────────────────────────────────────────────────
+SCRIPT_DIR   = os.path.dirname(os.path.abspath(__file__))
+PROFILE_DIR  = os.path.join(SCRIPT_DIR, "profiles")
+REPORT_NAME  = "profile_report.md"
+DEFAULT_THRESHOLD = 0.20
+
+# name -> (cypher, parameter set)
+QUERIES = {
+    'ndp_ministries': (a2.NDP_FWD_CYPHER, None),
+    'ucp_ministries': (a2.UCP_FWD_CYPHER, None),
+    'q1':     (a2.Q1_CYPHER,     'ndp'),
+    'q2':     (a2.Q2_CYPHER,     'ndp'),
+    'q2b':    (a2.Q2B_CYPHER,    'ndp'),
+    'q3':     (a2.Q3_CYPHER,     'ndp'),
+    'sym1':   (a2.SYM1_CYPHER,   'ucp'),
+    'bonus':  (a2.BONUS_CYPHER,  'ndp'),
+    'bonus2': (a2.BONUS2_CYPHER, 'ndp'),
+}
+
+SCAN_OPERATORS = ('AllNodesScan', 'NodeByLabelScan', 'RelationshipTypeScan',
+                  'AllRelationshipsScan')
+
+_PROP_REF  = re.compile(r'\b([A-Za-z_]\w*)\.([A-Za-z_]\w*)\b')
+_VAR_LABEL = re.compile(r'\b([A-Za-z_]\w*):([A-Za-z_]\w*)')
+
+def log(msg):
+    ts = datetime.now().strftime("%H:%M:%S")
+    print(f"[{ts}] {msg}", flush=True)
+
+
+# ── Plan flattening ──────────────────────────────────────────────────
+def _stat(op, key, arg_key):
+    v = op.get(key)
+    if v is None:
+        v = (op.get('args') or {}).get(arg_key)
+    return v or 0
+
+def flatten_plan(plan, depth=0, out=None):
+    """Profiled plan tree -> list of operator dicts (pre-order)."""
+    if out is None:
+        out = []
+    args = plan.get('args') or {}
+    out.append({
+        'depth': depth,
+        'operator': (plan.get('operatorType') or '').split('@')[0],
+        'details': args.get('Details') or '',
+        'db_hits': _stat(plan, 'dbHits', 'DbHits'),
+        'rows': _stat(plan, 'rows', 'Rows'),
+        'estimated_rows': float(args.get('EstimatedRows') or 0),
+        'page_cache_hits': _stat(plan, 'pageCacheHits', 'PageCacheHits'),
+        'page_cache_misses': _stat(plan, 'pageCacheMisses', 'PageCacheMisses'),
+        'time_ns': _stat(plan, 'time', 'Time'),
+    })
+    for child in plan.get('children') or []:
+        flatten_plan(child, depth + 1, out)
+    return out
+
+def missing_indexes(ops):
+    """label.property pairs that are found by scanning and then filtering."""
+    scanned = {}
+    for op in ops:
+        if op['operator'].endswith(SCAN_OPERATORS):
+            for var, label in _VAR_LABEL.findall(op['details']):
+                scanned[var] = (label, op['operator'])
+    found = {}
+    for op in ops:
+        if op['operator'] not in ('Filter', 'OptionalFilter'):
+            continue
+        for var, prop in _PROP_REF.findall(op['details']):
+            if var in scanned:
+                label, scan = scanned[var]
+                found[f"{label}.{prop}"] = {'scan': scan, 'db_hits': op['db_hits']}
+    return found
+
+
+# ── Profiling ────────────────────────────────────────────────────────
+def ministry_params(driver):
+    params = {}
+    with driver.session() as s:
+        params['ndp'] = {'ndp_ministry_ids': [
+            r['cid'] for r in s.run(a2.NDP_FWD_CYPHER) if r['cid']]}
+        params['ucp'] = {'ucp_ministry_ids': [
+            r['cid'] for r in s.run(a2.UCP_FWD_CYPHER) if r['cid']]}
+    return params
+
+def profile_query(driver, cypher, params, repeat=1):
+    """PROFILE one query; with repeat > 1, keep the fastest run."""
+    best = None
+    for _ in range(repeat):
+        t0 = time.time()
+        with driver.session() as s:
+            summary = s.run("PROFILE " + cypher, params or {}).consume()
+        wall = time.time() - t0
+        if best is None or wall < best[0]:
+            best = (wall, summary)
+    wall, summary = best
+    ops = flatten_plan(summary.profile or {})
+    return {
+        'wall_s': round(wall, 3),
+        'server_ms': (summary.result_available_after or 0) + (summary.result_consumed_after or 0),
+        'db_hits': sum(o['db_hits'] for o in ops),
+        'rows': ops[0]['rows'] if ops else 0,
+        'page_cache_hits': sum(o['page_cache_hits'] for o in ops),
+        'page_cache_misses': sum(o['page_cache_misses'] for o in ops),
+        'operators': ops,
+        'missing_indexes': missing_indexes(ops),
+    }
+
+
+# ── History & report ─────────────────────────────────────────────────
+def previous_profile(before):
+    if not os.path.isdir(PROFILE_DIR):
+        return None
+    days = sorted(f[:-5] for f in os.listdir(PROFILE_DIR)
+                  if re.fullmatch(r'\d{4}-\d{2}-\d{2}\.json', f) and f[:-5] < before)
+    if not days:
+        return None
+    with open(os.path.join(PROFILE_DIR, days[-1] + '.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+def regressions(run, prev, threshold):
+    flags = {}
+    if not prev:
+        return flags
+    for name, cur in run['queries'].items():
+        old = prev['queries'].get(name)
+        if not old:
+            continue
+        out = []
+        for metric in ('db_hits', 'server_ms'):
+            a, b = old[metric], cur[metric]
+            if a and (b - a) / a > threshold:
+                out.append(f"{metric} {a:,} -> {b:,} (+{(b - a) / a:.0%})")
+        if out:
+            flags[name] = out
+    return flags
+
+def write_report(run, prev, flags):
+    lines = [
+        "# Governance Query Profile",
+        "",
+        f"**Date:** {run['date']}  ",
+        f"**Compared with:** {prev['date'] if prev else 'none (first profile)'}",
+        "",
+        "| Query | db hits | rows | page cache hit/miss | server ms | flags |",
+        "|---|---:|---:|---:|---:|---|",
+    ]
+    for name, q in run['queries'].items():
+        notes = list(flags.get(name, []))
+        if q['missing_indexes']:
+            notes.append("no index: " + ", ".join(sorted(q['missing_indexes'])))
+        lines.append(f"| {name} | {q['db_hits']:,} | {q['rows']:,} | "
+                     f"{q['page_cache_hits']:,}/{q['page_cache_misses']:,} | "
+                     f"{q['server_ms']:,} | {'; '.join(notes) or '—'} |")
+
+    lines += ["", "## Most expensive operators", ""]
+    for name, q in run['queries'].items():
+        top = sorted(q['operators'], key=lambda o: -o['db_hits'])[:5]
+        lines.append(f"**{name}**")
+        lines.append("")
+        for o in top:
+            lines.append(f"- `{o['operator']}` {o['db_hits']:,} db hits, {o['rows']:,} rows "
+                         f"(est. {o['estimated_rows']:,.0f}) — {o['details'][:120]}")
+        lines.append("")
+
+    path = os.path.join(PROFILE_DIR, REPORT_NAME)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
+    return path
+
+
+def main():
+    ap = argparse.ArgumentParser(description="PROFILE the agent_2 governance queries.")
+    ap.add_argument('--queries', help="comma-separated subset of: " + ", ".join(QUERIES))
+    ap.add_argument('--repeat', type=int, default=1, help="runs per query; the fastest is kept")
+    ap.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                    help="relative increase flagged as a regression")
+    args = ap.parse_args()
+
+    names = args.queries.split(',') if args.queries else list(QUERIES)
+    unknown = [n for n in names if n not in QUERIES]
+    if unknown:
+        ap.error(f"unknown queries: {', '.join(unknown)}")
+
+    from graph_client import GraphClient
+    driver = GraphClient(a2.NEO4J_URI, a2.NEO4J_USER, a2.NEO4J_PASSWORD)
+    try:
+        driver.verify_connectivity()
+        params = ministry_params(driver)
+        log(f"NDP ministries: {len(params['ndp']['ndp_ministry_ids'])}, "
+            f"UCP ministries: {len(params['ucp']['ucp_ministry_ids'])}")
+
+        today = date.today().isoformat()
+        run = {'date': today, 'profiled_at': datetime.now().isoformat(timespec='seconds'),
+               'queries': {}}
+        for name in names:
+            cypher, pset = QUERIES[name]
+            q = profile_query(driver, cypher, params.get(pset), args.repeat)
+            run['queries'][name] = q
+            log(f"  {name}: {q['db_hits']:,} db hits, {q['rows']:,} rows, {q['server_ms']:,} ms"
+                + (f"  [no index: {', '.join(q['missing_indexes'])}]" if q['missing_indexes'] else ""))
+    finally:
+        driver.close()
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    prev = previous_profile(today)
+    flags = regressions(run, prev, args.threshold)
+    run['regressions'] = flags
+    with open(os.path.join(PROFILE_DIR, f"{today}.json"), 'w', encoding='utf-8') as f:
+        json.dump(run, f, indent=2)
+    path = write_report(run, prev, flags)
+
+    for name, out in flags.items():
+        log(f"  REGRESSION {name}: {'; '.join(out)}")
+    log(f"Report written to {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Snapshot Query Backend
+Operation Lineage Audit — Phase 2
+
+Pandas equivalents of the Cypher in agent_2_governance_queries.py and
+06-validation/statistical_tests.py, evaluated against the Parquet snapshot
+from 02-graph-build/graph_snapshot.py. Every method returns a list of dicts
+shaped exactly like the corresponding `session.run(...).data()` call, so the
+reporting code is shared between live and offline runs.
+"""
+
+import os, sys
+import numpy as np
+import pandas as pd
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SCRIPT_DIR, '..', '02-graph-build'))
+from graph_snapshot import SNAPSHOT_DIR, load_snapshot
+from pair_ranking import PairRanker
+
+NDP_START = '2015-05-24'
+NDP_END   = '2019-04-29'
+UCP_START = '2019-04-30'
+UCP_ERAS  = ['UCP_Kenney', 'UCP_Smith']
+
+
+def _records(df):
+    """DataFrame -> list of dicts with NaN as None (like Neo4j nulls)."""
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+def _scalar(v):
+    """One value as Neo4j would return it: None for NaN / pd.NA / NaT, numpy scalars as Python."""
+    if v is None or (np.ndim(v) == 0 and pd.isna(v)):
+        return None
+    return v.item() if isinstance(v, np.generic) else v
+
+def _cypher_round(x):
+    """Cypher round(): half away from zero."""
+    return float(np.sign(x) * np.floor(np.abs(x) + 0.5))
+
+
+class SnapshotQueries:
+    """Governance queries over one snapshot version."""
+
+    def __init__(self, tables, manifest=None):
+        self.manifest = manifest or {}
+        self.grants = tables['grants']
+        self.orgs = tables['organizations'].drop_duplicates('bn').set_index('bn')
+        self.events = tables['event_links']
+        self.shared = tables['shared_directors']
+        self.flags = tables['risk_flags']
+        self._ranker = None
+        self.target_pattern = "(evt:TransformEvent)-[:TARGET_OF]->(m:OrgEntity)"
+
+    @classmethod
+    def load(cls, path=SNAPSHOT_DIR, version=None):
+        manifest, tables = load_snapshot(path, version)
+        return cls(tables, manifest)
+
+    # ── Helpers ──────────────────────────────────────────────────────
+    def _org(self, bns, col):
+        return self.orgs[col].reindex(bns).to_numpy()
+
+    def _ministries(self, mask, roles=('TARGET_OF',)):
+        ev = self.events[mask & self.events['role'].isin(roles)]
+        ev = ev.dropna(subset=['ministry_id']).drop_duplicates('ministry_id')
+        return _records(ev.rename(columns={'ministry_id': 'cid', 'ministry_name': 'name'})[['cid', 'name']]
+                        .sort_values('cid'))
+
+    def _era_sums(self, g):
+        """Per-org NDP / UCP / PC sums and grant counts for grant rows g."""
+        era = g['political_era']
+        amt = g['amount'].fillna(0)
+        out = pd.DataFrame({
+            'bn': g['bn'],
+            'ndp': amt.where(era == 'NDP', 0),
+            'ucp': amt.where(era.isin(UCP_ERAS), 0),
+            'pc': amt.where(era == 'PC', 0),
+            'amount': amt,
+            'n': 1,
+        }).groupby('bn', sort=False).sum()
+        out['is_clustered'] = pd.notna(self._org(out.index, 'cluster_id'))
+        return out
+
+    def _through(self, ids):
+        return self.grants[self.grants['ministry_id'].isin(set(ids))]
+
+    def ndp_event_mask(self):
+        d = self.events['event_date'].fillna('')
+        return (self.events['political_context'].fillna('').str.contains('NDP')
+                | ((d >= NDP_START) & (d <= NDP_END)))
+
+    def ucp_event_mask(self):
+        d = self.events['event_date'].fillna('')
+        return self.events['political_context'].fillna('').str.contains('UCP') | (d >= UCP_START)
+
+    # ── STEP 1 / Symmetry: restructured ministries ───────────────────
+    def ndp_ministries(self):
+        return self._ministries(self.ndp_event_mask())
+
+    def ndp_ministries_any_rel(self):
+        return self._ministries(self.ndp_event_mask(), roles=('TARGET_OF', 'SOURCE_OF'))
+
+    def ucp_ministries(self):
+        found = self._ministries(self.ucp_event_mask())
+        return found or self._ministries(self.ucp_event_mask(), roles=('TARGET_OF', 'SOURCE_OF'))
+
+    # ── statistical_tests.py CYPHER_QUERY ────────────────────────────
+    def ndp_org_funding(self):
+        ids = [m['cid'] for m in self.ndp_ministries()]
+        g = self._through(ids)
+        g = g[g['political_era'] == 'NDP']
+        per = g.groupby('bn', sort=False)['amount'].sum().rename('ndp_funding').reset_index()
+        per['org_name'] = self._org(per['bn'], 'name')
+        per['cluster_id'] = self._org(per['bn'], 'cluster_id')
+        per['is_clustered'] = pd.notna(per['cluster_id'])
+        per = per.sort_values('ndp_funding', ascending=False, kind='stable')
+        return _records(per[['org_name', 'bn', 'is_clustered', 'cluster_id', 'ndp_funding']])
+
+    # ── QUERY 1: NDP Ministry Funding Trace ──────────────────────────
+    def q1(self, ids):
+        g = self._through(ids)
+        sums = self._era_sums(g)
+        sums = sums[(sums['ndp'] > 0) | (sums['ucp'] > 0)]
+        names = g.groupby('bn', sort=False)['ministry_name'].agg(lambda s: list(dict.fromkeys(s.dropna())))
+        flags = self.flags.groupby('bn')['flag_type'].agg(lambda s: list(dict.fromkeys(s.dropna())))
+
+        rows = []
+        for bn, r in sums.iterrows():
+            risk = flags.get(bn, [])
+            rows.append({
+                'org_name': self.orgs['name'].get(bn), 'bn': bn, 'city': self.orgs['city'].get(bn),
+                'cluster_id': self.orgs['cluster_id'].get(bn), 'cluster_size': self.orgs['cluster_size'].get(bn),
+                'total_ndp': r['ndp'], 'total_ucp': r['ucp'], 'total_pc': r['pc'],
+                'delta_pct': _cypher_round((r['ucp'] - r['ndp']) * 100.0 / r['ndp']) if r['ndp'] > 0 else None,
+                'total_grants': int(r['n']), 'ndp_ministries': names.get(bn, []),
+                'risk_flags': risk, 'n_flags': len(risk),
+            })
+        rows.sort(key=lambda r: -r['total_ndp'])
+        return [{k: _scalar(v) for k, v in r.items()} for r in rows]
+
+    # ── QUERY 2: Director-Cluster-Funding-Concentration ──────────────
+    def q2(self, ids):
+        g = self._through(ids)
+        g = g[g['political_era'] == 'NDP']
+        sums = self._era_sums(g)
+        rows = []
+        for is_clustered in (True, False):
+            f = sums.loc[sums['is_clustered'] == is_clustered, 'amount'].to_numpy(dtype=float)
+            if len(f) == 0:
+                continue
+            rows.append({
+                'is_clustered': is_clustered, 'n_orgs': len(f), 'total_funding': float(f.sum()),
+                'avg_per_org': _cypher_round(f.mean()),
+                'median_per_org': _cypher_round(np.percentile(f, 50)),
+                'p75_per_org': _cypher_round(np.percentile(f, 75)),
+                'p95_per_org': _cypher_round(np.percentile(f, 95)),
+                'min_per_org': _cypher_round(f.min()),
+                'max_per_org': _cypher_round(f.max()),
+            })
+        return rows
+
+    def q2b(self, ids):
+        sums = self._era_sums(self._through(ids))
+        rows = []
+        for is_clustered in (True, False):
+            s = sums[sums['is_clustered'] == is_clustered]
+            if len(s) == 0:
+                continue
+            rows.append({
+                'is_clustered': is_clustered, 'n_orgs': len(s),
+                'total_ndp': float(s['ndp'].sum()), 'total_ucp': float(s['ucp'].sum()),
+                'total_pc': float(s['pc'].sum()), 'total_all': float(s['amount'].sum()),
+                'avg_ndp': float(s['ndp'].mean()), 'avg_ucp': float(s['ucp'].mean()),
+                'avg_pc': float(s['pc'].mean()),
+            })
+        return rows
+
+    # ── QUERY 3: Governance Cluster NDP Audit ────────────────────────
+    def q3(self, ids):
+        sums = self._era_sums(self._through(ids))
+        sums = sums[sums['is_clustered']].copy()
+        sums['cluster_id'] = self._org(sums.index, 'cluster_id')
+        sums['name'] = self._org(sums.index, 'name')
+
+        members = self.orgs.reset_index()
+        size = members.groupby('cluster_id')['bn'].nunique()
+        mflags = self.flags.merge(members[['bn', 'cluster_id']], on='bn').dropna(subset=['cluster_id'])
+        n_types = mflags.groupby('cluster_id')['flag_type'].nunique()
+        n_flags = mflags.groupby('cluster_id')['flag_type'].count()
+
+        rows = []
+        for cid, c in sums.groupby('cluster_id', sort=False):
+            ndp, ucp = float(c['ndp'].sum()), float(c['ucp'].sum())
+            if ndp <= 0:
+                continue
+            rows.append({
+                'cluster_id': _scalar(cid), 'total_cluster_size': int(size.get(cid, 0)),
+                'cluster_grant_recipients': len(c),
+                'cluster_ndp_total': ndp, 'cluster_ucp_total': ucp,
+                'delta_pct': _cypher_round((ucp - ndp) * 100.0 / ndp),
+                'distinct_flag_types': int(n_types.get(cid, 0)),
+                'total_flags_in_cluster': int(n_flags.get(cid, 0)),
+                'sample_orgs': list(dict.fromkeys(c['name'].dropna()))[:8],
+            })
+        rows.sort(key=lambda r: -r['cluster_ndp_total'])
+        return rows
+
+    # ── SYMMETRY TEST: UCP Era ───────────────────────────────────────
+    def sym1(self, ucp_ids):
+        sums = self._era_sums(self._through(ucp_ids))
+        sums = sums[(sums['ucp'] > 0) | (sums['ndp'] > 0)]
+        rows = []
+        for is_clustered in (True, False):
+            s = sums[sums['is_clustered'] == is_clustered]
+            if len(s) == 0:
+                continue
+            rows.append({
+                'is_clustered': is_clustered, 'n_orgs': len(s),
+                'total_ucp': float(s['ucp'].sum()), 'total_ndp': float(s['ndp'].sum()),
+                'avg_ucp': _cypher_round(s['ucp'].mean()), 'avg_ndp': _cypher_round(s['ndp'].mean()),
+            })
+        return rows
+
+    # ── BONUS: per-era totals through the same ministries ────────────
+    def bonus(self, ids):
+        g = self._through(ids)
+        agg = g.groupby('political_era', dropna=False).agg(
+            n_orgs=('bn', 'nunique'), total_amount=('amount', 'sum'),
+            n_grants=('amount', 'size'), avg_grant=('amount', 'mean')).reset_index()
+        agg['avg_grant'] = agg['avg_grant'].map(_cypher_round)
+        agg = agg.rename(columns={'political_era': 'era'}).sort_values('total_amount', ascending=False)
+        return _records(agg[['era', 'n_orgs', 'total_amount', 'n_grants', 'avg_grant']])
+
+    # ── BONUS 2: shared-director pairs among NDP grantees ────────────
+    def bonus2(self, ids, limit=25):
+        if self._ranker is None:
+            self._ranker = PairRanker(self.shared, self.grants)
+        # sum(DISTINCT g.amount) per org, as in the Cypher
+        top = self._ranker.top(limit, eras=['NDP'], ministry_ids=ids, distinct=True)
+        return [{k: _scalar(v) for k, v in {
+            'org1': self.orgs['name'].get(r['bn1']), 'org2': self.orgs['name'].get(r['bn2']),
+            'n_shared': r['n_shared'], 'o1_ndp': r['funding1'], 'o2_ndp': r['funding2'],
+            'cluster1': self.orgs['cluster_id'].get(r['bn1']),
+            'cluster2': self.orgs['cluster_id'].get(r['bn2']),
+        }.items()} for r in top]
@@ -0,0 +1,257 @@
+"""
+Lineage-aware funding attribution engine.
+
+Propagates per-era ministry funding along the TransformEvent lineage DAG
+(SPLIT, MERGE, RENAME, TRANSFER) and emits Sankey node/link tables for
+generate_sankey.py. Replaces the hand-coded split fractions and name maps
+(may2025_map, kenney_to_current, ...) that used to live in that script.
+
+Columns and eras are data, not code. Defaults mirror D002; override them
+with sankey_config.json next to this file, or a "sankey_config" key in
+sankey_data.json:
+
+    {
+      "eras":    [{"era": "PC", "start": null, "end": "2015-05-23"}, ...],
+      "columns": [{"label": "NDP ERA (2015-2019)", "funding_era": "NDP",
+                   "as_of": "2019-04-29", "top_n": 16, "color": "#e67e22"}, ...],
+      "entity_type": "ministry",
+      "jurisdiction": null,
+      "split_fractions": {"EVT-0061": {"HOSPITAL AND SURGICAL HEALTH SERVICES": 0.5}}
+    }
+
+Split weights at each event, in priority order:
+  1. explicit split_fractions for (event_id, target)
+  2. data-derived: targets' funding in the era being attributed
+  3. equal share across targets
+TRANSFER sources persist, so they keep the share not attributed to targets.
+
+Every node is resolved in O(lineage depth) and links are accumulated in a
+dict keyed by (source_index, target_index), so building the Sankey stays
+linear in the number of entities.
+"""
+
+import os, sys, json
+from collections import defaultdict
+from datetime import date, timedelta
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.path.join(SCRIPT_DIR, 'sankey_config.json')
+
+sys.path.insert(0, os.path.join(SCRIPT_DIR, '..', '02-graph-build'))
+from lineage_closure import build_adjacency, PERSISTING_SOURCE_TYPES
+
+# Political era boundaries (D002)
+DEFAULT_ERAS = [
+    {'era': 'PC',         'start': None,         'end': '2015-05-23'},
+    {'era': 'NDP',        'start': '2015-05-24', 'end': '2019-04-29'},
+    {'era': 'UCP_Kenney', 'start': '2019-04-30', 'end': '2022-10-10'},
+    {'era': 'UCP_Smith',  'start': '2022-10-11', 'end': None},
+]
+
+# One Sankey column per entry; as_of is the date each column's names are resolved to
+DEFAULT_COLUMNS = [
+    {'label': 'PC ERA (pre-2015)',      'funding_era': 'PC',         'top_n': 14, 'color': '#95a5a6'},
+    {'label': 'NDP ERA (2015-2019)',    'funding_era': 'NDP',        'top_n': 16, 'color': '#e67e22'},
+    {'label': 'UCP-KENNEY (2019-2022)', 'funding_era': 'UCP_Kenney', 'top_n': 16, 'color': '#28bcb8'},
+    {'label': 'CURRENT (May 2025)',     'funding_era': 'UCP_Smith',  'top_n': 19, 'color': '#1a8a87'},
+]
+
+DEFAULT_CONFIG = {
+    'eras':            DEFAULT_ERAS,
+    'columns':         DEFAULT_COLUMNS,
+    'entity_type':     'ministry',
+    'jurisdiction':    None,
+    'min_funding':     1e6,
+    'split_fractions': {},
+}
+
+MAX_HOPS = 64
+
+
+def load_config(data=None, path=CONFIG_PATH):
+    """Defaults, overlaid by sankey_config.json, overlaid by data['sankey_config']."""
+    config = dict(DEFAULT_CONFIG)
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            config.update(json.load(f))
+    if data and data.get('sankey_config'):
+        config.update(data['sankey_config'])
+    return config
+
+
+def abbreviate(name, width=28):
+    return name if len(name) <= width else name[:width - 2] + '...'
+
+
+class FundingAttribution:
+    """Attribute per-era funding to lineage successors and build Sankey tables."""
+
+    def __init__(self, funding_rows, events, config, entities=None):
+        self.config = config
+        self.eras = {e['era']: e for e in config['eras']}
+
+        self.funding = defaultdict(dict)
+        for row in funding_rows:
+            self.funding[row['ministry']][row['era']] = (
+                self.funding[row['ministry']].get(row['era'], 0) + (row['total'] or 0))
+
+        self.allowed = None
+        if entities is not None:
+            etype, juris = config.get('entity_type'), config.get('jurisdiction')
+            self.allowed = {
+                n['name'] for n in entities
+                if (not etype or n.get('entity_type') == etype)
+                and (not juris or (n.get('jurisdiction') or '').lower() == juris.lower())
+            }
+
+        steps = []
+        for ev in events:
+            src, tgt = ev.get('source_name'), ev.get('target_name')
+            if not src or not tgt:
+                continue
+            if self.allowed is not None and (src not in self.allowed or tgt not in self.allowed):
+                continue
+            steps.append({
+                'source_id':  src,
+                'target_id':  tgt,
+                'event_id':   ev['event_id'],
+                'event_type': (ev.get('event_type') or '').upper(),
+                'event_date': ev.get('event_date') or '',
+            })
+        self.steps = steps
+        # The day before the earliest event: propagate's window is open at its start
+        dated = sorted(st['event_date'][:10] for st in steps if st['event_date'])
+        self.lineage_start = (date.fromisoformat(dated[0]) - timedelta(days=1)).isoformat() if dated else None
+        adj = build_adjacency(steps)
+
+        # node -> [(date, event_id, event_type, [targets])], date-ordered
+        self.events_from = {}
+        for src, out in adj.items():
+            grouped = {}
+            for st in out:
+                key = (st['event_date'], st['event_id'])
+                grouped.setdefault(key, (st['event_type'], []))[1].append(st['target_id'])
+            self.events_from[src] = [(d, eid, et, tg) for (d, eid), (et, tg) in grouped.items()]
+
+    @classmethod
+    def from_sankey_data(cls, data, config):
+        return cls(data['funding'], data['events'], config, entities=data.get('nodes'))
+
+    # ── Era helpers ──────────────────────────────────────────────────
+    def era_of_date(self, d):
+        if not d:
+            return 'UNKNOWN'
+        for e in self.config['eras']:
+            if (e['start'] is None or d >= e['start']) and (e['end'] is None or d <= e['end']):
+                return e['era']
+        return 'UNKNOWN'
+
+    def column_window(self, col):
+        """(start, as_of) dates for a column; None means open-ended. The
+        window starts at the earliest lineage event, not the era start, so
+        funding booked under a name retired before the era still resolves
+        to its as_of successor."""
+        era = self.eras.get(col['funding_era'], {})
+        return self.lineage_start, col.get('as_of', era.get('end'))
+
+    # ── Propagation ──────────────────────────────────────────────────
+    def shares(self, src, event_id, event_type, targets, era):
+        """[(entity, fraction)] for one event; persisting sources keep the remainder."""
+        explicit = self.config.get('split_fractions', {}).get(event_id, {})
+        persists = event_type in PERSISTING_SOURCE_TYPES
+
+        out = [(t, float(explicit[t])) for t in targets if t in explicit]
+        remaining = max(0.0, 1.0 - sum(f for _, f in out))
+        open_targets = [t for t in targets if t not in explicit]
+        candidates = open_targets + ([src] if persists else [])
+
+        if candidates and remaining > 0:
+            weights = [max(self.funding.get(c, {}).get(era, 0), 0) for c in candidates]
+            total = sum(weights)
+            if total <= 0:
+                weights, total = [1.0] * len(candidates), float(len(candidates))
+            out.extend((c, remaining * w / total) for c, w in zip(candidates, weights))
+        elif persists and remaining > 0:
+            out.append((src, remaining))
+        return out
+
+    def propagate(self, key, amount, lo, hi, era, stop=frozenset()):
+        """Push amount from key through events dated in (lo, hi].
+
+        Returns {terminal: [amount, first_event_type]}; first_event_type is
+        None when the amount never moved.
+        """
+        result = {}
+        work = [(key, amount, (lo or '', ''), None, 0)]
+        while work:
+            node, amt, after, first_type, hops = work.pop()
+            nxt = None
+            if hops < MAX_HOPS and not (hops and node in stop):
+                for d, eid, et, targets in self.events_from.get(node, ()):
+                    if (d, eid) > after and (hi is None or d <= hi) and (lo is None or d > lo):
+                        if nxt is None or (d, eid) < nxt[:2]:
+                            nxt = (d, eid, et, targets)
+            if nxt is None:
+                entry = result.setdefault(node, [0.0, first_type])
+                entry[0] += amt
+                continue
+            d, eid, et, targets = nxt
+            ftype = first_type or et.lower()
+            for ent, frac in self.shares(node, eid, et, targets, era):
+                if frac <= 0:
+                    continue
+                if ent == node:
+                    work.append((node, amt * frac, (d, eid), first_type, hops + 1))
+                else:
+                    work.append((ent, amt * frac, (d, ''), ftype, hops + 1))
+        return result
+
+    # ── Sankey tables ────────────────────────────────────────────────
+    def column_amounts(self, col):
+        """{entity: amount} for a column, resolved to its as_of names."""
+        era = col['funding_era']
+        lo, hi = self.column_window(col)
+        resolved = defaultdict(float)
+        for name, eras in self.funding.items():
+            amt = eras.get(era, 0)
+            if amt <= 0 or (self.allowed is not None and name not in self.allowed):
+                continue
+            for ent, (a, _) in self.propagate(name, amt, lo, hi, era).items():
+                resolved[ent] += a
+
+        min_val = col.get('min_funding', self.config.get('min_funding', 0))
+        items = sorted(((k, v) for k, v in resolved.items() if v >= min_val), key=lambda x: -x[1])
+        if col.get('top_n'):
+            items = items[:col['top_n']]
+        return dict(items)
+
+    def build(self):
+        """Return (columns, nodes, links) in the shape generate_sankey.py renders."""
+        cols = self.config['columns']
+        col_amounts = [self.column_amounts(c) for c in cols]
+
+        nodes, node_index = [], {}
+        for ci, amounts in enumerate(col_amounts):
+            for name, amt in amounts.items():
+                node_index[(name, ci)] = len(nodes)
+                nodes.append({'name': abbreviate(name), 'col': ci, 'funding': amt, 'fullName': name})
+
+        acc = {}
+        for ci in range(len(cols) - 1):
+            _, lo = self.column_window(cols[ci])
+            _, hi = self.column_window(cols[ci + 1])
+            era = cols[ci + 1]['funding_era']
+            present = col_amounts[ci + 1]
+            for name, amt in col_amounts[ci].items():
+                src = node_index[(name, ci)]
+                for ent, (a, first_type) in self.propagate(name, amt, lo, hi, era, stop=present).items():
+                    if ent not in present:
+                        continue
+                    k = (src, node_index[(ent, ci + 1)])
+                    link = acc.get(k)
+                    if link is None:
+                        acc[k] = link = {'source': k[0], 'target': k[1],
+                                         'type': first_type or 'continuation', 'value': 0.0}
+                    link['value'] += a
+
+        return col_amounts, nodes, list(acc.values())
@@ -1,275 +1,41 @@
 """
 Generate accurate Sankey HTML from Neo4j graph data.
 Reads sankey_data.json and produces 01-ministry-lineage-political.html
+
+Column membership, within-era collapses and cross-era links come from
+funding_attribution.py, which walks the TransformEvent lineage instead of
+hand-coded name maps. Columns/eras are configured in sankey_config.json.
 """
-import json, math, os
+import json, math, os, sys
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_PATH = os.path.join(SCRIPT_DIR, 'sankey_data.json')
 OUT_PATH = os.path.join(SCRIPT_DIR, '01-ministry-lineage-political.html')
 
+sys.path.insert(0, SCRIPT_DIR)
+from funding_attribution import FundingAttribution, load_config
+
 with open(DATA_PATH) as f:
     data = json.load(f)
 
-# ── Build funding lookup: {ministry_name: {era: amount}} ──
-funding_map = {}
-for row in data['funding']:
-    m, era, total = row['ministry'], row['era'], row['total']
-    if m not in funding_map:
-        funding_map[m] = {}
-    funding_map[m][era] = total
-
-def get_funding(name, era):
-    return funding_map.get(name, {}).get(era, 0)
+config = load_config(data)
+engine = FundingAttribution.from_sankey_data(data, config)
 
 # ── Filter ministry-level transform events ──
-ministry_nodes = {n['name'] for n in data['nodes'] if n['entity_type'] == 'ministry'}
-
-ministry_events = []
-for ev in data['events']:
-    if ev['source_name'] in ministry_nodes and ev['target_name'] in ministry_nodes:
-        ministry_events.append(ev)
+ministry_nodes = engine.allowed
+ministry_events = [ev for ev in data['events']
+                   if ev['source_name'] in ministry_nodes and ev['target_name'] in ministry_nodes]
 
 # ── Classify events by political era ──
-def era_of_date(d):
-    if not d: return 'UNKNOWN'
-    if d < '2015-05-24': return 'PC'
-    if d < '2019-04-30': return 'NDP'
-    if d < '2022-10-11': return 'UCP_Kenney'
-    return 'UCP_Smith'
-
-# ── Define 4 Sankey columns ──
-# Col 0: PC roots (pre-2015)
-# Col 1: NDP state (after NDP restructuring 2015-2016)
-# Col 2: UCP-Kenney end state (after July 2021 shuffle)
-# Col 3: Current (after May 2025 restructuring)
-
-# For each column, pick which ministry names appear.
-# A ministry appears in a column if it has funding in that era, OR is the target of
-# a transform event in that era.
-
-# PC column: ministries with PC-era funding
-pc_ministries = {}
-for m, eras in funding_map.items():
-    if m in ministry_nodes and 'PC' in eras and eras['PC'] > 0:
-        pc_ministries[m] = eras['PC']
-
-# NDP column: ministries with NDP-era funding (combine overlapping old/new names)
-ndp_ministries = {}
-for m, eras in funding_map.items():
-    if m in ministry_nodes and 'NDP' in eras and eras['NDP'] > 0:
-        ndp_ministries[m] = eras['NDP']
-
-# Combine INNOVATION AND ADVANCED EDUCATION NDP into ADVANCED EDUCATION
-if 'INNOVATION AND ADVANCED EDUCATION' in ndp_ministries and 'ADVANCED EDUCATION' in ndp_ministries:
-    ndp_ministries['ADVANCED EDUCATION'] += ndp_ministries.pop('INNOVATION AND ADVANCED EDUCATION')
-# Combine SENIORS NDP into SENIORS AND HOUSING
-if 'SENIORS' in ndp_ministries and 'SENIORS AND HOUSING' in ndp_ministries:
-    ndp_ministries['SENIORS AND HOUSING'] += ndp_ministries.pop('SENIORS')
-# Combine ABORIGINAL RELATIONS NDP into INDIGENOUS RELATIONS
-if 'ABORIGINAL RELATIONS' in ndp_ministries and 'INDIGENOUS RELATIONS' in ndp_ministries:
-    ndp_ministries['INDIGENOUS RELATIONS'] += ndp_ministries.pop('ABORIGINAL RELATIONS')
-# Remove HUMAN SERVICES from NDP (it's pre-split overlap; show split products instead)
-if 'HUMAN SERVICES' in ndp_ministries:
-    hs_ndp = ndp_ministries.pop('HUMAN SERVICES')
-    # Distribute to split products proportionally
-    splits = ['CHILDREN\'S SERVICES', 'COMMUNITY AND SOCIAL SERVICES', 'LABOUR']
-    split_total = sum(ndp_ministries.get(s, 0) for s in splits)
-    if split_total > 0:
-        for s in splits:
-            if s in ndp_ministries:
-                ndp_ministries[s] += hs_ndp * (ndp_ministries[s] / split_total)
-
-# Kenney column: ministries with UCP_Kenney funding
-kenney_ministries = {}
-for m, eras in funding_map.items():
-    if m in ministry_nodes and 'UCP_Kenney' in eras and eras['UCP_Kenney'] > 0:
-        kenney_ministries[m] = eras['UCP_Kenney']
-
-# Current column: post-May 2025 state
-# Use UCP_Smith funding but map to current names via May 2025 events
-current_ministries = {}
-
-# First, get all Smith-era funding
-smith_funding = {}
-for m, eras in funding_map.items():
-    if m in ministry_nodes and 'UCP_Smith' in eras and eras['UCP_Smith'] > 0:
-        smith_funding[m] = eras['UCP_Smith']
-
-# May 2025 renames/merges: map old → new
-may2025_map = {
-    'HEALTH': [('HOSPITAL AND SURGICAL HEALTH SERVICES', 0.5),
-               ('PRIMARY AND PREVENTATIVE HEALTH SERVICES', 0.5)],
-    'EDUCATION': [('EDUCATION AND CHILDCARE', 1.0)],
-    'SENIORS, COMMUNITY AND SOCIAL SERVICES': [('ASSISTED LIVING AND SOCIAL SERVICES', 1.0)],
-    'JOBS, ECONOMY AND TRADE': [('JOBS, ECONOMY, TRADE AND IMMIGRATION', 1.0)],
-    'IMMIGRATION AND MULTICULTURALISM': [('JOBS, ECONOMY, TRADE AND IMMIGRATION', 1.0)],
-}
-
-for m, amount in smith_funding.items():
-    if m in may2025_map:
-        for new_name, frac in may2025_map[m]:
-            current_ministries[new_name] = current_ministries.get(new_name, 0) + amount * frac
-    else:
-        # Check if this is an intermediate Smith-era name that was renamed
-        # Map intermediate names to their current successors
-        intermediate_map = {
-            'CHILDREN\'S SERVICES': 'CHILDREN AND FAMILY SERVICES',
-            'CULTURE': 'ARTS, CULTURE AND STATUS OF WOMEN',
-            'FORESTRY, PARKS AND TOURISM': 'FORESTRY AND PARKS',  # simplified
-            'TRADE, IMMIGRATION AND MULTICULTURALISM': 'JOBS, ECONOMY, TRADE AND IMMIGRATION',
-            'JOBS, ECONOMY AND NORTHERN DEVELOPMENT': 'JOBS, ECONOMY, TRADE AND IMMIGRATION',
-        }
-        target = intermediate_map.get(m, m)
-        current_ministries[target] = current_ministries.get(target, 0) + amount
-
-# ── Filter to top N per column for readability ──
-def top_n(d, n=18, min_val=1e6):
-    items = [(k, v) for k, v in d.items() if v >= min_val]
-    items.sort(key=lambda x: -x[1])
-    return dict(items[:n])
-
-pc_ministries = top_n(pc_ministries, 14)
-ndp_ministries = top_n(ndp_ministries, 16)
-kenney_ministries = top_n(kenney_ministries, 16)
-current_ministries = top_n(current_ministries, 19)
-
-# ── Build Sankey nodes ──
-nodes = []  # [{name, col, funding, fullName}]
-node_index = {}  # "name|col" -> index
-
-def add_node(name, col, funding, abbrev=None):
-    key = f"{name}|{col}"
-    if key in node_index:
-        return node_index[key]
-    idx = len(nodes)
-    node_index[key] = idx
-    # Create abbreviated name for display
-    if abbrev is None:
-        abbrev = name
-        if len(abbrev) > 28:
-            abbrev = abbrev[:26] + '...'
-    nodes.append({'name': abbrev, 'col': col, 'funding': funding, 'fullName': name})
-    return idx
-
-# Add nodes per column
-for name, amt in sorted(pc_ministries.items(), key=lambda x: -x[1]):
-    add_node(name, 0, amt)
-
-for name, amt in sorted(ndp_ministries.items(), key=lambda x: -x[1]):
-    add_node(name, 1, amt)
-
-for name, amt in sorted(kenney_ministries.items(), key=lambda x: -x[1]):
-    add_node(name, 2, amt)
-
-for name, amt in sorted(current_ministries.items(), key=lambda x: -x[1]):
-    add_node(name, 3, amt)
-
-# ── Build links ──
-links = []  # [{source, target, type}]
-
-# NDP transform events: PC → NDP links
-ndp_events = [e for e in ministry_events if e['event_date'] and '2015' <= e['event_date'] <= '2016-12-31']
-for ev in ndp_events:
-    src = ev['source_name']
-    tgt = ev['target_name']
-    # Handle combined names
-    if tgt == 'INDIGENOUS RELATIONS' and src == 'ABORIGINAL RELATIONS':
-        src_key = f"ABORIGINAL RELATIONS|0"
-        tgt_key = f"INDIGENOUS RELATIONS|1"
-    elif tgt == 'ADVANCED EDUCATION' and src == 'INNOVATION AND ADVANCED EDUCATION':
-        src_key = f"INNOVATION AND ADVANCED EDUCATION|0"
-        tgt_key = f"ADVANCED EDUCATION|1"
-    elif tgt == 'SENIORS AND HOUSING' and src == 'SENIORS':
-        src_key = f"SENIORS|0"
-        tgt_key = f"SENIORS AND HOUSING|1"
-    else:
-        src_key = f"{src}|0"
-        tgt_key = f"{tgt}|1"
-
-    if src_key in node_index and tgt_key in node_index:
-        links.append({
-            'source': node_index[src_key],
-            'target': node_index[tgt_key],
-            'type': ev['event_type'].lower()
-        })
-
-# Continuation links: PC ministries that persist unchanged to NDP
-for name in pc_ministries:
-    src_key = f"{name}|0"
-    tgt_key = f"{name}|1"
-    if src_key in node_index and tgt_key in node_index:
-        # Check if there's already a transform link from this source
-        existing = any(l['source'] == node_index[src_key] for l in links)
-        if not existing:
-            links.append({'source': node_index[src_key], 'target': node_index[tgt_key], 'type': 'continuation'})
-
-# NDP → Kenney links
-kenney_events = [e for e in ministry_events if e['event_date'] and '2019' <= e['event_date'] <= '2021-12-31']
-for ev in kenney_events:
-    src_key = f"{ev['source_name']}|1"
-    tgt_key = f"{ev['target_name']}|2"
-    if src_key in node_index and tgt_key in node_index:
-        links.append({
-            'source': node_index[src_key],
-            'target': node_index[tgt_key],
-            'type': ev['event_type'].lower()
-        })
-
-# Continuation: NDP → Kenney
-for name in ndp_ministries:
-    src_key = f"{name}|1"
-    tgt_key = f"{name}|2"
-    if src_key in node_index and tgt_key in node_index:
-        existing = any(l['source'] == node_index[src_key] for l in links)
-        if not existing:
-            links.append({'source': node_index[src_key], 'target': node_index[tgt_key], 'type': 'continuation'})
-
-# Kenney → Current links (collapsing all Smith-era transforms)
-# Map Kenney-era names to Current-era names through the chain of Smith events
-kenney_to_current = {
-    'HEALTH': ['HOSPITAL AND SURGICAL HEALTH SERVICES', 'PRIMARY AND PREVENTATIVE HEALTH SERVICES'],
-    'EDUCATION': ['EDUCATION AND CHILDCARE'],
-    'ADVANCED EDUCATION': ['ADVANCED EDUCATION'],
-    'COMMUNITY AND SOCIAL SERVICES': ['ASSISTED LIVING AND SOCIAL SERVICES'],
-    'INFRASTRUCTURE': ['INFRASTRUCTURE'],
-    'CHILDREN\'S SERVICES': ['CHILDREN AND FAMILY SERVICES'],
-    'SENIORS AND HOUSING': ['ASSISTED LIVING AND SOCIAL SERVICES'],
-    'LABOUR AND IMMIGRATION': ['SKILLED TRADES AND PROFESSIONS', 'JOBS, ECONOMY, TRADE AND IMMIGRATION'],
-    'CULTURE AND STATUS OF WOMEN': ['ARTS, CULTURE AND STATUS OF WOMEN'],
-    'AGRICULTURE AND FORESTRY': ['AGRICULTURE AND IRRIGATION'],
-    'MUNICIPAL AFFAIRS': ['MUNICIPAL AFFAIRS'],
-    'TRANSPORTATION': ['TRANSPORTATION AND ECONOMIC CORRIDORS'],
-    'ENVIRONMENT AND PARKS': ['ENVIRONMENT AND PROTECTED AREAS', 'FORESTRY AND PARKS', 'TOURISM AND SPORT'],
-    'JOBS, ECONOMY AND INNOVATION': ['JOBS, ECONOMY, TRADE AND IMMIGRATION'],
-    'JUSTICE AND SOLICITOR GENERAL': ['JUSTICE', 'PUBLIC SAFETY AND EMERGENCY SERVICES'],
-    'INDIGENOUS RELATIONS': ['INDIGENOUS RELATIONS'],
-}
-
-for kenney_name, current_names in kenney_to_current.items():
-    src_key = f"{kenney_name}|2"
-    if src_key not in node_index:
-        continue
-    for cur_name in current_names:
-        tgt_key = f"{cur_name}|3"
-        if tgt_key not in node_index:
-            continue
-        # Determine type
-        if len(current_names) > 1:
-            t = 'split'
-        elif kenney_name == current_names[0]:
-            t = 'continuation'
-        else:
-            t = 'rename'
-        # Check for merges (multiple Kenney sources → same target)
-        existing_to_target = [l for l in links if l['target'] == node_index[tgt_key]]
-        if existing_to_target:
-            t = 'merge'
-        links.append({
-            'source': node_index[src_key],
-            'target': node_index[tgt_key],
-            'type': t
-        })
+era_of_date = engine.era_of_date
+
+# ── Build Sankey nodes and links ──
+# One column per config['columns'] entry. Each column shows that era's funding
+# resolved through the lineage events up to the column's as_of date; links
+# follow the events between consecutive columns, weighted by attributed dollars.
+col_amounts, nodes, links = engine.build()
+col_labels = [c['label'] for c in config['columns']]
+col_colors = [c.get('color', '#28bcb8') for c in config['columns']]
 
 # ── Compute era totals ──
 era_totals = {}
@@ -683,7 +449,7 @@ html = f'''<!DOCTYPE html>
       </div>
       <div class="provenance-item">
         <div class="pv-label">Ministry Entities</div>
-        <div class="pv-value">{total_ministries} across 4 political eras</div>
+        <div class="pv-value">{total_ministries} across {len(col_labels)} political eras</div>
       </div>
       <div class="provenance-item">
         <div class="pv-label">Funding Coverage</div>
@@ -706,8 +472,9 @@ html = f'''<!DOCTYPE html>
 (function() {{
   'use strict';
 
-  var COL_COLORS = ['#95a5a6', '#e67e22', '#28bcb8', '#1a8a87'];
-  var COL_LABELS = ['PC ERA (pre-2015)', 'NDP ERA (2015-2019)', 'UCP-KENNEY (2019-2022)', 'CURRENT (May 2025)'];
+  var COL_COLORS = {json.dumps(col_colors)};
+  var COL_LABELS = {json.dumps(col_labels)};
+  var LAST_COL = COL_LABELS.length - 1;
   var LINK_COLORS = {{
     continuation: '#aab',
     rename: '#2980b9',
@@ -741,18 +508,18 @@ html = f'''<!DOCTYPE html>
     L.forEach(function(link) {{
       link.source.sourceLinks.push(link);
       link.target.targetLinks.push(link);
-      link.value = link.target.value;
+      link.value = links[link.index].value || link.target.value;
     }});
 
     // Assign x positions by column
-    var colSpacing = (width - nodeWidth) / 3;
+    var colSpacing = (width - nodeWidth) / Math.max(LAST_COL, 1);
     N.forEach(function(n) {{
       n.x0 = n.col * colSpacing;
       n.x1 = n.x0 + nodeWidth;
     }});
 
     // Group by column, sort by value desc
-    var columns = [[], [], [], []];
+    var columns = COL_LABELS.map(function() {{ return []; }});
     N.forEach(function(n) {{ columns[n.col].push(n); }});
 
     columns.forEach(function(col) {{
@@ -849,7 +616,7 @@ html = f'''<!DOCTYPE html>
       .attr('transform', 'translate(' + margin.left + ',' + margin.top + ')');
 
     // Era column headers
-    var colSpacing = (width - 16) / 3;
+    var colSpacing = (width - 16) / Math.max(LAST_COL, 1);
     COL_LABELS.forEach(function(label, i) {{
       g.append('text')
         .attr('x', i * colSpacing + 8)
@@ -919,21 +686,21 @@ html = f'''<!DOCTYPE html>
     // Node labels
     nodeSel.append('text')
       .attr('x', function(d) {{
-        if (d.col === 3) return d.x1 + 6;
+        if (d.col === LAST_COL) return d.x1 + 6;
         if (d.col === 0) return d.x0 - 6;
         return d.x0 + (d.x1 - d.x0) / 2;
       }})
       .attr('y', function(d) {{ return (d.y0 + d.y1) / 2; }})
       .attr('dy', '0.35em')
       .attr('text-anchor', function(d) {{
-        if (d.col === 3) return 'start';
+        if (d.col === LAST_COL) return 'start';
         if (d.col === 0) return 'end';
         return 'middle';
       }})
       .attr('font-size', '8.5px')
       .attr('font-weight', '600')
       .attr('fill', function(d) {{
-        if (d.col === 1 || d.col === 2) {{
+        if (d.col > 0 && d.col < LAST_COL) {{
           return (d.y1 - d.y0) > 12 ? '#fff' : 'var(--text-primary)';
         }}
         return 'var(--text-primary)';
@@ -941,7 +708,7 @@ html = f'''<!DOCTYPE html>
       .each(function(d) {{
         var label = d.name;
         if (label.length > 30) label = label.substring(0, 28) + '...';
-        if ((d.col === 1 || d.col === 2) && (d.y1 - d.y0) < 12) {{
+        if (d.col > 0 && d.col < LAST_COL && (d.y1 - d.y0) < 12) {{
           d3.select(this)
             .attr('x', d.x1 + 6)
             .attr('text-anchor', 'start')
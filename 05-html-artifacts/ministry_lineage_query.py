@@ -3,40 +3,60 @@ ministry_lineage_query.py
 Connect to Neo4j Aura and extract FULL ministry lineage data
 for building an accurate Sankey diagram of Alberta ministry
 restructuring flows across PC -> NDP -> UCP eras.
+
+Records are streamed from the cursor and printed as they arrive. With
+--out DIR each query is written to DIR/query_<n>.csv (or .parquet with
+--format parquet) through 02-graph-build/result_export.py instead, so no
+result is ever held in memory whole.
 """
 
-import sys, io
+import sys, io, os, argparse
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
 
-from neo4j import GraphDatabase
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SCRIPT_DIR, '..', '02-graph-build'))
+from result_export import stream_batches, export
+from graph_client import GraphClient
 
 URI      = "<YOUR_NEO4J_AURA_URI>"
 USER     = "neo4j"
 PASSWORD = "<YOUR_NEO4J_AURA_PASSWORD>"
 
 # -- helpers --
-def run_query(driver, title, cypher):
-    """Run a Cypher query, print every record, and return the list."""
+def run_query(driver, title, cypher, out_path=None):
+    """Run a Cypher query and print every record (or export it to out_path)."""
     print("=" * 90)
     print(f"  {title}")
     print("=" * 90)
-    records = []
-    with driver.session() as session:
-        result = session.run(cypher)
-        keys = result.keys()
-        print("  | ".join(str(k) for k in keys))
-        print("-" * 90)
-        for rec in result:
-            row = {k: rec[k] for k in keys}
-            records.append(row)
-            print("  | ".join(str(row[k]) for k in keys))
-    print(f"\n>>> {len(records)} record(s) returned\n\n")
-    return records
+    if out_path:
+        n = export(driver, cypher, out_path)
+        print(f">>> {n} record(s) written to {out_path}\n\n")
+        return n
+    n = 0
+    batches = stream_batches(driver, cypher)
+    print("  | ".join(str(k) for k in next(batches)))
+    print("-" * 90)
+    for batch in batches:
+        for row in batch:
+            print("  | ".join(str(v) for v in row))
+        n += len(batch)
+    print(f"\n>>> {n} record(s) returned\n\n")
+    return n
 
 
 # -- main --
 def main():
-    driver = GraphDatabase.driver(URI, auth=(USER, PASSWORD))
+    ap = argparse.ArgumentParser(description="Extract ministry lineage data from Neo4j.")
+    ap.add_argument('--out', help="write each query to this directory instead of printing")
+    ap.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    args = ap.parse_args()
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+
+    def out_path(n):
+        return os.path.join(args.out, f"query_{n}.{args.format}") if args.out else None
+
+    driver = GraphClient(URI, USER, PASSWORD)
     driver.verify_connectivity()
     print("Connected to Neo4j Aura successfully.\n")
 
@@ -46,7 +66,7 @@ MATCH (m:OrgEntity)
 RETURN m.canonical_id AS id, m.name AS name, m.status AS status,
        m.start_date AS start, m.end_date AS end_date, m.level AS level
 ORDER BY m.name"""
-    run_query(driver, "QUERY 1 -- All OrgEntity nodes", q1)
+    run_query(driver, "QUERY 1 -- All OrgEntity nodes", q1, out_path(1))
 
     # 2. All TransformEvent → OrgEntity relationships (full restructuring chain)
     q2 = """\
@@ -56,7 +76,7 @@ RETURN source.canonical_id AS source_id, source.name AS source_name,
        evt.event_date AS event_date, evt.political_context AS context,
        target.canonical_id AS target_id, target.name AS target_name
 ORDER BY toString(evt.event_date), evt.event_id"""
-    run_query(driver, "QUERY 2 -- Full restructuring chain (SOURCE_OF -> TransformEvent -> TARGET_OF)", q2)
+    run_query(driver, "QUERY 2 -- Full restructuring chain (SOURCE_OF -> TransformEvent -> TARGET_OF)", q2, out_path(2))
 
     # 3. Current active ministries
     q3 = """\
@@ -64,7 +84,7 @@ MATCH (m:OrgEntity)
 WHERE m.end_date IS NULL OR toString(m.end_date) > '2025-01-01'
 RETURN m.canonical_id AS id, m.name AS name, m.status AS status
 ORDER BY m.name"""
-    run_query(driver, "QUERY 3 -- Current active ministries", q3)
+    run_query(driver, "QUERY 3 -- Current active ministries", q3, out_path(3))
 
     # 4. UCP-Smith era TransformEvents (2022-10-11+)
     q4 = """\
@@ -74,7 +94,7 @@ RETURN source.name AS source_name, evt.event_type AS type,
        evt.event_date AS date, evt.political_context AS context,
        target.name AS target_name
 ORDER BY toString(evt.event_date)"""
-    run_query(driver, "QUERY 4 -- UCP-Smith era TransformEvents (2022-10-11+)", q4)
+    run_query(driver, "QUERY 4 -- UCP-Smith era TransformEvents (2022-10-11+)", q4, out_path(4))
 
     # 5. Most recent TransformEvents
     q5 = """\
@@ -83,7 +103,7 @@ RETURN evt.event_id AS id, evt.event_date AS date, evt.event_type AS type,
        evt.political_context AS context
 ORDER BY toString(evt.event_date) DESC
 LIMIT 20"""
-    run_query(driver, "QUERY 5 -- Most recent 20 TransformEvents", q5)
+    run_query(driver, "QUERY 5 -- Most recent 20 TransformEvents", q5, out_path(5))
 
     # 6. RECEIVED_GRANT totals by ministry
     q6 = """\
@@ -94,7 +114,7 @@ WITH m.canonical_id AS mid, m.name AS ministry, g.political_era AS era,
 RETURN mid, ministry, era, total, n_grants
 ORDER BY total DESC
 LIMIT 100"""
-    run_query(driver, "QUERY 6 -- RECEIVED_GRANT totals by ministry (top 100)", q6)
+    run_query(driver, "QUERY 6 -- RECEIVED_GRANT totals by ministry (top 100)", q6, out_path(6))
 
     driver.close()
     print("Done -- all queries complete.")
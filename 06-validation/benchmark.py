@@ -0,0 +1,371 @@
+"""
+Scale Benchmark for Operation Lineage Audit
+===========================================
+Times the pipeline against synthetic_data.py output at 1x / 10x / 100x
+today's volumes and keeps a JSON history so a change that makes ingestion
+or a governance query slower shows up as a regression.
+
+Suites (each timing is the fastest of --repeat runs):
+
+  generate   synthetic_data.py itself (only when the dataset is missing
+             or --regenerate is given)
+  load       Phase 0 CSVs through ArtifactStore.read_rows, cold (parse +
+             cache write) and warm (parsed-row cache hit)
+  snapshot   the in-process backend: SnapshotQueries over the synthetic
+             Parquet snapshot -- load plus every governance query
+  neo4j      with --neo4j-uri: loads the synthetic ministry lineage into a
+             local Neo4j, runs agent_1_graph_builder.py against the
+             synthetic CSVs (each PHASE / STEP timed from its log), then
+             the live governance queries with the result cache bypassed.
+             Point it at a scratch database, never at Aura.
+
+History: benchmark_history.json, one entry per run (commit, machine,
+scale, seed, backend, timings). A timing more than --threshold slower
+than the previous run of the same (scale, seed, suite) is reported as a
+regression; timings under --min-seconds are ignored as noise.
+
+Usage:
+  python benchmark.py --scale 1 --scale 10 [--repeat 3] [--suites load,snapshot]
+  python benchmark.py --scale 1 --neo4j-uri bolt://localhost:7687 --neo4j-password pw
+  python benchmark.py --scale 10 --fail-on-regression
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import datetime
+import tempfile
+import subprocess
+
+import synthetic_data
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, ".."))
+sys.path.insert(0, os.path.join(ROOT, "00-project-management"))
+sys.path.insert(0, os.path.join(ROOT, "02-graph-build"))
+sys.path.insert(0, os.path.join(ROOT, "03-governance-queries"))
+from artifact_store import ArtifactStore
+from snapshot_queries import SnapshotQueries
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+HISTORY_PATH = os.path.join(SCRIPT_DIR, "benchmark_history.json")
+BUILDER = os.path.join(ROOT, "02-graph-build", "agent_1_graph_builder.py")
+SUITES = ["generate", "load", "snapshot", "neo4j"]
+DEFAULT_THRESHOLD = 0.20
+DEFAULT_MIN_SECONDS = 0.05
+
+LOAD_FILES = ["grants_aggregated.csv", "org_risk_flags.csv", "multi_board_directors.csv",
+              "org_network_edges.csv", "org_clusters.csv", "goa_cra_matched.csv"]
+
+# method -> argument set ("ndp" / "ucp" ministry ids, or none)
+QUERIES = {
+    "ndp_ministries": None,
+    "ucp_ministries": None,
+    "ndp_org_funding": None,
+    "q1": "ndp",
+    "q2": "ndp",
+    "q2b": "ndp",
+    "q3": "ndp",
+    "sym1": "ucp",
+    "bonus": "ndp",
+    "bonus2": "ndp",
+}
+LIVE_QUERIES = ["ucp_ministries", "q1", "q2", "q2b", "q3", "sym1", "bonus", "bonus2"]
+
+_STEP = re.compile(r"-- ((?:PHASE|STEP) [0-9A-Z]+|FINAL VALIDATION)")
+
+
+def timed(fn, repeat=1):
+    """(fastest seconds, result of the last call)."""
+    best, result = None, None
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def _entry(seconds, rows=None, runs=1):
+    out = {"seconds": round(seconds, 4), "runs": runs}
+    if rows is not None:
+        out["rows"] = rows
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Suites
+# ---------------------------------------------------------------------------
+def bench_generate(scale, seed, out, regenerate):
+    info = synthetic_data.read_info(out)
+    if info and not regenerate and info.get("generator_version") == synthetic_data.GENERATOR_VERSION:
+        print(f"  Using existing dataset {out}")
+        return {}, info
+    if os.path.isdir(out):
+        shutil.rmtree(out)
+    seconds, info = timed(lambda: synthetic_data.generate(scale, seed, out, verbose=False))
+    return {"generate.total": _entry(seconds, sum(info["rows"].values()))}, info
+
+
+def bench_load(out, repeat):
+    results = {}
+    for name in LOAD_FILES:
+        path = os.path.join(out, name)
+        cold_best = warm_best = None
+        for _ in range(max(1, repeat)):
+            with tempfile.TemporaryDirectory(prefix="bench_store_") as tmp:
+                store = ArtifactStore(tmp)
+                cold, rows = timed(lambda: store.read_rows(name, path))
+                warm, _ = timed(lambda: ArtifactStore(tmp).read_rows(name, path))
+            cold_best = cold if cold_best is None else min(cold_best, cold)
+            warm_best = warm if warm_best is None else min(warm_best, warm)
+        stem = name[:-4]
+        results[f"load.{stem}.cold"] = _entry(cold_best, len(rows), repeat)
+        results[f"load.{stem}.warm"] = _entry(warm_best, len(rows), repeat)
+    return results
+
+
+def bench_snapshot(out, repeat):
+    snap = os.path.join(out, "snapshot")
+    seconds, q = timed(lambda: SnapshotQueries.load(snap), repeat)
+    results = {"snapshot.load": _entry(seconds, sum(t["rows"] for t in q.manifest["tables"].values()), repeat)}
+    ids = {"ndp": [m["cid"] for m in q.ndp_ministries()],
+           "ucp": [m["cid"] for m in q.ucp_ministries()]}
+    for name, arg in QUERIES.items():
+        fn = getattr(q, name)
+        seconds, rows = timed((lambda: fn(ids[arg])) if arg else fn, repeat)
+        results[f"snapshot.{name}"] = _entry(seconds, len(rows), repeat)
+    return results
+
+
+def load_lineage(driver, out):
+    """Recreate the synthetic ministry lineage that the builder links grants to."""
+    import pandas as pd
+
+    lin = os.path.join(out, "lineage")
+    ent = pd.read_csv(os.path.join(lin, "org_entities.csv"), dtype=str).fillna("")
+    evt = pd.read_csv(os.path.join(lin, "transform_events.csv"), dtype=str).fillna("")
+    src = pd.read_csv(os.path.join(lin, "edges_source_of.csv"), dtype=str)
+    tgt = pd.read_csv(os.path.join(lin, "edges_target_of.csv"), dtype=str)
+    with driver.session() as s:
+        s.run("CREATE CONSTRAINT IF NOT EXISTS FOR (m:OrgEntity) REQUIRE m.canonical_id IS UNIQUE").consume()
+        s.run("CREATE CONSTRAINT IF NOT EXISTS FOR (e:TransformEvent) REQUIRE e.event_id IS UNIQUE").consume()
+        s.run("UNWIND $rows AS r MERGE (m:OrgEntity {canonical_id: r.canonical_id}) "
+              "SET m.name = r.name, m.level = r.level, m.status = r.status",
+              rows=ent.to_dict("records")).consume()
+        s.run("UNWIND $rows AS r MERGE (e:TransformEvent {event_id: r.event_id}) "
+              "SET e.event_type = r.event_type, e.event_date = date(r.event_date), "
+              "e.political_context = r.political_context",
+              rows=evt.to_dict("records")).consume()
+        s.run("UNWIND $rows AS r MATCH (m:OrgEntity {canonical_id: r.source_entity_id}) "
+              "MATCH (e:TransformEvent {event_id: r.event_id}) MERGE (m)-[:SOURCE_OF]->(e)",
+              rows=src.to_dict("records")).consume()
+        s.run("UNWIND $rows AS r MATCH (e:TransformEvent {event_id: r.event_id}) "
+              "MATCH (m:OrgEntity {canonical_id: r.target_entity_id}) MERGE (e)-[:TARGET_OF]->(m)",
+              rows=tgt.to_dict("records")).consume()
+    return len(ent) + len(evt)
+
+
+def run_builder(out, uri, user, password):
+    """Run agent_1_graph_builder.py on the synthetic CSVs; seconds per PHASE / STEP."""
+    env = dict(os.environ, LINEAGE_DATA_DIR=out, NEO4J_URI=uri, NEO4J_USER=user,
+               NEO4J_PASSWORD=password, PYTHONIOENCODING="utf-8")
+    steps, current, t_step = {}, None, None
+    with tempfile.TemporaryDirectory(prefix="bench_build_") as tmp:
+        env["LINEAGE_OUTPUT_DIR"] = tmp
+        env["LINEAGE_ARTIFACT_DIR"] = os.path.join(tmp, "artifacts")
+        t0 = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, BUILDER], cwd=os.path.dirname(BUILDER), env=env,
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                text=True, encoding="utf-8", errors="replace")
+        tail = []
+        for line in proc.stdout:
+            tail = (tail + [line.rstrip()])[-20:]
+            m = _STEP.search(line)
+            if m:
+                now = time.perf_counter()
+                if current:
+                    steps[current] = now - t_step
+                current, t_step = m.group(1), now
+        proc.wait()
+        total = time.perf_counter() - t0
+        if current:
+            steps[current] = time.perf_counter() - t_step
+    if proc.returncode:
+        raise RuntimeError("graph builder failed:\n  " + "\n  ".join(tail))
+    return total, steps
+
+
+def bench_neo4j(out, uri, user, password, repeat):
+    from graph_client import GraphClient
+    import agent_2_governance_queries as a2
+    from query_cache import CachedCypher
+
+    results = {}
+    driver = GraphClient(uri, user, password)
+    try:
+        driver.verify_connectivity()
+        seconds, n = timed(lambda: load_lineage(driver, out))
+        results["neo4j.lineage_load"] = _entry(seconds, n)
+
+        total, steps = run_builder(out, uri, user, password)
+        results["neo4j.build.total"] = _entry(total)
+        for step, seconds in steps.items():
+            key = step.lower().replace(" ", "_")
+            results[f"neo4j.build.{key}"] = _entry(seconds)
+
+        cy = CachedCypher(driver, enabled=False)
+        q = a2.LiveQueries(cy, "(evt:TransformEvent)-[:TARGET_OF]->(m:OrgEntity)")
+        ids = {"ndp": [r["cid"] for r in cy.run(a2.NDP_FWD_CYPHER) if r["cid"]]}
+        ids["ucp"] = [r["cid"] for r in q.ucp_ministries() if r["cid"]]
+        for name in LIVE_QUERIES:
+            fn, arg = getattr(q, name), QUERIES[name]
+            seconds, rows = timed((lambda: fn(ids[arg])) if arg else fn, repeat)
+            results[f"neo4j.{name}"] = _entry(seconds, len(rows), repeat)
+    finally:
+        driver.close()
+    return results
+
+
+# ---------------------------------------------------------------------------
+# History
+# ---------------------------------------------------------------------------
+def load_history(path=HISTORY_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_history(history, path=HISTORY_PATH):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2)
+    os.replace(tmp, path)
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def previous_result(history, run, name):
+    """Most recent earlier timing of the same benchmark at the same scale and seed."""
+    for old in reversed(history):
+        if old["scale"] == run["scale"] and old["seed"] == run["seed"] and name in old["results"]:
+            return old["results"][name]
+    return None
+
+
+def regressions(history, run, threshold, min_seconds):
+    found = []
+    for name, cur in run["results"].items():
+        old = previous_result(history, run, name)
+        if not old or max(old["seconds"], cur["seconds"]) < min_seconds:
+            continue
+        change = (cur["seconds"] - old["seconds"]) / old["seconds"] if old["seconds"] else 0.0
+        if change > threshold:
+            found.append((name, old["seconds"], cur["seconds"], change))
+    return found
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+def run_scale(scale, args, suites):
+    out = args.out if args.out and len(args.scale) == 1 else synthetic_data.default_out(scale, args.seed)
+    print(f"\n-- Scale {scale:g}x (seed {args.seed}) --")
+    results, info = bench_generate(scale, args.seed, out, args.regenerate or "generate" in args.only)
+    if "load" in suites:
+        results.update(bench_load(out, args.repeat))
+    if "snapshot" in suites:
+        results.update(bench_snapshot(out, args.repeat))
+    if "neo4j" in suites:
+        results.update(bench_neo4j(out, args.neo4j_uri, args.neo4j_user, args.neo4j_password, args.repeat))
+    for name, r in results.items():
+        rows = f"{r['rows']:>12,}" if "rows" in r else " " * 12
+        print(f"  {name:<40} {r['seconds']:>10.3f}s {rows}")
+    return {
+        "run_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "scale": scale,
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "dataset_rows": info["rows"],
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ingestion and governance queries on synthetic data")
+    parser.add_argument("--scale", type=float, action="append", help="data scale; repeatable (default: 1)")
+    parser.add_argument("--seed", type=int, default=synthetic_data.DEFAULT_SEED)
+    parser.add_argument("--out", help="dataset directory (single --scale only)")
+    parser.add_argument("--suites", default="load,snapshot",
+                        help="comma-separated subset of: " + ", ".join(SUITES))
+    parser.add_argument("--regenerate", action="store_true", help="regenerate the dataset and time it")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per timing; the fastest is kept")
+    parser.add_argument("--neo4j-uri", help="local Neo4j for the neo4j suite (bolt://...)")
+    parser.add_argument("--neo4j-user", default="neo4j")
+    parser.add_argument("--neo4j-password", default="neo4j")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown flagged as a regression")
+    parser.add_argument("--min-seconds", type=float, default=DEFAULT_MIN_SECONDS,
+                        help="ignore timings below this in regression checks")
+    parser.add_argument("--no-history", action="store_true", help="do not append this run to the history")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit 1 if any regression is found")
+    args = parser.parse_args()
+
+    args.scale = args.scale or [1.0]
+    args.only = [s.strip() for s in args.suites.split(",") if s.strip()]
+    unknown = [s for s in args.only if s not in SUITES]
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(unknown)}")
+    if args.neo4j_uri and "neo4j" not in args.only:
+        args.only.append("neo4j")
+    if "neo4j" in args.only and not args.neo4j_uri:
+        parser.error("the neo4j suite needs --neo4j-uri")
+
+    print("=" * 68)
+    print("  Operation Lineage Audit -- Scale Benchmark")
+    print("=" * 68)
+
+    history = load_history()
+    found = []
+    for scale in args.scale:
+        run = run_scale(scale, args, args.only)
+        for name, old, new, change in regressions(history, run, args.threshold, args.min_seconds):
+            found.append((scale, name, old, new, change))
+        run["regressions"] = [f[1] for f in found if f[0] == scale]
+        history.append(run)
+
+    if not args.no_history:
+        save_history(history)
+        print(f"\nHistory written to: {HISTORY_PATH}")
+
+    if found:
+        print(f"\nRegressions (> {args.threshold:.0%} slower than the previous run):")
+        for scale, name, old, new, change in found:
+            print(f"  {scale:g}x {name}: {old:.3f}s -> {new:.3f}s (+{change:.0%})")
+        if args.fail_on_regression:
+            sys.exit(1)
+    else:
+        print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Resampling Engine for Operation Lineage Audit
+=============================================
+Bootstrap confidence intervals and permutation p-values for the
+clustered vs non-clustered funding comparison in statistical_tests.py.
+
+Statistics:
+  1. Median difference (clustered - non-clustered)
+  2. Common Language Effect Size, CLES = P(X > Y) + 0.5 * P(X = Y)
+
+Resampling schemes:
+  - Stratified bootstrap: each group resampled with replacement on its own.
+  - Block permutation: the "clustered" label is shuffled across blocks, not
+    organizations. Every cluster_id is one block and every non-clustered
+    organization is a singleton block, so orgs that share directors move
+    together and within-cluster dependence is preserved under H_0.
+
+Resamples are expressed as NumPy count/mask matrices (one row per resample)
+over the pre-sorted sample, so medians come from cumulative counts and CLES
+from midranks without a Python loop per resample. Work is split into fixed
+size tasks with seeds spawned from one SeedSequence, so results are
+identical for any number of worker processes.
+"""
+
+import os
+import math
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from scipy import stats
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+DEFAULT_RESAMPLES = 100_000
+DEFAULT_SEED = 20150524
+TASK_SIZE = 5_000             # resamples per pool task (fixes the seed layout)
+MAX_CELLS = 2_000_000         # rows x observations held in memory per sub-chunk
+
+_DATA = {}
+
+
+def _init_worker(payload):
+    """Process-pool initializer: keep the sample in a module global."""
+    _DATA.clear()
+    _DATA.update(payload)
+
+
+# ---------------------------------------------------------------------------
+# Vectorized statistics over resample matrices
+# ---------------------------------------------------------------------------
+def _counts(idx, n):
+    """(rows, m) index matrix -> (rows, n) occurrence counts."""
+    rows = idx.shape[0]
+    flat = idx + (np.arange(rows) * n)[:, None]
+    return np.bincount(flat.ravel(), minlength=rows * n).reshape(rows, n)
+
+
+def _median_from_cum(sorted_vals, cum):
+    """Row-wise median given cumulative counts over sorted_vals (np.median semantics).
+
+    Rows are offset so the flattened matrix is monotone and one searchsorted
+    finds the first position where each row's cumulative count passes k.
+    """
+    rows, n = cum.shape
+    m = cum[:, -1].astype(np.int64)
+    off = np.arange(rows, dtype=np.int64) * (n + 1)
+    flat = (cum + off[:, None]).ravel()
+    base = np.arange(rows, dtype=np.int64) * n
+    lo = np.searchsorted(flat, (m - 1) // 2 + off, side="right") - base
+    hi = np.searchsorted(flat, m // 2 + off, side="right") - base
+    return 0.5 * (sorted_vals[lo] + sorted_vals[hi])
+
+
+def _weighted_median(sorted_vals, counts):
+    """Row-wise median of sorted_vals repeated counts[r] times."""
+    return _median_from_cum(sorted_vals, np.cumsum(counts, axis=1, dtype=np.int64))
+
+
+def _chunk_rows(n_obs):
+    return max(1, MAX_CELLS // max(n_obs, 1))
+
+
+def _bootstrap_task(seed, n_rows):
+    xs, ys = _DATA["xs"], _DATA["ys"]
+    lo, hi = _DATA["lo"], _DATA["hi"]
+    n1, n2 = len(xs), len(ys)
+    rng = np.random.default_rng(seed)
+
+    med, cles = [], []
+    step = _chunk_rows(n1 + n2)
+    for start in range(0, n_rows, step):
+        rows = min(step, n_rows - start)
+        cx = _counts(rng.integers(0, n1, size=(rows, n1), dtype=np.int32), n1)
+        cy = _counts(rng.integers(0, n2, size=(rows, n2), dtype=np.int32), n2)
+
+        # P(X > Y) + 0.5 P(X = Y) = sum_i cx_i * (#{y < x_i} + #{y <= x_i}) / 2
+        cum_y = np.zeros((rows, n2 + 1), dtype=np.int64)
+        np.cumsum(cy, axis=1, out=cum_y[:, 1:])
+
+        med.append(_weighted_median(xs, cx) - _median_from_cum(ys, cum_y[:, 1:]))
+        ties = np.take(cum_y, lo, axis=1) + np.take(cum_y, hi, axis=1)
+        cles.append((cx * ties).sum(axis=1) / (2.0 * n1 * n2))
+
+    return np.concatenate(med), np.concatenate(cles)
+
+
+def _label_stats(mask, vals_sorted, ranks_sorted):
+    """Median difference and CLES for each row of a (rows, N) boolean label mask."""
+    n = mask.shape[1]
+    n1 = mask.sum(axis=1)
+    n2 = n - n1
+    u = mask @ ranks_sorted - n1 * (n1 + 1) / 2.0
+    cles = u / (n1 * n2)
+    cum1 = np.cumsum(mask, axis=1, dtype=np.int64)
+    cum2 = np.arange(1, n + 1, dtype=np.int64) - cum1
+    med = _median_from_cum(vals_sorted, cum1) - _median_from_cum(vals_sorted, cum2)
+    return med, cles
+
+
+def _permutation_task(seed, n_rows):
+    vals, ranks = _DATA["vals_sorted"], _DATA["ranks_sorted"]
+    block_of = _DATA["block_sorted"]
+    n_blocks, n_treat = _DATA["n_blocks"], _DATA["n_treat"]
+    rng = np.random.default_rng(seed)
+
+    med, cles = [], []
+    step = _chunk_rows(len(vals) + n_blocks)
+    for start in range(0, n_rows, step):
+        rows = min(step, n_rows - start)
+        keys = rng.random((rows, n_blocks))
+        chosen = np.argpartition(keys, n_treat - 1, axis=1)[:, :n_treat]
+        block_mask = np.zeros((rows, n_blocks), dtype=bool)
+        np.put_along_axis(block_mask, chosen, True, axis=1)
+        m, c = _label_stats(np.take(block_mask, block_of, axis=1), vals, ranks)
+        med.append(m)
+        cles.append(c)
+
+    return np.concatenate(med), np.concatenate(cles)
+
+
+# ---------------------------------------------------------------------------
+# Pool driver
+# ---------------------------------------------------------------------------
+def _run(task, payload, n_resamples, seed, workers):
+    n_tasks = max(1, math.ceil(n_resamples / TASK_SIZE))
+    sizes = [TASK_SIZE] * (n_tasks - 1) + [n_resamples - TASK_SIZE * (n_tasks - 1)]
+    seeds = np.random.SeedSequence(seed).spawn(n_tasks)
+    workers = workers or os.cpu_count() or 1
+
+    if workers <= 1 or n_tasks == 1:
+        _init_worker(payload)
+        parts = [task(s, k) for s, k in zip(seeds, sizes)]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, n_tasks),
+                                 initializer=_init_worker, initargs=(payload,)) as ex:
+            parts = list(ex.map(task, seeds, sizes))
+
+    return tuple(np.concatenate([p[i] for p in parts]) for i in range(len(parts[0])))
+
+
+def _interval(draws, ci):
+    alpha = (1.0 - ci) / 2.0
+    lo, hi = np.percentile(draws, [100 * alpha, 100 * (1 - alpha)])
+    return float(lo), float(hi)
+
+
+def bootstrap_ci(clustered, non_clustered, n_resamples=DEFAULT_RESAMPLES,
+                 seed=DEFAULT_SEED, workers=None, ci=0.95):
+    """Percentile bootstrap CIs for the median difference and CLES."""
+    xs = np.sort(np.asarray(clustered, dtype=float))
+    ys = np.sort(np.asarray(non_clustered, dtype=float))
+    payload = {
+        "xs": xs,
+        "ys": ys,
+        "lo": np.searchsorted(ys, xs, side="left"),
+        "hi": np.searchsorted(ys, xs, side="right"),
+    }
+    med, cles = _run(_bootstrap_task, payload, n_resamples, seed, workers)
+
+    return {
+        "n_resamples": n_resamples,
+        "ci": ci,
+        "median_diff": float(np.median(xs) - np.median(ys)),
+        "median_diff_ci": _interval(med, ci),
+        "median_diff_se": float(np.std(med, ddof=1)),
+        "cles_ci": _interval(cles, ci),
+        "cles_se": float(np.std(cles, ddof=1)),
+    }
+
+
+def block_ids(cluster_ids):
+    """Block index per organization: shared cluster_id -> shared block, else singleton."""
+    index = {}
+    blocks = np.empty(len(cluster_ids), dtype=np.int64)
+    for i, cid in enumerate(cluster_ids):
+        key = ("c", cid) if cid is not None else ("o", i)
+        blocks[i] = index.setdefault(key, len(index))
+    return blocks
+
+
+def permutation_test(values, is_clustered, blocks=None, n_resamples=DEFAULT_RESAMPLES,
+                     seed=DEFAULT_SEED, workers=None):
+    """Permutation p-values for median difference and CLES.
+
+    blocks=None permutes organizations individually; otherwise labels are
+    shuffled across blocks (see block_ids). Every block must carry a single
+    label, which holds when blocks come from cluster_id.
+    """
+    values = np.asarray(values, dtype=float)
+    labels = np.asarray(is_clustered, dtype=bool)
+    blocks = np.arange(len(values)) if blocks is None else np.asarray(blocks)
+    _, blocks = np.unique(blocks, return_inverse=True)
+    n_blocks = int(blocks.max()) + 1
+
+    block_label = np.zeros(n_blocks, dtype=bool)
+    block_label[blocks[labels]] = True
+    if (block_label[blocks] != labels).any():
+        raise ValueError("blocks mix clustered and non-clustered organizations")
+    n_treat = int(block_label.sum())
+    if n_treat == 0 or n_treat == n_blocks:
+        raise ValueError("permutation needs both groups present")
+
+    order = np.argsort(values, kind="stable")
+    payload = {
+        "vals_sorted": values[order],
+        "ranks_sorted": stats.rankdata(values)[order],
+        "block_sorted": blocks[order],
+        "n_blocks": n_blocks,
+        "n_treat": n_treat,
+    }
+    obs_med, obs_cles = _label_stats(labels[order][None, :],
+                                     payload["vals_sorted"], payload["ranks_sorted"])
+    obs_med, obs_cles = float(obs_med[0]), float(obs_cles[0])
+
+    med, cles = _run(_permutation_task, payload, n_resamples, seed, workers)
+
+    def p_value(hits):
+        return (1.0 + np.count_nonzero(hits)) / (1.0 + n_resamples)
+
+    return {
+        "n_resamples": n_resamples,
+        "n_blocks": n_blocks,
+        "n_treat_blocks": n_treat,
+        "median_diff": obs_med,
+        "cles": obs_cles,
+        "median_diff_p": p_value(np.abs(med) >= abs(obs_med)),
+        "median_diff_p_gt": p_value(med >= obs_med),
+        "cles_p": p_value(np.abs(cles - 0.5) >= abs(obs_cles - 0.5)),
+        "cles_p_gt": p_value(cles >= obs_cles),
+    }
@@ -0,0 +1,418 @@
+"""
+Era-Boundary and Threshold Sensitivity Sweep for Operation Lineage Audit
+========================================================================
+Re-evaluates the clustered vs non-clustered tests (statistical_tests.py)
+and the Query 1 / Query 3 aggregates (agent_2_governance_queries.py) over
+a grid of alternative analysis choices:
+
+  - NDP window start / end       (shifted around 2015-05-24 .. 2019-04-29)
+  - NDP-restructured definition  (political_context, date window, or either;
+                                  TARGET_OF only or any event link)
+  - Cluster definition           (graph cluster_id, or connected components
+                                  of SHARED_DIRECTORS with >= k shared directors)
+
+Every grid point runs against the local Parquet snapshot written by
+02-graph-build/graph_snapshot.py, never against live Cypher. Grant edges
+are re-assigned to eras by their earliest payment date. Results are cached
+per grid point under sweep_cache/<snapshot_id>/, so rerunning with a wider
+grid only computes the new points. Uncached points are spread across a
+process pool.
+
+Usage:
+  python sensitivity_sweep.py [--grid grid.json] [--workers N] [--snapshot DIR] [--version V]
+
+grid.json may override any of DEFAULT_GRID's keys.
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import hashlib
+import argparse
+import datetime
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from scipy import stats
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+OUTPUT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(OUTPUT_DIR, "..", "02-graph-build"))
+from graph_snapshot import SNAPSHOT_DIR, load_snapshot, read_manifest, resolve_snapshot
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+CACHE_DIR = os.path.join(OUTPUT_DIR, "sweep_cache")
+RESULTS_CSV = os.path.join(OUTPUT_DIR, "sensitivity_sweep_results.csv")
+RESULTS_MD = os.path.join(OUTPUT_DIR, "sensitivity_sweep_results.md")
+SWEEP_VERSION = 1   # bump when evaluate_point() semantics change
+
+NDP_START = "2015-05-24"
+NDP_END = "2019-04-29"
+
+DEFAULT_GRID = {
+    "ndp_start_offset_days": [-180, -90, 0, 90, 180],
+    "ndp_end_offset_days": [-180, -90, 0, 90, 180],
+    "ministry_def": ["context_or_window", "context_only", "window_only"],
+    "ministry_role": ["target", "any"],
+    "cluster_def": ["graph", "shared>=1", "shared>=2", "shared>=3"],
+}
+
+BASELINE = {
+    "ndp_start_offset_days": 0,
+    "ndp_end_offset_days": 0,
+    "ministry_def": "context_or_window",
+    "ministry_role": "target",
+    "cluster_def": "graph",
+}
+
+ALPHA = 0.05
+
+
+# ---------------------------------------------------------------------------
+# Grid
+# ---------------------------------------------------------------------------
+def expand_grid(grid):
+    points = [{}]
+    for key in DEFAULT_GRID:
+        points = [dict(p, **{key: v}) for p in points for v in grid[key]]
+    return points
+
+
+def point_key(point, snapshot_id):
+    raw = json.dumps({"p": point, "s": snapshot_id, "v": SWEEP_VERSION}, sort_keys=True)
+    return hashlib.sha1(raw.encode()).hexdigest()[:20]
+
+
+def cache_path(point, snapshot_id):
+    return os.path.join(CACHE_DIR, snapshot_id, f"{point_key(point, snapshot_id)}.json")
+
+
+# ---------------------------------------------------------------------------
+# Worker state: snapshot tables as NumPy arrays
+# ---------------------------------------------------------------------------
+_STATE = {}
+
+
+def _days(values):
+    """ISO date strings -> int days since epoch; missing/unparseable -> INT_MIN (NaT)."""
+    dt = pd.to_datetime(pd.Series(values, dtype=object).astype(str).str[:10],
+                        format="%Y-%m-%d", errors="coerce")
+    return dt.to_numpy(dtype="datetime64[D]").astype(np.int64)
+
+
+def _fiscal_year_days(values):
+    """Fallback grant date: 1 October of the fiscal year's first calendar year."""
+    return _days([f"{str(v)[:4]}-10-01" if pd.notna(v) and str(v)[:4].isdigit() else None
+                  for v in values])
+
+
+def _init_worker(snapshot_dir):
+    _, t = load_snapshot(snapshot_dir)
+    orgs, grants, events, shared = (t["organizations"], t["grants"],
+                                    t["event_links"], t["shared_directors"])
+
+    bns = list(dict.fromkeys(list(orgs["bn"]) + list(grants["bn"])))
+    bn_idx = {bn: i for i, bn in enumerate(bns)}
+    ministries = list(dict.fromkeys(list(grants["ministry_id"]) + list(events["ministry_id"])))
+    min_idx = {m: i for i, m in enumerate(ministries)}
+
+    graph_cluster = {bn: cid for bn, cid in zip(orgs["bn"], orgs["cluster_id"]) if pd.notna(cid)}
+    cluster_codes = {}
+    graph_labels = np.array([cluster_codes.setdefault(graph_cluster[bn], len(cluster_codes))
+                             if bn in graph_cluster else -1 for bn in bns], dtype=np.int64)
+
+    gdate = _days(grants["earliest"])
+    missing = gdate == np.iinfo(np.int64).min
+    gdate[missing] = _fiscal_year_days(grants["fiscal_year"][missing])
+
+    sd = shared.dropna(subset=["bn1", "bn2"])
+    sd = sd[sd["bn1"].isin(bn_idx) & sd["bn2"].isin(bn_idx)]
+
+    _STATE.clear()
+    _STATE.update({
+        "n_orgs": len(bns),
+        "grant_org": np.array([bn_idx[b] for b in grants["bn"]], dtype=np.int64),
+        "grant_min": np.array([min_idx[m] for m in grants["ministry_id"]], dtype=np.int64),
+        "grant_date": gdate,
+        "grant_amount": grants["amount"].fillna(0).to_numpy(dtype=float),
+        "event_min": np.array([min_idx[m] for m in events["ministry_id"]], dtype=np.int64),
+        "event_date": _days(events["event_date"]),
+        "event_ndp_ctx": events["political_context"].fillna("").str.upper()
+                                                    .str.contains("NDP").to_numpy(),
+        "event_is_target": (events["role"] == "TARGET_OF").to_numpy(),
+        "shared_a": np.array([bn_idx[b] for b in sd["bn1"]], dtype=np.int64),
+        "shared_b": np.array([bn_idx[b] for b in sd["bn2"]], dtype=np.int64),
+        "shared_n": sd["n_shared_directors"].fillna(1).to_numpy(dtype=float),
+        "labels": {"graph": graph_labels},
+    })
+
+
+def cluster_labels(cluster_def):
+    """Per-org cluster label (-1 = not clustered), memoized per definition."""
+    cache = _STATE["labels"]
+    if cluster_def not in cache:
+        k = float(cluster_def.split(">=")[1])
+        keep = _STATE["shared_n"] >= k
+        n = _STATE["n_orgs"]
+        adj = coo_matrix((np.ones(keep.sum()), (_STATE["shared_a"][keep], _STATE["shared_b"][keep])),
+                         shape=(n, n))
+        _, comp = connected_components(adj, directed=False)
+        sizes = np.bincount(comp)
+        cache[cluster_def] = np.where(sizes[comp] >= 2, comp, -1)
+    return cache[cluster_def]
+
+
+# ---------------------------------------------------------------------------
+# One grid point
+# ---------------------------------------------------------------------------
+def _shift(date, offset):
+    return int(np.datetime64(date, "D").astype(np.int64)) + int(offset)
+
+
+def evaluate_point(point):
+    s = _STATE
+    start = _shift(NDP_START, point["ndp_start_offset_days"])
+    end = _shift(NDP_END, point["ndp_end_offset_days"])
+
+    # NDP-restructured ministries
+    in_window = (s["event_date"] >= start) & (s["event_date"] <= end)
+    definition = point["ministry_def"]
+    if definition == "context_only":
+        ev = s["event_ndp_ctx"].copy()
+    elif definition == "window_only":
+        ev = in_window
+    else:
+        ev = s["event_ndp_ctx"] | in_window
+    if point["ministry_role"] == "target":
+        ev = ev & s["event_is_target"]
+    ministries = np.unique(s["event_min"][ev])
+
+    # Grants through those ministries, re-assigned to eras
+    through = np.isin(s["grant_min"], ministries)
+    date = s["grant_date"]
+    is_ndp = through & (date >= start) & (date <= end)
+    is_ucp = through & (date > end)
+    is_pc = through & (date < start)
+
+    n, org, amt = s["n_orgs"], s["grant_org"], s["grant_amount"]
+    ndp = np.bincount(org[is_ndp], amt[is_ndp], minlength=n)
+    ucp = np.bincount(org[is_ucp], amt[is_ucp], minlength=n)
+    pc = np.bincount(org[is_pc], amt[is_pc], minlength=n)
+    has_ndp = np.bincount(org[is_ndp], minlength=n) > 0
+    labels = cluster_labels(point["cluster_def"])
+    clustered = labels >= 0
+
+    row = dict(point)
+    row["n_ministries"] = int(len(ministries))
+
+    # statistical_tests.py: NDP grantees, clustered vs non-clustered
+    x = ndp[has_ndp & clustered]
+    y = ndp[has_ndp & ~clustered]
+    row.update({"n_clustered": int(len(x)), "n_non_clustered": int(len(y))})
+    if len(x) >= 2 and len(y) >= 2:
+        u, p = stats.mannwhitneyu(x, y, alternative="two-sided")
+        _, p_gt = stats.mannwhitneyu(x, y, alternative="greater")
+        ks, ks_p = stats.ks_2samp(x, y)
+        cles = u / (len(x) * len(y))
+        row.update({
+            "mw_p": float(p), "mw_p_gt": float(p_gt), "ks_stat": float(ks), "ks_p": float(ks_p),
+            "cles": float(cles), "rank_biserial": float(1.0 - 2.0 * cles),
+            "mean_ratio": float(x.mean() / y.mean()) if y.mean() > 0 else None,
+            "median_ratio": float(np.median(x) / np.median(y)) if np.median(y) > 0 else None,
+        })
+
+    # Query 1: orgs funded through NDP-restructured ministries
+    q1 = (ndp > 0) | (ucp > 0)
+    total_ndp, total_ucp = float(ndp[q1].sum()), float(ucp[q1].sum())
+    row.update({
+        "q1_orgs": int(q1.sum()),
+        "q1_clustered": int((q1 & clustered).sum()),
+        "q1_total_pc": float(pc[q1].sum()),
+        "q1_total_ndp": total_ndp,
+        "q1_total_ucp": total_ucp,
+        "q1_ndp_to_ucp_pct": (total_ucp - total_ndp) * 100.0 / total_ndp if total_ndp > 0 else None,
+        "q1_clustered_ndp_share": float(ndp[q1 & clustered].sum()) / total_ndp if total_ndp > 0 else None,
+    })
+
+    # Query 3: per-cluster NDP totals
+    cl = labels[clustered]
+    cluster_ndp = np.bincount(cl, ndp[clustered]) if len(cl) else np.zeros(0)
+    cluster_ucp = np.bincount(cl, ucp[clustered]) if len(cl) else np.zeros(0)
+    funded = cluster_ndp > 0
+    row.update({
+        "q3_clusters": int(funded.sum()),
+        "q3_cluster_ndp_total": float(cluster_ndp[funded].sum()),
+        "q3_cluster_ucp_total": float(cluster_ucp[funded].sum()),
+    })
+    return row
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+def run_sweep(points, snapshot_dir, snapshot_id, workers=None):
+    """Evaluate points, reusing cached results. Returns (rows, n_cached)."""
+    results, todo = {}, []
+    for i, p in enumerate(points):
+        path = cache_path(p, snapshot_id)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                results[i] = json.load(f)
+        else:
+            todo.append(i)
+    n_cached = len(results)
+    print(f"  Grid points: {len(points):,}  (cached: {n_cached:,}, to run: {len(todo):,})")
+
+    def store(i, row):
+        path = cache_path(points[i], snapshot_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(row, f)
+        results[i] = row
+
+    workers = workers or os.cpu_count() or 1
+    if todo and workers <= 1:
+        _init_worker(snapshot_dir)
+        for i in todo:
+            store(i, evaluate_point(points[i]))
+    elif todo:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(snapshot_dir,)) as ex:
+            futures = {ex.submit(evaluate_point, points[i]): i for i in todo}
+            for done, fut in enumerate(as_completed(futures), 1):
+                store(futures[fut], fut.result())
+                if done % 100 == 0:
+                    print(f"    ... {done:,} / {len(todo):,}")
+
+    return [results[i] for i in range(len(points))], n_cached
+
+
+def write_csv(rows):
+    fieldnames = list(dict.fromkeys(k for r in rows for k in r))
+    with open(RESULTS_CSV, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Results written to: {RESULTS_CSV}")
+
+
+def _share(rows, pred):
+    rows = [r for r in rows if r.get("mw_p") is not None]
+    return (sum(1 for r in rows if pred(r)) / len(rows)) if rows else float("nan")
+
+
+def _range(rows, key):
+    vals = [r[key] for r in rows if r.get(key) is not None]
+    if not vals:
+        return "n/a"
+    return f"{min(vals):,.3f} .. {np.median(vals):,.3f} .. {max(vals):,.3f}"
+
+
+def write_markdown(rows, manifest, n_cached, elapsed):
+    ts = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    base = next((r for r in rows if all(r[k] == v for k, v in BASELINE.items())), None)
+    tested = [r for r in rows if r.get("mw_p") is not None]
+
+    md = f"""# Sensitivity Sweep -- Operation Lineage Audit
+
+**Generated:** {ts}
+**Script:** `sensitivity_sweep.py`
+**Snapshot:** `{manifest['version']}` (graph changed {manifest['graph_changed_at']}, exported {manifest['exported_at']})
+**Grid points:** {len(rows):,} ({n_cached:,} from cache), {elapsed:.1f}s
+
+---
+
+## 1. Robustness Summary
+
+| Metric | Value |
+|--------|-------|
+| **Grid points with a testable split** | {len(tested):,} |
+| **Mann-Whitney p < {ALPHA} (two-sided)** | {_share(rows, lambda r: r['mw_p'] < ALPHA) * 100:.1f}% |
+| **Clustered > non-clustered (CLES > 0.5)** | {_share(rows, lambda r: r['cles'] > 0.5) * 100:.1f}% |
+| **Both of the above** | {_share(rows, lambda r: r['mw_p'] < ALPHA and r['cles'] > 0.5) * 100:.1f}% |
+| **CLES (min .. median .. max)** | {_range(rows, 'cles')} |
+| **Median ratio (min .. median .. max)** | {_range(rows, 'median_ratio')} |
+| **Mean ratio (min .. median .. max)** | {_range(rows, 'mean_ratio')} |
+| **Q1 NDP->UCP change % (min .. median .. max)** | {_range(rows, 'q1_ndp_to_ucp_pct')} |
+| **Clustered share of Q1 NDP funding** | {_range(rows, 'q1_clustered_ndp_share')} |
+
+"""
+    if base:
+        md += f"""## 2. Baseline (published definitions)
+
+| Metric | Value |
+|--------|-------|
+| **NDP-restructured ministries** | {base['n_ministries']} |
+| **Clustered / non-clustered NDP grantees** | {base['n_clustered']:,} / {base['n_non_clustered']:,} |
+| **Mann-Whitney p (two-sided)** | {base.get('mw_p', float('nan')):.3e} |
+| **CLES** | {base.get('cles', float('nan')):.4f} |
+| **Median ratio** | {base.get('median_ratio') or float('nan'):.2f}x |
+| **Q3 funded clusters** | {base['q3_clusters']:,} |
+
+"""
+    md += "## 3. By Dimension\n\n"
+    for key in DEFAULT_GRID:
+        md += f"### {key}\n\n| Value | Points | p < {ALPHA} | CLES > 0.5 | Median CLES | Median ratio (median) |\n"
+        md += "|-------|-------:|------:|------:|------:|------:|\n"
+        for value in dict.fromkeys(r[key] for r in rows):
+            sub = [r for r in rows if r[key] == value]
+            cles = [r["cles"] for r in sub if r.get("cles") is not None]
+            ratios = [r["median_ratio"] for r in sub if r.get("median_ratio") is not None]
+            md += (f"| {value} | {len(sub):,} | {_share(sub, lambda r: r['mw_p'] < ALPHA) * 100:.1f}% "
+                   f"| {_share(sub, lambda r: r['cles'] > 0.5) * 100:.1f}% "
+                   f"| {np.median(cles) if cles else float('nan'):.4f} "
+                   f"| {np.median(ratios) if ratios else float('nan'):.2f}x |\n")
+        md += "\n"
+
+    md += f"""---
+
+## 4. Notes
+
+1. Grant edges are placed in an era by their earliest payment date (fiscal year midpoint when missing), so shifting a boundary moves whole grant edges, not individual payments.
+2. `shared>=k` clusters are connected components of SHARED_DIRECTORS edges with at least k shared directors; singletons are non-clustered.
+3. Per-point results are cached by snapshot id and grid point in `sweep_cache/`; re-exporting the snapshot starts a fresh cache.
+"""
+    with open(RESULTS_MD, "w", encoding="utf-8") as f:
+        f.write(md)
+    print(f"Summary written to: {RESULTS_MD}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sensitivity sweep over era boundaries and definitions")
+    parser.add_argument("--grid", help="JSON file overriding DEFAULT_GRID keys")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--snapshot", default=SNAPSHOT_DIR, help="snapshot root or version directory")
+    parser.add_argument("--version", default=None, help="snapshot version (default: LATEST)")
+    args = parser.parse_args()
+
+    print("=" * 68)
+    print("  Operation Lineage Audit -- Sensitivity Sweep")
+    print("=" * 68)
+    print()
+
+    grid = dict(DEFAULT_GRID)
+    if args.grid:
+        with open(args.grid, encoding="utf-8") as f:
+            grid.update(json.load(f))
+
+    snapshot_dir = resolve_snapshot(args.snapshot, args.version)
+    manifest = read_manifest(snapshot_dir)
+    print(f"Snapshot {manifest['version']} ({manifest['exported_at']})")
+
+    t0 = time.time()
+    rows, n_cached = run_sweep(expand_grid(grid), snapshot_dir, manifest["snapshot_id"], args.workers)
+    elapsed = time.time() - t0
+
+    write_csv(rows)
+    write_markdown(rows, manifest, n_cached, elapsed)
+    print()
+    print("Done.")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,14 +9,31 @@ Tests performed:
   1. Mann-Whitney U test (non-parametric, two-sided)
   2. Kolmogorov-Smirnov two-sample test
   3. Rank-biserial correlation (effect size)
+  4. Bootstrap CIs (median difference, CLES) and block permutation p-values
+     respecting cluster_id grouping -- see resampling.py
+
+Data comes from the latest local graph snapshot (02-graph-build/graph_snapshot.py)
+unless --live is given; --refresh re-exports the snapshot from Neo4j first.
+
+Usage:
+  python statistical_tests.py [--resamples 100000] [--workers N] [--seed S]
+                              [--live | --refresh] [--snapshot DIR] [--version V]
 """
 
 import os
 import sys
+import argparse
 import datetime
 import numpy as np
 from scipy import stats
-from neo4j import GraphDatabase
+
+from resampling import (bootstrap_ci, permutation_test, block_ids,
+                        DEFAULT_RESAMPLES, DEFAULT_SEED)
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SCRIPT_DIR, "..", "02-graph-build"))
+sys.path.insert(0, os.path.join(SCRIPT_DIR, "..", "03-governance-queries"))
+from graph_snapshot import SNAPSHOT_DIR, refresh_snapshot
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -50,8 +67,10 @@ ORDER BY ndp_funding DESC
 
 def fetch_data():
     """Connect to Neo4j and retrieve per-organization NDP funding data."""
+    from graph_client import GraphClient
+
     print(f"Connecting to Neo4j at {NEO4J_URI} ...")
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+    driver = GraphClient(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
 
     try:
         driver.verify_connectivity()
@@ -70,6 +89,18 @@ def fetch_data():
     return records
 
 
+def load_from_snapshot(path, version=None):
+    """Same records as fetch_data(), computed from a local graph snapshot."""
+    from snapshot_queries import SnapshotQueries
+
+    q = SnapshotQueries.load(path, version)
+    m = q.manifest
+    print(f"Using graph snapshot {m['version']} (graph changed {m['graph_changed_at']})")
+    records = q.ndp_org_funding()
+    print(f"  Retrieved {len(records)} organization records.\n")
+    return records, f"graph snapshot `{m['version']}` (graph changed {m['graph_changed_at']})"
+
+
 def split_groups(records):
     """Split records into clustered and non-clustered funding arrays."""
     clustered = []
@@ -85,6 +116,15 @@ def split_groups(records):
     return np.array(clustered), np.array(non_clustered)
 
 
+def label_arrays(records):
+    """Funding, is_clustered flag and permutation block per organization."""
+    values = np.array([float(r["ndp_funding"]) if r["ndp_funding"] is not None else 0.0
+                       for r in records])
+    labels = np.array([bool(r["is_clustered"]) for r in records])
+    blocks = block_ids([r["cluster_id"] if r["is_clustered"] else None for r in records])
+    return values, labels, blocks
+
+
 def descriptive_stats(arr):
     """Return a dict of descriptive statistics for a numpy array."""
     if len(arr) == 0:
@@ -181,6 +221,66 @@ def run_tests(clustered, non_clustered):
     return results
 
 
+def run_resampling(records, clustered, non_clustered, n_resamples, seed, workers):
+    """Bootstrap CIs plus organization-level and cluster-level permutation tests."""
+    print(f"Running resampling ({n_resamples:,} resamples, seed {seed}) ...\n")
+    values, labels, blocks = label_arrays(records)
+
+    boot = bootstrap_ci(clustered, non_clustered, n_resamples, seed, workers)
+    perm_unit = permutation_test(values, labels, None, n_resamples, seed, workers)
+    perm_block = permutation_test(values, labels, blocks, n_resamples, seed, workers)
+
+    lo, hi = boot["median_diff_ci"]
+    print(f"  Median difference:           {fmt_currency(boot['median_diff'])}  "
+          f"95% CI [{fmt_currency(lo)}, {fmt_currency(hi)}]")
+    lo, hi = boot["cles_ci"]
+    print(f"  CLES:                        95% CI [{lo:.4f}, {hi:.4f}]")
+    print(f"  Permutation (organization):  p_median = {perm_unit['median_diff_p']:.2e}, "
+          f"p_cles = {perm_unit['cles_p']:.2e}")
+    print(f"  Permutation (cluster block): p_median = {perm_block['median_diff_p']:.2e}, "
+          f"p_cles = {perm_block['cles_p']:.2e}  ({perm_block['n_blocks']:,} blocks)")
+    print()
+
+    return {"bootstrap": boot, "perm_unit": perm_unit, "perm_block": perm_block}
+
+
+def resampling_section(rs):
+    """Markdown for section 3d; empty when resampling was skipped."""
+    if not rs:
+        return ""
+    b, pu, pb = rs["bootstrap"], rs["perm_unit"], rs["perm_block"]
+    ci_pct = f"{b['ci'] * 100:.0f}%"
+    return f"""### 3d. Resampling (bootstrap and block permutation)
+
+Bootstrap intervals resample each group with replacement ({b['n_resamples']:,} resamples, percentile method). Permutation p-values shuffle the clustered label {pb['n_resamples']:,} times, either across individual organizations or across whole clusters ({pb['n_blocks']:,} blocks: {pb['n_treat_blocks']:,} clusters plus singleton non-clustered organizations). The block version keeps organizations that share directors together, so it does not treat them as independent observations.
+
+| Statistic | Observed | {ci_pct} bootstrap CI | Bootstrap SE |
+|-----------|---------:|------------------|-------------:|
+| **Median difference** | {fmt_currency(b['median_diff'])} | [{fmt_currency(b['median_diff_ci'][0])}, {fmt_currency(b['median_diff_ci'][1])}] | {fmt_currency(b['median_diff_se'])} |
+| **CLES** | {pb['cles']:.4f} | [{b['cles_ci'][0]:.4f}, {b['cles_ci'][1]:.4f}] | {b['cles_se']:.4f} |
+
+| Permutation p-value | Organization-level | Cluster-level (block) |
+|---------------------|-------------------:|----------------------:|
+| **Median difference (two-sided)** | {pu['median_diff_p']:.2e} | {pb['median_diff_p']:.2e} |
+| **Median difference (greater)** | {pu['median_diff_p_gt']:.2e} | {pb['median_diff_p_gt']:.2e} |
+| **CLES (two-sided)** | {pu['cles_p']:.2e} | {pb['cles_p']:.2e} |
+| **CLES (greater)** | {pu['cles_p_gt']:.2e} | {pb['cles_p_gt']:.2e} |
+
+The smallest attainable permutation p-value is 1 / ({pb['n_resamples']:,} + 1).
+
+"""
+
+
+def resampling_raw(rs):
+    if not rs:
+        return ""
+    b, pb = rs["bootstrap"], rs["perm_block"]
+    ci = f"{b['ci'] * 100:.0f}%"
+    return (f"{'Median diff ' + ci + ' CI:':<29}[{b['median_diff_ci'][0]:,.2f}, {b['median_diff_ci'][1]:,.2f}]\n"
+            f"{'CLES ' + ci + ' CI:':<29}[{b['cles_ci'][0]:.4f}, {b['cles_ci'][1]:.4f}]\n"
+            f"{'Block permutation p:':<29}median = {pb['median_diff_p']:.2e}, cles = {pb['cles_p']:.2e}\n")
+
+
 def interpret_effect_size(r):
     """Interpret rank-biserial correlation magnitude."""
     r_abs = abs(r)
@@ -194,7 +294,8 @@ def interpret_effect_size(r):
         return "large"
 
 
-def write_results(clustered_stats, non_clustered_stats, test_results):
+def write_results(clustered_stats, non_clustered_stats, test_results, resampling=None,
+                  source="live Neo4j query"):
     """Write the full results report as Markdown."""
     ts = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
@@ -211,6 +312,7 @@ def write_results(clustered_stats, non_clustered_stats, test_results):
 
 **Generated:** {ts}
 **Script:** `statistical_tests.py`
+**Data:** {source}
 
 ---
 
@@ -280,7 +382,7 @@ The rank-biserial correlation is computed as: **r = 1 - 2U / (n1 * n2)**
 
 The CLES represents the probability that a randomly selected clustered organization received more NDP-era funding than a randomly selected non-clustered organization.
 
----
+{resampling_section(resampling)}---
 
 ## 4. Interpretation
 
@@ -351,7 +453,9 @@ The Mann-Whitney U test yields a p-value of **{r['mw_p']:.4f}**, which is above
 
 4. **Clustered organizations** are those with a non-null `cluster_id` in the graph, indicating they share one or more board directors with other grant-receiving organizations.
 
-5. **Multiple testing:** Two tests (Mann-Whitney U and KS) are run. Since both test related but distinct aspects of the distribution difference, Bonferroni correction would set the adjusted alpha at 0.025. Results should be interpreted accordingly, though with p-values this extreme, the correction does not change the conclusion.
+5. **Cluster dependence:** Organizations in the same cluster share directors and are not independent draws. The block permutation in 3d shuffles whole clusters, so its p-values do not rely on independence between organizations.
+
+6. **Multiple testing:** Two tests (Mann-Whitney U and KS) are run. Since both test related but distinct aspects of the distribution difference, Bonferroni correction would set the adjusted alpha at 0.025. Results should be interpreted accordingly, though with p-values this extreme, the correction does not change the conclusion.
 
 ---
 
@@ -365,7 +469,7 @@ Rank-biserial correlation:   r = {r['rank_biserial']:.6f}  ({effect_interp})
 CLES:                        {r['cles']:.4f}
 n_clustered = {r['n1']:,}
 n_non_clustered = {r['n2']:,}
-```
+{resampling_raw(resampling)}```
 """
 
     with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
@@ -375,16 +479,37 @@ n_non_clustered = {r['n2']:,}
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Clustered vs non-clustered NDP funding tests")
+    parser.add_argument("--resamples", type=int, default=DEFAULT_RESAMPLES,
+                        help="bootstrap/permutation resamples (0 skips resampling)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--live", action="store_true",
+                        help="query Neo4j directly instead of the local snapshot")
+    parser.add_argument("--refresh", action="store_true",
+                        help="re-export the graph snapshot from Neo4j first")
+    parser.add_argument("--snapshot", default=SNAPSHOT_DIR,
+                        help="snapshot root or version directory")
+    parser.add_argument("--version", default=None,
+                        help="snapshot version (default: LATEST)")
+    args = parser.parse_args()
+
     print("=" * 68)
     print("  Operation Lineage Audit -- Statistical Significance Tests")
     print("=" * 68)
     print()
 
-    # Step 1: Fetch data from Neo4j
-    records = fetch_data()
+    # Step 1: Fetch data (snapshot by default, Neo4j with --live)
+    if args.live:
+        records, source = fetch_data(), "live Neo4j query"
+    else:
+        if args.refresh:
+            refresh_snapshot(args.snapshot)
+        records, source = load_from_snapshot(args.snapshot, args.version)
 
     if not records:
-        print("ERROR: No records returned from Neo4j. Exiting.")
+        print("ERROR: No records returned. Exiting.")
         sys.exit(1)
 
     # Step 2: Split into groups
@@ -412,8 +537,14 @@ def main():
     # Step 4: Run tests
     test_results = run_tests(clustered, non_clustered)
 
-    # Step 5: Write results
-    write_results(cs, ns, test_results)
+    # Step 5: Resampling
+    resampling = None
+    if args.resamples > 0:
+        resampling = run_resampling(records, clustered, non_clustered,
+                                    args.resamples, args.seed, args.workers)
+
+    # Step 6: Write results
+    write_results(cs, ns, test_results, resampling, source)
 
     print()
     print("Done.")
@@ -0,0 +1,653 @@
+"""
+Synthetic Data Generator for Operation Lineage Audit
+====================================================
+Writes a self-consistent fake copy of every Phase 0 input at a chosen
+multiple of today's volumes, so ingestion and query performance can be
+measured without Databricks or Aura:
+
+  grants_aggregated.csv      702K rows x scale  (recipient, ministry, era, ...)
+  org_risk_flags.csv         9,145 orgs x scale (CRA financials + 7 flag columns)
+  multi_board_directors.csv  ~19K directors x scale (linked_bns JSON lists)
+  org_network_edges.csv      org pairs sharing directors (~154K x scale)
+  org_clusters.csv           components of pairs sharing >= 2 directors
+  goa_cra_matched.csv        GOA recipient name -> BN for matched recipients
+  federal_grants.csv         ~70K x scale
+  entity_mapping.csv, transform_events.csv
+  lineage/                   org_entities, transform_events, edges_source_of,
+                             edges_target_of (lineage_closure.py --from-csv)
+  snapshot/                  the graph those files would build, in the
+                             graph_snapshot.py Parquet layout, for the
+                             in-process query backend (SnapshotQueries)
+
+Skew follows the real data rather than uniform draws: director board
+counts are power-law (Zipf), directors sit mostly inside one governance
+community, grant amounts are log-normal with a heavy tail, recipients and
+cities are Zipf-popular, and restructuring events bunch up after each
+change of government (D002 era boundaries).
+
+Output is deterministic for a given (scale, seed).
+
+Usage:
+  python synthetic_data.py --scale 10 [--seed 7] [--out DIR] [--no-snapshot]
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import datetime
+import numpy as np
+import pandas as pd
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SCRIPT_DIR, "..", "02-graph-build"))
+from graph_snapshot import MANIFEST_NAME, LATEST_NAME
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+SYNTHETIC_DIR = os.path.join(SCRIPT_DIR, "synthetic")
+GENERATOR_VERSION = 2     # bump when the output for a given (scale, seed) changes
+DEFAULT_SEED = 20150524
+
+# Today's volumes (scale 1)
+BASE = {
+    "orgs": 9_145,
+    "directors": 19_156,
+    "grants": 702_000,
+    "unmatched_recipients": 60_000,
+    "federal": 70_000,
+    "initial_ministries": 50,
+    "events": 54,
+}
+CHUNK_ROWS = 1_000_000          # grant rows generated / written per chunk
+PROGRESS_STEP = 0.10            # report grant progress every 10% of the expected rows
+MATCHED_SHARE = 0.45            # grant rows whose recipient is a CRA charity
+BLANK_CID_SHARE = 0.08          # grant rows resolved by ministry name, not canonical_id
+HOME_COMMUNITY_SHARE = 0.75     # director boards drawn from the director's own community
+BOARD_COUNT_EXPONENT = 2.5     # Zipf exponent of boards per director (~154K org pairs at 1x)
+MAX_BOARDS = 60
+
+WINDOW_START = "2010-04-01"     # first grant payment (fiscal 2010)
+WINDOW_END = "2025-03-31"       # last grant payment (fiscal 2024)
+LINEAGE_START = "2008-01-01"
+LINEAGE_END = "2025-05-31"
+
+# D002 political eras: (name, first day, context string on TransformEvents)
+ERAS = [
+    ("PC", "1971-09-10", "PC (Stelmach / Redford / Prentice)"),
+    ("NDP", "2015-05-24", "NDP (Notley)"),
+    ("UCP_Kenney", "2019-04-30", "UCP (Kenney)"),
+    ("UCP_Smith", "2022-10-11", "UCP (Smith)"),
+]
+TRANSITIONS = ["2012-05-08", "2015-05-24", "2019-04-30", "2022-10-11"]
+
+EVENT_TYPES = ["RENAME", "MERGE", "SPLIT", "TRANSFER"]
+EVENT_WEIGHTS = [0.30, 0.25, 0.25, 0.20]
+
+CITIES = ["CALGARY", "EDMONTON", "RED DEER", "LETHBRIDGE", "MEDICINE HAT", "GRANDE PRAIRIE",
+          "AIRDRIE", "ST. ALBERT", "SPRUCE GROVE", "OKOTOKS", "FORT MCMURRAY", "CAMROSE",
+          "BROOKS", "LLOYDMINSTER", "COCHRANE", "CANMORE", "WETASKIWIN", "STONY PLAIN",
+          "SHERWOOD PARK", "LEDUC", "HIGH RIVER", "STRATHMORE", "SYLVAN LAKE", "BANFF",
+          "PEACE RIVER", "SLAVE LAKE", "ATHABASCA", "DRUMHELLER", "OLDS", "TABER"]
+CATEGORIES = ["Welfare", "Health", "Education", "Religion", "Community Benefit",
+              "Arts and Culture", "Environment", "Sports and Recreation", "Housing",
+              "Employment and Training"]
+ORG_WORDS_A = ["BOW VALLEY", "PRAIRIE", "NORTHERN", "CHINOOK", "ASPEN", "RIVERSIDE", "FOOTHILLS",
+               "PARKLAND", "SOUTHERN", "CAPITAL", "HERITAGE", "WILDROSE", "LAKELAND", "MOUNTAIN",
+               "CENTRAL", "EAST", "WEST", "UNITED", "COMMUNITY", "FAMILY"]
+ORG_WORDS_B = ["YOUTH", "SENIORS", "FOOD BANK", "HOUSING", "HEALTH", "ARTS", "LITERACY",
+               "IMMIGRANT", "INDIGENOUS", "DISABILITY", "MENTAL HEALTH", "RECOVERY", "CHILDREN",
+               "WOMEN'S SHELTER", "SPORTS", "MUSIC", "LEARNING", "EMPLOYMENT", "LEGAL", "HOSPICE"]
+ORG_FORMS = ["SOCIETY", "FOUNDATION", "ASSOCIATION", "CENTRE", "NETWORK", "SERVICES"]
+FIRST_NAMES = ["JOHN", "MARY", "DAVID", "SUSAN", "MICHAEL", "LINDA", "ROBERT", "KAREN", "JAMES",
+               "PATRICIA", "WILLIAM", "BARBARA", "RICHARD", "ELIZABETH", "THOMAS", "JENNIFER",
+               "DANIEL", "MARIA", "PAUL", "NANCY", "MARK", "LISA", "DONALD", "SANDRA", "GEORGE",
+               "DONNA", "KENNETH", "CAROL", "STEVEN", "RUTH", "BRIAN", "SHARON", "KEVIN",
+               "MICHELLE", "JASON", "LAURA", "GARY", "SARAH", "RYAN", "KIMBERLY"]
+LAST_NAMES = ["SMITH", "BROWN", "TREMBLAY", "MARTIN", "ROY", "WILSON", "MACDONALD", "GAGNON",
+              "JOHNSON", "TAYLOR", "COTE", "CAMPBELL", "ANDERSON", "LEBLANC", "LEE", "JONES",
+              "WHITE", "WILLIAMS", "MILLER", "THOMPSON", "GAUTHIER", "YOUNG", "VAN DYK",
+              "MORIN", "SCOTT", "STEWART", "PELLETIER", "CLARK", "ROSS", "WONG", "NGUYEN",
+              "SINGH", "PATEL", "CHEN", "KAUR", "BIRD", "CARDINAL", "LAROCQUE", "HUNTER", "FRASER"]
+TOPICS = ["HEALTH", "EDUCATION", "ENERGY", "ENVIRONMENT", "PARKS", "HUMAN SERVICES",
+          "CHILDREN'S SERVICES", "SENIORS", "HOUSING", "INFRASTRUCTURE", "TRANSPORTATION",
+          "JUSTICE", "SOLICITOR GENERAL", "AGRICULTURE", "FORESTRY", "ECONOMIC DEVELOPMENT",
+          "TRADE", "TOURISM", "CULTURE", "MULTICULTURALISM", "STATUS OF WOMEN", "LABOUR",
+          "IMMIGRATION", "ADVANCED EDUCATION", "INNOVATION", "MUNICIPAL AFFAIRS",
+          "INDIGENOUS RELATIONS", "COMMUNITY AND SOCIAL SERVICES", "TREASURY BOARD", "FINANCE",
+          "SERVICE ALBERTA", "RED TAPE REDUCTION", "MENTAL HEALTH AND ADDICTION", "TECHNOLOGY",
+          "JOBS", "SKILLS", "ENERGY AND MINERALS", "AFFORDABILITY", "UTILITIES", "PUBLIC SAFETY"]
+FED_DEPARTMENTS = ["Employment and Social Development Canada", "Canadian Heritage",
+                   "Immigration, Refugees and Citizenship Canada", "Public Health Agency of Canada",
+                   "Indigenous Services Canada", "Western Economic Diversification Canada",
+                   "Prairies Economic Development Canada", "Infrastructure Canada",
+                   "Women and Gender Equality Canada", "Health Canada",
+                   "Environment and Climate Change Canada", "Agriculture and Agri-Food Canada",
+                   "Canada Council for the Arts", "Public Safety Canada", "Housing, Infrastructure and Communities Canada"]
+FLAG_COLUMNS = ["flag_low_passthrough", "flag_salary_mill", "flag_high_gov_dependency",
+                "flag_deficit", "flag_insolvency_5pct_cut", "flag_shadow_network",
+                "flag_in_director_cluster"]
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+def _day(date):
+    return int(np.datetime64(date, "D").astype(np.int64))
+
+
+def _iso(days):
+    return np.asarray(days, dtype="int64").astype("datetime64[D]").astype(str)
+
+
+def _era_index(days):
+    starts = np.array([_day(s) for _, s, _ in ERAS])
+    return np.searchsorted(starts, days, side="right") - 1
+
+
+def _zipf_weights(n, a, rng=None):
+    """Popularity weights 1/rank^a, randomly permuted over n items if rng is given."""
+    w = 1.0 / np.arange(1, n + 1) ** a
+    if rng is not None:
+        w = rng.permutation(w)
+    return w / w.sum()
+
+
+def _weighted_choice(rng, weights, size):
+    """Vectorized draws from a categorical distribution (weights sum to 1)."""
+    return np.minimum(np.searchsorted(np.cumsum(weights), rng.random(size)), len(weights) - 1)
+
+
+def _labels(parts, n):
+    """n distinct labels from the Cartesian product of word lists, numbered past it."""
+    sizes = [len(p) for p in parts]
+    total = int(np.prod(sizes))
+    out = []
+    for i in range(n):
+        j, words = i % total, []
+        for p, s in zip(parts, sizes):
+            words.append(p[j % s])
+            j //= s
+        out.append(" ".join(words) + (f" {i // total + 1}" if i >= total else ""))
+    return out
+
+
+def _bns(rng, n):
+    """n distinct 15-character CRA business numbers (9 digits + RR0001)."""
+    base = 100_000_000 + rng.permutation(np.arange(n, dtype=np.int64) * 97 + rng.integers(0, 97))
+    return np.array([f"{b:09d}RR0001" for b in base], dtype=object)
+
+
+# ---------------------------------------------------------------------------
+# Organizations, directors, network, clusters
+# ---------------------------------------------------------------------------
+def make_orgs(rng, n):
+    names = np.array(_labels([ORG_WORDS_A, ORG_WORDS_B, ORG_FORMS], n), dtype=object)
+    orgs = pd.DataFrame({"bn": _bns(rng, n), "Legal_name": names})
+    orgs["Account_name"] = np.where(rng.random(n) < 0.15, orgs["Legal_name"] + " INC.", orgs["Legal_name"])
+    orgs["City"] = np.array(CITIES, dtype=object)[_weighted_choice(rng, _zipf_weights(len(CITIES), 1.3), n)]
+    orgs["Category_English_Desc"] = np.array(CATEGORIES, dtype=object)[
+        _weighted_choice(rng, _zipf_weights(len(CATEGORIES), 0.8), n)]
+
+    rev = np.round(rng.lognormal(13.0, 1.6, n), 2)
+    exp = np.round(rev * rng.uniform(0.80, 1.15, n), 2)
+    gov_dep = np.round(rng.beta(2, 2, n) * 100, 2)
+    total_gov = np.round(rev * gov_dep / 100, 2)
+    prov = np.round(total_gov * rng.uniform(0.4, 1.0, n), 2)
+    assets = np.round(rev * rng.lognormal(0.0, 0.8, n), 2)
+    liab = np.round(assets * rng.beta(2, 3, n), 2)
+    orgs["Total_Revenue"] = rev
+    orgs["Total_Expenditures"] = exp
+    orgs["gov_dependency_pct"] = gov_dep
+    orgs["program_pct"] = np.round(rng.beta(6, 2, n) * 100, 2)
+    orgs["admin_pct"] = np.round((100 - orgs["program_pct"]) * rng.uniform(0.4, 0.9, n), 2)
+    orgs["fundraising_pct"] = np.round(100 - orgs["program_pct"] - orgs["admin_pct"], 2)
+    orgs["compensation_pct_of_exp"] = np.round(rng.beta(3, 4, n) * 100, 2)
+    orgs["total_gov_rev"] = total_gov
+    orgs["prov_rev"] = prov
+    orgs["fed_rev"] = np.round(total_gov - prov, 2)
+    orgs["Total_Assets"] = assets
+    orgs["Total_Liabilities"] = liab
+    orgs["net_assets"] = np.round(assets - liab, 2)
+    return orgs
+
+
+def make_directors(rng, n_target, n_orgs):
+    """Directors on 3+ boards: (names, per-director arrays of org indices)."""
+    # Governance communities: Zipf-sized runs of consecutive org indices
+    sizes = []
+    while sum(sizes) < n_orgs:
+        sizes.append(int(min(1 + rng.zipf(1.8), 300)))
+    sizes[-1] -= sum(sizes) - n_orgs
+    sizes = np.array(sizes)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    multi = np.flatnonzero(sizes >= 3)
+    home_w = sizes[multi] / sizes[multi].sum()
+    attract = rng.pareto(1.5, n_orgs) + 1
+    attract /= attract.sum()
+
+    n = int(n_target * 1.25)          # oversample; directors left with < 3 boards are dropped
+    k = np.minimum(2 + rng.zipf(BOARD_COUNT_EXPONENT, n), MAX_BOARDS)
+    owner = np.repeat(np.arange(n), k)
+    home = multi[_weighted_choice(rng, home_w, n)][owner]
+    in_home = rng.random(len(owner)) < HOME_COMMUNITY_SHARE
+    slot = np.where(in_home,
+                    starts[home] + (rng.random(len(owner)) * sizes[home]).astype(np.int64),
+                    _weighted_choice(rng, attract, len(owner)))
+    pairs = np.unique(owner * n_orgs + slot)
+    owner, slot = pairs // n_orgs, pairs % n_orgs
+    counts = np.bincount(owner, minlength=n)
+    keep = np.flatnonzero(counts >= 3)[:n_target]
+    bounds = np.concatenate([[0], np.cumsum(counts)])
+    boards = [slot[bounds[i]:bounds[i + 1]] for i in keep]
+    names = _labels([FIRST_NAMES, LAST_NAMES], len(keep))
+    return names, boards
+
+
+def network_edges(boards, n_orgs):
+    """Org pairs sharing directors -> (a, b, n_shared) with a < b."""
+    codes = []
+    for k in sorted({len(b) for b in boards}):
+        group = np.array([b for b in boards if len(b) == k])
+        i, j = np.triu_indices(k, 1)
+        a, b = group[:, i].ravel(), group[:, j].ravel()
+        codes.append(np.minimum(a, b) * n_orgs + np.maximum(a, b))
+    code, n_shared = np.unique(np.concatenate(codes) if codes else np.array([], dtype=np.int64),
+                               return_counts=True)
+    return code // n_orgs, code % n_orgs, n_shared
+
+
+def clusters(a, b, n_shared, n_orgs, min_shared=2):
+    """Cluster id (1-based, 0 = none) and size per org: components of strong ties."""
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    strong = n_shared >= min_shared
+    adj = coo_matrix((np.ones(strong.sum()), (a[strong], b[strong])), shape=(n_orgs, n_orgs))
+    _, comp = connected_components(adj, directed=False)
+    size = np.bincount(comp)[comp]
+    clustered = size >= 2
+    ids = np.zeros(n_orgs, dtype=np.int64)
+    _, ids[clustered] = np.unique(comp[clustered], return_inverse=True)
+    ids[clustered] += 1
+    return ids, np.where(clustered, size, 0)
+
+
+def risk_flags(rng, orgs, cluster_id, degree):
+    flags = pd.DataFrame({
+        "flag_low_passthrough": orgs["program_pct"] < 50,
+        "flag_salary_mill": orgs["compensation_pct_of_exp"] > 65,
+        "flag_high_gov_dependency": orgs["gov_dependency_pct"] > 85,
+        "flag_deficit": orgs["Total_Expenditures"] > orgs["Total_Revenue"],
+        "flag_insolvency_5pct_cut": (orgs["net_assets"] < 0.05 * orgs["Total_Revenue"])
+                                    & (orgs["Total_Expenditures"] > 0.95 * orgs["Total_Revenue"]),
+        "flag_shadow_network": (degree >= np.quantile(degree, 0.97)) & (rng.random(len(orgs)) < 0.5),
+        "flag_in_director_cluster": cluster_id > 0,
+    })
+    return flags.astype(int).astype(str)
+
+
+# ---------------------------------------------------------------------------
+# Ministry lineage
+# ---------------------------------------------------------------------------
+def make_lineage(rng, n_initial, n_events):
+    """OrgEntity rows, TransformEvent rows and SOURCE_OF / TARGET_OF edges."""
+    lo, hi = _day(LINEAGE_START), _day(LINEAGE_END)
+    near = rng.random(n_events) < 0.6
+    trans = np.array([_day(t) for t in TRANSITIONS])
+    dates = np.where(near, trans[rng.integers(0, len(trans), n_events)] + rng.integers(0, 200, n_events),
+                     rng.integers(lo, hi, n_events))
+    dates = np.sort(np.minimum(dates, hi))
+    types = np.array(EVENT_TYPES)[_weighted_choice(rng, np.array(EVENT_WEIGHTS), n_events)]
+
+    width = max(3, len(str(n_initial + 3 * n_events)))
+    entities, used = [], set()
+
+    def new_entity(start):
+        k = 1 if rng.random() < 0.6 else 2
+        name = "MINISTRY OF " + " AND ".join(rng.choice(TOPICS, k, replace=False))
+        base, i = name, 2
+        while name in used:
+            name, i = f"{base} ({i})", i + 1
+        used.add(name)
+        entities.append({"canonical_id": f"EM-{len(entities) + 1:0{width}d}", "name": name,
+                         "level": "ministry", "start_date": start, "end_date": None,
+                         "normalized_name": name.lower(), "aliases": name[len("MINISTRY OF "):],
+                         "jurisdiction": "AB"})
+        return len(entities) - 1
+
+    active = [new_entity(str(_iso(lo - int(rng.integers(0, 3650))))) for _ in range(n_initial)]
+    events, src_edges, tgt_edges = [], [], []
+    for j, (d, etype) in enumerate(zip(dates, types)):
+        iso = str(_iso(d))
+        era = _era_index(d)
+        if etype == "MERGE" and len(active) < 3:
+            etype = "RENAME"
+        if etype == "TRANSFER" and len(active) < 2:
+            etype = "RENAME"
+        eid = f"EVT-{j + 1:04d}"
+        n_src = int(rng.integers(2, 4)) if etype == "MERGE" else 1
+        picks = rng.choice(len(active), min(n_src, len(active) - (etype == "TRANSFER")), replace=False)
+        sources = [active[p] for p in picks]
+        if etype == "TRANSFER":
+            others = [a for a in active if a not in sources]
+            targets = [others[int(rng.integers(0, len(others)))]]
+        else:
+            n_tgt = int(rng.integers(2, 4)) if etype == "SPLIT" else 1
+            for s in sources:
+                entities[s]["end_date"] = iso
+                active.remove(s)
+            targets = [new_entity(iso) for _ in range(n_tgt)]
+            active.extend(targets)
+        events.append({"event_id": eid, "event_type": etype, "event_date": iso,
+                       "political_context": ERAS[era][2],
+                       "notes": f"synthetic {etype.lower()} ({len(sources)} -> {len(targets)})"})
+        src_edges += [{"source_entity_id": entities[s]["canonical_id"], "event_id": eid} for s in sources]
+        tgt_edges += [{"event_id": eid, "target_entity_id": entities[t]["canonical_id"]} for t in targets]
+
+    ent = pd.DataFrame(entities)
+    ent["status"] = np.where(ent["end_date"].isna(), "active", "dissolved")
+    return ent, pd.DataFrame(events), pd.DataFrame(src_edges), pd.DataFrame(tgt_edges)
+
+
+# ---------------------------------------------------------------------------
+# Grants
+# ---------------------------------------------------------------------------
+def grant_chunks(rng, n_rows, entities, org_names, n_unmatched):
+    """Yield DataFrames of grants_aggregated.csv rows, at most CHUNK_ROWS at a time.
+
+    Rows are aggregates keyed on (recipient, ministry, fiscal_year, era), so
+    the generator works one fiscal year at a time and redraws colliding keys
+    until the year's quota is met; only that year's integer key codes are
+    held in memory, whatever the scale.
+    """
+    lo, hi = _day(WINDOW_START), _day(WINDOW_END)
+    start = np.array([_day(s) for s in entities["start_date"]])
+    end = np.array([_day(e) if isinstance(e, str) else hi for e in entities["end_date"]])
+    start, end = np.maximum(start, lo), np.minimum(end, hi + 1)
+    popularity = rng.pareto(1.2, len(entities)) + 1
+    org_w = _zipf_weights(len(org_names), 0.7, rng)
+    other_w = _zipf_weights(n_unmatched, 0.8, rng)
+    era_starts = np.array([_day(s) for _, s, _ in ERAS[1:]] + [hi + 1])
+    era_names = np.array([e[0] for e in ERAS], dtype=object)
+    cids = entities["canonical_id"].to_numpy(dtype=object)
+    mnames = entities["name"].to_numpy(dtype=object)
+    n_recipients = len(org_names) + n_unmatched
+
+    years = np.arange(int(WINDOW_START[:4]), int(WINDOW_END[:4]))
+    growth = 1.04 ** np.arange(len(years))                  # spending grows ~4% a year
+    quota = np.diff(np.round(np.concatenate([[0], np.cumsum(growth)]) / growth.sum() * n_rows)).astype(int)
+    for fy, want in zip(years, quota):
+        fy_lo, fy_hi = _day(f"{fy}-04-01"), _day(f"{fy + 1}-04-01")
+        m_lo, m_hi = np.maximum(start, fy_lo), np.minimum(end, fy_hi)
+        weight = np.where(m_hi > m_lo, (m_hi - m_lo) * popularity, 0.0)
+        if not want or not weight.any():
+            continue
+        weight /= weight.sum()
+        seen = np.array([], dtype=np.int64)
+        for _ in range(50):
+            n = min(CHUNK_ROWS, int((want - len(seen)) * 1.1) + 16)
+            m = _weighted_choice(rng, weight, n)
+            day = m_lo[m] + (rng.random(n) * (m_hi[m] - m_lo[m])).astype(np.int64)
+            era = _era_index(day)
+            matched = rng.random(n) < MATCHED_SHARE
+            rec = np.where(matched, _weighted_choice(rng, org_w, n),
+                           len(org_names) + _weighted_choice(rng, other_w, n))
+            code = (rec * len(entities) + m) * len(ERAS) + era
+            code, first = np.unique(code, return_index=True)
+            fresh = ~np.isin(code, seen, assume_unique=True)
+            keep = np.sort(first[fresh])[:want - len(seen)]
+            seen = np.union1d(seen, code[fresh])
+            if len(keep):
+                yield _grant_rows(rng, keep, m, day, era, rec, org_names, mnames, cids, era_names,
+                                  fy, np.minimum(m_hi[m], era_starts[np.minimum(era, len(era_starts) - 1)]))
+            if len(seen) >= want:
+                break
+
+
+def _grant_rows(rng, keep, m, day, era, rec, org_names, mnames, cids, era_names, fy, stop):
+    m, day, era, rec, stop = m[keep], day[keep], era[keep], rec[keep], stop[keep]
+    n = len(keep)
+    latest = np.maximum(np.minimum(day + rng.geometric(0.02, n) - 1, stop - 1), day)
+    recipient = np.where(
+        rec < len(org_names), org_names[np.minimum(rec, len(org_names) - 1)],
+        np.char.add("RECIPIENT ", (rec - len(org_names)).astype(str)).astype(object))
+    amount = rng.lognormal(9.6, 1.9, n)
+    amount = np.where(rng.random(n) < 0.005, -amount, amount)
+    n_pay = rng.geometric(0.35, n)
+    return pd.DataFrame({
+        "recipient": recipient,
+        "ministry": mnames[m],
+        "fiscal_year": str(fy),
+        "political_era": era_names[era],
+        "total_amount": np.round(amount * n_pay, 2),
+        "n_payments": n_pay,
+        "canonical_ministry_id": np.where(rng.random(n) < BLANK_CID_SHARE, "", cids[m]),
+        "earliest_payment": _iso(day),
+        "latest_payment": _iso(latest),
+    })
+
+
+def make_federal(rng, n, orgs):
+    known = rng.random(n) < 0.6
+    idx = rng.integers(0, len(orgs), n)
+    other = _bns(np.random.default_rng(rng.integers(1 << 31)), n)
+    day = rng.integers(_day(WINDOW_START), _day(WINDOW_END), n)
+    dept = _weighted_choice(rng, _zipf_weights(len(FED_DEPARTMENTS), 0.9), n)
+    return pd.DataFrame({
+        "BN": np.where(known, orgs["bn"].to_numpy()[idx], other),
+        "org_name": np.where(known, orgs["Legal_name"].to_numpy()[idx],
+                             np.char.add("FEDERAL RECIPIENT ", idx.astype(str)).astype(object)),
+        "federal_department": np.array(FED_DEPARTMENTS, dtype=object)[dept],
+        "program": np.char.add("Program ", (dept * 10 + rng.integers(0, 10, n)).astype(str)),
+        "amount": np.round(rng.lognormal(10.5, 1.7, n), 2),
+        "agreement_start_date": _iso(day),
+        "province": "AB",
+    })
+
+
+# ---------------------------------------------------------------------------
+# Snapshot (what agent_1_graph_builder.py would have put in the graph)
+# ---------------------------------------------------------------------------
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class SnapshotWriter:
+    def __init__(self, root, version):
+        self.root, self.version = root, version
+        self.dir = os.path.join(root, version)
+        os.makedirs(self.dir, exist_ok=True)
+        self.writers, self.rows = {}, {}
+
+    def write(self, name, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if name not in self.writers:
+            self.writers[name] = pq.ParquetWriter(os.path.join(self.dir, f"{name}.parquet"), table.schema)
+            self.rows[name] = 0
+        self.writers[name].write_table(table.cast(self.writers[name].schema))
+        self.rows[name] += len(df)
+
+    def close(self, extra):
+        tables = {}
+        for name, w in self.writers.items():
+            w.close()
+            tables[name] = {"rows": self.rows[name],
+                            "sha256": _sha256(os.path.join(self.dir, f"{name}.parquet"))}
+        digest = hashlib.sha256(json.dumps(
+            {k: v["sha256"] for k, v in sorted(tables.items())}).encode()).hexdigest()
+        now = datetime.datetime.now().isoformat(timespec="seconds")
+        manifest = dict({"version": self.version, "snapshot_id": digest[:16], "graph_version": None,
+                         "graph_changed_at": now, "exported_at": now, "previous_version": None,
+                         "source": "synthetic", "tables": tables}, **extra)
+        with open(os.path.join(self.dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        with open(os.path.join(self.root, LATEST_NAME), "w", encoding="utf-8") as f:
+            f.write(self.version + "\n")
+        return manifest
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+def default_out(scale, seed=DEFAULT_SEED):
+    tag = f"{scale:g}x" + ("" if seed == DEFAULT_SEED else f"-seed{seed}")
+    return os.path.join(SYNTHETIC_DIR, tag)
+
+
+def read_info(out):
+    path = os.path.join(out, "synthetic_info.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def generate(scale=1.0, seed=DEFAULT_SEED, out=None, snapshot=True, verbose=True):
+    """Write the synthetic dataset; returns the info dict (row counts, timings)."""
+    out = out or default_out(scale, seed)
+    say = print if verbose else (lambda *a, **k: None)
+    rng = np.random.default_rng([seed, int(scale * 1000)])
+    os.makedirs(os.path.join(out, "lineage"), exist_ok=True)
+    n = {k: max(1, int(round(v * scale))) for k, v in BASE.items()}
+    counts, timings = {}, {}
+
+    def save(df, name, sub=""):
+        df.to_csv(os.path.join(out, sub, name), index=False, encoding="utf-8")
+        counts[os.path.join(sub, name).replace(os.sep, "/")] = len(df)
+
+    t0 = time.time()
+    orgs = make_orgs(rng, n["orgs"])
+    names, boards = make_directors(rng, n["directors"], len(orgs))
+    a, b, n_shared = network_edges(boards, len(orgs))
+    cluster_id, cluster_size = clusters(a, b, n_shared, len(orgs))
+    degree = np.bincount(np.concatenate([a, b]), minlength=len(orgs))
+    orgs = pd.concat([orgs, risk_flags(rng, orgs, cluster_id, degree)], axis=1)
+    bn = orgs["bn"].to_numpy()
+    timings["orgs_directors_network"] = time.time() - t0
+
+    save(orgs, "org_risk_flags.csv")
+    save(pd.DataFrame({
+        "clean_name_no_initial": names,
+        "n_boards": [len(x) for x in boards],
+        "n_non_arms_length": [int(rng.binomial(len(x), 0.1)) for x in boards],
+        "linked_bns": [json.dumps(list(bn[x])) for x in boards],
+    }), "multi_board_directors.csv")
+    save(pd.DataFrame({"org1_bn": bn[a], "org2_bn": bn[b], "n_shared_directors": n_shared}),
+         "org_network_edges.csv")
+    in_cluster = cluster_id > 0
+    save(pd.DataFrame({"bn": bn[in_cluster], "cluster_id": cluster_id[in_cluster],
+                       "cluster_size": cluster_size[in_cluster]}), "org_clusters.csv")
+    say(f"  orgs {len(orgs):,}, directors {len(boards):,}, network edges {len(a):,}, "
+        f"clustered orgs {int(in_cluster.sum()):,}")
+
+    t0 = time.time()
+    ent, evt, src, tgt = make_lineage(rng, n["initial_ministries"], n["events"])
+    save(ent, "org_entities.csv", "lineage")
+    save(evt, "transform_events.csv", "lineage")
+    save(src, "edges_source_of.csv", "lineage")
+    save(tgt, "edges_target_of.csv", "lineage")
+    save(ent, "entity_mapping.csv")
+    save(evt, "transform_events.csv")
+    timings["lineage"] = time.time() - t0
+    say(f"  ministries {len(ent):,}, transform events {len(evt):,}")
+
+    snap = None
+    if snapshot:
+        snap = SnapshotWriter(os.path.join(out, "snapshot"), f"synthetic-{scale:g}x-{seed}")
+        orgs_tbl = pd.DataFrame({"bn": bn, "name": orgs["Legal_name"], "city": orgs["City"],
+                                 "cluster_id": pd.array(np.where(in_cluster, cluster_id, 0), dtype="Int64"),
+                                 "cluster_size": pd.array(cluster_size, dtype="Int64")})
+        orgs_tbl.loc[~in_cluster, ["cluster_id", "cluster_size"]] = pd.NA
+        snap.write("organizations", orgs_tbl)
+        snap.write("shared_directors", pd.DataFrame({"bn1": bn[a], "bn2": bn[b],
+                                                     "n_shared_directors": n_shared}))
+        flag_rows = orgs[FLAG_COLUMNS].eq("1").to_numpy()
+        oi, fi = np.nonzero(flag_rows)
+        snap.write("risk_flags", pd.DataFrame({
+            "bn": bn[oi], "flag_type": np.array([c[5:] for c in FLAG_COLUMNS], dtype=object)[fi]}))
+        ev = evt.set_index("event_id")
+        links = pd.concat([
+            src.rename(columns={"source_entity_id": "ministry_id"}).assign(role="SOURCE_OF"),
+            tgt.rename(columns={"target_entity_id": "ministry_id"}).assign(role="TARGET_OF")])
+        links = links.join(ev[["event_type", "event_date", "political_context"]], on="event_id")
+        links["ministry_name"] = links["ministry_id"].map(ent.set_index("canonical_id")["name"])
+        snap.write("event_links", links[["event_id", "event_type", "event_date", "political_context",
+                                         "role", "ministry_id", "ministry_name"]])
+
+    t0 = time.time()
+    name_to_bn = pd.Series(bn, index=orgs["Legal_name"].to_numpy())
+    cid_of_name = ent.set_index("name")["canonical_id"]
+    n_grants, matched_names = 0, set()
+    step = max(CHUNK_ROWS, int(n["grants"] * PROGRESS_STEP))
+    next_report = step
+    grants_path = os.path.join(out, "grants_aggregated.csv")
+    for i, chunk in enumerate(grant_chunks(rng, n["grants"], ent, orgs["Legal_name"].to_numpy(dtype=object),
+                                           n["unmatched_recipients"])):
+        chunk.to_csv(grants_path, index=False, encoding="utf-8", mode="w" if i == 0 else "a",
+                     header=i == 0)
+        n_grants += len(chunk)
+        hit = chunk["recipient"].isin(name_to_bn.index)
+        matched_names.update(chunk.loc[hit, "recipient"].unique())
+        if snap:
+            g = chunk[hit]
+            mid = g["canonical_ministry_id"].where(g["canonical_ministry_id"] != "",
+                                                   g["ministry"].map(cid_of_name))
+            snap.write("grants", pd.DataFrame({
+                "bn": name_to_bn.reindex(g["recipient"]).to_numpy(), "ministry_id": mid.to_numpy(),
+                "ministry_name": g["ministry"].to_numpy(), "fiscal_year": g["fiscal_year"].to_numpy(),
+                "political_era": g["political_era"].to_numpy(),
+                "amount": g["total_amount"].astype(float).to_numpy(),
+                "n_payments": g["n_payments"].astype("int64").to_numpy(),
+                "earliest": g["earliest_payment"].to_numpy(), "latest": g["latest_payment"].to_numpy()}))
+        if n_grants >= next_report:
+            say(f"  grants {n_grants:,} / ~{n['grants']:,}")
+            next_report = (n_grants // step + 1) * step
+    say(f"  grants {n_grants:,}")
+    counts["grants_aggregated.csv"] = n_grants
+    timings["grants"] = time.time() - t0
+
+    matched = sorted(matched_names)
+    save(pd.DataFrame({"goa_name": matched, "bn": name_to_bn.reindex(matched).to_numpy(),
+                       "match_method": "synthetic"}), "goa_cra_matched.csv")
+    save(make_federal(rng, n["federal"], orgs), "federal_grants.csv")
+
+    info = {"scale": scale, "seed": seed, "generator_version": GENERATOR_VERSION,
+            "generated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "rows": counts, "seconds": {k: round(v, 2) for k, v in timings.items()}}
+    if snap:
+        info["snapshot"] = snap.close({"synthetic": {"scale": scale, "seed": seed}})["version"]
+    with open(os.path.join(out, "synthetic_info.json"), "w", encoding="utf-8") as f:
+        json.dump(info, f, indent=2)
+    return info
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic Phase 0 data at a chosen scale")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiple of today's volumes (1, 10, 100)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--out", help="output directory (default: synthetic/<scale>x)")
+    parser.add_argument("--no-snapshot", action="store_true", help="skip the Parquet graph snapshot")
+    args = parser.parse_args()
+
+    out = args.out or default_out(args.scale, args.seed)
+    print(f"Generating {args.scale:g}x synthetic data (seed {args.seed}) into {out}")
+    t0 = time.time()
+    info = generate(args.scale, args.seed, out, snapshot=not args.no_snapshot)
+    for name, n in info["rows"].items():
+        print(f"  {name:<36} {n:>12,}")
+    print(f"Done in {time.time() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()